@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: renderer memory on long timelines with and without DOM pruning
+
+Loads a synthetic infinite feed (nested markup, text and a decoded image per
+post), scrolls it to 600 posts with the event-driven ScrollDriver, "extracts"
+each round's posts and optionally prunes them with DomPruner. Renderer metrics
+come from the Chrome DevTools Protocol (Performance.getMetrics after a forced
+GC) every 100 posts.
+
+Usage:
+    python bench_dom_pruning.py [target_posts]
+"""
+import sys
+import time
+import asyncio
+
+from playwright.async_api import async_playwright
+
+from scraper.scroll_driver import ScrollDriver
+from scraper.dom_pruning import DomPruner, unpruned
+
+POST_SELECTOR = 'div[role="article"]'
+
+FEED_HTML = """
+<html><body style="margin:0">
+<div id="feed" style="width:680px;margin:auto"></div>
+<script>
+  let next = 0;
+  const feed = document.getElementById('feed');
+  function image(n) {
+    const canvas = document.createElement('canvas');
+    canvas.width = 640; canvas.height = 360;
+    const ctx = canvas.getContext('2d');
+    ctx.fillStyle = `hsl(${(n * 37) % 360}, 70%, 50%)`;
+    ctx.fillRect(0, 0, 640, 360);
+    ctx.fillStyle = '#fff'; ctx.font = '48px sans-serif'; ctx.fillText('Post ' + n, 40, 180);
+    return canvas.toDataURL('image/jpeg', 0.8);
+  }
+  function addPosts(count) {
+    for (let i = 0; i < count; i++, next++) {
+      const post = document.createElement('div');
+      post.setAttribute('role', 'article');
+      post.style.cssText = 'border:1px solid #ddd;margin:12px 0;padding:12px';
+      let html = `<div><span dir="auto">Post number ${next}: a synthetic story with some text, #tag</span></div>`;
+      html += `<img src="${image(next)}" width="640" height="360">`;
+      html += '<div>' + Array.from({length: 40}, (_, k) => `<span><a href="/u/${k}">Reactor ${k}</a></span>`).join('') + '</div>';
+      post.innerHTML = html;
+      feed.appendChild(post);
+    }
+  }
+  addPosts(10);
+  let loading = false;
+  window.addEventListener('scroll', () => {
+    if (loading || window.innerHeight + window.scrollY < document.body.scrollHeight - 400) return;
+    loading = true;
+    setTimeout(() => { addPosts(10); loading = false; }, 50);
+  });
+</script>
+</body></html>
+"""
+
+
+async def renderer_metrics(client):
+    await client.send("HeapProfiler.collectGarbage")
+    metrics = {m["name"]: m["value"] for m in (await client.send("Performance.getMetrics"))["metrics"]}
+    return {
+        "js_heap_mb": metrics.get("JSHeapUsedSize", 0) / 1e6,
+        "nodes": int(metrics.get("Nodes", 0)),
+        "layout_objects": int(metrics.get("LayoutObjects", 0)),
+    }
+
+
+async def run(browser, mode, target_posts):
+    page = await browser.new_page(viewport={"width": 1000, "height": 800})
+    client = await page.context.new_cdp_session(page)
+    await client.send("Performance.enable")
+    await page.set_content(FEED_HTML)
+
+    driver = ScrollDriver(page, item_selector=POST_SELECTOR, min_delay=0.0, max_delay=0.0,
+                          timeout=3.0, graphql_url="")
+    pruner = DomPruner(page, mode) if mode != "none" else None
+    selector = unpruned(POST_SELECTOR) if pruner else POST_SELECTOR
+
+    extracted = 0
+    samples = []
+    next_sample = 100
+    start = time.time()
+    while extracted < target_posts:
+        elements = await page.query_selector_all(selector)
+        if pruner:
+            fresh = elements
+        else:
+            fresh = elements[extracted:]
+        extracted += len(fresh)
+        if pruner:
+            await pruner.prune(fresh)
+        while extracted >= next_sample and next_sample <= target_posts:
+            samples.append((next_sample, await renderer_metrics(client)))
+            next_sample += 100
+        result = await driver.scroll()
+        if not result.grew:
+            break
+
+    elapsed = time.time() - start
+    await page.close()
+    return samples, elapsed
+
+
+async def main(target_posts: int = 600):
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            for mode in ("none", "hide", "empty"):
+                samples, elapsed = await run(browser, mode, target_posts)
+                print(f"\n🧪 Pruning mode: {mode}  ({elapsed:.1f}s)")
+                print(f"{'posts':>6} {'JS heap MB':>11} {'DOM nodes':>10} {'layout objs':>12}")
+                for posts, m in samples:
+                    print(f"{posts:>6} {m['js_heap_mb']:>11.1f} {m['nodes']:>10} {m['layout_objects']:>12}")
+        finally:
+            await browser.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 600))
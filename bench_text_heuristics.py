@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: compiled text heuristics vs the PostsScraperImproved methods
+
+Builds a corpus from the bundled HTML samples (every span, auto-direction div,
+link and innerText line) and times the Strategy A/B candidate filter and the
+Strategy C line filter both ways.
+
+On the bundled samples the compiled engine measures about 1.9x on the
+Strategy A/B candidate filter and 1.6-1.8x on the Strategy C line filter.
+
+Usage:
+    python bench_text_heuristics.py [repeats]
+"""
+import sys
+import time
+import asyncio
+
+from scraper import text_heuristics
+from scraper.html_backend import SnapshotPage
+from scraper.posts_improved import PostsScraperImproved
+from scraper.utils import ScraperUtils
+
+SAMPLES = ["fb_profile_sample.html", "debug_facebook_page.html"]
+
+
+async def _collect_texts(html):
+    page = SnapshotPage(html)
+    texts = []
+    for selector in ("span", "div[dir='auto']", "a"):
+        for element in await page.query_selector_all(selector):
+            texts.append(await element.text_content())
+    texts.extend((await page.evaluate("() => document.body.innerText")).split("\n"))
+    return texts
+
+
+def build_corpus():
+    corpus = []
+    for name in SAMPLES:
+        with open(name, "r", encoding="utf-8") as f:
+            corpus.extend(asyncio.run(_collect_texts(f.read())))
+    return corpus
+
+
+def reference_candidates(scraper, texts, min_length):
+    candidates = []
+    for text in texts:
+        if text and len(text.strip()) > min_length:
+            cleaned = scraper._clean_facebook_content(text.strip())
+            if len(cleaned) > min_length and scraper._is_actual_post_content(cleaned):
+                candidates.append((cleaned, scraper._score_content_quality(cleaned)))
+    return candidates
+
+
+def reference_lines(scraper, full_text):
+    candidates = []
+    for line in [line.strip() for line in full_text.split('\n') if line.strip()]:
+        if len(line) > 25 and scraper._is_actual_post_content(line) and not scraper._is_ui_text(line):
+            cleaned = scraper._clean_facebook_content(line)
+            if len(cleaned) > 20:
+                candidates.append((cleaned, scraper._score_content_quality(cleaned)))
+    return candidates
+
+
+def timed(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = func()
+    return time.perf_counter() - start, result
+
+
+def main(repeats: int = 50):
+    scraper = PostsScraperImproved(SnapshotPage(""), ScraperUtils(None))
+    corpus = build_corpus()
+    full_text = "\n".join(t for t in corpus if t)
+    print(f"📊 Corpus: {len(corpus)} strings, {sum(len(t or '') for t in corpus):,} characters, {repeats} repeats")
+
+    cases = [
+        ("Strategy A/B candidates",
+         lambda: reference_candidates(scraper, corpus, 15),
+         lambda: text_heuristics.score_candidates(corpus, 15)),
+        ("Strategy C lines",
+         lambda: reference_lines(scraper, full_text),
+         lambda: text_heuristics.score_lines(full_text)),
+    ]
+
+    for label, reference, compiled in cases:
+        ref_time, ref_result = timed(reference, repeats)
+        fast_time, fast_result = timed(compiled, repeats)
+        status = "✅ identical" if ref_result == fast_result else "❌ MISMATCH"
+        print(f"{label:<26} reference {ref_time * 1000 / repeats:8.2f} ms   "
+              f"compiled {fast_time * 1000 / repeats:8.2f} ms   "
+              f"speedup {ref_time / fast_time:5.1f}x   {status}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -19,10 +19,18 @@ from fpdf import FPDF
 
 from scraper.session import FacebookSession
 from scraper.profile import ProfileScraper
-from scraper.posts_improved import PostsScraperImproved
+from scraper.posts_improved import PostsScraperImproved, EXTRACTION_BACKENDS
 from scraper.utils import ScraperUtils
 from scraper.json_builder import JSONBuilder
 from scraper.proxy_manager import ProxyManager
+from scraper.fields import FieldCostTracker, parse_fields, POST_FIELDS, PROFILE_SECTIONS
+from scraper.media_store import MediaStore
+from scraper.screenshot_service import ScreenshotService
+from scraper.identity import IdentityResolver
+from scraper.graph_store import GraphStore
+from scraper.negative_cache import NegativeCache
+from scraper.freshness import SECTIONS, SectionStore, join_sections, split_sections
+from scraper.navigation import NavigationManager
 
 # Global variables for VNC cleanup
 vnc_processes = []
@@ -155,6 +163,32 @@ templates = Jinja2Templates(directory="templates")
 os.makedirs("static/screenshots", exist_ok=True)
 os.makedirs("static/output", exist_ok=True)
 
+# Timeline checkpoints hold replayable session requests, so keep them out of static/
+CHECKPOINT_DIR = "data/checkpoints"
+
+# Posts from earlier runs, merged on every run and used by delta refreshes
+POST_HISTORY_DIR = "data/post_history"
+
+# Downloaded post media, stored once per content hash across all profiles
+MEDIA_STORE_DIR = "static/media"
+
+# Vanity name <-> numeric ID pairs learned from visited profiles
+IDENTITY_MAP_PATH = "data/identity_map.json"
+identity_resolver = IdentityResolver(IDENTITY_MAP_PATH)
+
+# Friendships of every scraped profile, as interned CSR adjacency arrays
+GRAPH_DIR = "data/graph"
+graph_store = GraphStore(GRAPH_DIR)
+
+# Profiles known to be missing or restricted, and private lists, answered without a browser
+NEGATIVE_CACHE_PATH = "data/negative_cache.json"
+negative_cache = NegativeCache(NEGATIVE_CACHE_PATH)
+NEGATIVE_STATUS_CODES = {"not_found": 404, "restricted": 403}
+
+# Last scraped data of every profile section, refreshed once past its TTL
+SECTION_DIR = "data/sections"
+section_store = SectionStore(SECTION_DIR)
+
 # Cache for scraping results
 scrape_results_cache = {}
 
@@ -231,7 +265,19 @@ async def root():
                 "description": "Scrape a Facebook profile",
                 "parameters": {
                     "username": "string - Facebook username to scrape",
-                    "headless": "boolean - Run in headless mode (default: false)"
+                    "headless": "boolean - Run in headless mode (default: false)",
+                    "backend": "string - Post extraction backend: live or snapshot (default: live)",
+                    "graphql": "boolean - Also capture posts from Facebook's GraphQL responses (default: false)",
+                    "paginate": "boolean - Fetch further timeline pages by GraphQL cursor instead of scrolling (default: false)",
+                    "prune": "boolean - Empty already-extracted posts from the page on long runs (default: false)",
+                    "resume": "boolean - Resume an interrupted timeline run from its checkpoint (default: true)",
+                    "delta": "boolean - Only scrape posts newer than the stored history and merge them in (default: false)",
+                    "fields": "string - Comma-separated post fields and profile sections to extract, e.g. content,timestamp,friends (default: all)",
+                    "full_comments": "boolean - Fetch each post's full comment thread from its permalink in background tabs (default: false)",
+                    "download_media": "boolean - Download post images/videos into the content-addressed media store (default: false)",
+                    "screenshots": "boolean - Save a clipped WebP screenshot of every post as media_screenshot_url (default: false)",
+                    "force_recheck": "boolean - Ignore cached not found / restricted / private results and check again (default: false)",
+                    "refresh": "boolean - Only re-scrape sections older than their TTL and merge them with the stored ones (default: false)"
                 },
                 "example": {
                     "basic": f"curl 'http://{server_ip}:8080/api/scrape/username' -o profile_data.json",
@@ -285,7 +331,11 @@ async def web_scrape_profile(username: str):
         return error_response
 
 @app.get("/api/scrape/{username:path}")
-async def api_scrape_profile(username: str, headless: bool = False):
+async def api_scrape_profile(username: str, headless: bool = False, backend: str = "live", graphql: bool = False,
+                             paginate: bool = False, prune: bool = False, resume: bool = True,
+                             delta: bool = False, fields: Optional[str] = None, full_comments: bool = False,
+                             download_media: bool = False, screenshots: bool = False, force_recheck: bool = False,
+                             refresh: bool = False):
     """
     Clean API endpoint for external clients - optimized for curl usage
     Returns pure JSON data that can be directly saved to file
@@ -297,7 +347,19 @@ async def api_scrape_profile(username: str, headless: bool = False):
         result = await scrape_profile(
             username=username, 
             use_vnc=False,  # Never use VNC for API calls
-            headless=headless
+            headless=headless,
+            backend=backend,
+            graphql=graphql,
+            paginate=paginate,
+            prune=prune,
+            resume=resume,
+            delta=delta,
+            fields=fields,
+            full_comments=full_comments,
+            download_media=download_media,
+            screenshots=screenshots,
+            force_recheck=force_recheck,
+            refresh=refresh
         )
         
         # Return clean JSON data structure
@@ -345,6 +407,42 @@ async def api_quick_scrape(username: str):
         "scraped_at": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
     }
 
+def _graph_key(username: str) -> List[str]:
+    """Every known name of a profile input; raises HTTPException 400 for inputs naming no profile"""
+    try:
+        return identity_resolver.resolve(username).aliases
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/graph/stats")
+async def api_graph_stats():
+    """Size of the stored friend graph"""
+    graph_store.refresh()
+    return {"success": True, "data": graph_store.stats()}
+
+@app.get("/api/graph/friends/{username:path}")
+async def api_graph_friends(username: str, limit: Optional[int] = None):
+    """Stored friends and degree of one profile"""
+    graph_store.refresh()
+    names = _graph_key(username)
+    if names not in graph_store:
+        raise HTTPException(status_code=404, detail=f"{names[0]} is not in the friend graph")
+    return {
+        "success": True,
+        "username": graph_store.key(names),
+        "data": {"degree": graph_store.degree(names), "friends": graph_store.neighbors(names, limit)}
+    }
+
+@app.get("/api/graph/mutual")
+async def api_graph_mutual(a: str, b: str):
+    """Mutual friends of two profiles"""
+    graph_store.refresh()
+    names_a, names_b = _graph_key(a), _graph_key(b)
+    mutual = graph_store.mutual_friends(names_a, names_b)
+    return {"success": True, "data": {"a": graph_store.key(names_a) or names_a[0],
+                                      "b": graph_store.key(names_b) or names_b[0],
+                                      "count": len(mutual), "mutual_friends": mutual}}
+
 @app.get("/api/docs")
 async def api_documentation():
     """API endpoint documentation for client testing"""
@@ -374,7 +472,19 @@ async def api_documentation():
                     "parameters": {
                         "username": "Facebook username or profile URL",
                         "headless": "boolean - Run headless (default: false)", 
-                        "use_morocco_proxy": "boolean - Use Morocco proxy (default: false)"
+                        "use_morocco_proxy": "boolean - Use Morocco proxy (default: false)",
+                        "backend": "string - live (query the browser DOM) or snapshot (parse page HTML offline)",
+                        "graphql": "boolean - Merge posts captured from GraphQL responses (default: false)",
+                        "paginate": "boolean - Page the timeline by GraphQL cursor, no scrolling (default: false)",
+                        "prune": "boolean - Keep renderer memory flat by emptying extracted posts (default: false)",
+                        "resume": "boolean - Continue an interrupted timeline run from its checkpoint (default: true)",
+                        "delta": "boolean - Stop at the newest already-stored post and merge (default: false)",
+                        "fields": "string - Only extract these post fields/profile sections; costs in extraction_metadata (default: all)",
+                        "full_comments": "boolean - Full comment threads per post via permalinks in background tabs (default: false)",
+                        "download_media": "boolean - Store post media by content hash under /static/media (default: false)",
+                        "screenshots": "boolean - Per-post WebP screenshots captured in the background (default: false)",
+                        "force_recheck": "boolean - Bypass the cache of missing/restricted profiles and private lists (default: false)",
+                        "refresh": "boolean - Partial refresh of stale sections; ages in extraction_metadata.section_ages (default: false)"
                     },
                     "estimated_time": "10-15 minutes",
                     "response": "Clean JSON with success flag and scraped data"
@@ -386,6 +496,25 @@ async def api_documentation():
                     "estimated_time": "N/A",
                     "response": "Error message indicating deprecation"
                 },
+                "graph_stats": {
+                    "url": "/api/graph/stats",
+                    "method": "GET",
+                    "description": "Size and degree statistics of the stored friend graph",
+                    "response": "profiles, friendships, max_degree, mean_degree, updated_at"
+                },
+                "graph_friends": {
+                    "url": "/api/graph/friends/{username}",
+                    "method": "GET",
+                    "description": "Stored friends and degree of a profile",
+                    "parameters": {"limit": "integer - Maximum friends returned (default: all)"},
+                    "response": "profile key, degree and friend keys"
+                },
+                "graph_mutual": {
+                    "url": "/api/graph/mutual?a={username}&b={username}",
+                    "method": "GET",
+                    "description": "Mutual friends of two profiles in the stored friend graph",
+                    "response": "both profile keys and their mutual friend keys"
+                },
                 "health_check": {
                     "url": "/health",
                     "method": "GET",
@@ -426,7 +555,11 @@ async def api_documentation():
     }
 
 @app.get("/scrape/{username:path}")
-async def scrape_profile(username: str, use_vnc: bool = False, headless: bool = False):
+async def scrape_profile(username: str, use_vnc: bool = False, headless: bool = False, backend: str = "live",
+                         graphql: bool = False, paginate: bool = False, prune: bool = False, resume: bool = True,
+                         delta: bool = False, fields: Optional[str] = None, full_comments: bool = False,
+                         download_media: bool = False, screenshots: bool = False, force_recheck: bool = False,
+                         refresh: bool = False):
     """API endpoint to scrape a Facebook profile with optional VNC support"""
     
     # URL decode the username in case it's a full URL that was encoded
@@ -446,27 +579,47 @@ async def scrape_profile(username: str, use_vnc: bool = False, headless: bool =
     if "facebook.com" in username and not any(x in username for x in ["profile.php?id=", "/", "."]):
         raise HTTPException(status_code=400, detail="Invalid Facebook URL format")
     
+    if backend not in EXTRACTION_BACKENDS:
+        raise HTTPException(status_code=400, detail=f"Invalid backend '{backend}', expected one of {list(EXTRACTION_BACKENDS)}")
+    
+    try:
+        post_fields, profile_sections = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{e}, expected any of {list(POST_FIELDS + PROFILE_SECTIONS)}")
+    
+    try:
+        identity = identity_resolver.resolve(username)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Answer known missing/restricted profiles without starting a browser
+    if force_recheck:
+        negative_cache.clear(identity.aliases)
+    else:
+        cached = negative_cache.lookup(identity.aliases)
+        if cached:
+            print(f"🚫 {username} is cached as {cached['reason']} ({cached['age_seconds']}s ago)")
+            raise HTTPException(status_code=NEGATIVE_STATUS_CODES[cached["reason"]],
+                                detail=f"Profile '{username}' is {cached['reason'].replace('_', ' ')} "
+                                       f"(checked {cached['age_seconds']}s ago, pass force_recheck=true to check again)")
+    
+    # A refresh only scrapes the requested sections that are past their TTL
+    requested_sections = [s for s in SECTIONS if s in ("basics", "posts") or s in profile_sections]
+    stale_sections = requested_sections
+    if refresh:
+        stale_sections = section_store.stale_sections(identity.aliases, requested_sections)
+        print(f"🗂️ Stale sections: {', '.join(stale_sections) or 'none'}")
+        if not stale_sections:
+            return _build_from_sections(identity, requested_sections)
+    
     try:
         print(f"🎯 Starting scrape for input: {username}")
+        print(f"🔍 Detected type: {identity.profile_type}")
+        print(f"🔍 Profile identifier: {identity.identifier}")
+        print(f"🔍 Will navigate to: {identity.url()}")
         
-        # Debug: Show URL detection results (imports already available at top)
-        
-        # Create temporary mock objects to test URL detection
-        class MockPage:
-            pass
-        class MockUtils:
-            pass
-        
-        temp_scraper = ProfileScraper(MockPage(), MockUtils())
-        profile_type, profile_identifier = temp_scraper._detect_profile_type(username)
-        constructed_url = temp_scraper._construct_profile_url(username)
-        
-        print(f"🔍 Detected type: {profile_type}")
-        print(f"🔍 Profile identifier: {profile_identifier}")
-        print(f"🔍 Will navigate to: {constructed_url}")
-        
-        # Use the clean profile identifier for directory names instead of full URL
-        clean_username = profile_identifier
+        # Name directories by the identity key, shared by every input form of the profile
+        clean_username = identity.key
         
         # Set up VNC server if requested
         if use_vnc and not headless:
@@ -518,8 +671,26 @@ async def scrape_profile(username: str, use_vnc: bool = False, headless: bool =
         
         # Initialize helper classes with username-specific directories
         utils = ScraperUtils(page, screenshot_dir=username_screenshots_dir)
-        profile_scraper = ProfileScraper(page, utils)
-        posts_scraper = PostsScraperImproved(page, utils)
+        cost_tracker = FieldCostTracker()
+        navigation = NavigationManager(page)
+        profile_scraper = ProfileScraper(page, utils, fields=fields, cost_tracker=cost_tracker,
+                                         identity_resolver=identity_resolver, negative_cache=negative_cache,
+                                         navigation=navigation)
+        # Downloaded media and post screenshots share one content-addressed store
+        media_store = MediaStore(MEDIA_STORE_DIR) if download_media or screenshots else None
+        if refresh:
+            profile_scraper.sections = frozenset(s for s in stale_sections if s in PROFILE_SECTIONS)
+        posts_scraper = PostsScraperImproved(page, utils, backend=backend, capture_graphql=graphql,
+                                             paginate_graphql=paginate, prune_extracted_posts=prune,
+                                             checkpoint_dir=CHECKPOINT_DIR if resume else None,
+                                             history_dir=POST_HISTORY_DIR, delta=delta,
+                                             fields=fields, cost_tracker=cost_tracker,
+                                             harvest_comments=full_comments,
+                                             media_store=media_store if download_media else None,
+                                             screenshot_service=ScreenshotService(page, media_store,
+                                                                                  username_screenshots_dir)
+                                             if screenshots else None,
+                                             identity_resolver=identity_resolver, navigation=navigation)
         json_builder = JSONBuilder(output_dir=username_output_dir)
         
         # Setup dialog handlers
@@ -540,6 +711,11 @@ async def scrape_profile(username: str, use_vnc: bool = False, headless: bool =
         if not profile_exists:
             print(f"❌ Failed to navigate to profile: {username}")
             await session.close()
+            # The scraper records under the identity learned on the page (e.g. the vanity name of an ID link)
+            cached = negative_cache.lookup((profile_scraper.identity or identity).aliases)
+            if cached:
+                raise HTTPException(status_code=NEGATIVE_STATUS_CODES[cached["reason"]],
+                                    detail=f"Profile '{username}' is {cached['reason'].replace('_', ' ')}")
             raise HTTPException(status_code=404, detail=f"Profile '{username}' not found or navigation failed")
         
         # Quick wait after successful navigation
@@ -548,8 +724,11 @@ async def scrape_profile(username: str, use_vnc: bool = False, headless: bool =
         
         # Quick checkpoint check
         print("🔍 Enhanced security checkpoint check for international accounts...")
-        checkpoint_detected = await utils.facebook_security_check()
-        if checkpoint_detected:
+        page_state = await utils.classify_page_state()
+        navigation.note_state(page_state["state"])
+        if page_state["state"] == "rate_limited":
+            print(f"⚠️ Facebook is rate limiting this account: {page_state['evidence'][:3]}")
+        if page_state["state"] == "checkpoint":
             print("🔒 Security checkpoint detected after profile navigation!")
             print("⏳ This is normal for international accounts (Moroccan account in US)")
             
@@ -592,19 +771,29 @@ async def scrape_profile(username: str, use_vnc: bool = False, headless: bool =
                         print(f"❌ Failed [{name}] after {max_retries + 1} attempts")
                         return {}
         
-        # Scrape basic profile info first
+        # Posts first, while the page still shows the profile: the posts stage then needs
+        # no navigation of its own, and the sections below each open their own URL once
+        if "posts" in stale_sections:
+            scrape_data["posts"] = await safe_scrape(
+                posts_scraper.get_all_post_types,
+                "All Posts",
+                username,
+                20  # Limit to 20 posts for better quality
+            )
+        
+        # Basic profile info (name and bio from the profile page, then the section pages)
         scrape_data["profile"] = await safe_scrape(
             profile_scraper.get_basic_info,
             "Basic Profile Info"
         )
-
-        # All post types - Enhanced posts extraction
-        scrape_data["posts"] = await safe_scrape(
-            posts_scraper.get_all_post_types,
-            "All Posts",
-            username,
-            20  # Limit to 20 posts for better quality
-        )
+        friends = (scrape_data["profile"] or {}).get("friends") or []
+        if friends:
+            try:
+                # Under the identity learned on the profile page, not the input form
+                identity = profile_scraper.identity or identity_resolver.resolve(clean_username)
+                graph_store.merge_friends(identity.aliases, friends, identity_resolver)
+            except Exception as e:
+                print(f"⚠️ Could not merge friends into the friend graph: {e}")
 
         # Locations visited
         # scrape_data["locations_visited"] = await safe_scrape(
@@ -629,6 +818,34 @@ async def scrape_profile(username: str, use_vnc: bool = False, headless: bool =
         
         print("🎉 All scraping operations completed!")
         
+        # Report what each field cost, and what the unrequested ones saved
+        posts_processed = cost_tracker.calls.get("content", 0)
+        skipped = {field: posts_processed for field in POST_FIELDS if field not in post_fields}
+        skipped.update({section: 1 for section in PROFILE_SECTIONS if section not in profile_scraper.sections})
+        scrape_data["extraction_costs"] = cost_tracker.report(skipped)
+        cost_tracker.save_baseline()
+        
+        # Store the sections scraped now, except those whose extraction failed (their empty
+        # placeholders are not the profile's data); a refresh fills the rest from the store
+        failed_sections = set(profile_scraper.section_errors)
+        if posts_scraper.extraction_failed:
+            failed_sections.add("posts")
+        if failed_sections:
+            print(f"⚠️ Not storing failed sections: {', '.join(sorted(failed_sections))}")
+        scraped = {s: data for s, data in split_sections(scrape_data).items()
+                   if s in stale_sections and s not in failed_sections}
+        try:
+            stored = section_store.update(clean_username, scraped, aliases=identity.aliases)
+        except OSError as e:
+            print(f"⚠️ Could not store profile sections: {e}")
+            stored = section_store.load(identity.aliases)
+        stored = {s: entry for s, entry in stored.items() if s in requested_sections}
+        if refresh:
+            scrape_data.update(join_sections(SectionStore.data(stored)))
+        scrape_data["section_ages"] = SectionStore.ages(stored)
+        scrape_data["navigation"] = navigation.report()
+        print(f"🧭 Navigations: {navigation.navigations} loaded, {navigation.avoided} avoided")
+        
         # Build JSON
         print("📝 Building final JSON output...")
         result = json_builder.build_profile_json(clean_username, scrape_data)
@@ -676,6 +893,27 @@ async def scrape_profile(username: str, use_vnc: bool = False, headless: bool =
         # Re-raise the exception so the calling endpoint can handle it
         raise
 
+def _build_from_sections(identity, sections: List[str]) -> Dict[str, Any]:
+    """Profile JSON from stored sections only, when none of them is stale"""
+    stored = {s: entry for s, entry in section_store.load(identity.aliases).items() if s in sections}
+    print(f"✅ All sections of {identity.key} are fresh, answering from the section store")
+    scrape_data = join_sections(SectionStore.data(stored))
+    scrape_data["section_ages"] = SectionStore.ages(stored)
+    json_builder = JSONBuilder(output_dir=os.path.join("static/output", identity.key))
+    return json_builder.build_profile_json(identity.key, scrape_data)["data"]
+
+def _find_profile_outputs(identity) -> List[Path]:
+    """Saved profile JSON files under any known name of the profile (key, vanity name, numeric ID)"""
+    for name in identity.aliases:
+        pattern = f"{name}_profile_*.json"
+        files = list((Path("static/output") / name).glob(pattern))
+        if not files:
+            # Fallback to old location
+            files = list(Path("static/output").glob(pattern))
+        if files:
+            return files
+    return []
+
 @app.get("/download/{username:path}/json")
 async def download_json(username: str):
     """Download the scraped data as a JSON file"""
@@ -683,22 +921,17 @@ async def download_json(username: str):
     username = urllib.parse.unquote(username).strip().rstrip('/').lstrip('@')
     
     # Extract clean identifier for file lookup
-    temp_scraper = ProfileScraper(type('MockPage', (), {})(), type('MockUtils', (), {})())
-    profile_type, clean_identifier = temp_scraper._detect_profile_type(username)
+    try:
+        identity = identity_resolver.resolve(username)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    clean_identifier = identity.key
     
     # Check if we have cached results or find the latest file
     if clean_identifier in scrape_results_cache:
         filepath = scrape_results_cache[clean_identifier]["filepath"]
     else:
-        # Try to find the latest file for this username
-        username_dir = Path("static/output") / clean_identifier
-        pattern = f"{clean_identifier}_profile_*.json"
-        files = list(username_dir.glob(pattern))
-        
-        if not files:
-            # Fallback to old location
-            files = list(Path("static/output").glob(pattern))
-        
+        files = _find_profile_outputs(identity)
         if not files:
             raise HTTPException(status_code=404, detail=f"No data found for {clean_identifier}")
         
@@ -719,20 +952,12 @@ async def generate_pdf(username: str):
         username = urllib.parse.unquote(username).strip().rstrip('/').lstrip('@')
         
         # Extract clean identifier for file lookup
-        temp_scraper = ProfileScraper(type('MockPage', (), {})(), type('MockUtils', (), {})())
-        profile_type, clean_identifier = temp_scraper._detect_profile_type(username)
+        identity = identity_resolver.resolve(username)
+        clean_identifier = identity.key
         
         # Check if we have cached results
         if clean_identifier not in scrape_results_cache:
-            # Try to find the latest file for this username
-            username_dir = Path("static/output") / clean_identifier
-            pattern = f"{clean_identifier}_profile_*.json"
-            files = list(username_dir.glob(pattern))
-            
-            if not files:
-                # Fallback to old location
-                files = list(Path("static/output").glob(pattern))
-            
+            files = _find_profile_outputs(identity)
             if not files:
                 raise HTTPException(status_code=404, detail=f"No data found for {clean_identifier}")
             
@@ -1113,12 +1338,14 @@ async def quick_test_friends_only(username: str):
         
         # Initialize scraper
         utils = ScraperUtils(page)
-        profile_scraper = ProfileScraper(page, utils)
+        profile_scraper = ProfileScraper(page, utils, identity_resolver=identity_resolver)
         
         # Navigate to profile
         profile_exists = await profile_scraper.navigate_to_profile(username)
         if not profile_exists:
             await session.close()
+            if profile_scraper.profile_locked:
+                raise HTTPException(status_code=403, detail=f"Profile '{username}' is restricted")
             raise HTTPException(status_code=404, detail=f"Profile '{username}' not found")
         
         # Scrape friends only
@@ -0,0 +1,130 @@
+"""
+One-pass About page snapshots
+
+The About stage used to query the live page once per field (work, education,
+location, birthday, contact), each extractor reading ``document.body.innerText``
+or running its own selectors. take_about_snapshot reads everything the field
+parsers need in a single page call:
+
+    {"url", "text", "emails", "phones", "fragments": {"work", "education", "location"}}
+
+and the parsers run on that dict in Python. When the overview leaves fields
+empty, the sub-tabs that hold them are opened side by side in background tabs
+of the same context (images, media and fonts blocked) and snapshotted the same
+way.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+# Fields of the about section, in output order
+ABOUT_FIELDS = ("work", "education", "location", "birthday", "email", "phone")
+
+# About sub-tab (profile section) -> fields it lists
+ABOUT_SUBTABS = {
+    "about_work_and_education": ("work", "education"),
+    "about_places": ("location",),
+    "about_contact_and_basic_info": ("birthday", "email", "phone"),
+}
+
+# Column the About content renders in
+ABOUT_READY_SELECTOR = 'div[role="main"]'
+
+# The About cards fill in shortly after the column appears
+ABOUT_SETTLE_SECONDS = 2
+
+BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+
+ABOUT_SNAPSHOT_JS = """
+(readySelector) => {
+    const root = document.querySelector(readySelector) || document.body;
+    const links = (prefix) => Array.from(root.querySelectorAll(`a[href^="${prefix}"]`))
+        .map(a => decodeURIComponent(a.getAttribute('href').slice(prefix.length)).split('?')[0].trim())
+        .filter(Boolean);
+    const fragments = (selector) => Array.from(root.querySelectorAll(selector))
+        .map(el => (el.innerText || '').trim())
+        .filter(Boolean);
+    return {
+        url: location.href,
+        text: root.innerText || '',
+        emails: links('mailto:'),
+        phones: links('tel:'),
+        fragments: {
+            work: fragments('div[data-testid="work"], a[href*="/work/"]'),
+            education: fragments('div[data-testid="education"], a[href*="/education/"]'),
+            location: fragments('div[data-testid="location"]')
+        }
+    };
+}
+"""
+
+
+def empty_snapshot(url: str = "") -> Dict[str, Any]:
+    return {"url": url, "text": "", "emails": [], "phones": [],
+            "fragments": {"work": [], "education": [], "location": []}}
+
+
+async def take_about_snapshot(page) -> Dict[str, Any]:
+    """Text and field fragments of the page's About column in one call"""
+    try:
+        return await page.evaluate(ABOUT_SNAPSHOT_JS, ABOUT_READY_SELECTOR)
+    except Exception as e:
+        logger.warning(f"⚠️ About snapshot failed: {e}")
+        return empty_snapshot(getattr(page, "url", ""))
+
+
+def missing_fields(about: Dict[str, Any]) -> List[str]:
+    return [field for field in ABOUT_FIELDS if not about.get(field)]
+
+
+def subtabs_for(fields: Iterable[str]) -> List[str]:
+    """About sub-tabs that list any of the given fields"""
+    wanted = set(fields)
+    return [section for section, section_fields in ABOUT_SUBTABS.items() if wanted.intersection(section_fields)]
+
+
+async def _snapshot_in_new_tab(context, url: str, timeout: int) -> Dict[str, Any]:
+    page = await context.new_page()
+    try:
+        async def block_heavy(route):
+            if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await page.route("**/*", block_heavy)
+        await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+        try:
+            await page.wait_for_selector(ABOUT_READY_SELECTOR, timeout=8000)
+        except Exception:
+            pass
+        await asyncio.sleep(ABOUT_SETTLE_SECONDS)
+        return await take_about_snapshot(page)
+    finally:
+        await page.close()
+
+
+async def load_about_subtabs(context, urls: Dict[str, str], timeout: int = 30000) -> Dict[str, Dict[str, Any]]:
+    """
+    Snapshot several About sub-tabs at once, one background tab each.
+
+    Args:
+        context: browser context of the scraping page (shares its session)
+        urls: sub-tab section -> URL
+        timeout: navigation timeout per tab in milliseconds
+
+    Returns:
+        section -> snapshot, for the tabs that loaded
+    """
+    sections = list(urls)
+    results = await asyncio.gather(*(_snapshot_in_new_tab(context, urls[s], timeout) for s in sections),
+                                   return_exceptions=True)
+    snapshots = {}
+    for section, result in zip(sections, results):
+        if isinstance(result, Exception):
+            logger.warning(f"⚠️ Could not load About tab {section}: {result}")
+        else:
+            snapshots[section] = result
+    return snapshots
@@ -0,0 +1,118 @@
+"""
+Confidence-based extraction cascade
+
+Runs extraction strategies in order. Each strategy returns (value, confidence)
+candidates, and the remaining strategies are skipped as soon as the best
+candidate so far reaches the confidence threshold. Per-strategy hit rates are
+tracked so strategies can be reordered by how often they actually win.
+"""
+import time
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Candidate = Tuple[Any, float]
+Strategy = Callable[[Any], Awaitable[List[Candidate]]]
+
+
+class StrategyStats:
+    """Counters for a single strategy"""
+
+    def __init__(self):
+        self.runs = 0
+        self.hits = 0       # runs that produced at least one candidate
+        self.wins = 0       # runs whose candidate was the final pick
+        self.skipped = 0    # runs avoided by early exit
+        self.errors = 0
+        self.seconds = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "hits": self.hits,
+            "wins": self.wins,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / self.runs, 3) if self.runs else 0.0,
+            "win_rate": round(self.wins / self.runs, 3) if self.runs else 0.0,
+            "avg_ms": round(self.seconds * 1000 / self.runs, 2) if self.runs else 0.0
+        }
+
+
+class ExtractionCascade:
+    """
+    Ordered strategies with early exit.
+
+    The winner is the highest-confidence candidate; ties go to the candidate
+    found first, same as a stable sort over all candidates.
+    """
+
+    def __init__(self, name: str, threshold: float):
+        self.name = name
+        self.threshold = threshold
+        self.strategies: List[Tuple[str, Strategy]] = []
+        self.stats: Dict[str, StrategyStats] = {}
+        self.calls = 0
+        self.early_exits = 0
+
+    def add(self, name: str, strategy: Strategy) -> "ExtractionCascade":
+        self.strategies.append((name, strategy))
+        self.stats[name] = StrategyStats()
+        return self
+
+    async def run(self, element) -> Optional[Candidate]:
+        """Run strategies until one pushes the best confidence over the threshold"""
+        self.calls += 1
+        best: Optional[Candidate] = None
+        best_strategy = None
+
+        for index, (name, strategy) in enumerate(self.strategies):
+            stats = self.stats[name]
+            stats.runs += 1
+            start = time.perf_counter()
+            try:
+                candidates = await strategy(element) or []
+            except Exception as e:
+                logger.debug(f"{self.name} strategy '{name}' failed: {e}")
+                stats.errors += 1
+                candidates = []
+            stats.seconds += time.perf_counter() - start
+
+            if candidates:
+                stats.hits += 1
+            for candidate in candidates:
+                if best is None or candidate[1] > best[1]:
+                    best, best_strategy = candidate, name
+
+            if best is not None and best[1] >= self.threshold:
+                remaining = self.strategies[index + 1:]
+                if remaining:
+                    self.early_exits += 1
+                    for skipped_name, _ in remaining:
+                        self.stats[skipped_name].skipped += 1
+                break
+
+        if best_strategy is not None:
+            self.stats[best_strategy].wins += 1
+        return best
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "early_exits": self.early_exits,
+            "strategies": {name: self.stats[name].to_dict() for name, _ in self.strategies}
+        }
+
+    def log_stats(self) -> None:
+        """Log per-strategy hit rates so strategies can be reordered"""
+        if not self.calls:
+            return
+        logger.info(f"📊 {self.name} cascade: {self.calls} calls, {self.early_exits} early exits")
+        for name, _ in self.strategies:
+            s = self.stats[name].to_dict()
+            if s["runs"] or s["skipped"]:
+                logger.info(
+                    f"   {name[:60]:<60} runs={s['runs']} hit={s['hit_rate']:.0%} "
+                    f"win={s['win_rate']:.0%} skipped={s['skipped']} avg={s['avg_ms']}ms"
+                )
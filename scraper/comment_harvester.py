@@ -0,0 +1,249 @@
+"""
+Full comment threads from post permalinks
+
+The timeline extractor only reads the few comments rendered inline under each
+post. CommentHarvester takes the ``original_url`` permalinks of extracted posts
+and opens them in a small pool of background tabs of the same browser context
+(same session cookies). Each tab expands the thread with bulk_expand, reads
+every comment in one page call and streams the result into the post record,
+while the timeline tab keeps scrolling.
+
+Concurrency is bounded by the number of tabs; each post is bounded by
+``max_comments_per_post`` and ``post_timeout``. Images, media and fonts are
+not loaded in the harvesting tabs.
+"""
+import re
+import time
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin, urlsplit, parse_qs
+
+from .utils import ScraperUtils
+
+logger = logging.getLogger(__name__)
+
+# Comment and reply containers on a post permalink page
+COMMENT_SELECTOR = ('div[role="article"][aria-label^="Comment"], div[role="article"][aria-label^="Reply"], '
+                    'div[data-testid="UFI2Comment/root_depth_0"], div[data-testid="UFI2Comment/root_depth_1"]')
+
+# Resource types the harvesting tabs never need
+BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+
+COMMENTS_JS = """
+([selector, maxComments]) => {
+    const comments = [];
+    for (const el of document.querySelectorAll(selector)) {
+        if (comments.length >= maxComments) break;
+        const label = el.getAttribute('aria-label') || '';
+        const links = Array.from(el.querySelectorAll('a[href]'));
+        const author = links.find(a => a.innerText.trim() && !a.href.includes('comment_id'));
+        const permalink = links.find(a => a.href.includes('comment_id'));
+        const authorName = author ? author.innerText.trim() : '';
+        const text = Array.from(el.querySelectorAll('div[dir="auto"]'))
+            .filter(d => d.closest(selector) === el && !d.querySelector('div[dir="auto"]'))
+            .map(d => d.innerText.trim())
+            .filter(t => t && t !== authorName)
+            .join('\\n');
+        comments.push({
+            author: authorName,
+            profile_url: author ? author.getAttribute('href') : '',
+            text: text,
+            timestamp: permalink ? permalink.innerText.trim() : '',
+            permalink: permalink ? permalink.getAttribute('href') : '',
+            is_reply: label.startsWith('Reply') || el.getAttribute('data-testid') === 'UFI2Comment/root_depth_1'
+        });
+    }
+    return comments;
+}
+"""
+
+COUNT_JS = "(selector) => document.querySelectorAll(selector).length"
+
+
+def normalize_comment(raw: Dict[str, Any], base_url: str = "https://www.facebook.com/") -> Optional[Dict[str, Any]]:
+    """Turn one raw in-page comment into the post's comment structure (None if it has no text)"""
+    text = re.sub(r'[ \t]+', ' ', raw.get("text") or "").strip()
+    if not text:
+        return None
+    profile_url = raw.get("profile_url") or ""
+    if profile_url:
+        # Commenter links carry tracking parameters; keep only the profile itself
+        parts = urlsplit(urljoin(base_url, profile_url))
+        profile_id = parse_qs(parts.query).get("id")
+        profile_url = f"{parts.scheme}://{parts.netloc}{parts.path}"
+        if profile_id and parts.path.endswith("profile.php"):
+            profile_url += f"?id={profile_id[0]}"
+    permalink = raw.get("permalink") or ""
+    comment_id = parse_qs(urlsplit(permalink).query).get("comment_id", [""])[0] if permalink else ""
+    return {
+        "id": comment_id,
+        "commenter": {
+            "name": (raw.get("author") or "").strip() or "Unknown",
+            "profile_url": profile_url,
+        },
+        "comment_text": text,
+        "timestamp": (raw.get("timestamp") or "").strip(),
+        "is_reply": bool(raw.get("is_reply")),
+    }
+
+
+class CommentHarvester:
+    """
+    Pool of background tabs that fetch full comment threads by permalink.
+
+    Args:
+        context: Playwright browser context (tabs share its cookies)
+        concurrency: number of harvesting tabs
+        max_comments_per_post: stop expanding a thread once this many comments are loaded
+        max_expansion_rounds: bulk expansion calls per post at most
+        post_timeout: seconds one post may take before it is given up
+        max_posts: harvest at most this many posts (None for all)
+        foreground_page: page to bring back to the front after a tab opens, so the
+            timeline tab is never backgrounded (and throttled) in headed runs
+    """
+
+    def __init__(self, context, concurrency: int = 3, max_comments_per_post: int = 50,
+                 max_expansion_rounds: int = 5, post_timeout: float = 45.0,
+                 max_posts: Optional[int] = None, foreground_page=None):
+        self.context = context
+        self.concurrency = max(1, concurrency)
+        self.max_comments_per_post = max_comments_per_post
+        self.max_expansion_rounds = max_expansion_rounds
+        self.post_timeout = post_timeout
+        self.max_posts = max_posts
+        self.foreground_page = foreground_page
+
+        self.results: Dict[str, List[Dict[str, Any]]] = {}
+        self.failed = 0
+        self.seconds = 0.0
+        self._submitted = set()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._pages = []
+
+    def submit(self, post: Dict[str, Any]) -> bool:
+        """Queue a post for harvesting (once per post ID); returns whether it was queued"""
+        post_id = post.get("id")
+        if not post_id or not post.get("original_url") or post_id in self._submitted:
+            return False
+        if self.max_posts is not None and len(self._submitted) >= self.max_posts:
+            return False
+        self._submitted.add(post_id)
+        self._queue.put_nowait(post)
+        if len(self._workers) < self.concurrency:
+            self._workers.append(asyncio.create_task(self._worker()))
+        return True
+
+    async def _open_tab(self):
+        page = await self.context.new_page()
+        self._pages.append(page)
+
+        async def block_heavy(route):
+            if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await page.route("**/*", block_heavy)
+        if self.foreground_page is not None:
+            try:
+                await self.foreground_page.bring_to_front()
+            except Exception:
+                pass
+        return page
+
+    async def _worker(self) -> None:
+        page = None
+        while True:
+            post = await self._queue.get()
+            try:
+                if page is None:
+                    page = await self._open_tab()
+                start = time.perf_counter()
+                comments = await asyncio.wait_for(self._harvest(page, post["original_url"]), self.post_timeout)
+                self.seconds += time.perf_counter() - start
+                self._store(post, comments)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.debug(f"Comment harvest failed for {post.get('original_url')}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _harvest(self, page, url: str) -> List[Dict[str, Any]]:
+        await page.goto(url, wait_until="domcontentloaded")
+        try:
+            await page.wait_for_selector(COMMENT_SELECTOR, timeout=5000)
+        except Exception:
+            return []
+
+        utils = ScraperUtils(page)
+        for _ in range(self.max_expansion_rounds):
+            if await page.evaluate(COUNT_JS, COMMENT_SELECTOR) >= self.max_comments_per_post:
+                break
+            result = await utils.bulk_expand(kinds=("comments",), viewport_only=False, max_expansions=10)
+            if not result["clicked"]:
+                break
+
+        raw_comments = await page.evaluate(COMMENTS_JS, [COMMENT_SELECTOR, self.max_comments_per_post])
+        comments = []
+        seen = set()
+        for raw in raw_comments:
+            comment = normalize_comment(raw, url)
+            key = comment and (comment["id"] or (comment["commenter"]["name"], comment["comment_text"]))
+            if comment and key not in seen:
+                seen.add(key)
+                comments.append(comment)
+        return comments
+
+    def _store(self, post: Dict[str, Any], comments: List[Dict[str, Any]]) -> None:
+        """Stream a finished thread into its post record"""
+        if not comments:
+            return
+        self.results[post["id"]] = comments
+        post["comments"] = comments
+        post["comments_count"] = max(post.get("comments_count") or 0, len(comments))
+
+    def apply(self, posts: List[Dict[str, Any]]) -> int:
+        """Copy harvested threads onto posts by ID (for records copied after submission)"""
+        applied = 0
+        for post in posts:
+            comments = self.results.get(post.get("id"))
+            if comments:
+                post["comments"] = comments
+                post["comments_count"] = max(post.get("comments_count") or 0, len(comments))
+                applied += 1
+        return applied
+
+    async def drain(self, timeout: Optional[float] = None) -> None:
+        """Wait for queued posts to finish (at most timeout seconds), then close the tabs"""
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ Comment harvest timed out with {self._queue.qsize()} posts still queued")
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for page in self._pages:
+            try:
+                await page.close()
+            except Exception:
+                pass
+        self._pages = []
+
+    def report(self) -> Dict[str, Any]:
+        harvested = len(self.results)
+        return {
+            "posts_submitted": len(self._submitted),
+            "posts_with_comments": harvested,
+            "comments": sum(len(c) for c in self.results.values()),
+            "failed": self.failed,
+            "tab_seconds": round(self.seconds, 2),
+        }
@@ -0,0 +1,101 @@
+"""
+DOM pruning for long timeline runs
+
+Facebook keeps every rendered story in the DOM, so a run toward max_posts=200
+grows the renderer until it slows down or crashes. Once a post has been
+extracted and its ID recorded, its subtree is no longer needed: DomPruner
+replaces it with an empty placeholder of the same height, so the scroll
+position and the infinite-scroll trigger near the bottom are unaffected.
+
+Modes:
+    "empty" - remove the children (frees DOM, layout and image memory)
+    "hide"  - keep the nodes but skip their rendering (content-visibility) and
+              drop image/video sources; use it if the page reacts badly to
+              removed children
+"""
+import logging
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+PRUNED_ATTR = "data-fbs-pruned"
+PRUNE_MODES = ("empty", "hide")
+
+PRUNE_JS = """
+([elements, mode, attr]) => {
+    let pruned = 0, nodes = 0;
+    for (const el of elements) {
+        if (!el || !el.isConnected || el.hasAttribute(attr)) continue;
+        const height = Math.ceil(el.getBoundingClientRect().height);
+        nodes += el.getElementsByTagName('*').length;
+
+        for (const video of el.querySelectorAll('video')) {
+            video.pause();
+            video.removeAttribute('src');
+            video.load();
+        }
+
+        if (mode === 'hide') {
+            for (const img of el.querySelectorAll('img')) {
+                img.removeAttribute('srcset');
+                img.removeAttribute('src');
+            }
+            el.style.contentVisibility = 'hidden';
+            el.style.containIntrinsicSize = `auto ${height}px`;
+        } else {
+            el.replaceChildren();
+            el.style.contain = 'strict';
+        }
+        el.style.height = `${height}px`;
+        el.style.minHeight = `${height}px`;
+        el.setAttribute(attr, '1');
+        pruned++;
+    }
+    return {pruned, nodes};
+}
+"""
+
+
+def unpruned(selector: str) -> str:
+    """Restrict a single CSS selector to elements neither pruned nor inside a pruned post"""
+    return f"{selector}:not([{PRUNED_ATTR}]):not([{PRUNED_ATTR}] *)"
+
+
+class DomPruner:
+    """Empty already-extracted post subtrees in one page call per round"""
+
+    def __init__(self, page, mode: str = "empty"):
+        if mode not in PRUNE_MODES:
+            raise ValueError(f"Unknown prune mode: {mode}")
+        self.page = page
+        self.mode = mode
+
+        # Metrics
+        self.rounds = 0
+        self.pruned = 0
+        self.nodes_pruned = 0
+
+    async def prune(self, elements: List[Any]) -> int:
+        """Prune the given element handles; returns how many were pruned"""
+        if not elements:
+            return 0
+        try:
+            result = await self.page.evaluate(PRUNE_JS, [elements, self.mode, PRUNED_ATTR])
+        except Exception as e:
+            logger.warning(f"⚠️ Could not prune extracted posts: {e}")
+            return 0
+
+        self.rounds += 1
+        self.pruned += result["pruned"]
+        self.nodes_pruned += result["nodes"]
+        if result["pruned"]:
+            logger.info(f"🧹 Pruned {result['pruned']} extracted posts ({result['nodes']} nodes, total {self.pruned})")
+        return result["pruned"]
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "rounds": self.rounds,
+            "posts_pruned": self.pruned,
+            "nodes_pruned": self.nodes_pruned
+        }
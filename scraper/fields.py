@@ -0,0 +1,128 @@
+"""
+Field projection and extraction cost accounting
+
+A ``fields`` spec ("content,timestamp,friends") selects which post fields and
+profile sections are extracted; unrequested extractors are never run. Names
+from each group default to the whole group when none of them are given, so
+"friends" alone still extracts every post field, and no spec means everything.
+``id``, ``content`` and ``original_url`` are always extracted because post IDs
+and post validation depend on them.
+
+FieldCostTracker times every extractor that does run and keeps a per-item
+baseline (seconds per post / per section) across runs, so the response can
+report what each skipped field saved.
+"""
+import os
+import json
+import time
+import logging
+from collections import defaultdict
+from typing import Any, Awaitable, Dict, FrozenSet, Iterable, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Optional post fields, in extraction order
+POST_FIELDS = (
+    "timestamp", "is_tagged", "tagged_accounts", "location_tagged", "comments",
+    "reactions", "comments_count", "shares_count", "media",
+)
+# Post fields every post carries regardless of the spec
+REQUIRED_POST_FIELDS = ("id", "content", "original_url")
+
+PROFILE_SECTIONS = ("about", "friends", "pages_followed", "following", "groups")
+
+DEFAULT_BASELINE_PATH = "data/field_costs.json"
+
+
+def parse_fields(spec: Union[str, Iterable[str], None]) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """
+    Split a fields spec into (post fields, profile sections).
+
+    Raises ValueError for unknown names.
+    """
+    if spec is None:
+        return frozenset(POST_FIELDS), frozenset(PROFILE_SECTIONS)
+    names = [n.strip() for n in (spec.split(",") if isinstance(spec, str) else spec) if n and n.strip()]
+    unknown = [n for n in names if n not in POST_FIELDS + REQUIRED_POST_FIELDS + PROFILE_SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    post_fields = {n for n in names if n in POST_FIELDS}
+    sections = {n for n in names if n in PROFILE_SECTIONS}
+    if not post_fields and not any(n in REQUIRED_POST_FIELDS for n in names):
+        post_fields = set(POST_FIELDS)
+    if not sections:
+        sections = set(PROFILE_SECTIONS)
+    return frozenset(post_fields), frozenset(sections)
+
+
+class FieldCostTracker:
+    """Time extractors per field and estimate the savings of skipped ones"""
+
+    def __init__(self, baseline_path: Optional[str] = DEFAULT_BASELINE_PATH):
+        self.baseline_path = baseline_path
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.baseline: Dict[str, float] = self._load_baseline()
+
+    def _load_baseline(self) -> Dict[str, float]:
+        if not self.baseline_path or not os.path.exists(self.baseline_path):
+            return {}
+        try:
+            with open(self.baseline_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Could not read field cost baseline: {e}")
+            return {}
+
+    async def measure(self, field: str, awaitable: Awaitable[Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.seconds[field] += time.perf_counter() - start
+            self.calls[field] += 1
+
+    def per_call(self, field: str) -> Optional[float]:
+        if self.calls.get(field):
+            return self.seconds[field] / self.calls[field]
+        return self.baseline.get(field)
+
+    def report(self, skipped: Dict[str, int]) -> Dict[str, Any]:
+        """
+        Cost of every field that ran, and the estimated savings of skipped ones.
+
+        ``skipped`` maps each skipped field to how many times it would have run
+        (posts extracted for post fields, 1 for a profile section).
+        """
+        measured = {
+            field: {"seconds": round(self.seconds[field], 3), "calls": self.calls[field],
+                    "ms_per_call": round(1000 * self.seconds[field] / self.calls[field], 2)}
+            for field in sorted(self.calls)
+        }
+        savings = {}
+        for field, count in skipped.items():
+            per_call = self.baseline.get(field)
+            savings[field] = round(per_call * count, 3) if per_call is not None else None
+        known = [s for s in savings.values() if s is not None]
+        return {
+            "measured": measured,
+            "skipped": sorted(skipped),
+            "estimated_seconds_saved": savings,
+            "total_estimated_seconds_saved": round(sum(known), 3) if known else None
+        }
+
+    def save_baseline(self, smoothing: float = 0.3) -> None:
+        """Blend this run's per-call costs into the stored baseline"""
+        if not self.baseline_path or not self.calls:
+            return
+        for field, calls in self.calls.items():
+            current = self.seconds[field] / calls
+            previous = self.baseline.get(field)
+            self.baseline[field] = current if previous is None else previous + smoothing * (current - previous)
+        try:
+            os.makedirs(os.path.dirname(self.baseline_path) or ".", exist_ok=True)
+            with open(self.baseline_path, "w", encoding="utf-8") as f:
+                json.dump(self.baseline, f, indent=2)
+        except OSError as e:
+            logger.debug(f"Could not save field cost baseline: {e}")
@@ -0,0 +1,115 @@
+"""
+Section-level freshness
+
+A profile's sections change at very different rates: its About data rarely,
+its friends list now and then, its posts all the time. SectionStore keeps
+the last scraped data of every section with the time it was scraped, one
+JSON file per profile key, and knows from per-section TTLs which sections
+are stale. A refresh scrapes only those and merges them with the stored
+rest; the response reports the age of every section.
+"""
+import os
+import json
+import time
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SECTION_DIR = "data/sections"
+
+# Seconds after which each section is scraped again on a refresh
+SECTION_TTLS = {
+    "basics": 24 * 3600,            # name and bio
+    "about": 7 * 24 * 3600,
+    "friends": 24 * 3600,
+    "pages_followed": 7 * 24 * 3600,
+    "following": 3 * 24 * 3600,
+    "groups": 7 * 24 * 3600,
+    "posts": 3600,
+}
+SECTIONS = tuple(SECTION_TTLS)
+
+
+def split_sections(scrape_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-section data of one scrape (get_basic_info result under "profile", posts under "posts")"""
+    profile = scrape_data.get("profile") or {}
+    sections = {}
+    if profile:
+        sections["basics"] = {"name": profile.get("name", ""), "bio": profile.get("bio", "")}
+        for section in SECTIONS:
+            if section in profile:
+                sections[section] = profile[section]
+    if scrape_data.get("posts"):
+        sections["posts"] = scrape_data["posts"]
+    return sections
+
+
+def join_sections(sections: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of split_sections"""
+    profile = dict(sections.get("basics") or {})
+    profile.update({section: data for section, data in sections.items() if section not in ("basics", "posts")})
+    return {"profile": profile, "posts": sections.get("posts", {})}
+
+
+class SectionStore:
+    """
+    Last scraped data and scrape time of every section of every profile.
+
+    Args:
+        root: directory of the <profile key>.json files
+        ttls: per-section overrides of SECTION_TTLS
+    """
+
+    def __init__(self, root: str = DEFAULT_SECTION_DIR, ttls: Optional[Dict[str, float]] = None):
+        self.root = root
+        self.ttls = dict(SECTION_TTLS, **(ttls or {}))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.json")
+
+    def load(self, keys: Union[str, Iterable[str]]) -> Dict[str, Dict[str, Any]]:
+        """{section: {"scraped_at", "data"}} stored under the first of the profile's keys that has any"""
+        for key in [keys] if isinstance(keys, str) else keys:
+            path = self._path(key)
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f).get("sections", {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Could not read stored sections {path}: {e}")
+        return {}
+
+    def update(self, key: str, sections: Dict[str, Any], now: Optional[float] = None,
+               aliases: Iterable[str] = ()) -> Dict[str, Dict[str, Any]]:
+        """Store freshly scraped sections over the stored ones; returns every stored section"""
+        now = time.time() if now is None else now
+        stored = self.load([key, *aliases])
+        for section, data in sections.items():
+            stored[section] = {"scraped_at": now, "data": data}
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self._path(key)}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "sections": stored}, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path(key))
+        logger.info(f"🗂️ Stored sections of {key}: {', '.join(sections) or 'none'}")
+        return stored
+
+    def stale_sections(self, keys: Union[str, Iterable[str]], requested: Optional[Iterable[str]] = None,
+                       now: Optional[float] = None) -> List[str]:
+        """Requested sections (default: all) that were never scraped or are older than their TTL"""
+        now = time.time() if now is None else now
+        stored = self.load(keys)
+        return [section for section in (requested or SECTIONS)
+                if section not in stored or now - stored[section]["scraped_at"] >= self.ttls[section]]
+
+    @staticmethod
+    def ages(stored: Dict[str, Dict[str, Any]], now: Optional[float] = None) -> Dict[str, int]:
+        """Seconds since each stored section was scraped"""
+        now = time.time() if now is None else now
+        return {section: round(now - entry["scraped_at"]) for section, entry in stored.items()}
+
+    @staticmethod
+    def data(stored: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        return {section: entry["data"] for section, entry in stored.items()}
@@ -0,0 +1,405 @@
+"""
+Friend-graph crawler
+
+Expands a seed list into its friendship graph: every profile taken from the
+frontier has its friends list harvested (ProfileScraper.get_friends_list), one
+edge is written per friend, and friends that are still within ``max_depth`` are
+added to the frontier. Seeds are depth 0; with the default ``max_depth=2`` the
+seeds and their friends are expanded, so the edges reach friends of friends.
+
+Profiles are deduplicated on their identity key (see scraper.identity), and
+the frontier is an append-only JSONL journal, so a crawl can be interrupted
+and resumed: profiles that were being expanded at the time are simply taken
+again. Each account (one logged-in browser session) expands one profile at a
+time under its own rate limit, all accounts share the frontier, and the crawl
+stops at its total profile budget or time budget.
+
+Crawl directory (``data/crawls/<name>/``):
+    frontier.jsonl
+        {"type": "enqueue", "time": ..., "key": ..., "url": ..., "depth": ..., "parent": ...}
+        {"type": "done", "time": ..., "key": ..., "account": ..., "friends": ...}
+        {"type": "failed", "time": ..., "key": ..., "account": ..., "error": ...}
+    edges.jsonl
+        {"source": ..., "target": ..., "depth": ...}
+
+Edges of a profile are written just before it is marked done, so a crash in
+between can repeat them on resume; consumers deduplicate edges.
+
+Usage:
+    python -m scraper.graph_crawler --name seeds --cookies facebook_cookies.json jane.doe 100004567890123
+"""
+import os
+import sys
+import json
+import time
+import heapq
+import asyncio
+import argparse
+import logging
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+from .identity import IdentityResolver, DEFAULT_IDENTITY_MAP
+from .graph_store import GraphStore, DEFAULT_GRAPH_DIR
+from .negative_cache import NegativeCache, DEFAULT_NEGATIVE_CACHE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CRAWL_ROOT = "data/crawls"
+
+
+class CrawlFrontier:
+    """
+    Deduplicated, depth-ordered queue of profiles to expand, journaled to disk.
+
+    Args:
+        path: JSONL journal (replayed on creation if it exists)
+        max_attempts: expansions tried per profile before it is given up
+    """
+
+    def __init__(self, path: str, max_attempts: int = 2):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.in_progress = set()
+        self._heap: List[tuple] = []
+        self._seq = 0
+        self._file = None
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn last line from an interrupted write
+                    logger.warning(f"⚠️ Skipping unreadable frontier line {line_number} in {self.path}")
+                    continue
+                key = record.get("key")
+                if record.get("type") == "enqueue" and key not in self.nodes:
+                    self.nodes[key] = {"key": key, "url": record["url"], "depth": record["depth"],
+                                       "parent": record.get("parent"), "status": "pending", "attempts": 0}
+                elif key in self.nodes and record.get("type") == "done":
+                    self.nodes[key]["status"] = "done"
+                elif key in self.nodes and record.get("type") == "failed":
+                    node = self.nodes[key]
+                    node["attempts"] += 1
+                    node["status"] = "failed" if node["attempts"] >= self.max_attempts else "pending"
+        for node in self.nodes.values():
+            if node["status"] == "pending":
+                self._push(node)
+        stats = self.stats()
+        logger.info(f"📂 Resuming crawl frontier {self.path}: {stats}")
+
+    def _push(self, node: Dict[str, Any]) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (node["depth"], self._seq, node["key"]))
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        record["time"] = time.time()
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def add(self, key: str, url: str, depth: int, parent: Optional[str] = None) -> bool:
+        """Queue a profile unless it is already known; returns True if it was new"""
+        if key in self.nodes:
+            return False
+        node = {"key": key, "url": url, "depth": depth, "parent": parent, "status": "pending", "attempts": 0}
+        self.nodes[key] = node
+        self._write({"type": "enqueue", "key": key, "url": url, "depth": depth, "parent": parent})
+        self._push(node)
+        return True
+
+    def next(self) -> Optional[Dict[str, Any]]:
+        """Claim the shallowest pending profile, or None if none is pending"""
+        while self._heap:
+            _, _, key = heapq.heappop(self._heap)
+            node = self.nodes[key]
+            if node["status"] == "pending":
+                node["status"] = "in_progress"
+                self.in_progress.add(key)
+                return node
+        return None
+
+    def release(self, key: str) -> None:
+        """Put a claimed profile back as pending without counting an attempt"""
+        self.nodes[key]["status"] = "pending"
+        self.in_progress.discard(key)
+        self._push(self.nodes[key])
+
+    def mark_done(self, key: str, account: str, friends: int) -> None:
+        self.nodes[key]["status"] = "done"
+        self.in_progress.discard(key)
+        self._write({"type": "done", "key": key, "account": account, "friends": friends})
+
+    def mark_failed(self, key: str, account: str, error: str) -> None:
+        node = self.nodes[key]
+        node["attempts"] += 1
+        self.in_progress.discard(key)
+        self._write({"type": "failed", "key": key, "account": account, "error": error})
+        if node["attempts"] < self.max_attempts:
+            node["status"] = "pending"
+            self._push(node)
+        else:
+            node["status"] = "failed"
+
+    @property
+    def done_count(self) -> int:
+        return sum(1 for node in self.nodes.values() if node["status"] == "done")
+
+    def stats(self) -> Dict[str, int]:
+        counts = {"pending": 0, "in_progress": 0, "done": 0, "failed": 0}
+        for node in self.nodes.values():
+            counts[node["status"]] += 1
+        return counts
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class AccountLimiter:
+    """Minimum spacing and hourly cap on one account's profile expansions"""
+
+    def __init__(self, min_interval: float = 30.0, max_per_hour: Optional[int] = None):
+        self.min_interval = min_interval
+        self.max_per_hour = max_per_hour
+        self._starts: deque = deque()
+
+    def delay(self, now: Optional[float] = None) -> float:
+        """Seconds until the next expansion is allowed"""
+        now = time.monotonic() if now is None else now
+        while self._starts and self._starts[0] <= now - 3600:
+            self._starts.popleft()
+        waits = [0.0]
+        if self._starts:
+            waits.append(self._starts[-1] + self.min_interval - now)
+        if self.max_per_hour and len(self._starts) >= self.max_per_hour:
+            waits.append(self._starts[0] + 3600 - now)
+        return max(waits)
+
+    async def wait(self, deadline: Optional[float] = None) -> bool:
+        """
+        Wait for the next allowed expansion and count it as started.
+
+        Returns False, without waiting, if it would only be allowed after
+        deadline (a time.time() value).
+        """
+        delay = self.delay()
+        if deadline is not None and time.time() + delay >= deadline:
+            return False
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self.delay()
+        self._starts.append(time.monotonic())
+        return True
+
+
+class GraphCrawler:
+    """
+    Crawl friend lists breadth-first with one worker per account.
+
+    Args:
+        scrapers: account name -> ProfileScraper on that account's logged-in page
+        crawl_dir: directory of the frontier and edge files
+        identity_resolver: resolver shared with the scrapers (profile keys and URLs)
+        max_depth: profiles at this depth are recorded as edges but not expanded
+        max_profiles: total expansions for the whole crawl, across resumed runs
+        max_seconds: time budget of this run
+        max_friends_per_profile: cap on each friends list
+        min_interval / max_per_hour: per-account rate limit on expansions
+        max_attempts: expansions tried per profile before it is given up
+    """
+
+    def __init__(self, scrapers: Dict[str, Any], crawl_dir: str,
+                 identity_resolver: Optional[IdentityResolver] = None, max_depth: int = 2,
+                 max_profiles: Optional[int] = None, max_seconds: Optional[float] = None,
+                 max_friends_per_profile: Optional[int] = None, min_interval: float = 30.0,
+                 max_per_hour: Optional[int] = 60, max_attempts: int = 2):
+        self.scrapers = scrapers
+        self.crawl_dir = crawl_dir
+        self.identity_resolver = identity_resolver or IdentityResolver()
+        self.max_depth = max_depth
+        self.max_profiles = max_profiles
+        self.max_seconds = max_seconds
+        self.max_friends_per_profile = max_friends_per_profile
+        self.limiters = {account: AccountLimiter(min_interval, max_per_hour) for account in scrapers}
+        self.frontier = CrawlFrontier(os.path.join(crawl_dir, "frontier.jsonl"), max_attempts=max_attempts)
+        self.edges_path = os.path.join(crawl_dir, "edges.jsonl")
+
+        # Metrics
+        self.expanded: Dict[str, int] = {account: 0 for account in scrapers}
+        self.edges_written = 0
+        self.stop_reason = ""
+        self.seconds = 0.0
+
+    def seed(self, seeds: Iterable[str]) -> int:
+        """Queue seed profiles (any input form) at depth 0; returns how many were new"""
+        added = 0
+        for raw in seeds:
+            try:
+                identity = self.identity_resolver.resolve(raw)
+            except ValueError as e:
+                logger.warning(f"⚠️ Skipping seed {raw!r}: {e}")
+                continue
+            added += self.frontier.add(identity.key, identity.url(), 0)
+        return added
+
+    def _budget_reason(self, start: float) -> str:
+        if self.max_profiles is not None and \
+                self.frontier.done_count + len(self.frontier.in_progress) >= self.max_profiles:
+            return "max_profiles"
+        if self.max_seconds is not None and time.time() - start >= self.max_seconds:
+            return "time_budget"
+        return ""
+
+    async def run(self) -> Dict[str, Any]:
+        start = time.time()
+        os.makedirs(self.crawl_dir, exist_ok=True)
+        self._changed = asyncio.Condition()
+        try:
+            with open(self.edges_path, "a", encoding="utf-8") as edges:
+                await asyncio.gather(*(self._worker(account, edges, start) for account in self.scrapers))
+        finally:
+            self.frontier.close()
+            self.seconds = time.time() - start
+        self.stop_reason = self.stop_reason or "exhausted"
+        logger.info(f"✅ Crawl {self.crawl_dir}: {self.report()}")
+        return self.report()
+
+    async def _worker(self, account: str, edges, start: float) -> None:
+        scraper = self.scrapers[account]
+        limiter = self.limiters[account]
+        while True:
+            reason = self._budget_reason(start)
+            if reason:
+                self.stop_reason = self.stop_reason or reason
+                return
+            node = self.frontier.next()
+            if node is None:
+                if not self.frontier.in_progress:
+                    return
+                # Another account may still add this depth's friends
+                async with self._changed:
+                    await self._changed.wait()
+                continue
+            deadline = start + self.max_seconds if self.max_seconds is not None else None
+            if not await limiter.wait(deadline):
+                # The rate limit would hold this profile past the time budget: leave it for the next run
+                self.frontier.release(node["key"])
+                self.stop_reason = self.stop_reason or "time_budget"
+                async with self._changed:
+                    self._changed.notify_all()
+                return
+            try:
+                friends = await self._expand(scraper, node)
+            except Exception as e:
+                logger.warning(f"⚠️ [{account}] Could not expand {node['key']}: {e}")
+                self.frontier.mark_failed(node["key"], account, str(e))
+            else:
+                self._record(node, friends, edges)
+                self.frontier.mark_done(node["key"], account, len(friends))
+                self.expanded[account] += 1
+                logger.info(f"🕸️ [{account}] {node['key']} (depth {node['depth']}): {len(friends)} friends, "
+                            f"frontier {self.frontier.stats()}")
+            async with self._changed:
+                self._changed.notify_all()
+
+    async def _expand(self, scraper, node: Dict[str, Any]) -> List[Dict[str, str]]:
+        scraper.use_profile(node["url"])
+        scraper.list_metrics.pop("friends", None)
+        friends = await scraper.get_friends_list(max_friends=self.max_friends_per_profile)
+        if not friends and "friends" not in scraper.list_metrics:
+            # The list never opened (navigation failed); a harvested, empty or private list has metrics
+            raise RuntimeError("friends list did not load")
+        return friends
+
+    def _record(self, node: Dict[str, Any], friends: List[Dict[str, str]], edges) -> None:
+        depth = node["depth"] + 1
+        lines = []
+        for friend in friends:
+            try:
+                identity = self.identity_resolver.resolve(friend["profile_url"])
+            except ValueError:
+                continue
+            if identity.key == node["key"]:
+                continue
+            lines.append(json.dumps({"source": node["key"], "target": identity.key, "depth": depth}) + "\n")
+            if depth < self.max_depth:
+                self.frontier.add(identity.key, identity.url(), depth, parent=node["key"])
+        edges.writelines(lines)
+        edges.flush()
+        self.edges_written += len(lines)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "frontier": self.frontier.stats(),
+            "expanded": dict(self.expanded),
+            "edges": self.edges_written,
+            "stop_reason": self.stop_reason,
+            "seconds": round(self.seconds, 2),
+            "edges_path": self.edges_path,
+        }
+
+
+async def open_account(cookies_file: str, identity_resolver: IdentityResolver,
+                       negative_cache: Optional[NegativeCache] = None, headless: bool = True):
+    """Browser session logged in with a saved cookie file, and a ProfileScraper on it"""
+    from .session import FacebookSession
+    from .utils import ScraperUtils
+    from .profile import ProfileScraper
+
+    account = os.path.splitext(os.path.basename(cookies_file))[0]
+    session = FacebookSession(headless=headless, user_data_dir=os.path.join("user_data", f"crawl_{account}"))
+    page = await session.initialize()
+    with open(cookies_file, "r", encoding="utf-8") as f:
+        await session.context.add_cookies(json.load(f)["cookies"])
+    return account, session, ProfileScraper(page, ScraperUtils(page), identity_resolver=identity_resolver,
+                                            negative_cache=negative_cache)
+
+
+async def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(prog="python -m scraper.graph_crawler", description="Crawl friend graphs")
+    parser.add_argument("seeds", nargs="*", help="usernames, IDs or profile URLs (optional when resuming)")
+    parser.add_argument("--name", required=True, help=f"crawl name (state in {DEFAULT_CRAWL_ROOT}/<name>/)")
+    parser.add_argument("--cookies", action="append", default=[], help="saved cookie file, one per account")
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--max-profiles", type=int)
+    parser.add_argument("--max-seconds", type=float)
+    parser.add_argument("--max-friends", type=int)
+    parser.add_argument("--min-interval", type=float, default=30.0)
+    parser.add_argument("--max-per-hour", type=int, default=60)
+    parser.add_argument("--graph", default=DEFAULT_GRAPH_DIR, help="friend graph the edges are merged into")
+    args = parser.parse_args(argv)
+
+    resolver = IdentityResolver(DEFAULT_IDENTITY_MAP)
+    negative_cache = NegativeCache(DEFAULT_NEGATIVE_CACHE)
+    sessions = []
+    try:
+        scrapers = {}
+        for cookies_file in args.cookies or ["facebook_cookies.json"]:
+            account, session, scraper = await open_account(cookies_file, resolver, negative_cache)
+            sessions.append(session)
+            scrapers[account] = scraper
+        crawler = GraphCrawler(scrapers, os.path.join(DEFAULT_CRAWL_ROOT, args.name), identity_resolver=resolver,
+                               max_depth=args.depth, max_profiles=args.max_profiles, max_seconds=args.max_seconds,
+                               max_friends_per_profile=args.max_friends, min_interval=args.min_interval,
+                               max_per_hour=args.max_per_hour)
+        crawler.seed(args.seeds)
+        print(json.dumps(await crawler.run(), indent=2))
+        GraphStore(args.graph).merge_jsonl(crawler.edges_path, resolver)
+    finally:
+        for session in sessions:
+            await session.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(sys.argv[1:]))
@@ -0,0 +1,325 @@
+"""
+Compact friend-graph store
+
+Friendships from profile scrapes and crawls (see scraper.graph_crawler) are
+kept as an undirected graph in compressed sparse row form, one directory per
+version of the graph:
+
+    meta.json         current version directory, node and edge counts, updated_at
+    v<n>/nodes.json   profile keys; a key's position is its integer ID
+    v<n>/aliases.json other names of a profile (numeric ID, old vanity name) -> integer ID
+    v<n>/indptr.npy   int64[n + 1], row i's neighbors are indices[indptr[i]:indptr[i + 1]]
+    v<n>/indices.npy  int32[2 * edges], each row sorted and free of duplicates
+
+The arrays are memory-mapped read-only, so queries touch only the rows they
+read: a degree is one subtraction, a neighbor list one slice, and mutual
+friends a sorted-array intersection. New edges are merged in batches: the
+merge rebuilds the arrays in one vectorized pass into a new version
+directory, and replacing meta.json (one atomic rename) switches readers to
+it, so they never see a mix of two versions. Merges from several processes
+(the API server and the crawler) take a file lock and reload the graph if
+another process merged since it was opened, so none overwrites another's
+edges.
+
+A profile's key changes from its numeric ID to its vanity name once the
+identity resolver learns the pair, so nodes are interned on every alias of
+the profile: a batch that names a profile by any known alias reaches the
+same node, and two nodes found to be one profile are merged into one.
+"""
+import os
+import json
+import time
+import fcntl
+import shutil
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .identity import IdentityResolver
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GRAPH_DIR = "data/graph"
+
+# A profile named by its key, or by all of its aliases (ProfileIdentity.aliases, key first)
+Names = Union[str, Sequence[str]]
+
+
+class GraphStore:
+    """
+    Interned, CSR-backed undirected friend graph.
+
+    Args:
+        root: directory of the node list and adjacency arrays
+    """
+
+    def __init__(self, root: str = DEFAULT_GRAPH_DIR):
+        self.root = root
+        self.nodes: List[str] = []
+        self.ids: Dict[str, int] = {}           # every alias -> integer ID
+        self._merged: Dict[int, int] = {}       # nodes found to be another node, until the next rebuild
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.updated_at: Optional[float] = None
+        self.version: Optional[str] = None
+        os.makedirs(root, exist_ok=True)
+        self._open()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _read_meta(self) -> Dict[str, Any]:
+        try:
+            with open(self._path("meta.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _open(self) -> None:
+        meta = self._read_meta()
+        self.nodes, self.ids, self._merged = [], {}, {}
+        self.indptr, self.indices = np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32)
+        if not meta:
+            return
+        # Graphs written before versioning keep their files in the root
+        version = os.path.join(self.root, meta.get("version", ""))
+        aliases = {}
+        try:
+            with open(os.path.join(version, "nodes.json"), "r", encoding="utf-8") as f:
+                nodes = json.load(f)
+            if os.path.exists(os.path.join(version, "aliases.json")):
+                with open(os.path.join(version, "aliases.json"), "r", encoding="utf-8") as f:
+                    aliases = json.load(f)
+            self.indptr = np.load(os.path.join(version, "indptr.npy"), mmap_mode="r")
+            self.indices = np.load(os.path.join(version, "indices.npy"), mmap_mode="r")
+            self.nodes = nodes
+            self.updated_at, self.version = meta.get("updated_at"), meta.get("version")
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not open friend graph in {self.root}: {e}")
+            self.indptr, self.indices = np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32)
+            aliases = {}
+        self.ids = dict(aliases)
+        self.ids.update((key, i) for i, key in enumerate(self.nodes))
+
+    def refresh(self) -> bool:
+        """Reopen the graph if another process merged into it since; returns True if it did"""
+        meta = self._read_meta()
+        if (meta.get("updated_at"), meta.get("version")) == (self.updated_at, self.version):
+            return False
+        logger.info(f"🔄 Friend graph in {self.root} changed on disk, reopening")
+        self._open()
+        return True
+
+    @contextmanager
+    def _lock(self):
+        """Exclusive lock on the graph directory for the length of a merge"""
+        with open(self._path(".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def edge_count(self) -> int:
+        return int(self.indptr[-1]) // 2
+
+    @staticmethod
+    def _names(names: Names) -> List[str]:
+        return [names] if isinstance(names, str) else [name for name in names if name]
+
+    def _find(self, node_id: int) -> int:
+        while node_id in self._merged:
+            node_id = self._merged[node_id]
+        return node_id
+
+    def _node_id(self, names: Names) -> Optional[int]:
+        for name in self._names(names):
+            if name in self.ids:
+                return self._find(self.ids[name])
+        return None
+
+    def _intern(self, names: Names) -> Optional[int]:
+        """Node of a profile (created if new), registering every alias; merges nodes the aliases join"""
+        names = self._names(names)
+        if not names:
+            return None
+        found = sorted({self._find(self.ids[name]) for name in names if name in self.ids})
+        if found:
+            node_id = found[0]
+            for other in found[1:]:
+                self._merged[other] = node_id
+        else:
+            node_id = len(self.nodes)
+            self.nodes.append(names[0])
+        # The first name is the profile's current key
+        self.nodes[node_id] = names[0]
+        for name in names:
+            self.ids[name] = node_id
+        return node_id
+
+    def merge(self, edges: Iterable[Tuple[Names, Names]]) -> int:
+        """
+        Add friendships, ignoring self-loops and known edges; returns how many were new.
+
+        Each side of an edge is a profile key or the list of its aliases.
+        """
+        with self._lock():
+            # Build on the latest graph: another process may have merged since this one was opened
+            self.refresh()
+            return self._merge(edges)
+
+    def _merge(self, edges: Iterable[Tuple[Names, Names]]) -> int:
+        sources, targets = [], []
+        for a, b in edges:
+            a_id, b_id = self._intern(a), self._intern(b)
+            if a_id is not None and b_id is not None and a_id != b_id:
+                sources.append(a_id)
+                targets.append(b_id)
+        if not sources and not self._merged:
+            return 0
+
+        old_edges = self.edge_count
+        # Every node's surviving node (itself unless merged into another), then IDs without the gaps
+        roots = np.arange(len(self.nodes), dtype=np.int64)
+        for node_id, into in self._merged.items():
+            roots[node_id] = into
+        while True:
+            jumped = roots[roots]
+            if np.array_equal(jumped, roots):
+                break
+            roots = jumped
+        kept = roots == np.arange(len(self.nodes))
+        remap = (np.cumsum(kept) - 1)[roots]
+        n = int(kept.sum())
+
+        # Existing rows expanded back to (row, col) pairs, plus both directions of every new edge
+        old_rows = np.repeat(np.arange(len(self.indptr) - 1, dtype=np.int64), np.diff(self.indptr))
+        new_a = np.asarray(sources, dtype=np.int64)
+        new_b = np.asarray(targets, dtype=np.int64)
+        rows = remap[np.concatenate([old_rows, new_a, new_b])]
+        cols = remap[np.concatenate([np.asarray(self.indices, dtype=np.int64), new_b, new_a])]
+        # Two merged nodes may have been friends with each other
+        loops = rows == cols
+        rows, cols = rows[~loops], cols[~loops]
+        # One sort by (row, col) both deduplicates and orders every row
+        pairs = np.unique(rows * n + cols)
+        rows, cols = pairs // n, pairs % n
+
+        if self._merged:
+            self.nodes = [self.nodes[i] for i in np.flatnonzero(kept).tolist()]
+            self.ids = {name: int(remap[node_id]) for name, node_id in self.ids.items()}
+            self._merged = {}
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        self._write(indptr, cols.astype(np.int32))
+        added = max(self.edge_count - old_edges, 0)
+        logger.info(f"🕸️ Friend graph: +{added} edges ({self.node_count} profiles, {self.edge_count} friendships)")
+        return added
+
+    def _write(self, indptr: np.ndarray, indices: np.ndarray) -> None:
+        """Write a new version directory, switch meta.json to it, then re-map the arrays"""
+        self.updated_at = time.time()
+        previous = self._read_meta().get("version")
+        version = f"v{time.time_ns()}"
+        os.makedirs(self._path(version))
+        files = {
+            "indptr.npy": lambda f: np.save(f, indptr),
+            "indices.npy": lambda f: np.save(f, indices),
+            "nodes.json": lambda f: f.write(json.dumps(self.nodes, ensure_ascii=False).encode("utf-8")),
+            "aliases.json": lambda f: f.write(json.dumps(
+                {name: i for name, i in self.ids.items() if self.nodes[i] != name}, ensure_ascii=False).encode("utf-8")),
+        }
+        for name, write in files.items():
+            with open(os.path.join(self._path(version), name), "wb") as f:
+                write(f)
+        meta = {"version": version, "nodes": len(self.nodes), "edges": int(indptr[-1]) // 2,
+                "updated_at": self.updated_at}
+        with open(self._path("meta.json.tmp"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(self._path("meta.json.tmp"), self._path("meta.json"))
+        self.version = version
+        self.indptr = np.load(os.path.join(self._path(version), "indptr.npy"), mmap_mode="r")
+        self.indices = np.load(os.path.join(self._path(version), "indices.npy"), mmap_mode="r")
+
+        # Keep the previous version for readers that read meta.json just before the switch
+        for name in os.listdir(self.root):
+            if name.startswith("v") and name not in (version, previous):
+                shutil.rmtree(self._path(name), ignore_errors=True)
+            elif name in files and not previous:
+                os.remove(self._path(name))
+
+    def merge_friends(self, key: Names, friends: List[Dict[str, Any]],
+                      identity_resolver: Optional[IdentityResolver] = None) -> int:
+        """Merge a scraped friends list (dicts with profile_url) of one profile (its key or aliases)"""
+        resolver = identity_resolver or IdentityResolver()
+        edges = []
+        for friend in friends:
+            try:
+                edges.append((key, resolver.resolve(friend.get("profile_url", "")).aliases))
+            except ValueError:
+                continue
+        return self.merge(edges)
+
+    def merge_jsonl(self, path: str, identity_resolver: Optional[IdentityResolver] = None) -> int:
+        """Merge a crawler edges.jsonl file, with each key's aliases known to identity_resolver"""
+        resolver = identity_resolver or IdentityResolver()
+
+        def aliases(key: str) -> Names:
+            try:
+                return resolver.resolve(key).aliases
+            except ValueError:
+                return key
+
+        edges = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    edge = json.loads(line)
+                except ValueError:
+                    continue
+                edges.append((aliases(edge["source"]), aliases(edge["target"])))
+        return self.merge(edges)
+
+    def _row(self, key: Names) -> np.ndarray:
+        node_id = self._node_id(key)
+        if node_id is None or node_id >= len(self.indptr) - 1:
+            return np.zeros(0, dtype=np.int32)
+        return self.indices[self.indptr[node_id]:self.indptr[node_id + 1]]
+
+    def __contains__(self, key: Names) -> bool:
+        return self._node_id(key) is not None
+
+    def key(self, names: Names) -> Optional[str]:
+        """Current key of the node a profile (any alias) is stored under"""
+        node_id = self._node_id(names)
+        return None if node_id is None else self.nodes[node_id]
+
+    def degree(self, key: Names) -> int:
+        return len(self._row(key))
+
+    def neighbors(self, key: Names, limit: Optional[int] = None) -> List[str]:
+        row = self._row(key)
+        if limit is not None:
+            row = row[:limit]
+        return [self.nodes[i] for i in row.tolist()]
+
+    def mutual_friends(self, a: Names, b: Names) -> List[str]:
+        common = np.intersect1d(self._row(a), self._row(b), assume_unique=True)
+        return [self.nodes[i] for i in common.tolist()]
+
+    def stats(self) -> Dict[str, Any]:
+        degrees = np.diff(self.indptr)
+        return {
+            "profiles": self.node_count,
+            "friendships": self.edge_count,
+            "max_degree": int(degrees.max()) if len(degrees) else 0,
+            "mean_degree": round(float(degrees.mean()), 2) if len(degrees) else 0.0,
+            "updated_at": self.updated_at,
+        }
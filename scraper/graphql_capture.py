@@ -0,0 +1,403 @@
+"""
+GraphQL response capture
+
+Facebook fills the timeline from /api/graphql responses (and from JSON blobs
+embedded in the initial HTML). This module listens to those responses on a
+live page, parses the streamed JSON payloads into post records shaped like the
+DOM extractor's output, and merges the two so DOM results gain exact IDs,
+timestamps, permalinks, media and counts.
+
+It also remembers the last pagination request and its cursor, which
+GraphQLPaginator reuses to fetch further pages without scrolling.
+"""
+import re
+import json
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import parse_qs
+
+from .post_identity import canonical_post_id, post_aliases
+
+logger = logging.getLogger(__name__)
+
+# Response bodies are prefixed with this anti-JSON-hijacking guard
+JSON_GUARD = "for (;;);"
+
+# Story subtrees that belong to another post (the original of a share)
+FOREIGN_STORY_KEYS = ("attached_story",)
+
+PERMALINK_MARKERS = ("/posts/", "/permalink", "story_fbid", "pfbid", "/videos/", "/photo", "/reel/")
+
+
+def iter_payload_objects(text: str) -> Iterable[Any]:
+    """Yield every JSON document in a (possibly streamed, newline-delimited) GraphQL body"""
+    if not text:
+        return
+    text = text.strip()
+    if text.startswith(JSON_GUARD):
+        text = text[len(JSON_GUARD):]
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            logger.debug(f"Skipping non-JSON payload line: {line[:80]}")
+
+
+def _iter_story_nodes(obj: Any) -> Iterable[Dict[str, Any]]:
+    """Yield the outermost Story nodes; nested stories are part of their parent"""
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            if current.get("__typename") == "Story" and (current.get("post_id") or current.get("id")):
+                yield current
+                continue
+            stack.extend(reversed(list(current.values())))
+        elif isinstance(current, list):
+            stack.extend(reversed(current))
+
+
+def _find(node: Any, key: str, predicate=None) -> Any:
+    """Breadth-first search for the shallowest value under ``key`` (skipping shared stories)"""
+    queue = deque([node])
+    while queue:
+        current = queue.popleft()
+        if isinstance(current, dict):
+            if key in current and current[key] is not None and (predicate is None or predicate(current[key])):
+                return current[key]
+            for child_key, value in current.items():
+                if child_key not in FOREIGN_STORY_KEYS and isinstance(value, (dict, list)):
+                    queue.append(value)
+        elif isinstance(current, list):
+            queue.extend(v for v in current if isinstance(v, (dict, list)))
+    return None
+
+
+def _count(value: Any) -> int:
+    if isinstance(value, bool):
+        return 0
+    if isinstance(value, int):
+        return value
+    if isinstance(value, dict):
+        for key in ("count", "total_count"):
+            if isinstance(value.get(key), int):
+                return value[key]
+    return 0
+
+
+def _message_text(node: Any) -> str:
+    message = _find(node, "message", lambda m: isinstance(m, dict) and isinstance(m.get("text"), str))
+    return message["text"] if message else ""
+
+
+def _is_permalink(value: Any) -> bool:
+    return isinstance(value, str) and any(marker in value for marker in PERMALINK_MARKERS)
+
+
+def _collect_media(node: Any) -> List[Dict[str, Any]]:
+    """Every Photo / Video under the story's attachments, in order, deduplicated by ID"""
+    attachments = _find(node, "attachments", lambda a: isinstance(a, list))
+    media, seen = [], set()
+    stack = [attachments] if attachments else []
+    while stack:
+        current = stack.pop()
+        if isinstance(current, list):
+            stack.extend(reversed(current))
+        elif isinstance(current, dict):
+            typename = current.get("__typename")
+            if typename in ("Photo", "Video") and current.get("id") and current["id"] not in seen:
+                seen.add(current["id"])
+                if typename == "Photo":
+                    image = current.get("photo_image") or current.get("image") or {}
+                    url = image.get("uri", "")
+                else:
+                    url = (current.get("playable_url_quality_hd") or current.get("browser_native_hd_url")
+                           or current.get("playable_url") or current.get("browser_native_sd_url") or "")
+                media.append({
+                    "type": "image" if typename == "Photo" else "video",
+                    "url": url,
+                    "description": current.get("accessibility_caption") or "",
+                    "id": current["id"]
+                })
+            stack.extend(reversed([v for k, v in current.items() if k not in FOREIGN_STORY_KEYS]))
+    return media
+
+
+def parse_story(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn one Story node into a post record with the DOM extractor's field names"""
+    story_id = node.get("id", "")
+    post_id = node.get("post_id") or _find(node, "post_id", lambda v: isinstance(v, str)) or ""
+
+    actors = []
+    for actor in node.get("actors") or _find(node, "actors", lambda a: isinstance(a, list)) or []:
+        if isinstance(actor, dict):
+            actors.append({
+                "id": actor.get("id", ""),
+                "name": actor.get("name", ""),
+                "profile_url": actor.get("url") or actor.get("profile_url") or ""
+            })
+
+    creation_time = _find(node, "creation_time", lambda v: isinstance(v, int))
+    timestamp = ""
+    if creation_time:
+        timestamp = datetime.fromtimestamp(creation_time, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+    url = node.get("url") if _is_permalink(node.get("url")) else (_find(node, "url", _is_permalink) or "")
+    text = _message_text(node)
+
+    shared_story = _find(node, "attached_story", lambda s: isinstance(s, dict))
+    shared_actors = (shared_story or {}).get("actors") or []
+
+    return {
+        "id": canonical_post_id(url=url, post_id=post_id, story_id=story_id),
+        "story_id": story_id,
+        "post_id": post_id,
+        "timestamp": timestamp,
+        "creation_time": creation_time or 0,
+        "content": text,
+        "caption": text,
+        "original_url": url,
+        "actors": actors,
+        "shared": shared_story is not None,
+        "shared_content": _message_text(shared_story) if shared_story else "",
+        "original_poster": shared_actors[0].get("name", "") if shared_actors and isinstance(shared_actors[0], dict) else "",
+        "reactions": {"total": _count(_find(node, "reaction_count")) or _count(_find(node, "reactors"))},
+        "comments_count": _count(_find(node, "total_comment_count")) or _count(_find(node, "comment_count"))
+                          or _count(_find(node, "comments", lambda c: isinstance(c, dict) and "total_count" in c)),
+        "shares_count": _count(_find(node, "share_count")),
+        "media": _collect_media(node),
+        "source": "graphql"
+    }
+
+
+def parse_graphql_payload(text: str) -> List[Dict[str, Any]]:
+    """Parse a GraphQL response body into post records (one per Story)"""
+    posts = []
+    for obj in iter_payload_objects(text):
+        for node in _iter_story_nodes(obj):
+            posts.append(parse_story(node))
+    return posts
+
+
+def find_page_info(text: str) -> Optional[Dict[str, Any]]:
+    """Last ``page_info`` (end_cursor / has_next_page) in a GraphQL response body"""
+    page_info = None
+    for obj in iter_payload_objects(text):
+        stack = [obj]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, dict):
+                info = current.get("page_info")
+                if isinstance(info, dict) and "end_cursor" in info:
+                    page_info = info
+                stack.extend(current.values())
+            elif isinstance(current, list):
+                stack.extend(current)
+    return page_info
+
+
+def _merge_record(target: Dict[str, Any], update: Dict[str, Any]) -> None:
+    """Fill empty fields of ``target`` from ``update`` and keep the larger counts"""
+    for key, value in update.items():
+        if key in ("reactions",):
+            total = max(target.get(key, {}).get("total", 0), value.get("total", 0))
+            target[key] = {**target.get(key, {}), "total": total}
+        elif key in ("comments_count", "shares_count"):
+            target[key] = max(target.get(key, 0) or 0, value or 0)
+        elif not target.get(key) and value:
+            target[key] = value
+
+
+def _newest_first(posts: List[Dict[str, Any]], dom_count: int) -> List[Dict[str, Any]]:
+    """Stable sort by creation time; undated DOM posts inherit the time of the DOM post above them"""
+    sort_times = []
+    previous = float("inf")
+    for i, post in enumerate(posts):
+        created = post.get("creation_time") or 0
+        if i < dom_count:
+            previous = created or previous
+            created = previous
+        sort_times.append(created)
+    order = sorted(range(len(posts)), key=lambda i: -sort_times[i])
+    return [posts[i] for i in order]
+
+
+def _identity_keys(record: Dict[str, Any]) -> set:
+    keys = set(post_aliases(record))
+    url = record.get("original_url") or ""
+    if url:
+        keys.add(url.split("?")[0].rstrip("/"))
+    return keys
+
+
+def _content_key(text: str) -> str:
+    return re.sub(r'\W+', '', (text or "").lower())[:60]
+
+
+class GraphQLCapture:
+    """
+    Listen to a page's GraphQL responses and collect the posts they carry.
+
+    Usage:
+        capture = GraphQLCapture(page)
+        capture.start()
+        ... navigate / scroll ...
+        await capture.flush()
+        posts = capture.merge_with_dom(dom_posts)
+    """
+
+    def __init__(self, page, url_fragment: str = "/api/graphql"):
+        self.page = page
+        self.url_fragment = url_fragment
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.responses_seen = 0
+        self.last_request: Optional[Dict[str, Any]] = None
+        self.page_info: Optional[Dict[str, Any]] = None
+        self._pending = set()
+        self._listening = False
+
+    @property
+    def posts(self) -> List[Dict[str, Any]]:
+        return list(self.records.values())
+
+    @property
+    def cursor(self) -> Optional[str]:
+        return (self.page_info or {}).get("end_cursor")
+
+    @property
+    def has_next_page(self) -> bool:
+        return bool((self.page_info or {}).get("has_next_page"))
+
+    def start(self) -> None:
+        if not self._listening:
+            self.page.on("response", self._on_response)
+            self._listening = True
+
+    def stop(self) -> None:
+        if self._listening:
+            try:
+                self.page.remove_listener("response", self._on_response)
+            except Exception:
+                pass
+            self._listening = False
+
+    def rebind(self, page) -> None:
+        """Listen on another page (one swapped in after a crash), keeping the captured posts"""
+        listening = self._listening
+        self.stop()
+        self.page = page
+        if listening:
+            self.start()
+
+    def _on_response(self, response) -> None:
+        if self.url_fragment not in response.url:
+            return
+        task = asyncio.ensure_future(self._ingest_response(response))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def flush(self) -> None:
+        """Wait for response bodies still being read"""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    async def _ingest_response(self, response) -> None:
+        try:
+            if response.status != 200:
+                return
+            body = await response.text()
+        except Exception as e:
+            logger.debug(f"Could not read GraphQL response body: {e}")
+            return
+
+        added = self.ingest(body)
+        page_info = find_page_info(body)
+        if page_info:
+            self.page_info = page_info
+            self._remember_request(response.request)
+        if added:
+            logger.info(f"📡 GraphQL capture: +{added} posts (total {len(self.records)})")
+
+    def _remember_request(self, request) -> None:
+        """Keep the request that returned a cursor so it can be replayed with the next one"""
+        try:
+            post_data = request.post_data or ""
+            form = {k: v[0] for k, v in parse_qs(post_data, keep_blank_values=True).items()}
+            self.last_request = {
+                "url": request.url,
+                "method": request.method,
+                "headers": dict(request.headers),
+                "form": form,
+                "doc_id": form.get("doc_id", ""),
+                "friendly_name": form.get("fb_api_req_friendly_name", ""),
+                "variables": json.loads(form["variables"]) if form.get("variables") else {}
+            }
+        except Exception as e:
+            logger.debug(f"Could not record GraphQL request shape: {e}")
+
+    def ingest(self, body: str) -> int:
+        """Parse one response body; returns the number of new posts"""
+        self.responses_seen += 1
+        added = 0
+        for record in parse_graphql_payload(body):
+            key = record["id"] or record["story_id"]
+            if key in self.records:
+                _merge_record(self.records[key], record)
+            else:
+                self.records[key] = record
+                added += 1
+        return added
+
+    def ingest_html(self, html: str) -> int:
+        """Parse the JSON blobs embedded in the initial page (first posts never go through /api/graphql)"""
+        from selectolax.lexbor import LexborHTMLParser
+
+        added = 0
+        for script in LexborHTMLParser(html).css('script[type="application/json"]'):
+            text = script.text() or ""
+            if '"Story"' in text:
+                added += self.ingest(text)
+        return added
+
+    def merge_with_dom(self, dom_posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Merge captured records into DOM posts.
+
+        DOM posts gain any fields they are missing and captured posts with no DOM
+        counterpart are added; the result is newest first by creation time. DOM
+        posts without one keep their place right after the post above them.
+        """
+        merged = [dict(post) for post in dom_posts]
+        by_key: Dict[str, Dict[str, Any]] = {}
+        by_content: Dict[str, Dict[str, Any]] = {}
+        for post in merged:
+            for key in _identity_keys(post):
+                by_key.setdefault(key, post)
+            content_key = _content_key(post.get("content", ""))
+            if len(content_key) >= 20:
+                by_content.setdefault(content_key, post)
+
+        for record in self.records.values():
+            match = next((by_key[k] for k in _identity_keys(record) if k in by_key), None)
+            if match is None:
+                content_key = _content_key(record.get("content", ""))
+                match = by_content.get(content_key) if len(content_key) >= 20 else None
+
+            if match is not None:
+                _merge_record(match, record)
+                # GraphQL timestamps are exact; prefer them over relative DOM text like "3h"
+                if record.get("timestamp"):
+                    match["timestamp"] = record["timestamp"]
+            else:
+                post = dict(record)
+                merged.append(post)
+                for key in _identity_keys(post):
+                    by_key.setdefault(key, post)
+
+        return _newest_first(merged, len(dom_posts))
@@ -0,0 +1,164 @@
+"""
+Cursor-based timeline pagination
+
+Once GraphQLCapture has seen one timeline pagination request, the next pages
+can be requested directly: the same doc_id and variables with the new cursor,
+POSTed from inside the page with fetch() so the session cookies, fb_dtsg token
+and headers are the page's own. No scrolling, layout or image decoding.
+
+Cursors are sequential within one timeline, so concurrency is bounded across
+paginators (e.g. several sections or profiles sharing one FetchLimiter), and
+every request is spaced by the limiter's rate.
+"""
+import time
+import json
+import random
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from .graphql_capture import GraphQLCapture, find_page_info
+
+logger = logging.getLogger(__name__)
+
+# Headers worth replaying from the captured request (the rest are set by the browser)
+REPLAY_HEADERS = ("x-fb-friendly-name", "x-fb-lsd", "x-asbd-id", "x-fb-qpl-active-flows")
+
+FETCH_JS = """
+async ({url, form, headers}) => {
+    const response = await fetch(url, {
+        method: 'POST',
+        credentials: 'include',
+        headers: Object.assign({'Content-Type': 'application/x-www-form-urlencoded'}, headers),
+        body: new URLSearchParams(form).toString()
+    });
+    return {status: response.status, text: await response.text()};
+}
+"""
+
+
+class FetchLimiter:
+    """Shared concurrency cap plus a minimum spacing between request starts"""
+
+    def __init__(self, max_concurrency: int = 2, requests_per_second: float = 1.0):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.min_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        try:
+            async with self._lock:
+                now = time.monotonic()
+                wait = self._next_start - now
+                self._next_start = max(now, self._next_start) + self.min_interval
+            if wait > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            # Cancelled before the body ran: __aexit__ will not, so give the slot back here
+            self.semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.semaphore.release()
+
+
+class GraphQLPaginator:
+    """
+    Replay the captured timeline request with successive cursors.
+
+    Args:
+        page: Playwright page (fetches run inside it)
+        capture: GraphQLCapture that has recorded at least one pagination request
+        limiter: FetchLimiter, share one between paginators to bound total load
+        page_size: override the ``count`` variable (None keeps the page's own)
+        max_retries: attempts per page before giving up
+    """
+
+    def __init__(self, page, capture: GraphQLCapture, limiter: Optional[FetchLimiter] = None,
+                 page_size: Optional[int] = None, max_retries: int = 3):
+        self.page = page
+        self.capture = capture
+        self.limiter = limiter or FetchLimiter()
+        self.page_size = page_size
+        self.max_retries = max_retries
+
+        # Metrics
+        self.pages_fetched = 0
+        self.failures = 0
+        self.seconds = 0.0
+
+    @property
+    def ready(self) -> bool:
+        """A request shape and a next cursor are available"""
+        return bool(self.capture.last_request and self.capture.cursor and self.capture.has_next_page)
+
+    def _build_request(self, cursor: str) -> Dict[str, Any]:
+        request = self.capture.last_request
+        variables = dict(request["variables"])
+        variables["cursor"] = cursor
+        if self.page_size:
+            variables["count"] = self.page_size
+
+        form = dict(request["form"])
+        form["variables"] = json.dumps(variables, separators=(",", ":"))
+        headers = {k: v for k, v in request["headers"].items() if k.lower() in REPLAY_HEADERS}
+        return {"url": request["url"], "form": form, "headers": headers}
+
+    async def fetch_page(self, cursor: str) -> Optional[str]:
+        """Fetch one page body for ``cursor`` (None after exhausting retries)"""
+        payload = self._build_request(cursor)
+        for attempt in range(self.max_retries):
+            async with self.limiter:
+                try:
+                    result = await self.page.evaluate(FETCH_JS, payload)
+                    if result["status"] == 200:
+                        return result["text"]
+                    logger.warning(f"⚠️ GraphQL page returned HTTP {result['status']} (attempt {attempt + 1})")
+                except Exception as e:
+                    logger.warning(f"⚠️ GraphQL page fetch failed (attempt {attempt + 1}): {e}")
+            self.failures += 1
+            await asyncio.sleep((2 ** attempt) + random.uniform(0, 0.5))
+        return None
+
+    async def paginate(self, max_posts: int, max_pages: int = 100,
+                       on_page: Optional[Callable[[], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch pages until max_posts captured posts, the last page, or max_pages.
+        ``on_page`` is called after each page is ingested (e.g. to checkpoint).
+        """
+        start = time.time()
+        pages = 0
+
+        while self.ready and len(self.capture.records) < max_posts and pages < max_pages:
+            cursor = self.capture.cursor
+            body = await self.fetch_page(cursor)
+            if body is None:
+                logger.error("❌ Giving up on cursor pagination")
+                break
+
+            pages += 1
+            self.pages_fetched += 1
+            added = self.capture.ingest(body)
+            page_info = find_page_info(body)
+            self.capture.page_info = page_info or {"end_cursor": None, "has_next_page": False}
+            logger.info(f"📄 GraphQL page {pages}: +{added} posts (total {len(self.capture.records)})")
+            if on_page:
+                on_page()
+
+            if self.capture.cursor == cursor:
+                logger.warning("⚠️ Cursor did not advance, stopping pagination")
+                break
+
+        self.seconds += time.time() - start
+        return self.capture.posts
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "pages_fetched": self.pages_fetched,
+            "failures": self.failures,
+            "seconds": round(self.seconds, 2),
+            "posts": len(self.capture.records)
+        }
@@ -0,0 +1,312 @@
+"""
+Offline HTML extraction backend
+
+Runs the same post and profile extractors as the live Playwright backend, but
+against a static HTML snapshot (one ``page.content()`` per round, or a saved
+file such as ``fb_profile_sample.html``). Parsing uses selectolax's Lexbor
+engine (C), and candidate post elements are fanned out over a process pool.
+
+Usage:
+    python -m scraper.html_backend fb_profile_sample.html debug_facebook_page.html
+"""
+import os
+import sys
+import json
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List, Any, Optional
+
+from selectolax.lexbor import LexborHTMLParser
+
+from .utils import ScraperUtils
+from .posts_improved import PostsScraperImproved, POST_CONTAINER_SELECTORS
+from .profile import ProfileScraper
+
+logger = logging.getLogger(__name__)
+
+# Elements that never contribute to rendered text
+NON_TEXT_TAGS = {"script", "style", "noscript", "template", "head"}
+
+# Elements that start a new line in innerText
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4",
+    "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section",
+    "table", "tr", "ul"
+}
+
+
+def _inner_text(node) -> str:
+    """Approximate the browser's innerText: skip scripts, break lines on block elements"""
+    parts = []
+
+    def walk(current):
+        for child in current.iter(include_text=True):
+            tag = child.tag
+            if tag == "-text":
+                parts.append(child.text_content or "")
+            elif tag in NON_TEXT_TAGS or tag == "-comment":
+                continue
+            else:
+                if tag in BLOCK_TAGS:
+                    parts.append("\n")
+                walk(child)
+                if tag in BLOCK_TAGS:
+                    parts.append("\n")
+
+    walk(node)
+    lines = [line.strip() for line in "".join(parts).split("\n")]
+    return "\n".join(line for line in lines if line)
+
+
+class SnapshotElement:
+    """
+    Read-only stand-in for a Playwright ElementHandle backed by a parsed HTML node.
+    Implements the subset of the async API the extractors use.
+    """
+
+    def __init__(self, node):
+        self.node = node
+
+    async def query_selector_all(self, selector: str) -> List["SnapshotElement"]:
+        return [SnapshotElement(n) for n in _css(self.node, selector)]
+
+    async def query_selector(self, selector: str) -> Optional["SnapshotElement"]:
+        matches = _css(self.node, selector)
+        return SnapshotElement(matches[0]) if matches else None
+
+    async def get_attribute(self, name: str) -> Optional[str]:
+        return self.node.attributes.get(name)
+
+    async def text_content(self) -> str:
+        return self.node.text(deep=True, separator="", strip=False)
+
+    async def inner_text(self) -> str:
+        return _inner_text(self.node)
+
+    async def is_visible(self) -> bool:
+        style = (self.node.attributes.get("style") or "").replace(" ", "")
+        return "hidden" not in self.node.attributes and "display:none" not in style
+
+    def outer_html(self) -> str:
+        return self.node.html or ""
+
+
+class UnsupportedOnSnapshot(Exception):
+    """A page operation that needs a live browser (script evaluation, navigation)"""
+
+
+def _css(node, selector: str) -> list:
+    """Run a CSS selector, treating Playwright-only syntax (text=, :has-text) as no match"""
+    try:
+        return node.css(selector)
+    except Exception as e:
+        logger.debug(f"Selector not supported offline '{selector}': {e}")
+        return []
+
+
+class SnapshotPage:
+    """
+    Stand-in for a Playwright Page holding a single HTML snapshot.
+    Navigation is not available; ``evaluate`` only understands the handful of
+    expressions the extractors use to read page-level text and metrics, treats
+    scrolling as a no-op (the snapshot is already complete), and raises
+    UnsupportedOnSnapshot for anything else.
+    """
+
+    def __init__(self, html: str, url: str = ""):
+        self.html = html
+        self.url = url
+        self.tree = LexborHTMLParser(html)
+        self.root = self.tree.root
+
+    async def query_selector_all(self, selector: str) -> List[SnapshotElement]:
+        if self.root is None:
+            return []
+        return [SnapshotElement(n) for n in _css(self.root, selector)]
+
+    async def query_selector(self, selector: str) -> Optional[SnapshotElement]:
+        elements = await self.query_selector_all(selector)
+        return elements[0] if elements else None
+
+    async def content(self) -> str:
+        return self.html
+
+    async def title(self) -> str:
+        title = self.tree.css_first("title")
+        return title.text() if title else ""
+
+    async def evaluate(self, expression: str, arg: Any = None) -> Any:
+        expression = expression.strip().rstrip(";")
+        if expression.endswith("document.body.innerText"):
+            return _inner_text(self.tree.body) if self.tree.body else ""
+        if expression.endswith("document.title"):
+            return await self.title()
+        if expression.endswith("document.body.scrollHeight"):
+            return 0
+        if expression.startswith(("window.scrollTo", "window.scrollBy")):
+            return None
+        raise UnsupportedOnSnapshot(f"Expression not supported on an HTML snapshot: {expression[:60]}")
+
+
+def _find_post_elements(page: SnapshotPage) -> List[SnapshotElement]:
+    """Apply the shared container selectors and keep the one with the most matches"""
+    best = []
+    for selector in POST_CONTAINER_SELECTORS:
+        matches = _css(page.root, selector) if page.root is not None else []
+        if len(matches) > len(best):
+            best = matches
+    return [SnapshotElement(n) for n in best]
+
+
+async def _extract_posts_from_elements(elements: List[SnapshotElement], post_fields=None) -> List[Dict[str, Any]]:
+    scraper = PostsScraperImproved(SnapshotPage(""), ScraperUtils(None), fields=post_fields)
+    posts = []
+    for element in elements:
+        try:
+            post_data = await scraper._extract_comprehensive_post_data(element)
+            if scraper._is_valid_comprehensive_post(post_data):
+                posts.append(post_data)
+        except UnsupportedOnSnapshot as e:
+            logger.debug(f"Post needs a live page, skipped offline: {e}")
+        except Exception as e:
+            logger.debug(f"Offline post extraction failed: {e}")
+    return posts
+
+
+def _extract_posts_from_fragments(fragments: List[str], post_fields=None) -> List[Dict[str, Any]]:
+    """Process pool worker: parse each post's outer HTML and run the post extractors"""
+    elements = []
+    for fragment in fragments:
+        root = LexborHTMLParser(fragment).css_first("body > *")
+        if root is not None:
+            elements.append(SnapshotElement(root))
+    return asyncio.run(_extract_posts_from_elements(elements, post_fields))
+
+
+async def _offline(awaitable, default: Any) -> Any:
+    """Result of an extractor, or default when it needs a live page"""
+    try:
+        return await awaitable
+    except UnsupportedOnSnapshot as e:
+        logger.debug(f"Extractor needs a live page, using its default offline: {e}")
+        return default
+
+
+async def _extract_profile_from_page(page: SnapshotPage) -> Dict[str, Any]:
+    scraper = ProfileScraper(page, ScraperUtils(page))
+    utils = scraper.utils
+
+    name = await _offline(scraper._extract_profile_name(), "")
+    bio = await _offline(scraper._extract_profile_bio(), "")
+
+    page_text = await page.evaluate("() => document.body.innerText")
+    work_education = scraper._format_work_education(
+        await _offline(scraper._extract_work_education_from_text(page_text), {})
+    )
+    places = await _offline(scraper._extract_places(), {})
+    birthday = await _offline(scraper._extract_birthday_from_text(page_text), "")
+    contact = await _offline(scraper._extract_contact_info(), {})
+
+    return {
+        "name": utils.clean_text(name),
+        "bio": utils.clean_text(bio),
+        "about": {
+            "work": work_education.get("work", ""),
+            "education": work_education.get("education", ""),
+            "location": places.get("location", ""),
+            "birthday": birthday,
+            "contact": {
+                "email": contact.get("email", ""),
+                "phone": contact.get("phone", "")
+            }
+        }
+    }
+
+
+class HTMLSnapshotBackend:
+    """
+    Extract posts and profile data from HTML snapshots without a browser.
+
+    Post candidates are located in the parent process and their outer HTML is
+    split into chunks for a process pool, so the text heuristics run in parallel.
+    ``max_workers=0`` runs everything inline.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 8, post_fields=None):
+        self.post_fields = post_fields
+        self.max_workers = max_workers if max_workers is not None else min(4, os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def extract_posts(self, html: str) -> List[Dict[str, Any]]:
+        """Extract valid posts from one HTML snapshot"""
+        page = SnapshotPage(html)
+        elements = _find_post_elements(page)
+        logger.info(f"🔍 Offline backend found {len(elements)} potential post elements")
+
+        if not elements:
+            return []
+
+        if self.max_workers == 0 or len(elements) <= self.chunk_size:
+            return asyncio.run(_extract_posts_from_elements(elements, self.post_fields))
+
+        fragments = [element.outer_html() for element in elements]
+        chunks = [fragments[i:i + self.chunk_size] for i in range(0, len(fragments), self.chunk_size)]
+
+        posts = []
+        worker = partial(_extract_posts_from_fragments, post_fields=self.post_fields)
+        for chunk_posts in self._get_pool().map(worker, chunks):
+            posts.extend(chunk_posts)
+        return posts
+
+    async def extract_posts_async(self, html: str) -> List[Dict[str, Any]]:
+        """Run ``extract_posts`` off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.extract_posts, html)
+
+    def extract_profile(self, html: str) -> Dict[str, Any]:
+        """Extract name, bio and About fields from one HTML snapshot"""
+        return asyncio.run(_extract_profile_from_page(SnapshotPage(html)))
+
+    async def extract_profile_async(self, html: str) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.extract_profile, html)
+
+    def extract_file(self, path: str) -> Dict[str, Any]:
+        """Extract profile and posts from a saved HTML file"""
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+        return {
+            "source": path,
+            "profile": self.extract_profile(html),
+            "posts": self.extract_posts(html)
+        }
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+def main(paths: List[str]) -> None:
+    backend = HTMLSnapshotBackend()
+    try:
+        results = [backend.extract_file(path) for path in paths]
+    finally:
+        backend.close()
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m scraper.html_backend <file.html> [<file.html> ...]")
+        sys.exit(1)
+    main(sys.argv[1:])
@@ -0,0 +1,196 @@
+"""
+Profile identity resolution
+
+A profile can be given as a vanity name (``jane.doe``), a numeric ID, a
+``profile.php?id=`` link, a ``/people/<name>/<id>`` link or any full profile
+URL. IdentityResolver turns each form into one ProfileIdentity, memoized per
+input, and learns which vanity name belongs to which numeric ID from the
+profile pages it visits (the page's app-link meta tags carry the numeric ID,
+and ID links redirect to the vanity URL). The mapping is persisted, so later
+runs resolve both forms of the same person to the same key, and caches,
+checkpoints and output directories line up.
+"""
+import os
+import re
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IDENTITY_MAP = "data/identity_map.json"
+
+# First path segments that are Facebook sections rather than vanity names
+RESERVED_SEGMENTS = {"profile.php", "people", "groups", "pages", "events", "watch", "marketplace", "gaming",
+                     "photo", "photo.php", "story.php", "permalink.php", "friends", "hashtag", "home.php",
+                     "login", "checkpoint"}
+
+# Numeric ID of the profile shown, read from its app-link meta tags
+PAGE_IDENTITY_JS = """
+() => {
+    const ids = [];
+    for (const selector of ['meta[property="al:android:url"]', 'meta[property="al:ios:url"]']) {
+        const meta = document.querySelector(selector);
+        const match = ((meta && meta.content) || '').match(/fb:\\/\\/profile\\/(\\d+)/);
+        if (match && !ids.includes(match[1])) ids.push(match[1]);
+    }
+    return {url: location.href, ids: ids};
+}
+"""
+
+
+class ProfileIdentity:
+    """Canonical identity of one profile input"""
+
+    def __init__(self, profile_type: str, identifier: str, numeric_id: Optional[str] = None,
+                 vanity: Optional[str] = None):
+        self.profile_type = profile_type    # "id" or "username", as given
+        self.identifier = identifier        # numeric ID or lowercased vanity name, as given
+        self.numeric_id = numeric_id
+        self.vanity = vanity
+
+    @property
+    def key(self) -> str:
+        """Stable name for caches, checkpoints and output directories (vanity name first)"""
+        return self.vanity or self.numeric_id or self.identifier
+
+    @property
+    def aliases(self) -> List[str]:
+        """Every known name of the profile, key first"""
+        names = [self.key, self.vanity, self.numeric_id, self.identifier]
+        return [name for i, name in enumerate(names) if name and name not in names[:i]]
+
+    def url(self, section: str = "") -> str:
+        """Profile (or profile section) URL in the form the profile was given"""
+        if self.profile_type == "id":
+            base_url = f"https://www.facebook.com/profile.php?id={self.identifier}"
+            return f"{base_url}&sk={section}" if section else base_url
+        base_url = f"https://www.facebook.com/{self.identifier}"
+        return f"{base_url}/{section}" if section else base_url
+
+    def __repr__(self) -> str:
+        return f"ProfileIdentity({self.profile_type}={self.identifier!r}, key={self.key!r})"
+
+
+def parse_profile_input(raw: str) -> Tuple[str, str]:
+    """(profile_type, identifier) of a username, ID or profile URL; raises ValueError if there is none"""
+    if not raw or not raw.strip():
+        raise ValueError("Username cannot be empty")
+    text = raw.strip().rstrip('/').lstrip('@')
+
+    match = re.search(r'profile\.php\?(?:.*&)?id=(\d+)', text)
+    if match:
+        return "id", match.group(1)
+
+    if "facebook.com" in text.lower():
+        if "://" not in text:
+            text = "https://" + text
+        segments = [s for s in urlsplit(text).path.split("/") if s]
+        if len(segments) >= 3 and segments[0] == "people" and segments[2].isdigit():
+            return "id", segments[2]
+        if segments and segments[0].lower() not in RESERVED_SEGMENTS:
+            name = segments[0].lower()
+            return ("id", name) if name.isdigit() else ("username", name)
+        raise ValueError(f"Could not extract profile information from URL: {raw}")
+
+    if text.isdigit():
+        if len(text) < 5 or len(text) > 20:
+            logger.warning(f"Profile ID {text} has unusual length ({len(text)} digits)")
+        return "id", text
+    return "username", text.lower()
+
+
+class IdentityResolver:
+    """
+    Memoized profile-input resolver with a persisted vanity name -> numeric ID map.
+
+    Args:
+        path: JSON file the map is kept in (None keeps it in memory only)
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.vanity_to_id: Dict[str, str] = {}
+        self.id_to_vanity: Dict[str, str] = {}
+        self._cache: Dict[str, ProfileIdentity] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not read identity map {self.path}: {e}")
+            return
+        for vanity, numeric_id in data.get("vanity_to_id", {}).items():
+            self.vanity_to_id[vanity] = numeric_id
+            self.id_to_vanity[numeric_id] = vanity
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"vanity_to_id": self.vanity_to_id}, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save identity map {self.path}: {e}")
+
+    def resolve(self, raw: str) -> ProfileIdentity:
+        """Identity of any profile input form; raises ValueError for inputs naming no profile"""
+        identity = self._cache.get(raw)
+        if identity is None:
+            profile_type, identifier = parse_profile_input(raw)
+            if profile_type == "id":
+                identity = ProfileIdentity("id", identifier, numeric_id=identifier,
+                                           vanity=self.id_to_vanity.get(identifier))
+            else:
+                identity = ProfileIdentity("username", identifier, numeric_id=self.vanity_to_id.get(identifier),
+                                           vanity=identifier)
+            logger.info(f"Resolved {raw!r} to {identity}")
+            self._cache[raw] = identity
+        return identity
+
+    def profile_url(self, raw: str, section: str = "") -> str:
+        return self.resolve(raw).url(section)
+
+    def learn(self, vanity: str, numeric_id: str) -> bool:
+        """Record that a vanity name and a numeric ID are the same profile; returns True if new"""
+        vanity = vanity.lower()
+        if not vanity or not numeric_id or self.vanity_to_id.get(vanity) == numeric_id:
+            return False
+        # A vanity name can move to another account, and an account can change its vanity name
+        old_vanity = self.id_to_vanity.pop(numeric_id, None)
+        if old_vanity:
+            self.vanity_to_id.pop(old_vanity, None)
+        old_id = self.vanity_to_id.get(vanity)
+        if old_id:
+            self.id_to_vanity.pop(old_id, None)
+        self.vanity_to_id[vanity] = numeric_id
+        self.id_to_vanity[numeric_id] = vanity
+        self._cache.clear()
+        logger.info(f"🪪 Learned profile identity {vanity} = {numeric_id}")
+        self.save()
+        return True
+
+    async def learn_from_page(self, page, raw: str) -> ProfileIdentity:
+        """Learn the vanity/numeric pair of the profile the page shows, then re-resolve raw"""
+        identity = self.resolve(raw)
+        try:
+            found = await page.evaluate(PAGE_IDENTITY_JS)
+            shown_type, shown = parse_profile_input(found["url"])
+        except Exception as e:
+            logger.debug(f"Could not read profile identity from page: {e}")
+            return identity
+        if identity.profile_type == "id":
+            # ID links redirect to the vanity URL when the profile has one
+            if shown_type == "username" and identity.numeric_id in found["ids"]:
+                self.learn(shown, identity.numeric_id)
+        elif shown_type == "username" and shown == identity.vanity and len(found["ids"]) == 1:
+            self.learn(identity.vanity, found["ids"][0])
+        return self.resolve(raw)
@@ -49,6 +49,12 @@ class JSONBuilder:
             "date": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
             "total_items": self._count_total_items(profile_data)
         }
+        if data.get("extraction_costs"):
+            profile_data["extraction_metadata"]["extraction_costs"] = data["extraction_costs"]
+        if data.get("section_ages") is not None:
+            profile_data["extraction_metadata"]["section_ages"] = data["section_ages"]
+        if data.get("navigation"):
+            profile_data["extraction_metadata"]["navigation"] = data["navigation"]
         
         # Save JSON to file with timestamp
         timestamp = int(time.time())
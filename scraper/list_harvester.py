@@ -0,0 +1,277 @@
+"""
+Infinite-list harvesting for friends, groups, pages and following
+
+Every profile list is a column of tiles that loads more as it is scrolled.
+ListHarvester runs the one loop they all need:
+
+    extract new tiles (one page call) -> dedup -> stream -> scroll -> decide to stop
+
+The item extractor is pluggable. LinkListExtractor covers the profile lists:
+each round one in-page call returns only the links it has not returned before
+(marking them as it goes) and empties the tiles it has read, keeping their
+height, so the renderer stays flat on lists of thousands. Items are
+deduplicated by a canonical key (profile ID, vanity name or group ID, never
+the display name) in a set, and each round's new items are appended to a
+JSONL file as they arrive.
+
+Stopping is adaptive: the end-of-list marker, or ``stable_rounds`` rounds in
+which neither new items nor page growth appeared (a "See more" control is
+tried before a round counts as stalled), or the list's budget (items, rounds,
+seconds). Every list reports the same metrics.
+"""
+import json
+import time
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+logger = logging.getLogger(__name__)
+
+SEEN_ATTR = "data-fbs-seen"
+
+# Tile wrapping each list entry (bios are read from it, and it is emptied once read)
+TILE_SELECTOR = 'div[role="listitem"]'
+
+NEW_ITEMS_JS = """
+([linkSelector, tileSelector, attr, prune]) => {
+    const items = [];
+    const tiles = new Set();
+    for (const a of document.querySelectorAll(`${linkSelector}:not([${attr}])`)) {
+        a.setAttribute(attr, '1');
+        const name = (a.innerText || '').trim();
+        // Photo links repeat the tile's link without text
+        if (!name) continue;
+        const tile = tileSelector ? a.closest(tileSelector) : null;
+        let bio = '';
+        if (tile) {
+            for (const el of tile.querySelectorAll('span[dir="auto"], div[dir="auto"]')) {
+                const text = (el.innerText || '').trim();
+                if (text.length > 3 && text !== name && !text.includes('Mutual') && !text.includes('Friends')) {
+                    bio = text;
+                    break;
+                }
+            }
+            tiles.add(tile);
+        }
+        items.push({name: name, url: a.href, bio: bio});
+    }
+    if (prune) {
+        for (const tile of tiles) {
+            const height = Math.ceil(tile.getBoundingClientRect().height);
+            tile.replaceChildren();
+            tile.style.height = `${height}px`;
+        }
+    }
+    return items;
+}
+"""
+
+# Path segments that are Facebook sections rather than profiles
+NON_PROFILE_SEGMENTS = {"", "profile.php", "people", "groups", "pages", "events", "watch", "marketplace",
+                        "gaming", "photo", "photo.php", "story.php", "permalink.php", "friends", "hashtag"}
+
+
+def _facebook_parts(url: str):
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if host and not host.endswith("facebook.com"):
+        return None
+    return parts
+
+
+def profile_key(url: str) -> Optional[str]:
+    """Canonical key of a profile or page link: its numeric ID, else its lowercased vanity name"""
+    parts = _facebook_parts(url)
+    if parts is None:
+        return None
+    segments = [s for s in parts.path.split("/") if s]
+    if parts.path.rstrip("/").endswith("profile.php"):
+        profile_id = parse_qs(parts.query).get("id")
+        return profile_id[0] if profile_id else None
+    if len(segments) >= 3 and segments[0] == "people" and segments[2].isdigit():
+        return segments[2]
+    if segments and segments[0].lower() not in NON_PROFILE_SEGMENTS:
+        return segments[0].lower()
+    return None
+
+
+def group_key(url: str) -> Optional[str]:
+    """Canonical key of a group link: the ID or slug after /groups/"""
+    parts = _facebook_parts(url)
+    if parts is None:
+        return None
+    segments = [s for s in parts.path.split("/") if s]
+    if len(segments) >= 2 and segments[0] == "groups" and segments[1] not in ("feed", "discover", "joins", "create"):
+        return f"group:{segments[1].lower()}"
+    return None
+
+
+class LinkListExtractor:
+    """
+    Item extractor for lists of linked tiles.
+
+    Args:
+        link_selector: links inside the tiles
+        name_field / url_field: output keys for the link text and URL
+        key: canonical key of a URL (None rejects the link)
+        accept: filter applied to each raw item (name, url, bio)
+        clean_text: normalizer for names and bios
+        tile_selector: tile around each link (None: no bios and no pruning)
+    """
+
+    def __init__(self, link_selector: str, name_field: str = "name", url_field: str = "profile_url",
+                 key: Callable[[str], Optional[str]] = profile_key,
+                 accept: Optional[Callable[[Dict[str, str]], bool]] = None,
+                 clean_text: Optional[Callable[[str], str]] = None, tile_selector: Optional[str] = TILE_SELECTOR):
+        self.link_selector = link_selector
+        self.name_field = name_field
+        self.url_field = url_field
+        self.key = key
+        self.accept = accept or (lambda raw: True)
+        self.clean_text = clean_text or (lambda text: text.strip())
+        self.tile_selector = tile_selector
+
+    async def new_items(self, page, prune: bool) -> List[Dict[str, str]]:
+        """Raw items of the links not returned before"""
+        return await page.evaluate(NEW_ITEMS_JS, [self.link_selector, self.tile_selector, SEEN_ATTR, prune])
+
+    def build(self, raw: Dict[str, str]) -> Optional[Tuple[str, Dict[str, str]]]:
+        """(canonical key, output item), or None to reject"""
+        key = self.key(raw["url"])
+        if not key or not self.accept(raw):
+            return None
+        return key, {self.name_field: self.clean_text(raw["name"]), self.url_field: raw["url"],
+                     "bio": self.clean_text(raw["bio"]) if raw.get("bio") else ""}
+
+
+class ListHarvester:
+    """
+    Scroll one list to its end (or its budget), extracting only new items each round.
+
+    Args:
+        page: Playwright page showing the list
+        extractor: item extractor (see LinkListExtractor)
+        scroll_driver: ScrollDriver for the list (waits for the next items)
+        name: list name for logs and metrics
+        output_path: JSONL file the items are streamed to (None keeps them in memory only)
+        max_items / max_rounds / max_seconds: the list's budget (None for no limit)
+        stable_rounds: stop after this many rounds without new items or page growth
+        prune: let the extractor empty tiles once read
+        expand: coroutine function tried when a round stalls (e.g. click "See more");
+            returns a truthy value if it revealed anything
+    """
+
+    def __init__(self, page, extractor, scroll_driver, name: str = "list", output_path: Optional[str] = None,
+                 max_items: Optional[int] = None, max_rounds: Optional[int] = None,
+                 max_seconds: Optional[float] = None, stable_rounds: int = 3, prune: bool = True,
+                 expand: Optional[Callable[[], Awaitable[Any]]] = None):
+        self.page = page
+        self.extractor = extractor
+        self.scroll_driver = scroll_driver
+        self.name = name
+        self.output_path = output_path
+        self.max_items = max_items
+        self.max_rounds = max_rounds
+        self.max_seconds = max_seconds
+        self.stable_rounds = stable_rounds
+        self.prune = prune
+        self.expand = expand
+
+        self.items: List[Dict[str, str]] = []
+        self.seen_keys = set()
+        self._output = None
+
+        # Metrics
+        self.rounds = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.expansions = 0
+        self.seconds = 0.0
+        self.stop_reason = ""
+
+    def _budget_reason(self, start: float) -> str:
+        if self.max_items is not None and len(self.items) >= self.max_items:
+            return "max_items"
+        if self.max_rounds is not None and self.rounds >= self.max_rounds:
+            return "max_rounds"
+        if self.max_seconds is not None and time.time() - start >= self.max_seconds:
+            return "time_budget"
+        return ""
+
+    async def harvest(self) -> List[Dict[str, str]]:
+        start = time.time()
+        self._output = open(self.output_path, "w", encoding="utf-8") if self.output_path else None
+        try:
+            stalled = 0
+            while True:
+                self.rounds += 1
+                new_count = await self._collect()
+                logger.info(f"[{self.name}] Round {self.rounds}: {len(self.items)} total (+{new_count} new)")
+
+                self.stop_reason = self._budget_reason(start)
+                if self.stop_reason:
+                    break
+
+                scroll_result = await self.scroll_driver.scroll()
+                if scroll_result.end_of_feed:
+                    # The last tiles may have rendered together with the end marker
+                    await self._collect()
+                    self.stop_reason = "end_of_list"
+                    break
+
+                if new_count or scroll_result.grew:
+                    stalled = 0
+                    continue
+                if self.expand and await self.expand():
+                    self.expansions += 1
+                    continue
+                stalled += 1
+                if stalled >= self.stable_rounds:
+                    self.stop_reason = "stalled"
+                    break
+        finally:
+            if self._output:
+                self._output.close()
+                self._output = None
+            self.seconds = time.time() - start
+        logger.info(f"✅ [{self.name}] {self.report()}")
+        return self.items
+
+    async def _collect(self) -> int:
+        """Extract this round's new items; returns how many were added"""
+        try:
+            raw_items = await self.extractor.new_items(self.page, self.prune)
+        except Exception as e:
+            logger.warning(f"[{self.name}] Extraction round failed: {e}")
+            return 0
+        new_items = []
+        for raw in raw_items:
+            if self.max_items is not None and len(self.items) >= self.max_items:
+                break
+            built = self.extractor.build(raw)
+            if built is None:
+                self.rejected += 1
+                continue
+            key, item = built
+            if key in self.seen_keys:
+                self.duplicates += 1
+                continue
+            self.seen_keys.add(key)
+            self.items.append(item)
+            new_items.append(item)
+        if self._output and new_items:
+            self._output.writelines(json.dumps(item, ensure_ascii=False) + "\n" for item in new_items)
+            self._output.flush()
+        return len(new_items)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "items": len(self.items),
+            "rounds": self.rounds,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "expansions": self.expansions,
+            "seconds": round(self.seconds, 2),
+            "stop_reason": self.stop_reason,
+            "output": self.output_path,
+        }
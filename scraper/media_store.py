@@ -0,0 +1,284 @@
+"""
+Content-addressed media store and concurrent media fetcher
+
+Post media URLs (fbcdn images and videos) are signed and expire within hours
+(the hex ``oe=`` parameter is the expiry time), so they are only useful if
+downloaded during the run. MediaFetcher downloads them with the browser
+context's cookies over one bounded aiohttp connection pool, with retries, and
+MediaStore keeps every file once under its SHA-256:
+
+    <root>/objects/ab/cd/abcd1234....jpg
+
+The same photo reposted, shared or seen on another profile is stored once.
+An index maps each media item's unsigned source (CDN path or GraphQL media ID)
+to its hash, so later runs skip the download entirely. Each post media item
+gains a ``stored`` reference ({sha256, path, url, size, content_type}) or a
+``download_status`` saying why it has none (expired, too_large, invalid_url,
+unsupported, http_<status>, failed).
+"""
+import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import mimetypes
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit, parse_qs
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEDIA_ROOT = "static/media"
+
+# Statuses retried with backoff; anything else is final
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Extensions for content types mimetypes gets wrong or does not know
+CONTENT_TYPE_EXTENSIONS = {"image/jpeg": ".jpg", "image/webp": ".webp", "video/mp4": ".mp4"}
+
+
+class MediaTooLarge(Exception):
+    """A download passed MediaFetcher.max_bytes"""
+
+
+def url_expiry(url: str) -> Optional[float]:
+    """Expiry time of a signed CDN URL (its hex ``oe`` parameter), if it has one"""
+    value = parse_qs(urlsplit(url).query).get("oe")
+    if not value:
+        return None
+    try:
+        return float(int(value[0], 16))
+    except ValueError:
+        return None
+
+
+def is_expired(url: str, margin: float = 60.0, now: Optional[float] = None) -> bool:
+    expiry = url_expiry(url)
+    return expiry is not None and expiry - margin <= (now or time.time())
+
+
+def source_key(item: Dict[str, Any]) -> str:
+    """Stable identity of a media item across re-signed URLs"""
+    if item.get("id"):
+        return f"id:{item['id']}"
+    parts = urlsplit(item.get("url", ""))
+    # CDN hosts and signature parameters change between loads; the path does not
+    return f"path:{parts.path}"
+
+
+class MediaStore:
+    """SHA-256 addressed files under one root, plus the source -> hash index"""
+
+    def __init__(self, root: str = DEFAULT_MEDIA_ROOT, url_prefix: Optional[str] = None):
+        self.root = root
+        self.url_prefix = url_prefix if url_prefix is not None else "/" + root.strip("/")
+        self.index_path = os.path.join(root, "index.json")
+        self.objects: Dict[str, Dict[str, Any]] = {}
+        self.sources: Dict[str, str] = {}
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.objects = data.get("objects", {})
+            self.sources = data.get("sources", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not read media index {self.index_path}: {e}")
+
+    def save_index(self) -> None:
+        try:
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"objects": self.objects, "sources": self.sources}, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save media index {self.index_path}: {e}")
+
+    def _relative_path(self, sha256: str, content_type: str) -> str:
+        ext = CONTENT_TYPE_EXTENSIONS.get(content_type) or mimetypes.guess_extension(content_type or "") or ""
+        return os.path.join("objects", sha256[:2], sha256[2:4], f"{sha256}{ext}")
+
+    def reference(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """The stored-object reference for a hash, if the file is still on disk"""
+        meta = self.objects.get(sha256)
+        if not meta or not os.path.exists(os.path.join(self.root, meta["path"])):
+            return None
+        return {"sha256": sha256, "path": os.path.join(self.root, meta["path"]),
+                "url": f"{self.url_prefix}/{meta['path']}", "size": meta["size"],
+                "content_type": meta["content_type"]}
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        sha256 = self.sources.get(key)
+        return self.reference(sha256) if sha256 else None
+
+    def commit(self, tmp_path: str, sha256: str, size: int, content_type: str,
+               key: Optional[str] = None) -> Dict[str, Any]:
+        """Move a downloaded temp file to its hash path (or drop it if already stored)"""
+        existing = self.reference(sha256)
+        if existing:
+            os.remove(tmp_path)
+        else:
+            relative = self._relative_path(sha256, content_type)
+            os.makedirs(os.path.dirname(os.path.join(self.root, relative)), exist_ok=True)
+            os.replace(tmp_path, os.path.join(self.root, relative))
+            self.objects[sha256] = {"path": relative, "size": size, "content_type": content_type}
+        if key:
+            self.sources[key] = sha256
+        return self.reference(sha256)
+
+    def put_bytes(self, data: bytes, content_type: str, key: Optional[str] = None) -> Dict[str, Any]:
+        """Store in-memory content (e.g. a screenshot) and return its reference"""
+        sha256 = hashlib.sha256(data).hexdigest()
+        tmp_path = os.path.join(self.root, f".{sha256}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        return self.commit(tmp_path, sha256, len(data), content_type, key)
+
+
+class MediaFetcher:
+    """
+    Download post media into a MediaStore over one bounded connection pool.
+
+    Args:
+        store: MediaStore to put files in
+        cookies: Playwright cookies (``await context.cookies()``) sent to matching hosts
+        user_agent: browser user agent to send
+        max_connections: connection pool size (total concurrent downloads)
+        max_retries: attempts per file for connection errors and 429/5xx
+        timeout: seconds per download
+        max_bytes: files larger than this are abandoned
+    """
+
+    def __init__(self, store: MediaStore, cookies: Optional[List[Dict[str, Any]]] = None,
+                 user_agent: Optional[str] = None, max_connections: int = 8, max_retries: int = 3,
+                 timeout: float = 60.0, max_bytes: int = 100 * 1024 * 1024):
+        self.store = store
+        self.cookies = cookies or []
+        self.user_agent = user_agent
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.stats = {"downloaded": 0, "deduplicated": 0, "cached": 0, "expired": 0, "failed": 0, "bytes": 0}
+
+    @classmethod
+    async def from_context(cls, store: MediaStore, context, page=None, **kwargs) -> "MediaFetcher":
+        """Fetcher that reuses a browser context's cookies (and the page's user agent)"""
+        cookies = await context.cookies()
+        user_agent = None
+        if page is not None:
+            try:
+                user_agent = await page.evaluate("navigator.userAgent")
+            except Exception:
+                pass
+        return cls(store, cookies=cookies, user_agent=user_agent, **kwargs)
+
+    def _cookie_header(self, url: str) -> str:
+        host = urlsplit(url).hostname or ""
+        pairs = []
+        for cookie in self.cookies:
+            domain = cookie.get("domain", "").lstrip(".")
+            if domain and (host == domain or host.endswith("." + domain)):
+                pairs.append(f"{cookie['name']}={cookie['value']}")
+        return "; ".join(pairs)
+
+    async def fetch_posts(self, posts: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Download the media of every post and attach stored references in place"""
+        items = [item for post in posts for item in post.get("media") or []
+                 if isinstance(item, dict) and item.get("url")]
+        if not items:
+            return dict(self.stats)
+
+        # One download per distinct source, shared by every item that shows it
+        by_key: Dict[str, List[Dict[str, Any]]] = {}
+        for item in items:
+            by_key.setdefault(source_key(item), []).append(item)
+
+        connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.max_connections)
+        headers = {"User-Agent": self.user_agent} if self.user_agent else {}
+        async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+            await asyncio.gather(*(self._fetch_source(session, key, group) for key, group in by_key.items()))
+        self.store.save_index()
+        logger.info(f"🖼️ Media: {self.stats}")
+        return dict(self.stats)
+
+    async def _fetch_source(self, session: aiohttp.ClientSession, key: str, group: List[Dict[str, Any]]) -> None:
+        reference = self.store.lookup(key)
+        if reference:
+            self.stats["cached"] += 1
+        else:
+            # Items of one source can carry differently signed URLs; try the freshest first
+            urls = sorted({item["url"] for item in group}, key=lambda u: url_expiry(u) or float("inf"), reverse=True)
+            status = "expired"
+            for url in urls:
+                if not url.startswith("http"):
+                    status = "unsupported"
+                    continue
+                if is_expired(url):
+                    continue
+                reference, status = await self._download(session, url, key)
+                if reference:
+                    break
+            if not reference:
+                self.stats["expired" if status == "expired" else "failed"] += 1
+        for item in group:
+            if reference:
+                item["stored"] = reference
+                item.pop("download_status", None)
+            else:
+                item["download_status"] = status
+
+    async def _download(self, session: aiohttp.ClientSession, url: str, key: str):
+        """Stream one URL into the store; returns (reference or None, status)"""
+        cookie = self._cookie_header(url)
+        headers = {"Cookie": cookie} if cookie else {}
+        status = "failed"
+        for attempt in range(self.max_retries):
+            tmp_path = os.path.join(self.store.root, f".{hashlib.md5(url.encode()).hexdigest()}.{attempt}.tmp")
+            try:
+                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                    if response.status in RETRY_STATUSES:
+                        status = f"http_{response.status}"
+                        raise aiohttp.ClientResponseError(response.request_info, (), status=response.status)
+                    if response.status != 200:
+                        # Signed URLs answer 403 once their signature has lapsed
+                        return None, "expired" if response.status in (403, 410) and url_expiry(url) else f"http_{response.status}"
+                    content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+                    digest = hashlib.sha256()
+                    size = 0
+                    with open(tmp_path, "wb") as f:
+                        async for chunk in response.content.iter_chunked(64 * 1024):
+                            size += len(chunk)
+                            if size > self.max_bytes:
+                                raise MediaTooLarge(f"larger than {self.max_bytes} bytes")
+                            digest.update(chunk)
+                            f.write(chunk)
+                sha256 = digest.hexdigest()
+                if sha256 in self.store.objects:
+                    self.stats["deduplicated"] += 1
+                else:
+                    self.stats["downloaded"] += 1
+                    self.stats["bytes"] += size
+                return self.store.commit(tmp_path, sha256, size, content_type, key), "stored"
+            except MediaTooLarge as e:
+                logger.debug(f"Skipping media {url[:80]}: {e}")
+                return None, "too_large"
+            except aiohttp.InvalidURL as e:
+                # Malformed URLs fail the same way every time: no retry
+                logger.debug(f"Skipping media with invalid URL {url[:80]}: {e}")
+                return None, "invalid_url"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.debug(f"Media download attempt {attempt + 1} failed for {url[:80]}: {e}")
+                if attempt + 1 < self.max_retries:
+                    await asyncio.sleep(0.5 * 2 ** attempt + random.uniform(0, 0.25))
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        return None, status
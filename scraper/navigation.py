@@ -0,0 +1,96 @@
+"""
+Navigation deduplication
+
+One scrape visits the profile page, then its About, friends, pages and groups
+sections, and the posts stage opens the profile page again. Every scraper
+used to call page.goto (and wait its fixed settle time) whether or not the
+page already showed that URL. NavigationManager is shared by the scrapers of
+one page: it knows the canonical URL the page shows and whether that page
+was classified as usable, skips gotos to the URL already shown, and counts
+the navigations it avoided.
+"""
+import logging
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that select a different page; everything else (ref, __tn__, ...) is tracking
+SIGNIFICANT_PARAMS = ("id", "sk", "v", "story_fbid", "fbid")
+
+# Page states (see ScraperUtils.classify_page_state) after which a page must be loaded again
+UNUSABLE_STATES = {"checkpoint", "login", "rate_limited", "error", "not_found"}
+
+
+def canonical_url(url: str) -> str:
+    """URL with the host, trailing slash, fragment and tracking parameters normalized away"""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.endswith("facebook.com"):
+        host = "www.facebook.com"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query) if k in SIGNIFICANT_PARAMS)
+    return urlunsplit(("https", host, parts.path.rstrip("/").lower(), urlencode(query), ""))
+
+
+class NavigationManager:
+    """
+    page.goto that skips the URL the page already shows.
+
+    Args:
+        page: Playwright page shared by the scrapers
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.requested: Optional[str] = None    # canonical URL of the last goto
+        self.landed: Optional[str] = None       # page.url right after it (redirects included)
+        self.state: Optional[str] = None
+        self.navigations = 0
+        self.avoided = 0
+        self.avoided_urls: Dict[str, int] = {}
+
+    def is_current(self, url: str) -> bool:
+        """Whether the page shows url (directly or as the redirect target of the last goto to it)"""
+        try:
+            if self.page.is_closed():
+                return False
+            shown = self.page.url
+        except Exception:
+            return False
+        if self.state in UNUSABLE_STATES or not self.landed:
+            return False
+        wanted = canonical_url(url)
+        if canonical_url(shown) == wanted:
+            return True
+        return self.requested == wanted and shown == self.landed
+
+    async def goto(self, url: str, wait_until: str = "domcontentloaded", timeout: float = 30000,
+                   force: bool = False) -> bool:
+        """Navigate unless the page already shows url; returns False when the navigation was skipped"""
+        if not force and self.is_current(url):
+            self.avoided += 1
+            key = canonical_url(url)
+            self.avoided_urls[key] = self.avoided_urls.get(key, 0) + 1
+            logger.info(f"⏭️ Already on {url}, skipping navigation")
+            try:
+                await self.page.evaluate("window.scrollTo(0, 0)")
+            except Exception as e:
+                logger.debug(f"Could not scroll back to the top: {e}")
+            return False
+        self.invalidate()
+        await self.page.goto(url, wait_until=wait_until, timeout=timeout)
+        self.navigations += 1
+        self.requested = canonical_url(url)
+        self.landed = self.page.url
+        return True
+
+    def note_state(self, state: str) -> None:
+        """Record the classified state of the page shown (unusable states force the next goto)"""
+        self.state = state
+
+    def invalidate(self) -> None:
+        """Forget the page shown (after cookies are cleared, a crash, or a failed navigation)"""
+        self.requested = self.landed = self.state = None
+
+    def report(self) -> Dict[str, Any]:
+        return {"navigations": self.navigations, "avoided": self.avoided, "avoided_urls": dict(self.avoided_urls)}
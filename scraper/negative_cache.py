@@ -0,0 +1,137 @@
+"""
+Negative-result cache
+
+Profiles that do not exist, are restricted, or hide a list fail the same way
+every time, but finding that out costs a browser start and a navigation with
+retries. NegativeCache remembers such outcomes per canonical profile key and
+section ("profile" for the profile itself, or a list such as "friends"),
+each reason with its own TTL, so repeated requests are answered without
+opening the browser until the entry expires or a recheck is forced.
+"""
+import os
+import json
+import time
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NEGATIVE_CACHE = "data/negative_cache.json"
+
+# Seconds each kind of negative result is trusted for
+NEGATIVE_TTLS = {
+    "not_found": 7 * 24 * 3600,   # deleted or never existed
+    "restricted": 24 * 3600,      # profile hidden from this account (blocked, age/region gated)
+    "private": 24 * 3600,         # a list (friends, groups, ...) the profile does not share
+}
+
+# Page states (see ScraperUtils.classify_page_state) that are worth remembering;
+# login, rate limits and errors say something about the session, not the profile
+PROFILE_STATE_REASONS = {"not_found": "not_found", "private": "restricted"}
+SECTION_STATE_REASONS = {"not_found": "private", "private": "private"}
+
+# Evidence that describes the page itself (URL, markup, dialog, error layout, profile
+# header, an empty list) rather than a phrase that could come from any text on it;
+# a negative result is only recorded on such evidence
+PAGE_LEVEL_EVIDENCE = ("url:", "selector:", "dialog:", "layout:", "header_", "empty_list:")
+
+
+def page_level_evidence(evidence: Iterable[str]) -> List[str]:
+    """The page-level items of a verdict's evidence"""
+    return [item for item in evidence if item.startswith(PAGE_LEVEL_EVIDENCE)]
+
+
+class NegativeCache:
+    """
+    Persisted (profile key, section) -> negative result map with per-reason TTLs.
+
+    Args:
+        path: JSON file the entries are kept in (None keeps them in memory only)
+        ttls: per-reason overrides of NEGATIVE_TTLS
+    """
+
+    def __init__(self, path: Optional[str] = None, ttls: Optional[Dict[str, float]] = None):
+        self.path = path
+        self.ttls = dict(NEGATIVE_TTLS, **(ttls or {}))
+        self.entries: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.hits = 0
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not read negative cache {self.path}: {e}")
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save negative cache {self.path}: {e}")
+
+    def record(self, key: str, section: str, reason: str, evidence: Iterable[str] = (),
+               now: Optional[float] = None) -> None:
+        if reason not in self.ttls:
+            raise ValueError(f"Unknown negative result '{reason}', expected one of {list(self.ttls)}")
+        now = time.time() if now is None else now
+        self.entries.setdefault(key, {})[section] = {
+            "reason": reason,
+            "checked_at": now,
+            "expires_at": now + self.ttls[reason],
+            "evidence": list(evidence)[:3],
+        }
+        logger.info(f"🚫 Remembering {key}/{section} as {reason} for {self.ttls[reason] / 3600:.0f}h")
+        self.save()
+
+    def lookup(self, keys: Union[str, Iterable[str]], section: str = "profile",
+               now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Unexpired entry for any of the profile's keys (aliases), with its age in seconds"""
+        now = time.time() if now is None else now
+        for key in [keys] if isinstance(keys, str) else keys:
+            entry = self.entries.get(key, {}).get(section)
+            if entry and entry["expires_at"] > now:
+                self.hits += 1
+                return dict(entry, key=key, section=section, age_seconds=round(now - entry["checked_at"]))
+        return None
+
+    def clear(self, keys: Union[str, Iterable[str]], section: Optional[str] = None) -> int:
+        """Forget a profile's entries (one section, or all of them); returns how many were removed"""
+        removed = 0
+        for key in [keys] if isinstance(keys, str) else keys:
+            sections = self.entries.get(key)
+            if not sections:
+                continue
+            if section is None:
+                removed += len(sections)
+                del self.entries[key]
+            elif sections.pop(section, None):
+                removed += 1
+                if not sections:
+                    del self.entries[key]
+        if removed:
+            self.save()
+        return removed
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop expired entries; returns how many were removed"""
+        now = time.time() if now is None else now
+        removed = 0
+        for key in list(self.entries):
+            sections = self.entries[key]
+            for section in [s for s, entry in sections.items() if entry["expires_at"] <= now]:
+                del sections[section]
+                removed += 1
+            if not sections:
+                del self.entries[key]
+        if removed:
+            self.save()
+        return removed
@@ -0,0 +1,152 @@
+"""
+Persistent post index for repeated scrapes of the same profile
+
+One JSON file per profile maps each post's canonical ID (see post_identity) to
+its stored record and first/last-seen times, plus the timeline order (newest
+first). Every known alias of a post (numeric ID, pfbid, story ID, permalink IDs)
+resolves to its canonical ID in O(1), so cross-run dedup and delta refreshes
+never scan the history.
+
+A delta run asks ``is_known`` for each post it extracts and stops scrolling
+once it has passed a run of known posts; ``merge`` then folds the fresh posts
+into the index so the result covers the whole timeline seen so far.
+"""
+import os
+import json
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+from .post_identity import post_aliases
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 2
+
+
+class PostHistory:
+    """Canonical post ID -> stored record and last-seen time, for one profile"""
+
+    def __init__(self, path: str, profile: str = ""):
+        self.path = path
+        self.profile = profile
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.order: List[str] = []
+        self.updated_at: Optional[float] = None
+        self._aliases: Dict[str, str] = {}
+        self.load()
+
+    @property
+    def posts(self) -> List[Dict[str, Any]]:
+        """Stored records in timeline order (newest first)"""
+        return [self.entries[post_id]["record"] for post_id in self.order]
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not read post history {self.path}: {e}")
+            return
+
+        self.updated_at = data.get("updated_at")
+        if data.get("version") == INDEX_VERSION:
+            self.entries = data.get("entries", {})
+            self.order = [post_id for post_id in data.get("order", []) if post_id in self.entries]
+        else:
+            # Version 1 stored a plain list of records
+            seen_at = self.updated_at or time.time()
+            for post in data.get("posts", []):
+                self._add(post, seen_at, append=True)
+        for post_id, entry in self.entries.items():
+            self._register(post_id, entry["record"])
+        logger.info(f"📚 Loaded {len(self.order)} known posts for {self.profile or self.path}")
+
+    def _register(self, post_id: str, record: Dict[str, Any]) -> None:
+        self._aliases[post_id] = post_id
+        for alias in post_aliases(record):
+            self._aliases.setdefault(alias, post_id)
+
+    def _add(self, post: Dict[str, Any], seen_at: float, append: bool = False) -> Optional[str]:
+        post_id = str(post.get("id") or "")
+        if not post_id or post_id in self.entries:
+            return None
+        self.entries[post_id] = {"record": post, "first_seen": seen_at, "last_seen": seen_at}
+        if append:
+            self.order.append(post_id)
+        self._register(post_id, post)
+        return post_id
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def key_for(self, post: Dict[str, Any]) -> Optional[str]:
+        """Canonical ID this post is stored under, if any of its aliases is known"""
+        for alias in post_aliases(post):
+            if alias in self._aliases:
+                return self._aliases[alias]
+        return None
+
+    def find(self, post: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        post_id = self.key_for(post)
+        return self.entries[post_id]["record"] if post_id else None
+
+    def is_known(self, post: Dict[str, Any]) -> bool:
+        return self.key_for(post) is not None
+
+    def last_seen(self, post: Dict[str, Any]) -> Optional[float]:
+        post_id = self.key_for(post)
+        return self.entries[post_id]["last_seen"] if post_id else None
+
+    def merge(self, fresh_posts: List[Dict[str, Any]], seen_at: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Fold this run's posts (newest first) into the index.
+
+        Known posts are refreshed in place with the new values (reaction and
+        comment counts change) and their last-seen time. Unknown posts above the
+        run's first known post go in front of the history; any other unknown post
+        goes right after the known post above it in the run, so the history
+        stays newest first when a run reaches further back than the last one.
+        Returns the merged history.
+        """
+        seen_at = seen_at or time.time()
+        new_ids = []
+        inserted_after: Dict[str, List[str]] = {}
+        anchor = None  # last known post of this run so far
+        refreshed = 0
+        for post in fresh_posts:
+            post_id = self.key_for(post)
+            if post_id is None:
+                post_id = self._add(post, seen_at)
+                if post_id:
+                    (new_ids if anchor is None else inserted_after.setdefault(anchor, [])).append(post_id)
+                continue
+            anchor = post_id
+            entry = self.entries[post_id]
+            entry["record"].update({k: v for k, v in post.items() if k != "id" and v not in (None, "", [], {})})
+            entry["last_seen"] = seen_at
+            self._register(post_id, post)
+            refreshed += 1
+        order = list(new_ids)
+        for post_id in self.order:
+            order.append(post_id)
+            order.extend(inserted_after.get(post_id, ()))
+        added = len(order) - len(self.order)
+        self.order = order
+        logger.info(f"📚 Post history: +{added} new, {refreshed} refreshed, {len(self.order)} total")
+        return self.posts
+
+    def save(self) -> None:
+        """Write the index atomically so a crash never leaves a half-written file"""
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.updated_at = time.time()
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "profile": self.profile, "updated_at": self.updated_at,
+                           "order": self.order, "entries": self.entries}, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save post history {self.path}: {e}")
@@ -0,0 +1,121 @@
+"""
+Canonical post identity
+
+Facebook exposes the same post under several identifiers: a numeric post ID
+(``/posts/1234``, ``story_fbid=1234``, GraphQL ``post_id``), an obfuscated
+``pfbid0...`` token, and a base64 Comet story ID (``UzpfSTEw...`` which decodes
+to ``S:_I<owner>:<post>``). These helpers turn any of them into one canonical
+ID that does not depend on the rendered text, so the same post gets the same ID
+across runs and across the DOM, snapshot and GraphQL paths.
+
+Preference order: numeric post ID, then pfbid, then the raw story ID. Posts
+without any identifier fall back to a fingerprint of their message text.
+"""
+import re
+import base64
+import hashlib
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+PFBID_RE = re.compile(r'pfbid0\w+')
+NUMERIC_RE = re.compile(r'^\d{6,}$')
+
+# Path segments followed by the post's own identifier
+POST_PATH_MARKERS = ("posts", "permalink", "videos", "reel", "reels", "stories")
+# Query parameters that carry the post's own identifier (never the owner's "id")
+POST_QUERY_KEYS = ("story_fbid", "fbid", "v", "multi_permalinks")
+
+
+def _is_post_id(value: str) -> bool:
+    return bool(value) and (bool(NUMERIC_RE.match(value)) or value.startswith("pfbid0"))
+
+
+def ids_from_url(url: str) -> List[str]:
+    """Post identifiers in a permalink, numeric ones first"""
+    if not url:
+        return []
+    parsed = urlparse(url if "://" in url else f"https://www.facebook.com/{url.lstrip('/')}")
+    candidates = []
+
+    query = parse_qs(parsed.query)
+    for key in POST_QUERY_KEYS:
+        for value in query.get(key, []):
+            candidates.extend(value.split(","))
+
+    segments = [s for s in parsed.path.split("/") if s]
+    for i, segment in enumerate(segments[:-1]):
+        if segment in POST_PATH_MARKERS:
+            candidates.append(segments[i + 1])
+    if "photos" in segments:
+        # /<owner>/photos/a.<album>/<photo_id>/
+        candidates.extend(s for s in segments if NUMERIC_RE.match(s))
+    candidates.extend(PFBID_RE.findall(parsed.path))
+
+    ids = []
+    for candidate in candidates:
+        if _is_post_id(candidate) and candidate not in ids:
+            ids.append(candidate)
+    return sorted(ids, key=lambda value: not value.isdigit())
+
+
+def decode_story_id(story_id: str) -> str:
+    """Numeric post ID inside a base64 Comet story ID ("" if it is not one)"""
+    if not story_id or story_id.isdigit():
+        return ""
+    try:
+        decoded = base64.b64decode(story_id + "=" * (-len(story_id) % 4), validate=True).decode("ascii")
+    except (ValueError, UnicodeDecodeError):
+        return ""
+    if not decoded.startswith("S:"):
+        return ""
+    numbers = [part for part in decoded.split(":")[2:] if NUMERIC_RE.match(part)]
+    return numbers[-1] if numbers else ""
+
+
+def canonical_post_id(url: str = "", post_id: str = "", story_id: str = "") -> str:
+    """Canonical ID from whatever identifiers are available ("" if none)"""
+    post_id = str(post_id or "")
+    if NUMERIC_RE.match(post_id):
+        return post_id
+    from_url = ids_from_url(url)
+    if from_url and from_url[0].isdigit():
+        return from_url[0]
+    decoded = decode_story_id(story_id)
+    if decoded:
+        return decoded
+    if _is_post_id(post_id):
+        return post_id
+    if from_url:
+        return from_url[0]
+    return story_id or ""
+
+
+def content_fingerprint(text: str) -> str:
+    """Last-resort ID from the post's message text (not the rendered card)"""
+    normalized = re.sub(r'\W+', '', (text or "").lower())
+    if len(normalized) < 10:
+        return ""
+    return "c" + hashlib.md5(normalized.encode()).hexdigest()[:16]
+
+
+def post_aliases(record: Dict[str, Any]) -> List[str]:
+    """Every identifier a post record can be recognised by"""
+    aliases = []
+    for field in ("id", "post_id", "story_id"):
+        value = str(record.get(field) or "")
+        if value:
+            aliases.append(value)
+    decoded = decode_story_id(str(record.get("story_id") or ""))
+    if decoded:
+        aliases.append(decoded)
+    aliases.extend(ids_from_url(record.get("original_url") or ""))
+    return list(dict.fromkeys(aliases))
+
+
+def first_post_id(values: List[Optional[str]]) -> str:
+    """Canonical ID from the first of several hrefs/attributes that carries one"""
+    for value in values:
+        post_id = canonical_post_id(url=value or "")
+        if post_id:
+            return post_id
+    return ""
@@ -10,6 +10,7 @@ from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 import logging
 
 from .utils import ScraperUtils
+from .identity import IdentityResolver
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,77 +21,25 @@ class PostsScraper:
     Improved Facebook Posts Scraper with robust error handling and modern design patterns
     """
     
-    def __init__(self, page: Page, utils: ScraperUtils):
+    def __init__(self, page: Page, utils: ScraperUtils, identity_resolver: Optional[IdentityResolver] = None):
         """Initialize the PostsScraper with page and utilities"""
         self.page = page
         self.utils = utils
+        self.identity_resolver = identity_resolver or IdentityResolver()
         
         # Configuration
         self.max_retries = 3
         self.default_timeout = 30000
         self.max_posts_per_section = 100
     
-    def _clean_input(self, username: str) -> str:
-        """Clean and normalize input username/URL"""
-        if not username:
-            raise ValueError("Username cannot be empty")
-        return username.strip().rstrip('/').lstrip('@')
-    
     def _detect_profile_type(self, username: str) -> Tuple[str, str]:
         """Detect if input is username or profile ID and return type and identifier"""
-        username = self._clean_input(username)
-        
-        # Handle full Facebook URLs
-        if "facebook.com" in username.lower():
-            if "profile.php?id=" in username:
-                match = re.search(r'profile\.php\?id=(\d+)', username)
-                if match:
-                    profile_id = match.group(1)
-                    logger.info(f"Extracted profile ID from URL: {profile_id}")
-                    return "id", profile_id
-            else:
-                # Extract username from URL
-                try:
-                    parts = username.lower().split('facebook.com/')
-                    if len(parts) > 1:
-                        username_part = parts[1].split('/')[0].split('?')[0].split('#')[0]
-                        if username_part and not username_part.isdigit() and len(username_part) > 0:
-                            logger.info(f"Extracted username from URL: {username_part}")
-                            return "username", username_part
-                except Exception as e:
-                    logger.warning(f"Error extracting username from URL: {e}")
-        
-        # Handle profile.php format without domain
-        if "profile.php?id=" in username:
-            match = re.search(r'profile\.php\?id=(\d+)', username)
-            if match:
-                profile_id = match.group(1)
-                logger.info(f"Detected profile.php format: {profile_id}")
-                return "id", profile_id
-        
-        # Handle numeric ID only
-        if username.isdigit():
-            logger.info(f"Detected numeric profile ID: {username}")
-            return "id", username
-        
-        # Handle username format
-        logger.info(f"Detected username format: {username}")
-        return "username", username
+        identity = self.identity_resolver.resolve(username)
+        return identity.profile_type, identity.identifier
     
     def _construct_profile_url(self, username: str, section: str = "") -> str:
         """Construct the correct Facebook URL for posts sections"""
-        profile_type, profile_identifier = self._detect_profile_type(username)
-        
-        if profile_type == "id":
-            base_url = f"https://www.facebook.com/profile.php?id={profile_identifier}"
-            if section:
-                return f"{base_url}&sk={section}"
-            return base_url
-        else:
-            base_url = f"https://www.facebook.com/{profile_identifier}"
-            if section:
-                return f"{base_url}/{section}"
-            return base_url
+        return self.identity_resolver.profile_url(username, section)
     
     async def get_all_post_types(self, username: str, max_posts: int = 20) -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -499,7 +448,10 @@ class PostsScraper:
 
         except Exception as e:
             logger.error(f"❌ Critical error in _extract_single_post for post_id {post_id}: {e}", exc_info=True)
-            clean_username = self._detect_profile_type(self.page.url)[1]
+            try:
+                clean_username = self.identity_resolver.resolve(self.page.url).key
+            except ValueError:
+                clean_username = "unknown"
             await self.utils.save_page_html(f"{clean_username}_post_extraction_error_{post_id}.html")
             return None
 
@@ -2,6 +2,7 @@
 Improved Facebook Posts Scraper - Enhanced to match target JSON structure
 """
 import asyncio
+import os
 import re
 import time
 import hashlib
@@ -10,88 +11,253 @@ from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 import logging
 
 from .utils import ScraperUtils
+from . import text_heuristics
+from .cascade import ExtractionCascade
+from .scroll_driver import ScrollDriver, ScrollResult
+from .graphql_capture import GraphQLCapture
+from .graphql_paginator import GraphQLPaginator
+from .dom_pruning import DomPruner, unpruned
+from .timeline_checkpoint import TimelineCheckpoint, DEFAULT_CHECKPOINT_TTL
+from .post_history import PostHistory
+from .post_identity import canonical_post_id, content_fingerprint, first_post_id
+from .fields import FieldCostTracker, parse_fields
+from .comment_harvester import CommentHarvester
+from .media_store import MediaFetcher, MediaStore
+from .screenshot_service import ScreenshotService
+from .identity import IdentityResolver
+from .navigation import NavigationManager
 
 # Configure logging - REDUCED for cleaner output
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
+# Available post extraction backends
+EXTRACTION_BACKENDS = ("live", "snapshot")
+
+# Post container selectors (UPDATED 2024 Facebook selectors based on real DOM analysis).
+# Shared by the live-DOM extractor and the offline snapshot backend; the selector
+# matching the most elements wins.
+POST_CONTAINER_SELECTORS = [
+    # Primary selectors from actual Facebook 2024 DOM structure
+    'div.x1rg5ohu.x1iyjqo2.x6ikm8r.x10wlt62.xv54qhq',  # Main post containers
+    'div.xqcrz7y.x1c9tyrk.xeusxvb.x1pahc9y.x1ertn4p.x1lliihq.xbelrpt.xr9ek0c.x1n2onr6',  # Comment containers
+    'div.x1r8uery.x1iyjqo2.x6ikm8r.x10wlt62.xv54qhq',  # Alternative post containers
+    'div.x6s0dn4.x3nfvp2',  # Action containers with content
+    
+    # Secondary selectors (more specific)
+    'div[role="article"]',                    # Post articles
+    'div[data-pagelet*="FeedUnit"]',         # Feed units  
+    'div[data-testid*="post"]',              # Test ID posts
+    'div[aria-posinset]',                    # Positioned posts
+    
+    # Tertiary selectors (backup)
+    '[data-testid="story-root-element"]',    # Story elements
+    'div[data-testid="story-subtitle"]',     # Story subtitles
+    'div[class*="userContentWrapper"]',      # User content wrappers
+    
+    # Final fallback selectors
+    'div[data-ft]',                          # Facebook tracking elements
+    'div[id*="mall_post"]',                  # Mall posts
+    'div[id*="photos_timeline"]',            # Timeline photos
+]
+
+# Post text containers for Strategy A of the content cascade, most specific first
+CONTENT_SELECTORS = [
+    # Real Facebook 2024 selectors based on actual DOM structure
+    'span.x193iq5w.xeuugli.x13faqbe.x1vvkbs.x1xmvt09.x1lliihq.x1s928wv.xhkezso.x1gmr53x.x1cpjm7i.x1fgarty.x1943h6x.xudqn12.x3x7a5m.x6prxxf.xvq8zen.xo1l8bm.xzsf02u[dir="auto"]',
+    'div.xdj266r.x14z9mp.xat24cr.x1lziwak.xvv2xg div[dir="auto"][style*="text-align:start"]',
+    'div[dir="auto"][style*="text-align:start"]',
+    'span.x193iq5w.xeuugli.x13faqbe.x1vvkbs[dir="auto"]',
+    'div.x1lliihq.xjkvuk6.x1iorvi4 span[dir="auto"]',
+    
+    # Fallback selectors - broader patterns
+    'div[data-ad-preview="message"]',  # Sponsored post content
+    'div[data-testid="post_message"]',  # Direct post message
+    'div[class*="userContent"]',       # User content wrapper
+    'span[class*="userContent"]',      # User content text
+    'div[dir="auto"] span',            # Auto-direction spans in divs
+    'span[dir="auto"]',                # Auto-direction spans
+    'div[role="button"] + div span',   # Content after action buttons
+]
+
+# Timestamp link/label selectors, each one a stage of the timestamp cascade
+TIMESTAMP_SELECTORS = [
+    # Real Facebook 2024 selectors based on actual DOM structure
+    'li.html-li.xdj266r.xat24cr.xexx8yu.xyri2b.x18d9i69.x1c1uobl.x1rg5ohu.x1xegmmw.x13fj5qh a',  # Real timestamp links in lists
+    'span.html-span.xdj266r.x14z9mp.xat24cr.x1lziwak.xexx8yu.xyri2b.x18d9i69.x1c1uobl.x1hl2dhg.x16tdsg8.x1vvkbs.x4k7w5x.x1h91t0o.x1h9r5lt.x1jfb8zj.xv2umb2.x1beo9mf.xaigb6o.x12ejxvf.x3igimt.xarpa2k.xedcshv.x1lytzrv.x1t2pt76.x7ja8zs.x1qrby5j a',
+    'div.html-div.xdj266r.x14z9mp.xat24cr.x1lziwak.xexx8yu.xyri2b.x18d9i69.x1c1uobl a',
+    'a[role="link"][tabindex="0"]',       # Focusable links
+    
+    # Fallback selectors
+    'a[aria-label*="ago"]',              # Links with "ago" in aria-label
+    'a[href*="/posts/"]',                # Post links
+    'a[href*="/photos/"]',               # Photo links  
+    'a[role="link"][aria-label]',        # Links with aria labels
+    'span[id*="jsc"][title]',            # Facebook's JS component spans
+    'abbr[title]',                       # HTML5 abbreviation with title
+    'time',                              # HTML5 time elements
+    'a[title*="20"]',                    # Links with year in title
+    'span[title*="20"]'                  # Spans with year in title
+]
+
+# Optional post fields: extractor method and the empty value used when a field is not requested
+POST_FIELD_EXTRACTORS = {
+    "timestamp": ("_extract_enhanced_timestamp", str),
+    "is_tagged": ("_detect_if_tagged_post", bool),
+    "tagged_accounts": ("_extract_enhanced_tagged_accounts", list),
+    "location_tagged": ("_extract_location_from_post", str),
+    "comments": ("_extract_post_comments", list),
+    "reactions": ("_extract_reactions_enhanced", dict),
+    "comments_count": ("_extract_comments_count", int),
+    "shares_count": ("_extract_shares_count", int),
+    "media": ("_extract_media_info", list),
+}
+
+# Post containers searched for "See more" / "View more comments" controls each round
+EXPANSION_ROOT_SELECTOR = 'div[role="article"], div[aria-posinset]'
+
+# Links inside a post that carry its story identifier (for canonical post IDs)
+POST_ID_LINK_SELECTOR = ('a[href*="/posts/"], a[href*="story_fbid"], a[href*="pfbid"], a[href*="/permalink"], '
+                         'a[href*="fbid="], a[href*="/videos/"], a[href*="/reel/"]')
+
 class PostsScraperImproved:
     """
     Enhanced Facebook Posts Scraper that extracts detailed post information
     matching the target JSON structure with full user profiles, locations, etc.
     """
     
-    def __init__(self, page: Page, utils: ScraperUtils):
-        """Initialize the PostsScraper with page and utilities"""
+    def __init__(self, page: Page, utils: ScraperUtils, backend: str = "live",
+                 content_confidence_threshold: float = 0.8, capture_graphql: bool = False,
+                 paginate_graphql: bool = False, prune_extracted_posts: bool = False,
+                 prune_mode: str = "empty", checkpoint_dir: Optional[str] = None,
+                 checkpoint_ttl: float = DEFAULT_CHECKPOINT_TTL, history_dir: Optional[str] = None,
+                 delta: bool = False, delta_known_run: int = 3, fields=None,
+                 cost_tracker: Optional[FieldCostTracker] = None, expand_posts: bool = True,
+                 max_expansions_per_round: int = 25, harvest_comments: bool = False,
+                 comment_tabs: int = 3, max_comments_per_post: int = 50,
+                 media_store: Optional[MediaStore] = None,
+                 screenshot_service: Optional[ScreenshotService] = None,
+                 identity_resolver: Optional[IdentityResolver] = None,
+                 navigation: Optional[NavigationManager] = None):
+        """
+        Initialize the PostsScraper with page and utilities
+        
+        Args:
+            backend: "live" queries the Playwright DOM element by element,
+                "snapshot" takes one page.content() per round and extracts offline
+            content_confidence_threshold: content quality score at which the remaining
+                content strategies are skipped (1.0 is the maximum score, i.e. never skip)
+            capture_graphql: also parse posts out of the page's GraphQL responses and
+                merge them with the DOM results
+            paginate_graphql: once one pagination request has been seen, fetch the rest
+                of the timeline by cursor instead of scrolling (implies capture_graphql)
+            prune_extracted_posts: empty post subtrees once their IDs are recorded so the
+                renderer stays flat on long runs (live backend); prune_mode "empty" or "hide"
+            checkpoint_dir: journal timeline progress to a per-profile file in this directory
+                and resume an interrupted run from it; checkpoints older than checkpoint_ttl
+                seconds are discarded
+            history_dir: keep each profile's posts across runs in this directory and merge
+                every run into them
+            delta: stop scrolling after delta_known_run consecutive posts already in the
+                history and return the fresh posts merged over it (requires history_dir)
+            fields: fields spec (see scraper.fields); post fields that are not requested
+                are never extracted and keep their empty value
+            cost_tracker: FieldCostTracker to time extractors with (shared with ProfileScraper)
+            expand_posts: before each extraction round, expand "See more" text (and comment
+                threads when comments are requested) in the visible posts with one page call,
+                at most max_expansions_per_round controls
+            harvest_comments: open each post's permalink in one of comment_tabs background
+                tabs and replace its inline comments with the full thread (at most
+                max_comments_per_post), while the timeline keeps scrolling
+            media_store: download every post's media into this MediaStore before the signed
+                URLs expire and add a ``stored`` reference to each media item
+            screenshot_service: capture a clipped screenshot of every new post in the
+                background and set its media_screenshot_url (live backend)
+            identity_resolver: IdentityResolver shared with the other scrapers; checkpoints
+                and history files are named by the profile's identity key
+            navigation: NavigationManager shared with ProfileScraper; the profile page is
+                not loaded again when the page already shows it
+        """
+        if backend not in EXTRACTION_BACKENDS:
+            raise ValueError(f"Unknown extraction backend: {backend}")
+        if delta and not history_dir:
+            raise ValueError("Delta scraping needs a history_dir")
+        self.post_fields = parse_fields(fields)[0]
+        self.field_costs = cost_tracker or FieldCostTracker(baseline_path=None)
+        self.expand_posts = expand_posts
+        self.max_expansions_per_round = max_expansions_per_round
+        
         self.page = page
         self.utils = utils
+        self.backend = backend
+        self._snapshot_backend = None
         
         # Configuration
         self.max_retries = 3
         self.default_timeout = 30000
         self.max_posts_per_section = 50
-    
-    def _clean_input(self, username: str) -> str:
-        """Clean and normalize input username/URL"""
-        if not username:
-            raise ValueError("Username cannot be empty")
-        return username.strip().rstrip('/').lstrip('@')
+        
+        # Extraction cascades (strategy order + early exit + hit-rate stats)
+        self.content_confidence_threshold = content_confidence_threshold
+        self.content_cascade = self._build_content_cascade()
+        self.timestamp_cascade = self._build_timestamp_cascade()
+        
+        # Event-driven infinite scroll for the timeline
+        self.scroll_driver = ScrollDriver(page)
+        
+        # Optional GraphQL response capture and cursor pagination
+        self.capture_graphql = capture_graphql or paginate_graphql
+        self.graphql_capture = GraphQLCapture(page) if self.capture_graphql else None
+        self.graphql_paginator = GraphQLPaginator(page, self.graphql_capture) if paginate_graphql else None
+        
+        # Optional DOM pruning of already-extracted posts
+        self.dom_pruner = DomPruner(page, prune_mode) if prune_extracted_posts else None
+        self._round_elements = []
+        # Container selector chosen before anything was pruned (kept for the rest of the run)
+        self._post_selector: Optional[str] = None
+        
+        # Optional resumable timeline checkpoints
+        self.checkpoint_dir = checkpoint_dir
+        self.checkpoint_ttl = checkpoint_ttl
+        self.checkpoint: Optional[TimelineCheckpoint] = None
+        self._journaled_records = set()
+        self._timeline_height = 0
+        
+        # Optional post history across runs and delta refreshes
+        self.history_dir = history_dir
+        self.delta = delta
+        self.delta_known_run = delta_known_run
+        self.post_history: Optional[PostHistory] = None
+        
+        # Optional full comment threads from post permalinks
+        self.harvest_comments = harvest_comments and "comments" in self.post_fields
+        self.comment_tabs = comment_tabs
+        self.max_comments_per_post = max_comments_per_post
+        self.comment_harvester: Optional[CommentHarvester] = None
+        
+        # Optional media downloads into a content-addressed store
+        self.media_store = media_store if "media" in self.post_fields else None
+        
+        # Optional clipped per-post screenshots
+        self.screenshot_service = screenshot_service
+        
+        # One identity (and file names) for every input form of the same profile
+        self.identity_resolver = identity_resolver or IdentityResolver()
+        
+        # Page loads shared with ProfileScraper (skips the URL the page already shows)
+        self.navigation = navigation or NavigationManager(page)
+        
+        # Whether the last get_all_post_types gave up (its empty result is not the profile's posts)
+        self.extraction_failed = False
     
     def _detect_profile_type(self, username: str) -> Tuple[str, str]:
         """Detect if input is username or profile ID and return type and identifier"""
-        username = self._clean_input(username)
-        
-        # Handle full Facebook URLs
-        if "facebook.com" in username.lower():
-            if "profile.php?id=" in username:
-                match = re.search(r'profile\.php\?id=(\d+)', username)
-                if match:
-                    profile_id = match.group(1)
-                    logger.info(f"Extracted profile ID from URL: {profile_id}")
-                    return "id", profile_id
-            else:
-                # Extract username from URL
-                try:
-                    parts = username.lower().split('facebook.com/')
-                    if len(parts) > 1:
-                        username_part = parts[1].split('/')[0].split('?')[0].split('#')[0]
-                        if username_part and not username_part.isdigit() and len(username_part) > 0:
-                            logger.info(f"Extracted username from URL: {username_part}")
-                            return "username", username_part
-                except Exception as e:
-                    logger.warning(f"Error extracting username from URL: {e}")
-        
-        # Handle profile.php format without domain
-        if "profile.php?id=" in username:
-            match = re.search(r'profile\.php\?id=(\d+)', username)
-            if match:
-                profile_id = match.group(1)
-                logger.info(f"Detected profile.php format: {profile_id}")
-                return "id", profile_id
-        
-        # Handle numeric ID only
-        if username.isdigit():
-            logger.info(f"Detected numeric profile ID: {username}")
-            return "id", username
-        
-        # Handle username format
-        logger.info(f"Detected username format: {username}")
-        return "username", username
+        identity = self.identity_resolver.resolve(username)
+        return identity.profile_type, identity.identifier
     
     def _construct_profile_url(self, username: str, section: str = "") -> str:
         """Construct the correct Facebook URL for posts sections"""
-        profile_type, profile_identifier = self._detect_profile_type(username)
-        
-        if profile_type == "id":
-            base_url = f"https://www.facebook.com/profile.php?id={profile_identifier}"
-            if section:
-                return f"{base_url}&sk={section}"
-            return base_url
-        else:
-            base_url = f"https://www.facebook.com/{profile_identifier}"
-            if section:
-                return f"{base_url}/{section}"
-            return base_url
+        return self.identity_resolver.profile_url(username, section)
     
     async def _check_page_health(self) -> bool:
         """Check if the page is still responsive and not crashed"""
@@ -103,6 +269,24 @@ class PostsScraperImproved:
             logger.warning(f"Page health check failed: {e}")
             return False
     
+    def _rebind_page(self, page) -> None:
+        """Point this scraper and every page-bound helper at a new page"""
+        self.page = page
+        self.utils.page = page  # Update utils reference
+        self.navigation.page = page
+        self.navigation.invalidate()
+        self.scroll_driver.rebind(page)
+        if self.graphql_capture:
+            self.graphql_capture.rebind(page)
+        if self.graphql_paginator:
+            self.graphql_paginator.page = page
+        if self.dom_pruner:
+            self.dom_pruner.page = page
+        if self.screenshot_service:
+            self.screenshot_service.rebind(page)
+        if self.comment_harvester:
+            self.comment_harvester.foreground_page = page
+
     async def _recover_from_crash(self) -> bool:
         """Attempt to recover from page crash by creating a new page"""
         try:
@@ -124,8 +308,7 @@ class PostsScraperImproved:
                 
                 # Replace the old page with the new one
                 old_page = self.page
-                self.page = new_page
-                self.utils.page = new_page  # Update utils reference
+                self._rebind_page(new_page)
                 
                 # Close the old crashed page
                 try:
@@ -153,6 +336,7 @@ class PostsScraperImproved:
             "comments_by_user": []
         }
         
+        self.extraction_failed = False
         try:
             logger.info(f"🚀 Starting COMPLETE chronological post extraction for {username}")
             logger.info(f"📊 Target: Extract ALL posts from newest to oldest (max {max_posts})")
@@ -162,24 +346,60 @@ class PostsScraperImproved:
                 logger.warning("Page appears crashed, attempting recovery...")
                 if not await self._recover_from_crash():
                     logger.error("❌ Could not recover from page crash")
+                    self.extraction_failed = True
                     return all_posts
             
-            # Navigate to the main profile page
+            # Start listening before navigation so the first pagination responses are captured
+            if self.graphql_capture:
+                self.graphql_capture.start()
+            
+            # Navigate to the main profile page. The capture only sees responses of a load it
+            # listened to, so with it on the page is reloaded even if it already shows the profile
             profile_url = self._construct_profile_url(username)
-            if not await self._navigate_with_retries(profile_url):
+            if not await self._navigate_with_retries(profile_url, force=self.graphql_capture is not None):
                 logger.error(f"❌ Failed to navigate to profile {profile_url}")
+                self.extraction_failed = True
                 return all_posts
             
             await self._wait_for_posts_to_load()
             
+            # The first posts are embedded in the page HTML rather than fetched via GraphQL
+            if self.graphql_capture:
+                self.graphql_capture.ingest_html(await self.page.content())
+            
             # Save the initial HTML for debugging
-            clean_username = self._detect_profile_type(username)[1]
+            clean_username = (await self.identity_resolver.learn_from_page(self.page, username)).key
             await self.utils.save_page_html(f"{clean_username}_posts_page_debug.html")
+            
+            if self.checkpoint_dir:
+                checkpoint_path = os.path.join(self.checkpoint_dir, f"{clean_username}_timeline.jsonl")
+                self.checkpoint = TimelineCheckpoint(checkpoint_path, clean_username, self.checkpoint_ttl)
+            if self.history_dir:
+                history_path = os.path.join(self.history_dir, f"{clean_username}_posts.json")
+                self.post_history = PostHistory(history_path, clean_username)
+            if self.harvest_comments:
+                self.comment_harvester = CommentHarvester(self.page.context, concurrency=self.comment_tabs,
+                                                          max_comments_per_post=self.max_comments_per_post,
+                                                          foreground_page=self.page)
 
             # Extract ALL posts chronologically with enhanced details
             logger.info("🔍 Extracting ALL posts chronologically (newest to oldest)...")
             extracted_posts = await self._extract_all_posts_chronologically(max_posts)
             
+            if self.screenshot_service:
+                await self.screenshot_service.flush()
+                self.screenshot_service.apply(extracted_posts)
+            if self.comment_harvester:
+                await self._finish_comment_harvest(extracted_posts)
+            if self.media_store is not None:
+                await self._download_media(extracted_posts)
+            
+            if self.post_history is not None:
+                merged_posts = self.post_history.merge(extracted_posts)
+                self.post_history.save()
+                if self.delta:
+                    extracted_posts = merged_posts[:max_posts]
+            
             # Categorize posts with enhanced structure
             for post in extracted_posts:
                 if post.get("is_tagged_post"):
@@ -195,37 +415,81 @@ class PostsScraperImproved:
             logger.info(f"   - Own posts: {len(all_posts['own_posts'])}")
             logger.info(f"   - Tagged posts: {len(all_posts['tagged_posts'])}")
             logger.info(f"   - Comments by user: {len(all_posts['comments_by_user'])}")
+            self.content_cascade.log_stats()
+            self.timestamp_cascade.log_stats()
             
             return all_posts
             
         except Exception as e:
             logger.error(f"❌ Error in enhanced post extraction: {e}", exc_info=True)
+            self.extraction_failed = True
             return all_posts
+        finally:
+            self.scroll_driver.close()
+            if self.dom_pruner:
+                # Pruned posts are gone from the page: a later visit must load it again
+                self.navigation.invalidate()
+                self._post_selector = None
+            if self.graphql_capture:
+                self.graphql_capture.stop()
+            if self._snapshot_backend is not None:
+                self._snapshot_backend.close()
+                self._snapshot_backend = None
+            if self.checkpoint:
+                self.checkpoint.close()
+            if self.comment_harvester:
+                await self.comment_harvester.close()
+                self.comment_harvester = None
+            if self.screenshot_service:
+                await self.screenshot_service.close()
 
     async def _extract_all_posts_chronologically(self, max_posts: int) -> List[Dict[str, Any]]:
         """Extract ALL posts from the timeline in chronological order (newest to oldest)"""
         all_posts = []
         seen_post_ids = set()
-        last_height = 0
         no_new_content_rounds = 0
         max_no_new_rounds = 8
         start_time = time.time()
         max_time = 900  # 15 minutes max for complete extraction
+        timed_out = False
+        paginated = False
+        known_streak = 0
+        delta_history = self.post_history if self.delta else None
+        self._timeline_height = 0
+        self._journaled_records = set()
         
         logger.info(f"🔄 Starting complete chronological extraction (max {max_posts} posts)")
         
-        while len(all_posts) < max_posts and no_new_content_rounds < max_no_new_rounds:
+        # Pick up an interrupted run: restore its posts, then jump to where it stopped
+        resumed = self.checkpoint.load() if self.checkpoint else None
+        if resumed:
+            all_posts = resumed["posts"]
+            seen_post_ids = resumed["seen_post_ids"]
+            if self._restore_graphql_position(resumed):
+                logger.info(f"📄 Resuming cursor pagination after {len(all_posts)} posts")
+                await self.graphql_paginator.paginate(max_posts, on_page=self._checkpoint_round)
+                paginated = self.graphql_paginator.pages_fetched > 0
+                if not paginated:
+                    logger.warning("⚠️ Checkpointed cursor was rejected, falling back to scrolling")
+                    self.graphql_capture.page_info = None
+            if not paginated and resumed["scroll_height"]:
+                await self._fast_forward_timeline(resumed["scroll_height"])
+        
+        while not paginated and len(all_posts) < max_posts and no_new_content_rounds < max_no_new_rounds:
             # Check timeout
             if time.time() - start_time > max_time:
                 logger.warning(f"⏰ Time limit reached. Extracted {len(all_posts)} posts.")
+                timed_out = True
                 break
             
             try:
-                # Get current page height
-                current_height = await self.page.evaluate("document.body.scrollHeight")
+                await self._expand_visible_posts()
                 
                 # Extract current batch of posts
-                current_posts = await self._extract_current_posts_with_enhanced_content()
+                if self.backend == "snapshot":
+                    current_posts = await self._extract_current_posts_from_snapshot()
+                else:
+                    current_posts = await self._extract_current_posts_with_enhanced_content()
                 
                 # Add new unique posts
                 new_posts_added = 0
@@ -235,6 +499,10 @@ class PostsScraperImproved:
                         seen_post_ids.add(post_id)
                         all_posts.append(post)
                         new_posts_added += 1
+                        if self.comment_harvester:
+                            self.comment_harvester.submit(post)
+                        if delta_history is not None:
+                            known_streak = known_streak + 1 if delta_history.is_known(post) else 0
                         
                         # Log progress every 10 posts
                         if len(all_posts) % 10 == 0:
@@ -242,6 +510,21 @@ class PostsScraperImproved:
                 
                 logger.info(f"🔄 Round {len(all_posts)//5 + 1}: +{new_posts_added} new posts (total: {len(all_posts)})")
                 
+                if self.screenshot_service and new_posts_added:
+                    await self._screenshot_new_posts(all_posts[len(all_posts) - new_posts_added:])
+                
+                # Posts whose IDs are recorded no longer need their DOM subtree
+                if self.dom_pruner and self._round_elements:
+                    await self.dom_pruner.prune([el for post_id, el in self._round_elements if post_id in seen_post_ids])
+                    self._round_elements = []
+                
+                self._checkpoint_round(all_posts[len(all_posts) - new_posts_added:])
+                
+                # Delta refresh: everything below a run of known posts is already stored
+                if delta_history is not None and known_streak >= self.delta_known_run:
+                    logger.info(f"🛑 Reached {known_streak} already-known posts, stopping delta refresh")
+                    break
+                
                 # Check if we're getting new content
                 if new_posts_added == 0:
                     no_new_content_rounds += 1
@@ -249,23 +532,32 @@ class PostsScraperImproved:
                 else:
                     no_new_content_rounds = 0
                 
-                # Check if we reached target
-                if len(all_posts) >= max_posts:
+                # Check if we reached target (captured GraphQL posts count too)
+                captured = len(self.graphql_capture.records) if self.graphql_capture else 0
+                if max(len(all_posts), captured) >= max_posts:
                     logger.info(f"🎯 Target reached: {len(all_posts)} posts extracted!")
                     break
                 
-                # Smart scrolling - scroll to load more content
-                await self._smart_scroll_for_more_posts()
-                
-                # Wait for new content to load
-                await asyncio.sleep(2)
+                # Smart scrolling - returns once new content has loaded
+                scroll_result = await self._smart_scroll_for_more_posts()
+                self._timeline_height = max(self._timeline_height, scroll_result.height)
+                if scroll_result.end_of_feed:
+                    logger.info("🏁 End of timeline reached")
+                    break
                 
-                # Check if page height changed (indicates new content)
-                new_height = await self.page.evaluate("document.body.scrollHeight")
-                if new_height == current_height and new_posts_added == 0:
+                # Check if the page grew (indicates new content)
+                if not scroll_result.grew and new_posts_added == 0:
                     no_new_content_rounds += 1
                 
-                last_height = new_height
+                # The scroll triggered a pagination request: fetch the rest by cursor
+                # (a delta refresh stops at known posts instead of paging to max_posts)
+                if self.graphql_paginator and delta_history is None:
+                    await self.graphql_capture.flush()
+                    if self.graphql_paginator.ready:
+                        logger.info("📄 Switching to cursor pagination")
+                        await self.graphql_paginator.paginate(max_posts, on_page=self._checkpoint_round)
+                        logger.info(f"📄 Cursor pagination: {self.graphql_paginator.report()}")
+                        break
                 
             except Exception as e:
                 logger.error(f"⚠️ Error during extraction round: {e}")
@@ -273,7 +565,19 @@ class PostsScraperImproved:
                 await asyncio.sleep(3)
                 continue
         
+        if self.checkpoint and not timed_out:
+            self.checkpoint.complete()
+        
+        if self.graphql_capture:
+            await self.graphql_capture.flush()
+            dom_count = len(all_posts)
+            all_posts = self.graphql_capture.merge_with_dom(all_posts)[:max_posts]
+            logger.info(f"📡 Merged {len(self.graphql_capture.records)} GraphQL posts with {dom_count} DOM posts -> {len(all_posts)}")
+        
         logger.info(f"✅ Chronological extraction complete: {len(all_posts)} posts")
+        self.scroll_driver.log_stats()
+        if self.dom_pruner:
+            logger.info(f"🧹 DOM pruning: {self.dom_pruner.report()}")
         return all_posts
 
     async def _extract_current_posts_with_enhanced_content(self) -> List[Dict[str, Any]]:
@@ -281,47 +585,29 @@ class PostsScraperImproved:
         posts_batch = []
         
         try:
-            # Use UPDATED 2024 Facebook selectors based on real DOM analysis
-            post_selectors = [
-                # Primary selectors from actual Facebook 2024 DOM structure
-                'div.x1rg5ohu.x1iyjqo2.x6ikm8r.x10wlt62.xv54qhq',  # Main post containers
-                'div.xqcrz7y.x1c9tyrk.xeusxvb.x1pahc9y.x1ertn4p.x1lliihq.xbelrpt.xr9ek0c.x1n2onr6',  # Comment containers
-                'div.x1r8uery.x1iyjqo2.x6ikm8r.x10wlt62.xv54qhq',  # Alternative post containers
-                'div.x6s0dn4.x3nfvp2',  # Action containers with content
-                
-                # Secondary selectors (more specific)
-                'div[role="article"]',                    # Post articles
-                'div[data-pagelet*="FeedUnit"]',         # Feed units  
-                'div[data-testid*="post"]',              # Test ID posts
-                'div[aria-posinset]',                    # Positioned posts
-                
-                # Tertiary selectors (backup)
-                '[data-testid="story-root-element"]',    # Story elements
-                'div[data-testid="story-subtitle"]',     # Story subtitles
-                'div[class*="userContentWrapper"]',      # User content wrappers
-                
-                # Final fallback selectors
-                'div[data-ft]',                          # Facebook tracking elements
-                'div[id*="mall_post"]',                  # Mall posts
-                'div[id*="photos_timeline"]',            # Timeline photos
-            ]
-            
             post_elements = []
             best_selector = None
             max_elements = 0
             
-            # Test each selector and use the one that finds the most elements
-            for selector in post_selectors:
+            # Test each selector and use the one that finds the most elements. With pruning,
+            # the most matches after a prune can be a broader selector (comments, action bars),
+            # so the first choice is kept for the rest of the run.
+            self._round_elements = []
+            candidates = [self._post_selector] if self.dom_pruner and self._post_selector else POST_CONTAINER_SELECTORS
+            for selector in candidates:
                 try:
-                    elements = await self.page.query_selector_all(selector)
+                    query = unpruned(selector) if self.dom_pruner else selector
+                    elements = await self.page.query_selector_all(query)
                     if elements and len(elements) > max_elements:
                         max_elements = len(elements)
                         post_elements = elements
                         best_selector = selector
-                        logger.debug(f"✅ Selector '{selector}' found {len(elements)} elements")
+                        logger.debug(f"✅ Selector '{query}' found {len(elements)} elements")
                 except Exception as e:
-                    logger.debug(f"❌ Selector '{selector}' failed: {e}")
+                    logger.debug(f"❌ Selector '{query}' failed: {e}")
                     continue
+            if self.dom_pruner and best_selector:
+                self._post_selector = best_selector
             
             print(f"🎯 Using best selector: '{best_selector}' with {max_elements} elements")
             logger.info(f"🔍 Processing {len(post_elements)} potential post elements")
@@ -347,6 +633,7 @@ class PostsScraperImproved:
                     # Validation with enhanced logging
                     if self._is_valid_comprehensive_post(post_data):
                         posts_batch.append(post_data)
+                        self._round_elements.append((post_data["id"], element))
                         print(f"✅ Post {i+1} ACCEPTED - Content: {post_data.get('content', 'No content')[:40]}...")
                     else:
                         print(f"❌ Post {i+1} REJECTED - Failed validation")
@@ -362,48 +649,124 @@ class PostsScraperImproved:
             logger.error(f"❌ Error extracting current posts: {e}")
             return []
 
-    async def _smart_scroll_for_more_posts(self):
-        """Intelligent scrolling to load more posts"""
+    async def _extract_current_posts_from_snapshot(self) -> List[Dict[str, Any]]:
+        """Extract current posts from a single page.content() snapshot using the offline backend"""
         try:
-            # Scroll down in steps to trigger loading
-            for _ in range(3):
-                await self.page.evaluate("window.scrollBy(0, window.innerHeight * 0.8)")
-                await asyncio.sleep(0.5)
+            if self._snapshot_backend is None:
+                from .html_backend import HTMLSnapshotBackend
+                self._snapshot_backend = HTMLSnapshotBackend(post_fields=self.post_fields)
             
-            # Scroll to bottom to trigger infinite scroll
-            await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            await asyncio.sleep(1)
-            
-            # Small scroll up and down to trigger loading
-            await self.page.evaluate("window.scrollBy(0, -100)")
-            await asyncio.sleep(0.5)
-            await self.page.evaluate("window.scrollBy(0, 200)")
+            html = await self.page.content()
+            posts_batch = await self._snapshot_backend.extract_posts_async(html)
+            logger.info(f"📊 Snapshot backend extracted {len(posts_batch)} valid posts from this batch")
+            return posts_batch
             
         except Exception as e:
-            logger.warning(f"⚠️ Error during smart scrolling: {e}")
+            logger.error(f"❌ Error extracting posts from snapshot: {e}")
+            return []
+
+    async def _expand_visible_posts(self) -> None:
+        """Expand truncated text (and comment threads if requested) in the posts on screen"""
+        if not self.expand_posts or self.utils is None:
+            return
+        kinds = ("see_more", "comments") if "comments" in self.post_fields else ("see_more",)
+        await self.utils.bulk_expand(kinds=kinds, root_selector=EXPANSION_ROOT_SELECTOR,
+                                     max_expansions=self.max_expansions_per_round)
+
+    async def _finish_comment_harvest(self, posts: List[Dict[str, Any]], timeout: float = 300) -> None:
+        """Harvest posts the scroll loop never saw (GraphQL pages, resumed runs) and wait for all threads"""
+        for post in posts:
+            self.comment_harvester.submit(post)
+        await self.comment_harvester.drain(timeout)
+        # GraphQL merging copies post records, so copy the threads onto the final list
+        self.comment_harvester.apply(posts)
+        logger.info(f"💬 Comment harvest: {self.comment_harvester.report()}")
+
+    async def _screenshot_new_posts(self, new_posts: List[Dict[str, Any]]) -> None:
+        """Queue screenshots of this round's new posts (captured while the next round runs)"""
+        elements = dict(self._round_elements)
+        for post in new_posts:
+            if post["id"] in elements:
+                self.screenshot_service.submit(post, elements[post["id"]])
+        # Pruning empties the subtrees, so their screenshots must be taken first
+        if self.dom_pruner:
+            await self.screenshot_service.flush()
+
+    async def _download_media(self, posts: List[Dict[str, Any]]) -> None:
+        """Fetch post media with the session's cookies and attach the stored objects"""
+        try:
+            fetcher = await MediaFetcher.from_context(self.media_store, self.page.context, self.page)
+            await fetcher.fetch_posts(posts)
+        except Exception as e:
+            logger.warning(f"⚠️ Media download failed: {e}")
+
+    def _checkpoint_round(self, new_posts: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Journal this round's new posts, new GraphQL records and the current position"""
+        if not self.checkpoint:
+            return
+        capture = self.graphql_capture
+        new_records = {}
+        if capture:
+            new_records = {key: record for key, record in capture.records.items() if key not in self._journaled_records}
+            self._journaled_records.update(new_records)
+        self.checkpoint.record_round(
+            new_posts or [], self._timeline_height,
+            cursor=capture.cursor if capture and capture.has_next_page else None,
+            request=capture.last_request if capture else None,
+            new_records=new_records
+        )
+
+    def _restore_graphql_position(self, resumed: Dict[str, Any]) -> bool:
+        """Restore captured records and the pagination cursor; True if pagination can continue"""
+        capture = self.graphql_capture
+        if not capture:
+            return False
+        capture.records.update(resumed["records"])
+        self._journaled_records.update(resumed["records"])
+        if resumed["cursor"] and resumed["request"]:
+            capture.page_info = {"end_cursor": resumed["cursor"], "has_next_page": True}
+            capture.last_request = resumed["request"]
+        return bool(self.graphql_paginator and self.graphql_paginator.ready)
+
+    async def _fast_forward_timeline(self, target_height: int, max_stalls: int = 3) -> None:
+        """Scroll back down to a checkpointed feed height without extracting on the way"""
+        logger.info(f"⏩ Fast-forwarding timeline to height {target_height}px")
+        stalls = 0
+        while self._timeline_height < target_height and stalls < max_stalls:
+            result = await self._smart_scroll_for_more_posts()
+            self._timeline_height = max(self._timeline_height, result.height)
+            if result.end_of_feed:
+                break
+            stalls = 0 if result.grew else stalls + 1
+        logger.info(f"⏩ Fast-forward reached {self._timeline_height}px")
+
+    async def _smart_scroll_for_more_posts(self) -> ScrollResult:
+        """Intelligent scrolling to load more posts - waits for new feed nodes, page growth or the GraphQL page"""
+        return await self.scroll_driver.scroll()
 
     async def _extract_comprehensive_post_data(self, element) -> Dict[str, Any]:
         """Extract comprehensive post data with improved content detection"""
+        costs = self.field_costs
+        original_url = await costs.measure("original_url", self._extract_enhanced_post_url(element))
+        content = await costs.measure("content", self._extract_enhanced_post_content(element))
         post_data = {
-            "id": await self._generate_enhanced_post_id(element),
-            "timestamp": await self._extract_enhanced_timestamp(element),
-            "content": await self._extract_enhanced_post_content(element),
+            "id": await costs.measure("id", self._generate_enhanced_post_id(element, original_url, content)),
+            "content": content,
             "caption": "",
             "media_screenshot_url": "",
-            "original_url": await self._extract_enhanced_post_url(element),
+            "original_url": original_url,
             "shared": False,
             "shared_content": "",
-            "original_poster": "",
-            "is_tagged": await self._detect_if_tagged_post(element),
-            "tagged_accounts": await self._extract_enhanced_tagged_accounts(element),
-            "location_tagged": await self._extract_location_from_post(element),
-            "comments": await self._extract_post_comments(element),
-            "reactions": await self._extract_reactions_enhanced(element),
-            "comments_count": await self._extract_comments_count(element),
-            "shares_count": await self._extract_shares_count(element),
-            "media": await self._extract_media_info(element)
+            "original_poster": ""
         }
         
+        # Only run the extractors for requested fields
+        for field, (method, empty) in POST_FIELD_EXTRACTORS.items():
+            if field in self.post_fields:
+                post_data[field] = await costs.measure(field, getattr(self, method)(element))
+            else:
+                post_data[field] = empty()
+        
         # Set caption same as content if not empty
         if post_data["content"]:
             post_data["caption"] = post_data["content"]
@@ -424,7 +787,7 @@ class PostsScraperImproved:
         # Primary validation: Must have actual content
         if content and len(content) > 15:
             # Make sure it's not just UI noise
-            if self._is_actual_post_content(content):
+            if text_heuristics.is_actual_post_content(content):
                 return True
         
         # Secondary validation: Tagged posts with meaningful data
@@ -566,7 +929,8 @@ class PostsScraperImproved:
             # Generate unique ID
             timestamp = await self._extract_post_timestamp_enhanced(element)
             content = await self._extract_post_content_enhanced(element)
-            post_id = self._generate_post_id(content, timestamp)
+            post_url = await self._extract_post_url_enhanced(element)
+            post_id = canonical_post_id(url=post_url) or self._generate_post_id(content, timestamp)
             
             logger.info(f"Processing enhanced post with ID: {post_id}")
 
@@ -577,7 +941,7 @@ class PostsScraperImproved:
                 "content": content,
                 "caption": content,  # In Facebook, content often serves as caption
                 "media_screenshot_url": "",  # Can be implemented if needed
-                "original_url": await self._extract_post_url_enhanced(element),
+                "original_url": post_url,
                 "tagged_accounts": await self._extract_tagged_accounts(element),
                 "location_tagged": await self._extract_location_tagged(element),
                 "comments": await self._extract_comments_enhanced(element),
@@ -698,76 +1062,12 @@ class PostsScraperImproved:
     async def _extract_enhanced_post_content(self, element) -> str:
         """ULTRA-ENHANCED content extraction - finds actual post text with aggressive filtering"""
         try:
-            # Method 1: Target Facebook 2024 post content structure - most specific first
-            post_content_candidates = []
-            
-            # Strategy A: Look for the main post text container (updated with real Facebook 2024 selectors)
-            main_content_selectors = [
-                # Real Facebook 2024 selectors based on actual DOM structure
-                'span.x193iq5w.xeuugli.x13faqbe.x1vvkbs.x1xmvt09.x1lliihq.x1s928wv.xhkezso.x1gmr53x.x1cpjm7i.x1fgarty.x1943h6x.xudqn12.x3x7a5m.x6prxxf.xvq8zen.xo1l8bm.xzsf02u[dir="auto"]',
-                'div.xdj266r.x14z9mp.xat24cr.x1lziwak.xvv2xg div[dir="auto"][style*="text-align:start"]',
-                'div[dir="auto"][style*="text-align:start"]',
-                'span.x193iq5w.xeuugli.x13faqbe.x1vvkbs[dir="auto"]',
-                'div.x1lliihq.xjkvuk6.x1iorvi4 span[dir="auto"]',
-                
-                # Fallback selectors - broader patterns
-                'div[data-ad-preview="message"]',  # Sponsored post content
-                'div[data-testid="post_message"]',  # Direct post message
-                'div[class*="userContent"]',       # User content wrapper
-                'span[class*="userContent"]',      # User content text
-                'div[dir="auto"] span',            # Auto-direction spans in divs
-                'span[dir="auto"]',                # Auto-direction spans
-                'div[role="button"] + div span',   # Content after action buttons
-            ]
-            
-            for selector in main_content_selectors:
-                try:
-                    elements = await element.query_selector_all(selector)
-                    for el in elements:
-                        text = await el.text_content()
-                        if text and len(text.strip()) > 15:
-                            cleaned = self._clean_facebook_content(text.strip())
-                            if len(cleaned) > 15 and self._is_actual_post_content(cleaned):
-                                post_content_candidates.append((cleaned, self._score_content_quality(cleaned)))
-                except:
-                    continue
-            
-            # Strategy B: Look for largest meaningful text blocks in the post
-            try:
-                all_spans = await element.query_selector_all('span')
-                for span in all_spans:
-                    text = await span.text_content()
-                    if text and len(text.strip()) > 20:
-                        cleaned = self._clean_facebook_content(text.strip())
-                        if len(cleaned) > 20 and self._is_actual_post_content(cleaned):
-                            post_content_candidates.append((cleaned, self._score_content_quality(cleaned)))
-            except:
-                pass
-            
-            # Strategy C: Extract and analyze all text, then find the best content
-            try:
-                full_element_text = await element.text_content()
-                if full_element_text:
-                    # Split into lines and analyze each
-                    lines = [line.strip() for line in full_element_text.split('\n') if line.strip()]
-                    for line in lines:
-                        if (len(line) > 25 and 
-                            self._is_actual_post_content(line) and
-                            not self._is_ui_text(line)):
-                            cleaned = self._clean_facebook_content(line)
-                            if len(cleaned) > 20:
-                                post_content_candidates.append((cleaned, self._score_content_quality(cleaned)))
-            except:
-                pass
-            
-            # Find the best content from all candidates
-            if post_content_candidates:
-                # Sort by score (highest first)
-                post_content_candidates.sort(key=lambda x: x[1], reverse=True)
-                best_content = post_content_candidates[0][0]
-                
+            # Strategies A (per selector), B and C run as a cascade that stops once a
+            # candidate scores at least content_confidence_threshold
+            best = await self.content_cascade.run(element)
+            if best:
                 # Additional cleaning and validation
-                final_content = self._final_content_cleanup(best_content)
+                final_content = text_heuristics.final_content_cleanup(best[0])
                 if len(final_content) > 15:
                     return final_content[:400]  # Reasonable length limit
             
@@ -788,6 +1088,41 @@ class PostsScraperImproved:
             logger.debug(f"Content extraction error: {e}")
             return ""
 
+    def _build_content_cascade(self) -> ExtractionCascade:
+        cascade = ExtractionCascade("Post content", self.content_confidence_threshold)
+        for selector in CONTENT_SELECTORS:
+            cascade.add(f"A {selector}", lambda element, selector=selector: self._content_candidates_from_selector(element, selector))
+        cascade.add("B all spans", self._content_candidates_from_spans)
+        cascade.add("C full text lines", self._content_candidates_from_lines)
+        return cascade
+
+    async def _content_candidates_from_selector(self, element, selector: str) -> List[Tuple[str, float]]:
+        """Strategy A: text of the main post text containers"""
+        texts = []
+        try:
+            for el in await element.query_selector_all(selector):
+                texts.append(await el.text_content())
+        except:
+            pass
+        return text_heuristics.score_candidates(texts, 15)
+
+    async def _content_candidates_from_spans(self, element) -> List[Tuple[str, float]]:
+        """Strategy B: largest meaningful text blocks in the post"""
+        texts = []
+        try:
+            for span in await element.query_selector_all('span'):
+                texts.append(await span.text_content())
+        except:
+            pass
+        return text_heuristics.score_candidates(texts, 20)
+
+    async def _content_candidates_from_lines(self, element) -> List[Tuple[str, float]]:
+        """Strategy C: split the full element text into lines and analyze each"""
+        full_element_text = await element.text_content()
+        if not full_element_text:
+            return []
+        return text_heuristics.score_lines(full_element_text)
+
     def _is_actual_post_content(self, text: str) -> bool:
         """Enhanced check if text is actual post content (not UI noise)"""
         if not text or len(text.strip()) < 10:
@@ -866,7 +1201,7 @@ class PostsScraperImproved:
         import re
         
         # Remove common Facebook artifacts
-        text = re.sub(r'\bFacebook\b{2,}', 'Facebook', text, flags=re.IGNORECASE)
+        text = re.sub(r'\bFacebook(?:\s*Facebook\b)+', 'Facebook', text, flags=re.IGNORECASE)
         text = re.sub(r'(\bFacebook\b\s*){3,}', '', text, flags=re.IGNORECASE)
         
         # Remove UI fragments that might have slipped through
@@ -1065,110 +1400,12 @@ class PostsScraperImproved:
     async def _extract_enhanced_timestamp(self, element) -> str:
         """ULTRA-ENHANCED timestamp extraction with Facebook 2024 selectors"""
         try:
-            timestamp_candidates = []
-            
-            # Strategy 1: Facebook 2024 timestamp selectors (updated with real selectors)
-            timestamp_selectors = [
-                # Real Facebook 2024 selectors based on actual DOM structure
-                'li.html-li.xdj266r.xat24cr.xexx8yu.xyri2b.x18d9i69.x1c1uobl.x1rg5ohu.x1xegmmw.x13fj5qh a',  # Real timestamp links in lists
-                'span.html-span.xdj266r.x14z9mp.xat24cr.x1lziwak.xexx8yu.xyri2b.x18d9i69.x1c1uobl.x1hl2dhg.x16tdsg8.x1vvkbs.x4k7w5x.x1h91t0o.x1h9r5lt.x1jfb8zj.xv2umb2.x1beo9mf.xaigb6o.x12ejxvf.x3igimt.xarpa2k.xedcshv.x1lytzrv.x1t2pt76.x7ja8zs.x1qrby5j a',
-                'div.html-div.xdj266r.x14z9mp.xat24cr.x1lziwak.xexx8yu.xyri2b.x18d9i69.x1c1uobl a',
-                'a[role="link"][tabindex="0"]',       # Focusable links
-                
-                # Fallback selectors
-                'a[aria-label*="ago"]',              # Links with "ago" in aria-label
-                'a[href*="/posts/"]',                # Post links
-                'a[href*="/photos/"]',               # Photo links  
-                'a[role="link"][aria-label]',        # Links with aria labels
-                'span[id*="jsc"][title]',            # Facebook's JS component spans
-                'abbr[title]',                       # HTML5 abbreviation with title
-                'time',                              # HTML5 time elements
-                'a[title*="20"]',                    # Links with year in title
-                'span[title*="20"]'                  # Spans with year in title
-            ]
-            
-            for selector in timestamp_selectors:
-                try:
-                    elements = await element.query_selector_all(selector)
-                    for el in elements:
-                        # Check aria-label first (most reliable)
-                        aria_label = await el.get_attribute('aria-label')
-                        if aria_label and self._is_timestamp_text(aria_label):
-                            timestamp_candidates.append((aria_label.strip(), 3))
-                        
-                        # Check title attribute
-                        title = await el.get_attribute('title')
-                        if title and self._is_timestamp_text(title):
-                            timestamp_candidates.append((title.strip(), 2))
-                        
-                        # Check text content
-                        text = await el.text_content()
-                        if text and self._is_timestamp_text(text.strip()):
-                            timestamp_candidates.append((text.strip(), 1))
-                except:
-                    continue
-            
-            # Strategy 2: Search all text for timestamp patterns
-            try:
-                full_text = await element.text_content()
-                if full_text:
-                    import re
-                    
-                    # Pattern 1: "X ago" format (most common)
-                    ago_patterns = [
-                        r'(\d+\s+(?:second|minute|hour|day|week|month|year)s?\s+ago)',
-                        r'(just now|a moment ago|an? (?:second|minute|hour|day|week|month|year) ago)',
-                        r'(yesterday|today|this morning|this afternoon|this evening)'
-                    ]
-                    
-                    for pattern in ago_patterns:
-                        matches = re.findall(pattern, full_text, re.IGNORECASE)
-                        for match in matches:
-                            timestamp_candidates.append((match, 2))
-                    
-                    # Pattern 2: Specific dates and times
-                    date_patterns = [
-                        r'(\w+ \d{1,2}, 20\d{2})',           # "January 15, 2023"
-                        r'(\d{1,2}/\d{1,2}/20\d{2})',        # "01/15/2023"
-                        r'(\d{1,2}:\d{2}\s*(?:AM|PM)?)',     # "2:30 PM"
-                        r'(\w+ at \d{1,2}:\d{2}\s*(?:AM|PM)?)'  # "Yesterday at 2:30 PM"
-                    ]
-                    
-                    for pattern in date_patterns:
-                        matches = re.findall(pattern, full_text, re.IGNORECASE)
-                        for match in matches:
-                            timestamp_candidates.append((match, 1))
-            except:
-                pass
-            
-            # Strategy 3: Look for time-related attributes in any element
-            try:
-                all_elements = await element.query_selector_all('*')
-                for el in all_elements[:20]:  # Limit search to avoid performance issues
-                    try:
-                        # Check datetime attribute (HTML5)
-                        datetime_attr = await el.get_attribute('datetime')
-                        if datetime_attr:
-                            timestamp_candidates.append((datetime_attr, 2))
-                        
-                        # Check data-time or similar attributes
-                        for attr_name in ['data-time', 'data-timestamp', 'data-date']:
-                            attr_value = await el.get_attribute(attr_name)
-                            if attr_value and self._is_timestamp_text(attr_value):
-                                timestamp_candidates.append((attr_value, 1))
-                    except:
-                        continue
-            except:
-                pass
-            
-            # Find the best timestamp candidate
-            if timestamp_candidates:
-                # Sort by priority (higher number = better)
-                timestamp_candidates.sort(key=lambda x: x[1], reverse=True)
-                best_timestamp = timestamp_candidates[0][0]
-                
+            # Priorities: aria-label 3, title/relative text 2, other text 1. The cascade
+            # stops at the first priority-3 hit, which is what a full sort would pick.
+            best = await self.timestamp_cascade.run(element)
+            if best:
                 # Clean and validate
-                cleaned_timestamp = self._clean_timestamp_text(best_timestamp)
+                cleaned_timestamp = self._clean_timestamp_text(best[0])
                 if cleaned_timestamp:
                     return cleaned_timestamp
             
@@ -1178,6 +1415,98 @@ class PostsScraperImproved:
             logger.debug(f"Error extracting enhanced timestamp: {e}")
             return ""
 
+    def _build_timestamp_cascade(self) -> ExtractionCascade:
+        cascade = ExtractionCascade("Timestamp", 3)
+        for selector in TIMESTAMP_SELECTORS:
+            cascade.add(selector, lambda element, selector=selector: self._timestamp_candidates_from_selector(element, selector))
+        cascade.add("text patterns", self._timestamp_candidates_from_text)
+        cascade.add("time attributes", self._timestamp_candidates_from_attributes)
+        return cascade
+
+    async def _timestamp_candidates_from_selector(self, element, selector: str) -> List[Tuple[str, int]]:
+        """Strategy 1: aria-label, title and text of timestamp links"""
+        timestamp_candidates = []
+        try:
+            elements = await element.query_selector_all(selector)
+            for el in elements:
+                # Check aria-label first (most reliable)
+                aria_label = await el.get_attribute('aria-label')
+                if aria_label and self._is_timestamp_text(aria_label):
+                    timestamp_candidates.append((aria_label.strip(), 3))
+                    break  # Nothing can outrank it
+                
+                # Check title attribute
+                title = await el.get_attribute('title')
+                if title and self._is_timestamp_text(title):
+                    timestamp_candidates.append((title.strip(), 2))
+                
+                # Check text content
+                text = await el.text_content()
+                if text and self._is_timestamp_text(text.strip()):
+                    timestamp_candidates.append((text.strip(), 1))
+        except:
+            pass
+        return timestamp_candidates
+
+    async def _timestamp_candidates_from_text(self, element) -> List[Tuple[str, int]]:
+        """Strategy 2: Search all text for timestamp patterns"""
+        timestamp_candidates = []
+        try:
+            full_text = await element.text_content()
+            if full_text:
+                import re
+                
+                # Pattern 1: "X ago" format (most common)
+                ago_patterns = [
+                    r'(\d+\s+(?:second|minute|hour|day|week|month|year)s?\s+ago)',
+                    r'(just now|a moment ago|an? (?:second|minute|hour|day|week|month|year) ago)',
+                    r'(yesterday|today|this morning|this afternoon|this evening)'
+                ]
+                
+                for pattern in ago_patterns:
+                    matches = re.findall(pattern, full_text, re.IGNORECASE)
+                    for match in matches:
+                        timestamp_candidates.append((match, 2))
+                
+                # Pattern 2: Specific dates and times
+                date_patterns = [
+                    r'(\w+ \d{1,2}, 20\d{2})',           # "January 15, 2023"
+                    r'(\d{1,2}/\d{1,2}/20\d{2})',        # "01/15/2023"
+                    r'(\d{1,2}:\d{2}\s*(?:AM|PM)?)',     # "2:30 PM"
+                    r'(\w+ at \d{1,2}:\d{2}\s*(?:AM|PM)?)'  # "Yesterday at 2:30 PM"
+                ]
+                
+                for pattern in date_patterns:
+                    matches = re.findall(pattern, full_text, re.IGNORECASE)
+                    for match in matches:
+                        timestamp_candidates.append((match, 1))
+        except:
+            pass
+        return timestamp_candidates
+
+    async def _timestamp_candidates_from_attributes(self, element) -> List[Tuple[str, int]]:
+        """Strategy 3: Look for time-related attributes in any element"""
+        timestamp_candidates = []
+        try:
+            all_elements = await element.query_selector_all('*')
+            for el in all_elements[:20]:  # Limit search to avoid performance issues
+                try:
+                    # Check datetime attribute (HTML5)
+                    datetime_attr = await el.get_attribute('datetime')
+                    if datetime_attr:
+                        timestamp_candidates.append((datetime_attr, 2))
+                    
+                    # Check data-time or similar attributes
+                    for attr_name in ['data-time', 'data-timestamp', 'data-date']:
+                        attr_value = await el.get_attribute(attr_name)
+                        if attr_value and self._is_timestamp_text(attr_value):
+                            timestamp_candidates.append((attr_value, 1))
+                except:
+                    continue
+        except:
+            pass
+        return timestamp_candidates
+
     def _is_timestamp_text(self, text: str) -> bool:
         """Enhanced check if text looks like a timestamp (updated for Facebook 2024)"""
         if not text or len(text.strip()) < 1:
@@ -1318,35 +1647,34 @@ class PostsScraperImproved:
         
         return any(pattern in url for pattern in valid_patterns)
 
-    async def _generate_enhanced_post_id(self, element) -> str:
-        """Generate enhanced post ID with better uniqueness"""
+    async def _generate_enhanced_post_id(self, element, post_url: str = "", content: str = "") -> str:
+        """
+        Canonical post ID that stays the same across runs: from the permalink, any
+        story link inside the post, or story ID attributes; a fingerprint of the
+        message text as a last resort ("" if the post has none of these)
+        """
         try:
-            # Try to find existing post ID attributes
-            id_attributes = ['data-testid', 'id', 'data-story-id', 'data-post-id']
-            
-            for attr in id_attributes:
-                post_id = await element.get_attribute(attr)
+            post_id = canonical_post_id(url=post_url)
+            if post_id:
+                return post_id
+            
+            # Comment, photo and timestamp links carry the story identifier too
+            links = await element.query_selector_all(POST_ID_LINK_SELECTOR)
+            post_id = first_post_id([await link.get_attribute('href') for link in links[:10]])
+            if post_id:
+                return post_id
+            
+            for attr in ('data-story-id', 'data-post-id'):
+                value = await element.get_attribute(attr)
+                post_id = canonical_post_id(post_id=value, story_id=value) if value else ""
                 if post_id:
-                    # Clean and shorten the ID
-                    clean_id = re.sub(r'[^a-zA-Z0-9]', '', post_id)
-                    if len(clean_id) > 8:
-                        return clean_id[:12]  # Take first 12 chars
-            
-            # Fallback: generate ID from content hash
-            content = await element.text_content() or ""
-            if content:
-                import hashlib
-                content_hash = hashlib.md5(content[:200].encode()).hexdigest()
-                return content_hash[:12]
-            
-            # Last resort: timestamp-based ID
-            import time
-            return f"post_{int(time.time() * 1000) % 1000000000000}"
+                    return post_id
+            
+            return content_fingerprint(content)
             
         except Exception as e:
             logger.debug(f"Error generating enhanced post ID: {e}")
-            import time
-            return f"post_{int(time.time() * 1000) % 1000000000000}"
+            return content_fingerprint(content)
 
     async def _extract_enhanced_tagged_accounts(self, element) -> List[Dict[str, Any]]:
         """Enhanced extraction of tagged accounts"""
@@ -1874,8 +2202,8 @@ class PostsScraperImproved:
         return False
 
     # Additional helper methods
-    async def _navigate_with_retries(self, url: str, retries: int = 3) -> bool:
-        """Navigate with retries and crash recovery"""
+    async def _navigate_with_retries(self, url: str, retries: int = 3, force: bool = False) -> bool:
+        """Navigate with retries and crash recovery (force loads url even if the page already shows it)"""
         for attempt in range(retries):
             try:
                 # Check page health before navigation
@@ -1886,7 +2214,8 @@ class PostsScraperImproved:
                         continue
                 
                 logger.info(f"Navigation attempt {attempt + 1} to: {url}")
-                await self.page.goto(url, wait_until="domcontentloaded", timeout=30000)
+                if not await self.navigation.goto(url, timeout=30000, force=force):
+                    return True
                 
                 # Verify navigation was successful
                 current_url = self.page.url
@@ -3,6 +3,7 @@ Improved Facebook Profile Scraper
 Modern, clean, and robust implementation with comprehensive error handling
 """
 import asyncio
+import os
 import re
 import time
 from typing import Dict, List, Any, Optional, Tuple
@@ -10,36 +11,104 @@ from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 import logging
 
 from .utils import ScraperUtils
+from .scroll_driver import ScrollDriver
+from .list_harvester import ListHarvester, LinkListExtractor, group_key
+from .fields import PROFILE_SECTIONS, FieldCostTracker, parse_fields
+from .identity import IdentityResolver, ProfileIdentity
+from .negative_cache import NegativeCache, PROFILE_STATE_REASONS, SECTION_STATE_REASONS, page_level_evidence
+from .navigation import NavigationManager
+from .about_snapshot import (ABOUT_READY_SELECTOR, ABOUT_SETTLE_SECONDS, ABOUT_SUBTABS, load_about_subtabs,
+                             missing_fields, subtabs_for, take_about_snapshot)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Profile links rendered as friends list tiles
+FRIEND_LINK_SELECTOR = 'a[href*="facebook.com/"]'
+
+# Per-list harvesting budgets (max_items / max_rounds / max_seconds); override with list_budgets
+DEFAULT_LIST_BUDGETS = {
+    "friends": {"max_seconds": 1800},
+    "groups": {"max_seconds": 300},
+    "pages_followed": {"max_seconds": 300},
+    "following": {"max_seconds": 600},
+}
+
 class ProfileScraper:
     """
     Improved Facebook Profile Scraper with robust error handling and modern design patterns
     """
     
-    def __init__(self, page: Page, utils: ScraperUtils):
-        """Initialize the ProfileScraper with page and utilities"""
+    def __init__(self, page: Page, utils: ScraperUtils, fields=None,
+                 cost_tracker: Optional[FieldCostTracker] = None, list_output_dir: Optional[str] = None,
+                 list_budgets: Optional[Dict[str, Dict[str, Any]]] = None,
+                 identity_resolver: Optional[IdentityResolver] = None,
+                 negative_cache: Optional[NegativeCache] = None,
+                 navigation: Optional[NavigationManager] = None):
+        """
+        Initialize the ProfileScraper with page and utilities
+        
+        Args:
+            fields: fields spec (see scraper.fields); profile sections that are not
+                requested (about, friends, pages_followed, following, groups) are skipped
+            cost_tracker: FieldCostTracker to time sections with (shared with the posts scraper)
+            list_output_dir: stream friends/groups/pages/following lists to <list>.jsonl here
+            list_budgets: per-list overrides of DEFAULT_LIST_BUDGETS
+            identity_resolver: IdentityResolver shared with the other scrapers (learns the
+                profile's vanity name / numeric ID pair on navigation)
+            negative_cache: NegativeCache of missing/restricted profiles and private lists;
+                cached sections are skipped without navigating, new ones are recorded
+            navigation: NavigationManager shared with the posts scraper, so a URL the
+                page already shows is not loaded again
+        """
+        # The page lives on the navigation manager, so a page swapped in after a crash
+        # (see PostsScraperImproved._recover_from_crash) is the page of every scraper sharing it
+        self.navigation = navigation or NavigationManager(page)
         self.page = page
         self.utils = utils
         self.original_username = None
         self.profile_url = None
         self.profile_type = None
         self.profile_identifier = None
+        self.identity_resolver = identity_resolver or IdentityResolver()
+        self.identity: Optional[ProfileIdentity] = None
+        
+        # Remembered "not found" / "restricted" / "private list" outcomes
+        self.negative_cache = negative_cache
+        self.page_state: Optional[Dict[str, Any]] = None
+        self.negative_result: Optional[Dict[str, Any]] = None
+        self.profile_locked = False
+        
+        # Sections of the last get_basic_info whose extraction failed (section -> error), never stored as fresh
+        self.section_errors: Dict[str, str] = {}
         
         # Configuration
         self.max_retries = 3
         self.default_timeout = 30000
         self.navigation_timeout = 60000
         
-    def _clean_input(self, username: str) -> str:
-        """Clean and normalize input username/URL"""
-        if not username:
-            raise ValueError("Username cannot be empty")
+        # Event-driven scrolling for friends lists
+        self.friends_scroll_driver = ScrollDriver(page, item_selector=FRIEND_LINK_SELECTOR)
+        
+        # Requested profile sections and their extraction cost
+        self.sections = parse_fields(fields)[1]
+        self.field_costs = cost_tracker or FieldCostTracker(baseline_path=None)
+        
+        # Infinite-list harvesting (friends, groups, pages, following)
+        self.list_output_dir = list_output_dir
+        self.list_budgets = {name: dict(budget) for name, budget in DEFAULT_LIST_BUDGETS.items()}
+        for name, budget in (list_budgets or {}).items():
+            self.list_budgets.setdefault(name, {}).update(budget)
+        self.list_metrics: Dict[str, Dict[str, Any]] = {}
         
-        return username.strip().rstrip('/').lstrip('@')
+    @property
+    def page(self) -> Page:
+        return self.navigation.page
+    
+    @page.setter
+    def page(self, page: Page) -> None:
+        self.navigation.page = page
     
     def _detect_profile_type(self, username: str) -> Tuple[str, str]:
         """
@@ -48,71 +117,19 @@ class ProfileScraper:
         Returns:
             Tuple[str, str]: (profile_type, profile_identifier)
         """
-        username = self._clean_input(username)
-        
-        # Handle full Facebook URLs
-        if "facebook.com" in username.lower():
-            return self._extract_from_url(username)
-        
-        # Handle profile.php format without domain
-        if "profile.php?id=" in username:
-            match = re.search(r'profile\.php\?id=(\d+)', username)
-            if match:
-                profile_id = match.group(1)
-                logger.info(f"Detected profile.php format: {profile_id}")
-                return "id", profile_id
-        
-        # Handle numeric ID only
-        if username.isdigit():
-            self._validate_profile_id(username)
-            logger.info(f"Detected numeric profile ID: {username}")
-            return "id", username
-        
-        # Handle username format
-        logger.info(f"Detected username format: {username}")
-        return "username", username
-    
-    def _extract_from_url(self, url: str) -> Tuple[str, str]:
-        """Extract profile information from Facebook URL"""
-        if "profile.php?id=" in url:
-            match = re.search(r'profile\.php\?id=(\d+)', url)
-            if match:
-                profile_id = match.group(1)
-                logger.info(f"Extracted profile ID from URL: {profile_id}")
-                return "id", profile_id
-        else:
-            # Extract username from URL
-            try:
-                parts = url.lower().split('facebook.com/')
-                if len(parts) > 1:
-                    username_part = parts[1].split('/')[0].split('?')[0].split('#')[0]
-                    if username_part and not username_part.isdigit() and len(username_part) > 0:
-                        logger.info(f"Extracted username from URL: {username_part}")
-                        return "username", username_part
-            except Exception as e:
-                logger.warning(f"Error extracting username from URL: {e}")
-        
-        raise ValueError(f"Could not extract profile information from URL: {url}")
-    
-    def _validate_profile_id(self, profile_id: str) -> None:
-        """Validate profile ID format"""
-        if len(profile_id) < 5 or len(profile_id) > 20:
-            logger.warning(f"Profile ID {profile_id} has unusual length ({len(profile_id)} digits)")
+        identity = self.identity_resolver.resolve(username)
+        return identity.profile_type, identity.identifier
     
     def _construct_profile_url(self, username: str, section: str = "") -> str:
         """Construct the correct Facebook URL for both username and profile ID formats"""
-        profile_type, profile_identifier = self._detect_profile_type(username)
-        
-        if profile_type == "id":
-            base_url = f"https://www.facebook.com/profile.php?id={profile_identifier}"
-            if section:
-                return f"{base_url}&sk={section}"
-            return base_url
-        else:
-            base_url = f"https://www.facebook.com/{profile_identifier}"
-            if section:
-                return f"{base_url}/{section}"
-            return base_url
+        return self.identity_resolver.profile_url(username, section)
+    
+    def use_profile(self, username: str) -> None:
+        """Point the section extractors (friends, groups, ...) at a profile without opening its main page"""
+        self.original_username = username
+        self.profile_url = self._construct_profile_url(username)
+        self.profile_type, self.profile_identifier = self._detect_profile_type(username)
+        self.identity = self.identity_resolver.resolve(username)
     
     async def navigate_to_profile(self, username: str) -> bool:
         """
@@ -125,7 +142,20 @@ class ProfileScraper:
             bool: True if navigation successful, False otherwise
         """
         self.original_username = username
+        self.identity = None
+        self.page_state = None
+        self.profile_locked = False
+        self.negative_result = self._cached_negative("profile")
+        if self.negative_result:
+            return False
         
+        if await self._navigate_to_profile(username):
+            return True
+        self._remember_negative("profile", PROFILE_STATE_REASONS)
+        return False
+    
+    async def _navigate_to_profile(self, username: str) -> bool:
+        """Navigation attempts with alternative URLs on retries"""
         for attempt in range(self.max_retries):
             try:
                 logger.info(f"Navigation attempt {attempt + 1}/{self.max_retries}")
@@ -142,18 +172,22 @@ class ProfileScraper:
                     await self._handle_retry_logic(attempt, username)
                     profile_url = self._get_alternative_url(attempt, username)
                 
-                # Navigate to profile
-                await self.page.goto(profile_url, wait_until="domcontentloaded", timeout=self.navigation_timeout)
-                logger.info("Page loaded successfully")
-                
-                # Wait for page to settle
-                await self._wait_for_page_load()
+                # Navigate to profile (already shown and validated: nothing to load or wait for)
+                if await self.navigation.goto(profile_url, timeout=self.navigation_timeout):
+                    logger.info("Page loaded successfully")
+                    
+                    # Wait for page to settle
+                    await self._wait_for_page_load()
                 
                 # Validate navigation success
                 if await self._validate_navigation():
                     logger.info(f"Successfully navigated to profile: {self.profile_identifier}")
                     return True
                 
+                # A locked profile stays locked: retrying with cleared cookies changes nothing
+                if self.profile_locked:
+                    return False
+                
                 if attempt < self.max_retries - 1:
                     logger.warning(f"Navigation validation failed, retrying...")
                     continue
@@ -175,6 +209,7 @@ class ProfileScraper:
         """Handle retry-specific logic"""
         logger.info(f"Retry attempt {attempt}: Clearing cookies to avoid redirect loops")
         await self.page.context.clear_cookies()
+        self.navigation.invalidate()
         await asyncio.sleep(10)
     
     def _get_alternative_url(self, attempt: int, username: str) -> str:
@@ -219,29 +254,39 @@ class ProfileScraper:
     
     async def _validate_navigation(self) -> bool:
         """Validate that navigation was successful"""
-        current_url = self.page.url
+        verdict = await self.utils.classify_page_state()
+        current_url = verdict["url"]
+        logger.info(f"Current URL: {current_url}")
+        logger.info(f"Page title: {verdict['title']}")
         
-        try:
-            page_title = await self.page.title()
-            logger.info(f"Current URL: {current_url}")
-            logger.info(f"Page title: {page_title}")
-        except Exception:
-            logger.warning("Could not get page title")
+        # Check for security checkpoints
+        if verdict["state"] == "checkpoint":
+            logger.warning(f"Security checkpoint detected: {verdict['evidence'][:3]}")
+            await self.utils.handle_security_checkpoint(wait_time=60)
+            await asyncio.sleep(3)
+            verdict = await self.utils.classify_page_state()
+            current_url = verdict["url"]
+        self.page_state = verdict
+        self.navigation.note_state(verdict["state"])
         
         # Check for error redirects
-        if "facebook.com" not in current_url or "error" in current_url.lower():
-            logger.warning(f"Unexpected redirect to: {current_url}")
+        if "facebook.com" not in current_url or verdict["state"] in ("error", "not_found", "login", "rate_limited"):
+            logger.warning(f"Profile not reachable ({verdict['state']}): {current_url}")
             return False
         
         # Check for profile-specific validation
         if not await self._validate_profile_page(current_url):
             return False
         
-        # Check for security checkpoints
-        if await self.utils.check_for_security_checkpoint():
-            logger.warning("Security checkpoint detected")
-            await self.utils.handle_security_checkpoint(wait_time=60)
-            await asyncio.sleep(3)
+        # A locked or private profile says so in its header; page-wide "private" text alone does not count
+        if verdict["state"] in ("profile", "private"):
+            evidence = await self.utils.profile_lock_evidence()
+            if evidence:
+                logger.warning(f"Profile is locked or private: {evidence[:3]}")
+                self.page_state = dict(verdict, state="private", evidence=evidence)
+                self.navigation.note_state("private")
+                self.profile_locked = True
+                return False
         
         return True
     
@@ -252,17 +297,14 @@ class ProfileScraper:
             logger.error(f"Redirected to home/feed: {current_url}")
             return False
         
-        # Validate profile-specific content
-        if self.profile_type == "id":
-            if f"id={self.profile_identifier}" not in current_url:
-                logger.error(f"Profile ID mismatch: expected {self.profile_identifier}")
-                return False
-        else:
-            if self.profile_identifier not in current_url and f"/{self.profile_identifier}" not in current_url:
-                logger.error(f"Username mismatch: expected {self.profile_identifier}")
-                return False
-        
-        return True
+        # Validate profile-specific content (an ID link may redirect to the profile's vanity URL)
+        self.identity = await self.identity_resolver.learn_from_page(self.page, self.original_username)
+        if self.identity.numeric_id and f"id={self.identity.numeric_id}" in current_url:
+            return True
+        if self.identity.vanity and f"/{self.identity.vanity}" in current_url.lower():
+            return True
+        logger.error(f"Profile mismatch: expected {' or '.join(self.identity.aliases)}")
+        return False
     
     async def get_basic_info(self) -> Dict[str, Any]:
         """
@@ -271,25 +313,28 @@ class ProfileScraper:
         Returns:
             Dict containing profile information in the requested format
         """
+        self.section_errors = {}
         try:
             logger.info("Extracting enhanced profile information...")
             
             # Get profile name
             name = await self._extract_profile_name()
             logger.info(f"Profile name: {name}")
+            if name == "Unknown":
+                self._section_failed("basics", "profile name not found")
             
             # Get bio/description
             bio = await self._extract_profile_bio()
             logger.info(f"Profile bio: {bio[:50]}..." if bio else "No bio found")
             
             # Get About page information
-            about_data = await self._extract_about_info_enhanced()
+            about_data = await self._extract_section("about", self._extract_about_info_enhanced, {})
             
             # Extract friends, pages_followed, following, and groups
-            friends_list = await self._extract_friends_summary()
-            pages_followed = await self._extract_pages_followed()
-            following_list = await self._extract_following_list()
-            groups_list = await self._extract_groups_list()
+            friends_list = await self._extract_section("friends", self._extract_friends_summary, [])
+            pages_followed = await self._extract_section("pages_followed", self._extract_pages_followed, [])
+            following_list = await self._extract_section("following", self._extract_following_list, [])
+            groups_list = await self._extract_section("groups", self._extract_groups_list, [])
             
             # Structure data according to target JSON format
             result = {
@@ -321,8 +366,27 @@ class ProfileScraper:
             
         except Exception as e:
             logger.error(f"Error extracting enhanced profile info: {e}")
+            # Placeholder data for the response only: no section of it was scraped
+            for section in ("basics",) + PROFILE_SECTIONS:
+                self.section_errors.setdefault(section, str(e))
             return self._get_default_enhanced_profile_info()
     
+    async def _extract_section(self, section: str, extractor, empty: Any) -> Any:
+        """Run a section extractor if the section was requested, timing it; failures go to section_errors"""
+        if section not in self.sections:
+            logger.info(f"⏭️ Skipping {section} (not requested)")
+            return empty
+        try:
+            return await self.field_costs.measure(section, extractor())
+        except Exception as e:
+            self._section_failed(section, str(e))
+            return empty
+    
+    def _section_failed(self, section: str, error: Any) -> None:
+        """Record that a section's extraction failed (its empty result is not the profile's data)"""
+        logger.warning(f"⚠️ {section} extraction failed: {error}")
+        self.section_errors[section] = str(error)
+    
     def _get_default_enhanced_profile_info(self) -> Dict[str, Any]:
         """Return default enhanced profile info structure"""
         return {
@@ -345,58 +409,74 @@ class ProfileScraper:
         }
     
     async def _extract_about_info_enhanced(self) -> Dict[str, Any]:
-        """Extract enhanced about information"""
+        """
+        Extract about information from one snapshot of the About overview
+        
+        Fields the overview leaves empty are read from the About sub-tabs that list
+        them, loaded in parallel background tabs.
+        """
         try:
-            # Navigate to About page for detailed info
-            about_url = f"{self.profile_url}/about"
+            about_url = self._construct_profile_url(self.original_username, "about")
             logger.info(f"Navigating to About page: {about_url}")
             
-            await self.page.goto(about_url, wait_until="domcontentloaded", timeout=30000)
-            await asyncio.sleep(3)
-            
-            about_data = {}
-            
-            # Extract work info
-            work_info = await self._extract_work_info_enhanced()
-            if work_info:
-                about_data["work"] = work_info
+            if not await self._navigate_with_retries(about_url, retries=2, ready_selector=ABOUT_READY_SELECTOR):
+                self._section_failed("about", "About page did not load")
+                return {}
+            await asyncio.sleep(ABOUT_SETTLE_SECONDS)
             
-            # Extract education info
-            education_info = await self._extract_education_info_enhanced()
-            if education_info:
-                about_data["education"] = education_info
+            about_data = await self._parse_about_snapshot(await take_about_snapshot(self.page))
             
-            # Extract location
-            location_info = await self._extract_location_info_enhanced()
-            if location_info:
-                about_data["location"] = location_info
-            
-            # Extract birthday
-            birthday_info = await self._extract_birthday_info()
-            if birthday_info:
-                about_data["birthday"] = birthday_info
-            
-            # Extract contact info
-            contact_info = await self._extract_contact_info()
-            about_data["email"] = contact_info.get("email", "")
-            about_data["phone"] = contact_info.get("phone", "")
+            sections = subtabs_for(missing_fields(about_data))
+            if sections:
+                logger.info(f"About overview incomplete, loading {', '.join(sections)} in parallel")
+                urls = {section: self._construct_profile_url(self.original_username, section) for section in sections}
+                snapshots = await load_about_subtabs(self.page.context, urls, timeout=self.default_timeout)
+                for section, snapshot in snapshots.items():
+                    parsed = await self._parse_about_snapshot(snapshot)
+                    for field in ABOUT_SUBTABS[section]:
+                        if not about_data.get(field) and parsed.get(field):
+                            about_data[field] = parsed[field]
             
             return about_data
             
         except Exception as e:
             logger.error(f"Error extracting enhanced about info: {e}")
+            self._section_failed("about", e)
             return {}
     
+    async def _parse_about_snapshot(self, snapshot: Dict[str, Any]) -> Dict[str, str]:
+        """Run every about field parser on one About snapshot (see scraper.about_snapshot)"""
+        page_text = snapshot.get("text", "")
+        fragments = snapshot.get("fragments", {})
+        
+        about_data = self._format_work_education(await self._extract_work_education_from_text(page_text))
+        about_data["location"] = self._format_location(await self._extract_location_from_text(page_text))
+        
+        # Dedicated elements only fill what the text patterns missed
+        for field, limit in (("work", 3), ("education", 3), ("location", 2)):
+            if not about_data[field] and fragments.get(field):
+                about_data[field] = " • ".join(self.utils.clean_text(text) for text in fragments[field][:limit])
+        
+        about_data["birthday"] = await self._extract_birthday_from_text(page_text)
+        
+        contact = self._parse_contact_from_text(page_text)
+        about_data["email"] = (snapshot.get("emails") or [contact.get("email", "")])[0]
+        about_data["phone"] = (snapshot.get("phones") or [contact.get("phone", "")])[0]
+        
+        return about_data
+    
     async def _extract_friends_summary(self) -> List[Dict[str, Any]]:
         """Extract friends list with profile URLs and bios"""
         friends_list = []
+        if self._cached_negative("friends"):
+            return friends_list
         try:
             # Navigate to friends page
             friends_url = f"{self.profile_url}/friends"
             logger.info(f"Extracting friends from: {friends_url}")
             
-            await self.page.goto(friends_url, wait_until="domcontentloaded", timeout=30000)
-            await asyncio.sleep(3)
+            if await self.navigation.goto(friends_url, timeout=30000):
+                await asyncio.sleep(3)
             
             # Extract friends with enhanced details
             friend_elements = await self.page.query_selector_all('div[data-testid="friend_list_item"], a[href*="/"][aria-label]')
@@ -410,8 +490,12 @@ class ProfileScraper:
                     logger.debug(f"Error extracting friend: {e}")
                     continue
             
+            if not friends_list and await self._check_privacy_restrictions('div[data-testid="friend_list_item"]'):
+                self._remember_negative("friends", SECTION_STATE_REASONS)
+            
         except Exception as e:
             logger.debug(f"Error extracting friends: {e}")
+            self._section_failed("friends", e)
         
         return friends_list
     
@@ -423,8 +507,8 @@ class ProfileScraper:
             pages_url = f"{self.profile_url}/likes"
             logger.info(f"Extracting pages from: {pages_url}")
             
-            await self.page.goto(pages_url, wait_until="domcontentloaded", timeout=30000)
-            await asyncio.sleep(3)
+            if await self.navigation.goto(pages_url, timeout=30000):
+                await asyncio.sleep(3)
             
             # Extract pages
             page_elements = await self.page.query_selector_all('a[href*="/"][role="link"]:not([href*="/posts/"])')
@@ -440,6 +524,7 @@ class ProfileScraper:
             
         except Exception as e:
             logger.debug(f"Error extracting pages followed: {e}")
+            self._section_failed("pages_followed", e)
         
         return pages_list
     
@@ -453,6 +538,7 @@ class ProfileScraper:
             
         except Exception as e:
             logger.debug(f"Error extracting following list: {e}")
+            self._section_failed("following", e)
         
         return following_list
     
@@ -466,12 +552,12 @@ class ProfileScraper:
             
             # Facebook might redirect or have different URL structures
             try:
-                await self.page.goto(groups_url, wait_until="domcontentloaded", timeout=20000)
-                await asyncio.sleep(3)
+                if await self.navigation.goto(groups_url, timeout=20000):
+                    await asyncio.sleep(3)
             except:
                 # Try alternative approach - go to main profile and look for groups
-                await self.page.goto(self.profile_url, wait_until="domcontentloaded", timeout=20000)
-                await asyncio.sleep(2)
+                if await self.navigation.goto(self.profile_url, timeout=20000):
+                    await asyncio.sleep(2)
             
             # Extract groups
             group_elements = await self.page.query_selector_all('a[href*="/groups/"]:not([href*="/posts/"])')
@@ -487,6 +573,7 @@ class ProfileScraper:
             
         except Exception as e:
             logger.debug(f"Error extracting groups: {e}")
+            self._section_failed("groups", e)
         
         return groups_list
     
@@ -580,53 +667,6 @@ class ProfileScraper:
         except:
             return ""
     
-    async def _extract_work_info_enhanced(self) -> str:
-        """Extract work information as formatted string"""
-        try:
-            work_elements = await self.page.query_selector_all('div[data-testid="work"], div:has-text("Work"), a[href*="/work/"]')
-            work_info = []
-            
-            for work_el in work_elements:
-                work_text = await work_el.text_content()
-                if work_text and work_text.strip() and "work" not in work_text.lower():
-                    work_info.append(self.utils.clean_text(work_text))
-            
-            return " • ".join(work_info[:3]) if work_info else ""
-        except:
-            return ""
-    
-    async def _extract_education_info_enhanced(self) -> str:
-        """Extract education information as formatted string"""
-        try:
-            edu_elements = await self.page.query_selector_all('div[data-testid="education"], div:has-text("Education"), a[href*="/education/"]')
-            edu_info = []
-            
-            for edu_el in edu_elements:
-                edu_text = await edu_el.text_content()
-                if edu_text and edu_text.strip() and "education" not in edu_text.lower():
-                    edu_info.append(self.utils.clean_text(edu_text))
-            
-            return " • ".join(edu_info[:3]) if edu_info else ""
-        except:
-            return ""
-    
-    async def _extract_location_info_enhanced(self) -> str:
-        """Extract location information as formatted string"""
-        try:
-            location_elements = await self.page.query_selector_all('div[data-testid="location"], div:has-text("Lives in"), div:has-text("From")')
-            locations = []
-            
-            for loc_el in location_elements:
-                loc_text = await loc_el.text_content()
-                if loc_text and loc_text.strip():
-                    clean_loc = self.utils.clean_text(loc_text)
-                    if clean_loc and not any(word in clean_loc.lower() for word in ["lives", "from", "location"]):
-                        locations.append(clean_loc)
-            
-            return " • ".join(locations[:2]) if locations else ""
-        except:
-            return ""
-    
     async def _extract_profile_name(self) -> str:
         """Extract profile name with multiple fallback selectors"""
         name_selectors = [
@@ -748,8 +788,8 @@ class ProfileScraper:
             logger.info(f"Navigating directly to About page: {about_url}")
             
             # Navigate to the About page
-            await self.page.goto(about_url, wait_until="domcontentloaded", timeout=self.default_timeout)
-            await asyncio.sleep(6)
+            if await self.navigation.goto(about_url, timeout=self.default_timeout):
+                await asyncio.sleep(6)
             
             # Verify we're on the About page
             current_url = self.page.url
@@ -778,76 +818,7 @@ class ProfileScraper:
             # Extract work and education using the specific Facebook format
             work_education_data = await self._extract_work_education_from_text(page_text)
             
-            # Format work information
-            if work_education_data.get("work"):
-                work_entries = work_education_data["work"]
-                if work_entries:
-                    # Combine current and past work
-                    current_work = []
-                    past_work = []
-                    
-                    for entry in work_entries:
-                        if "works at" in entry.lower():
-                            current_work.append(entry)
-                        elif "past:" in entry.lower() or "worked at" in entry.lower():
-                            past_work.append(entry)
-                        else:
-                            current_work.append(entry)
-                    
-                    # Format as requested: "Software Engineer at Meta"
-                    if current_work:
-                        result["work"] = current_work[0]  # Take the first current work
-                    elif past_work:
-                        result["work"] = past_work[0]  # Fallback to past work
-            
-            # Format education information
-            if work_education_data.get("education"):
-                education_entries = work_education_data["education"]
-                if education_entries:
-                    # Look for the main education entry (usually the first one)
-                    for entry in education_entries:
-                        entry_lower = entry.lower()
-                        
-                        # Handle "Studied at" pattern
-                        if "studied at" in entry_lower:
-                            institution = entry.split("Studied at", 1)[1].strip()
-                            if "(" in institution:
-                                institution = institution.split("(")[0].strip()
-                            result["education"] = institution
-                            logger.info(f"Extracted education from 'Studied at': {institution}")
-                            break
-                        
-                        # Handle "Attended from" pattern
-                        elif "attended from" in entry_lower:
-                            # Extract institution from "Attended from X to Y" format
-                            parts = entry.split("Attended from", 1)
-                            if len(parts) > 1:
-                                # The institution name comes before "Attended from"
-                                institution = parts[0].strip()
-                                if "(" in institution:
-                                    institution = institution.split("(")[0].strip()
-                                result["education"] = institution
-                                logger.info(f"Extracted education from 'Attended from': {institution}")
-                                break
-                        
-                        # Handle "Studies at" pattern
-                        elif "studies at" in entry_lower:
-                            institution = entry.split("Studies at", 1)[1].strip()
-                            if "(" in institution:
-                                institution = institution.split("(")[0].strip()
-                            result["education"] = institution
-                            logger.info(f"Extracted education from 'Studies at': {institution}")
-                            break
-                        
-                        # Handle general education patterns
-                        elif any(pattern in entry_lower for pattern in ["university", "college", "institute", "school"]):
-                            # Clean up the entry to get just the institution name
-                            institution = entry.strip()
-                            if "(" in institution:
-                                institution = institution.split("(")[0].strip()
-                            result["education"] = institution
-                            logger.info(f"Extracted education from general pattern: {institution}")
-                            break
+            result = self._format_work_education(work_education_data)
             
             logger.info(f"Extracted work: {result['work']}")
             logger.info(f"Extracted education: {result['education']}")
@@ -857,6 +828,83 @@ class ProfileScraper:
         
         return result
     
+    def _format_work_education(self, work_education_data: Dict[str, List[str]]) -> Dict[str, str]:
+        """Pick the work and education strings to report from the raw text entries"""
+        result = {"work": "", "education": ""}
+        
+        # Format work information
+        if work_education_data.get("work"):
+            work_entries = work_education_data["work"]
+            if work_entries:
+                # Combine current and past work
+                current_work = []
+                past_work = []
+                
+                for entry in work_entries:
+                    if "works at" in entry.lower():
+                        current_work.append(entry)
+                    elif "past:" in entry.lower() or "worked at" in entry.lower():
+                        past_work.append(entry)
+                    else:
+                        current_work.append(entry)
+                
+                # Format as requested: "Software Engineer at Meta"
+                if current_work:
+                    result["work"] = current_work[0]  # Take the first current work
+                elif past_work:
+                    result["work"] = past_work[0]  # Fallback to past work
+        
+        # Format education information
+        if work_education_data.get("education"):
+            education_entries = work_education_data["education"]
+            if education_entries:
+                # Look for the main education entry (usually the first one)
+                for entry in education_entries:
+                    entry_lower = entry.lower()
+                    
+                    # Handle "Studied at" pattern
+                    if "studied at" in entry_lower:
+                        institution = entry.split("Studied at", 1)[1].strip()
+                        if "(" in institution:
+                            institution = institution.split("(")[0].strip()
+                        result["education"] = institution
+                        logger.info(f"Extracted education from 'Studied at': {institution}")
+                        break
+                    
+                    # Handle "Attended from" pattern
+                    elif "attended from" in entry_lower:
+                        # Extract institution from "Attended from X to Y" format
+                        parts = entry.split("Attended from", 1)
+                        if len(parts) > 1:
+                            # The institution name comes before "Attended from"
+                            institution = parts[0].strip()
+                            if "(" in institution:
+                                institution = institution.split("(")[0].strip()
+                            result["education"] = institution
+                            logger.info(f"Extracted education from 'Attended from': {institution}")
+                            break
+                    
+                    # Handle "Studies at" pattern
+                    elif "studies at" in entry_lower:
+                        institution = entry.split("Studies at", 1)[1].strip()
+                        if "(" in institution:
+                            institution = institution.split("(")[0].strip()
+                        result["education"] = institution
+                        logger.info(f"Extracted education from 'Studies at': {institution}")
+                        break
+                    
+                    # Handle general education patterns
+                    elif any(pattern in entry_lower for pattern in ["university", "college", "institute", "school"]):
+                        # Clean up the entry to get just the institution name
+                        institution = entry.strip()
+                        if "(" in institution:
+                            institution = institution.split("(")[0].strip()
+                        result["education"] = institution
+                        logger.info(f"Extracted education from general pattern: {institution}")
+                        break
+        
+        return result
+    
     async def _extract_section_data(self, selectors: List[str], section_type: str) -> List[str]:
         """Extract data from a specific section"""
         data = []
@@ -980,19 +1028,7 @@ class ProfileScraper:
             # Extract location using the specific Facebook format
             location_data = await self._extract_location_from_text(page_text)
             
-            # Format location as requested: "San Francisco, CA"
-            current_city = location_data.get("current_city", "")
-            hometown = location_data.get("hometown", "")
-            
-            # Combine current city and hometown if both exist
-            if current_city and hometown:
-                result["location"] = f"{current_city}, {hometown}"
-            elif current_city:
-                result["location"] = current_city
-            elif hometown:
-                result["location"] = hometown
-            else:
-                result["location"] = ""
+            result["location"] = self._format_location(location_data)
             
             logger.info(f"Extracted location: {result['location']}")
                     
@@ -1001,6 +1037,16 @@ class ProfileScraper:
         
         return result
     
+    def _format_location(self, location_data: Dict[str, str]) -> str:
+        """Format location as requested: "San Francisco, CA" (current city, then hometown)"""
+        current_city = location_data.get("current_city", "")
+        hometown = location_data.get("hometown", "")
+        
+        # Combine current city and hometown if both exist
+        if current_city and hometown:
+            return f"{current_city}, {hometown}"
+        return current_city or hometown
+    
     async def _extract_location_from_text(self, page_text: str) -> Dict[str, str]:
         """Extract location information from page text using specific Facebook format"""
         result = {}
@@ -1051,11 +1097,18 @@ class ProfileScraper:
     
     async def _extract_contact_info(self) -> Dict[str, Any]:
         """Extract contact information with improved patterns"""
+        try:
+            page_text = await self.page.evaluate('() => document.body.innerText')
+            return self._parse_contact_from_text(page_text)
+        except Exception as e:
+            logger.error(f"Error extracting contact info: {e}")
+            return {}
+    
+    def _parse_contact_from_text(self, page_text: str) -> Dict[str, str]:
+        """Find the first email address and phone number in page text"""
         result = {}
         
         try:
-            page_text = await self.page.evaluate('() => document.body.innerText')
-            
             # Extract email with multiple patterns
             email_patterns = [
                 r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
@@ -1206,62 +1259,82 @@ class ProfileScraper:
 
     # Additional methods for friends, groups, etc. will be added in the next part...
 
-    async def get_friends_list(self, max_scrolls: int = 20) -> List[Dict[str, str]]:
-        """Extract friends list with simplified approach"""
+    async def get_friends_list(self, max_scrolls: Optional[int] = None, max_friends: Optional[int] = None,
+                               output_path: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        Extract the friends list, scrolling to its end
+        
+        Friends are deduplicated on the canonical profile ID and, with output_path (or
+        list_output_dir), streamed to a JSONL file. max_scrolls / max_friends bound the
+        run on top of the list budget.
+        """
+        extractor = LinkListExtractor(
+            FRIEND_LINK_SELECTOR, "name", "profile_url", clean_text=self.utils.clean_text,
+            accept=lambda raw: self._is_valid_friend_link(raw["url"]) and self._is_valid_friend_name(raw["name"])
+        )
+        if self.friends_scroll_driver.page is not self.page:
+            # The page was replaced after a crash
+            self.friends_scroll_driver.close()
+            self.friends_scroll_driver = ScrollDriver(self.page, item_selector=FRIEND_LINK_SELECTOR)
+        return await self._harvest_list("friends", "friends", extractor, scroll_driver=self.friends_scroll_driver,
+                                        output_path=output_path, max_items=max_friends, max_rounds=max_scrolls)
+    
+    async def _harvest_list(self, name: str, section: str, extractor: LinkListExtractor, scroll_driver=None,
+                            output_path: Optional[str] = None, **budget) -> List[Dict[str, str]]:
+        """Open a profile list section and harvest it with a ListHarvester"""
         try:
-            logger.info("Extracting friends list...")
+            logger.info(f"Extracting {name} list...")
             
-            # Navigate to friends page
-            friends_url = self._construct_profile_url(self.original_username, "friends")
-            await self.page.goto(friends_url, wait_until="domcontentloaded", timeout=30000)
-            await asyncio.sleep(5)
-            
-            # Check for privacy restrictions
-            page_content = await self.page.content()
-            if "This content isn't available" in page_content or "Friends list is private" in page_content:
-                logger.warning("Friends list is private or restricted")
+            if not self._validate_page_availability():
                 return []
             
-            # Extract friends with efficient scrolling
-            friends_list = []
-            stable_rounds = 0
+            # A known private list counts as harvested: there is nothing to retry
+            cached = self._cached_negative(name)
+            if cached:
+                self.list_metrics[name] = {"items": 0, "negative": cached["reason"]}
+                return []
             
-            for scroll in range(max_scrolls):
-                # Extract current batch
-                current_batch = await self._extract_current_friends_batch()
-                
-                # Add new friends
-                new_count = 0
-                for friend in current_batch:
-                    if not any(f["name"] == friend["name"] for f in friends_list):
-                        friends_list.append(friend)
-                        new_count += 1
-                
-                logger.info(f"Scroll {scroll + 1}: Found {len(friends_list)} total (+{new_count} new)")
-                
-                # Check for stability - stop earlier if no new friends
-                if new_count == 0:
-                    stable_rounds += 1
-                    if stable_rounds >= 2:  # Reduced from 3 to 2
-                        logger.info("No new friends found for 2 rounds, stopping")
-                        break
-                else:
-                    stable_rounds = 0
-                
-                # Stop if we've found a good amount of friends
-                if len(friends_list) >= 500:  # Stop at 500 friends to prevent infinite scrolling
-                    logger.info("Found 500+ friends, stopping to prevent timeout")
-                    break
-                
-                # Scroll down with shorter delay
-                await self.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                await asyncio.sleep(1.5)  # Reduced from 3 to 1.5 seconds
+            list_url = self._construct_profile_url(self.original_username, section)
+            logger.info(f"Navigating to {name} page: {list_url}")
             
-            logger.info(f"Extracted {len(friends_list)} friends total")
-            return friends_list
+            if not await self._navigate_with_retries(list_url, ready_selector=extractor.link_selector):
+                return []
+            
+            if await self._check_privacy_restrictions(extractor.link_selector):
+                logger.warning(f"{name} list is private or empty")
+                # Harvested as far as it goes: callers must not treat it as a failed navigation
+                self.list_metrics[name] = {"items": 0, "private": True}
+                reason = self._remember_negative(name, SECTION_STATE_REASONS)
+                if reason:
+                    self.list_metrics[name]["negative"] = reason
+                return []
+            
+            if output_path is None and self.list_output_dir:
+                os.makedirs(self.list_output_dir, exist_ok=True)
+                output_path = os.path.join(self.list_output_dir, f"{name}.jsonl")
+            limits = dict(self.list_budgets.get(name, {}))
+            limits.update({key: value for key, value in budget.items() if value is not None})
+            
+            own_driver = scroll_driver is None
+            if own_driver:
+                scroll_driver = ScrollDriver(self.page, item_selector=extractor.link_selector)
+            harvester = ListHarvester(self.page, extractor, scroll_driver, name=name, output_path=output_path,
+                                      expand=self._click_see_more_buttons, **limits)
+            try:
+                items = await harvester.harvest()
+            finally:
+                # The harvest marks and empties the tiles it read: a later visit must load the list again
+                self.navigation.invalidate()
+                scroll_driver.log_stats()
+                if own_driver:
+                    scroll_driver.close()
+            self.list_metrics[name] = harvester.report()
+            
+            logger.info(f"Extracted {len(items)} {name}")
+            return items
             
         except Exception as e:
-            logger.error(f"Error getting friends list: {e}")
+            logger.error(f"Error getting {name} list: {e}")
             return []
     
     def _validate_page_availability(self) -> bool:
@@ -1271,12 +1344,19 @@ class ProfileScraper:
             return False
         return True
     
-    async def _navigate_with_retries(self, url: str, retries: int = 3) -> bool:
-        """Navigate to URL with retries"""
+    async def _navigate_with_retries(self, url: str, retries: int = 3, ready_selector: Optional[str] = None) -> bool:
+        """Navigate to URL with retries, then wait for ready_selector (or a fixed human-like delay)"""
         for attempt in range(retries):
             try:
-                await self.page.goto(url, wait_until="domcontentloaded", timeout=self.default_timeout)
-                await asyncio.sleep(8)  # Human-like delay
+                if not await self.navigation.goto(url, timeout=self.default_timeout):
+                    return True
+                if ready_selector:
+                    try:
+                        await self.page.wait_for_selector(ready_selector, timeout=8000)
+                    except PlaywrightTimeoutError:
+                        pass
+                else:
+                    await asyncio.sleep(8)  # Human-like delay
                 return True
             except Exception as e:
                 logger.warning(f"Navigation attempt {attempt + 1} failed: {e}")
@@ -1285,129 +1365,43 @@ class ProfileScraper:
                 await asyncio.sleep(10)
         return False
     
-    async def _check_privacy_restrictions(self) -> bool:
-        """Check for privacy restrictions on the page"""
-        privacy_texts = [
-            "This content isn't available",
-            "Friends list is private",
-            "No friends to show",
-            "Only you can see",
-            "Content not available"
-        ]
-        
-        try:
-            page_content = await self.page.content()
-            return any(text in page_content for text in privacy_texts)
-        except Exception:
-            return False
-    
-    async def _extract_friends_with_scrolling(self, max_scrolls: int) -> List[Dict[str, str]]:
-        """Extract friends with intelligent scrolling"""
-        friends_list = []
-        last_count = 0
-        stable_rounds = 0
-        max_stable_rounds = 5
-        
-        logger.info(f"Starting scrolling extraction (max {max_scrolls} scrolls)")
-        
-        for scroll_attempt in range(max_scrolls):
-            # Extract current batch of friends
-            current_batch = await self._extract_current_friends_batch()
-            
-            # Add new friends to list
-            for friend in current_batch:
-                if not any(f["name"] == friend["name"] for f in friends_list):
-                    friends_list.append(friend)
-            
-            current_count = len(friends_list)
-            new_friends = current_count - last_count
-            logger.info(f"Scroll {scroll_attempt + 1}: Found {current_count} total (+{new_friends} new)")
-            
-            # Check for stability (no new friends found)
-            if current_count == last_count:
-                stable_rounds += 1
-                if stable_rounds >= max_stable_rounds:
-                    logger.info(f"No new friends found for {max_stable_rounds} rounds, stopping")
-                    break
+    async def _check_privacy_restrictions(self, item_selector: str) -> bool:
+        """Check whether a list page says its content is private or unavailable and shows none of it"""
+        verdict = await self.utils.classify_page_state()
+        if verdict["state"] in ("private", "not_found") and not page_level_evidence(verdict["evidence"]):
+            # The phrase is only somewhere in the page text: it describes the list if the list is empty
+            if await self.page.query_selector(item_selector):
+                verdict = dict(verdict, state="profile")
             else:
-                stable_rounds = 0
-            
-            last_count = current_count
-            
-            # Perform human-like scrolling
-            await self._perform_human_scrolling()
-        
-        return friends_list
+                verdict = dict(verdict, evidence=verdict["evidence"] + [f"empty_list:{item_selector}"])
+        self.page_state = verdict
+        self.navigation.note_state(verdict["state"])
+        return verdict["state"] in ("private", "not_found")
     
-    async def _extract_current_friends_batch(self) -> List[Dict[str, str]]:
-        """Extract friends from current page state - simplified and robust"""
-        current_batch = []
-        
-        try:
-            # Simple approach - just get all Facebook profile links
-            friend_elements = await self.page.query_selector_all('a[href*="facebook.com/"]')
-            
-            for element in friend_elements:
-                try:
-                    # Skip if element is None or not a proper element
-                    if not element:
-                        continue
-                    
-                    # Get href
-                    href = await element.get_attribute('href')
-                    if not href or not self._is_valid_friend_link(href):
-                        continue
-                    
-                    # Get name - simplified approach
-                    name = await element.text_content()
-                    if not name:
-                        continue
-                    
-                    name = name.strip()
-                    if not self._is_valid_friend_name(name):
-                        continue
-                    
-                    # Try to extract bio from nearby element
-                    bio = ""
-                    try:
-                        # Look for bio in nearby elements
-                        parent = await element.evaluate('el => el.closest("div[role=\'listitem\']")') 
-                        if parent:
-                            bio_element = await self.page.evaluate('''
-                                (parent) => {
-                                    // Look for elements that might contain bio text (span, div with small text)
-                                    const bioElements = parent.querySelectorAll('span[dir="auto"], div[dir="auto"]');
-                                    for (const el of bioElements) {
-                                        const text = el.innerText;
-                                        // Skip if it's the name or very short text
-                                        if (text && text.length > 3 && !text.includes("Mutual") && !text.includes("Friends")) {
-                                            return text;
-                                        }
-                                    }
-                                    return "";
-                                }
-                            ''', parent)
-                            if bio_element:
-                                bio = self.utils.clean_text(bio_element)
-                    except Exception:
-                        pass
-                    
-                    friend_data = {
-                        "name": self.utils.clean_text(name),
-                        "profile_url": href,
-                        "bio": bio
-                    }
-                    
-                    current_batch.append(friend_data)
-                    
-                except Exception:
-                    # Skip problematic elements silently
-                    continue
-                    
-        except Exception as e:
-            logger.error(f"Error extracting friends batch: {e}")
-        
-        return current_batch
+    def _negative_identity(self) -> ProfileIdentity:
+        return self.identity or self.identity_resolver.resolve(self.original_username)
+    
+    def _cached_negative(self, section: str) -> Optional[Dict[str, Any]]:
+        """Unexpired negative result for the current profile's section, if any"""
+        if not self.negative_cache or not self.original_username:
+            return None
+        entry = self.negative_cache.lookup(self._negative_identity().aliases, section)
+        if entry:
+            logger.info(f"🚫 Skipping {section}: {entry['reason']} (checked {entry['age_seconds']}s ago)")
+        return entry
+    
+    def _remember_negative(self, section: str, reasons: Dict[str, str]) -> Optional[str]:
+        """Record the last page state as a negative result if the page itself (not its text) says so"""
+        state = (self.page_state or {}).get("state")
+        if state not in reasons:
+            return None
+        if not page_level_evidence(self.page_state.get("evidence", [])):
+            logger.info(f"Not caching {section} as {reasons[state]}: only page text says so")
+            return None
+        if self.negative_cache:
+            self.negative_cache.record(self._negative_identity().key, section, reasons[state],
+                                       self.page_state.get("evidence", []))
+        return reasons[state]
     
     def _is_valid_friend_link(self, href: str) -> bool:
         """Validate if link is a valid friend profile"""
@@ -1488,277 +1482,55 @@ class ProfileScraper:
         
         return True
     
-    async def _perform_human_scrolling(self) -> None:
-        """Perform human-like scrolling behavior"""
-        try:
-            # Gradual scrolling
-            for i in range(3):
-                await self.page.evaluate(f'window.scrollBy(0, {300 + i * 100})')
-                await asyncio.sleep(1.5)
-            
-            # Final scroll to bottom
-            await self.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-            await asyncio.sleep(5)
-            
-            # Try to click "See more" buttons
-            await self._click_see_more_buttons()
-            
-        except Exception as e:
-            logger.warning(f"Error during scrolling: {e}")
-    
-    async def _click_see_more_buttons(self) -> None:
-        """Click 'See more' buttons if available"""
-        see_more_selectors = [
-            'text="See more"',
-            'text="Show more"',
-            'text="Load more"',
-            '[aria-label*="See more"]'
-        ]
-        
-        for selector in see_more_selectors:
-            try:
-                buttons = await self.page.query_selector_all(selector)
-                for button in buttons:
-                    try:
-                        if await button.is_visible():
-                            await asyncio.sleep(2)
-                            await button.click()
-                            await asyncio.sleep(4)
-                    except Exception:
-                        continue
-            except Exception:
-                continue
+    async def _click_see_more_buttons(self) -> int:
+        """Click 'See more' / 'Load more' buttons if available (one page call); returns how many"""
+        result = await self.utils.bulk_expand(kinds=("load_more",), viewport_only=False, max_expansions=10)
+        return result["clicked"]
     
-    async def get_groups(self) -> List[Dict[str, str]]:
+    async def get_groups(self, max_items: Optional[int] = None) -> List[Dict[str, str]]:
         """Extract groups the user is a member of"""
-        try:
-            logger.info("Extracting groups list...")
-            
-            if not self._validate_page_availability():
-                return []
-            
-            groups_url = self._construct_profile_url(self.original_username, "groups")
-            logger.info(f"Navigating to groups page: {groups_url}")
-            
-            if not await self._navigate_with_retries(groups_url):
-                return []
-            
-            if await self._check_privacy_restrictions():
-                logger.warning("Groups list is private or empty")
-                return []
-            
-            # Scroll to load more content
-            await self._perform_simple_scroll()
-            
-            # Extract groups
-            groups_list = await self._extract_groups_data()
-            
-            logger.info(f"Extracted {len(groups_list)} groups")
-            return groups_list
-            
-        except Exception as e:
-            logger.error(f"Error getting groups: {e}")
-            return []
-    
-    async def _perform_simple_scroll(self) -> None:
-        """Perform simple scrolling to load content"""
-        try:
-            await self.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-            await asyncio.sleep(6)
-        except Exception as e:
-            logger.warning(f"Error during simple scroll: {e}")
+        extractor = LinkListExtractor('a[href*="/groups/"]', "group_name", "group_url", key=group_key,
+                                      accept=self._is_valid_group_item, clean_text=self.utils.clean_text)
+        return await self._harvest_list("groups", "groups", extractor, max_items=max_items)
     
-    async def _extract_groups_data(self) -> List[Dict[str, str]]:
-        """Extract groups data from page"""
-        groups_list = []
-        
-        try:
-            group_links = await self.page.query_selector_all('a[href*="/groups/"]')
-            
-            for link in group_links:
-                try:
-                    name = await link.text_content()
-                    href = await link.get_attribute('href')
-                    
-                    if name and href and name.strip() and "/groups/" in href:
-                        # Skip navigation elements
-                        if any(skip in name.lower() for skip in ["see all", "more", "groups", "discover", "create"]):
-                            continue
-                        
-                        group_data = {
-                            "group_name": self.utils.clean_text(name.strip()),
-                            "group_url": href,
-                            "bio": ""
-                        }
-                        
-                        # Avoid duplicates
-                        if not any(g["group_name"] == group_data["group_name"] for g in groups_list):
-                            groups_list.append(group_data)
-                            
-                except Exception:
-                    continue
-                    
-        except Exception as e:
-            logger.warning(f"Error extracting groups data: {e}")
-        
-        return groups_list
+    def _is_valid_group_item(self, raw: Dict[str, str]) -> bool:
+        """Skip navigation elements of the groups tab"""
+        return not any(skip in raw["name"].lower() for skip in ["see all", "more", "groups", "discover", "create"])
     
-    async def get_pages_followed(self) -> List[Dict[str, str]]:
+    async def get_pages_followed(self, max_items: Optional[int] = None) -> List[Dict[str, str]]:
         """Extract pages the user follows"""
-        try:
-            logger.info("Extracting pages followed...")
-            
-            if not self._validate_page_availability():
-                return []
-            
-            likes_url = self._construct_profile_url(self.original_username, "likes")
-            logger.info(f"Navigating to likes page: {likes_url}")
-            
-            if not await self._navigate_with_retries(likes_url):
-                return []
-            
-            if await self._check_privacy_restrictions():
-                logger.warning("Pages list is private or empty")
-                return []
-            
-            await self._perform_simple_scroll()
-            
-            pages_list = await self._extract_pages_data()
-            
-            logger.info(f"Extracted {len(pages_list)} pages")
-            return pages_list
-            
-        except Exception as e:
-            logger.error(f"Error getting pages: {e}")
-            return []
+        extractor = LinkListExtractor('a[href*="facebook.com/"]', "page_name", "page_url",
+                                      accept=self._is_valid_page_item, clean_text=self.utils.clean_text)
+        return await self._harvest_list("pages_followed", "likes", extractor, max_items=max_items)
     
-    async def _extract_pages_data(self) -> List[Dict[str, str]]:
-        """Extract pages data from page"""
-        pages_list = []
-        
-        try:
-            all_links = await self.page.query_selector_all('a[href*="facebook.com/"]')
-            
-            for link in all_links:
-                try:
-                    href = await link.get_attribute('href')
-                    name = await link.text_content()
-                    
-                    if not href or not name or not name.strip():
-                        continue
-                    
-                    name = name.strip()
-                    
-                    # Skip navigation and user profile links
-                    if any(skip in href for skip in ['/likes', '/friends', '/photos', '/videos', '/about', '?ref=', '?sk=', '/home', '/feed']):
-                        continue
-                    
-                    # Skip navigation text
-                    if any(invalid in name.lower() for invalid in ["see all", "more", "likes", "following", "pages", "mutual", "message", "home", "settings"]):
-                        continue
-                    
-                    # Skip if this is the user's own profile
-                    if self.profile_identifier and self.profile_identifier in href:
-                        continue
-                    
-                    page_data = {
-                        "page_name": self.utils.clean_text(name),
-                        "page_url": href,
-                        "bio": ""
-                    }
-                    
-                    # Avoid duplicates
-                    if not any(p["page_name"] == page_data["page_name"] for p in pages_list):
-                        pages_list.append(page_data)
-                        
-                except Exception:
-                    continue
-                    
-        except Exception as e:
-            logger.warning(f"Error extracting pages data: {e}")
-        
-        return pages_list
+    def _is_valid_page_item(self, raw: Dict[str, str]) -> bool:
+        """Skip navigation links and the user's own profile on the likes tab"""
+        href, name = raw["url"], raw["name"]
+        if any(skip in href for skip in ['/likes', '/friends', '/photos', '/videos', '/about', '?ref=', '?sk=', '/home', '/feed']):
+            return False
+        if any(invalid in name.lower() for invalid in ["see all", "more", "likes", "following", "pages", "mutual", "message", "home", "settings"]):
+            return False
+        if self.profile_identifier and self.profile_identifier in href:
+            return False
+        return True
     
-    async def get_following_list(self) -> List[Dict[str, str]]:
+    async def get_following_list(self, max_items: Optional[int] = None) -> List[Dict[str, str]]:
         """Extract following list with improved filtering"""
-        try:
-            logger.info("Extracting following list...")
-            
-            if not self._validate_page_availability():
-                return []
-            
-            following_url = self._construct_profile_url(self.original_username, "following")
-            logger.info(f"Navigating to following page: {following_url}")
-            
-            if not await self._navigate_with_retries(following_url):
-                return []
-            
-            page_content = await self.page.content()
-            if "This content isn't available" in page_content:
-                logger.warning("Following list is private or empty")
-                return []
-            
-            await self._perform_simple_scroll()
-            
-            following_list = await self._extract_following_data()
-            
-            logger.info(f"Extracted {len(following_list)} following")
-            return following_list
-            
-        except Exception as e:
-            logger.error(f"Error getting following list: {e}")
-            return []
+        extractor = LinkListExtractor('a[href*="facebook.com/"]', "name", "profile_url",
+                                      accept=self._is_valid_following_item, clean_text=self.utils.clean_text)
+        return await self._harvest_list("following", "following", extractor, max_items=max_items)
     
-    async def _extract_following_data(self) -> List[Dict[str, str]]:
-        """Extract following data from page"""
-        following_list = []
-        
-        try:
-            all_links = await self.page.query_selector_all('a[href*="facebook.com/"]')
-            
-            for link in all_links:
-                try:
-                    href = await link.get_attribute('href')
-                    name = await link.text_content()
-                    
-                    if not href or not name or not name.strip():
-                        continue
-                    
-                    name = name.strip()
-                    
-                    # Skip the user's own profile (CRITICAL)
-                    if self.profile_identifier and (f"/{self.profile_identifier}" in href or href.endswith(self.profile_identifier) or self.profile_identifier in href):
-                        continue
-                    
-                    # Skip navigation and non-profile links
-                    if any(skip in href for skip in ['/following/', '/friends/', '/photos/', '/videos/', '/about/', '?ref=', '?sk=', '/home/', '/feed/', '/settings/', '/notifications/']):
-                        continue
-                    
-                    # Skip navigation text
-                    if any(invalid in name.lower() for invalid in ["see all", "more", "following", "follow", "unfollow", "mutual", "message", "home", "settings", "photos", "videos"]):
-                        continue
-                    
-                    # Validate it's a real profile URL
-                    if not self._is_valid_profile_url(href):
-                        continue
-                    
-                    following_data = {
-                        "name": self.utils.clean_text(name),
-                        "profile_url": href,
-                        "bio": ""
-                    }
-                    
-                    # Avoid duplicates
-                    if not any(f["name"] == following_data["name"] for f in following_list):
-                        following_list.append(following_data)
-                        
-                except Exception:
-                    continue
-                    
-        except Exception as e:
-            logger.warning(f"Error extracting following data: {e}")
-        
-        return following_list
+    def _is_valid_following_item(self, raw: Dict[str, str]) -> bool:
+        """Skip the user's own profile, navigation and non-profile links on the following tab"""
+        href, name = raw["url"], raw["name"]
+        # Skip the user's own profile (CRITICAL)
+        if self.profile_identifier and self.profile_identifier in href:
+            return False
+        if any(skip in href for skip in ['/following/', '/friends/', '/photos/', '/videos/', '/about/', '?ref=', '?sk=', '/home/', '/feed/', '/settings/', '/notifications/']):
+            return False
+        if any(invalid in name.lower() for invalid in ["see all", "more", "following", "follow", "unfollow", "mutual", "message", "home", "settings", "photos", "videos"]):
+            return False
+        return self._is_valid_profile_url(href)
     
     def _is_valid_profile_url(self, url: str) -> bool:
         """Validate if URL looks like a real Facebook profile"""
@@ -0,0 +1,183 @@
+"""
+Clipped per-post screenshots captured off the extraction path
+
+Full-page PNGs of a long timeline cost seconds each and block the scraping
+coroutine. ScreenshotService instead clips each accepted post's box and asks
+Chromium to encode it as WebP or JPEG (CDP Page.captureScreenshot, so encoding
+happens in the browser, not in Python). Extraction only enqueues the element;
+one background task reads its box and captures it while the loop carries on
+with the next post.
+
+The encoded images go into the content-addressed MediaStore, so identical
+captures (the same shared post on two profiles, a re-captured post that did
+not change) are stored once. The service only keeps a per-post index mapping
+each post to the hash of its visible state (text, image sources, size) and
+the SHA-256 of its image; if the index already holds the same state hash and
+the stored image still exists, nothing is captured. The index lives in the
+profile's screenshot directory, so unchanged posts are also skipped on later
+runs.
+"""
+import os
+import json
+import base64
+import asyncio
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+
+from .media_store import MediaStore
+
+logger = logging.getLogger(__name__)
+
+SCREENSHOT_FORMATS = ("webp", "jpeg")
+SCREENSHOT_CONTENT_TYPES = {"webp": "image/webp", "jpg": "image/jpeg"}
+
+# Box of the element in document coordinates plus what it currently shows
+ELEMENT_STATE_JS = """
+(el) => {
+    const rect = el.getBoundingClientRect();
+    const images = Array.from(el.querySelectorAll('img')).map(img => img.currentSrc || img.src).join('|');
+    return {
+        x: rect.left + window.scrollX, y: rect.top + window.scrollY,
+        width: rect.width, height: rect.height,
+        state: el.innerText + '|' + images + '|' + Math.round(rect.width) + 'x' + Math.round(rect.height)
+    };
+}
+"""
+
+
+class ScreenshotService:
+    """
+    Background queue of clipped post screenshots.
+
+    Args:
+        page: Playwright page the elements belong to
+        store: MediaStore the encoded images are put in (its URLs are the screenshot URLs)
+        index_dir: directory for the per-post index
+        image_format: "webp" or "jpeg" (JPEG is used where WebP capture is unavailable)
+        quality: encoder quality, 0-100
+        max_height: clip tall posts to this many CSS pixels
+    """
+
+    def __init__(self, page, store: MediaStore, index_dir: str, image_format: str = "webp",
+                 quality: int = 60, max_height: int = 2000):
+        if image_format not in SCREENSHOT_FORMATS:
+            raise ValueError(f"Unknown screenshot format: {image_format}")
+        self.page = page
+        self.store = store
+        self.index_dir = index_dir
+        self.image_format = image_format
+        self.quality = quality
+        self.max_height = max_height
+        self.index_path = os.path.join(index_dir, "screenshots_index.json")
+        self.index: Dict[str, Dict[str, str]] = {}
+        self.urls: Dict[str, str] = {}
+        self.stats = {"captured": 0, "unchanged": 0, "failed": 0}
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._cdp = None
+        os.makedirs(index_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Could not read screenshot index: {e}")
+
+    def submit(self, post: Dict[str, Any], element) -> None:
+        """Queue a screenshot of an accepted post; its media_screenshot_url is set when done"""
+        if not post.get("id"):
+            return
+        self._queue.put_nowait((post, element))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            post, element = await self._queue.get()
+            try:
+                url = await self._capture(post["id"], element)
+                if url:
+                    self.urls[post["id"]] = url
+                    post["media_screenshot_url"] = url
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.debug(f"Screenshot of post {post.get('id')} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _capture(self, post_id: str, element) -> str:
+        box = await element.evaluate(ELEMENT_STATE_JS)
+        if box["width"] < 1 or box["height"] < 1:
+            return ""
+        state_hash = hashlib.sha1(box["state"].encode("utf-8", "ignore")).hexdigest()
+        known = self.index.get(post_id)
+        if known and known.get("hash") == state_hash and known.get("sha256"):
+            reference = self.store.reference(known["sha256"])
+            if reference:
+                self.stats["unchanged"] += 1
+                return reference["url"]
+
+        clip = {"x": box["x"], "y": box["y"], "width": box["width"], "height": min(box["height"], self.max_height)}
+        data, ext = await self._encode(clip)
+        reference = self.store.put_bytes(data, SCREENSHOT_CONTENT_TYPES[ext], key=f"screenshot:{post_id}")
+        self.index[post_id] = {"hash": state_hash, "sha256": reference["sha256"]}
+        self.stats["captured"] += 1
+        return reference["url"]
+
+    async def _encode(self, clip: Dict[str, float]):
+        """Capture a document-coordinate clip, encoded by the browser"""
+        if self._cdp is None:
+            try:
+                self._cdp = await self.page.context.new_cdp_session(self.page)
+            except Exception:
+                self._cdp = False  # Not Chromium
+        if self._cdp:
+            result = await self._cdp.send("Page.captureScreenshot", {
+                "format": self.image_format, "quality": self.quality,
+                "clip": dict(clip, scale=1), "captureBeyondViewport": True
+            })
+            return base64.b64decode(result["data"]), "webp" if self.image_format == "webp" else "jpg"
+        data = await self.page.screenshot(type="jpeg", quality=self.quality, clip=clip, full_page=True)
+        return data, "jpg"
+
+    def rebind(self, page) -> None:
+        """Capture from another page (one swapped in after a crash); the old CDP session died with its page"""
+        self.page = page
+        self._cdp = None
+
+    def apply(self, posts: List[Dict[str, Any]]) -> None:
+        """Copy finished screenshot URLs onto posts by ID (for records copied after submission)"""
+        for post in posts:
+            url = self.urls.get(post.get("id"))
+            if url:
+                post["media_screenshot_url"] = url
+
+    async def flush(self) -> None:
+        """Wait for every queued screenshot (e.g. before the elements are pruned)"""
+        await self._queue.join()
+
+    async def close(self) -> None:
+        """Finish the queue, stop the worker and save the post index and the media index"""
+        if self._worker is not None:
+            await self.flush()
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        if self._cdp:
+            try:
+                await self._cdp.detach()
+            except Exception:
+                pass
+        self._cdp = None
+        try:
+            with open(self.index_path, "w", encoding="utf-8") as f:
+                json.dump(self.index, f)
+        except OSError as e:
+            logger.debug(f"Could not save screenshot index: {e}")
+        self.store.save_index()
+        logger.info(f"📸 Post screenshots: {self.stats}")
@@ -0,0 +1,224 @@
+"""
+Event-driven infinite scroll
+
+Scrolls once, then waits for a real signal that the next page has arrived
+instead of sleeping a fixed time: more feed nodes, a taller document, or a
+finished GraphQL pagination request. A short randomized floor keeps the pace
+human-like, and scrolling stops as soon as an end-of-feed marker is shown.
+"""
+import time
+import random
+import asyncio
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Feed items on a timeline
+FEED_ITEM_SELECTOR = 'div[role="article"], div[aria-posinset], div[data-pagelet*="FeedUnit"]'
+
+# Texts Facebook shows once a feed or list has nothing more to load
+END_OF_FEED_MARKERS = [
+    "No more posts to show",
+    "No more posts",
+    "You're all caught up",
+    "End of results",
+    "No more results",
+]
+
+METRICS_JS = """
+([selector, markers]) => {
+    const xpath = markers.map(m => `//*[not(self::script)][text()[contains(., ${JSON.stringify(m)})]]`).join(' | ');
+    const end = xpath ? document.evaluate(xpath, document.body, null, XPathResult.ANY_UNORDERED_NODE_TYPE, null).singleNodeValue : null;
+    return {
+        count: document.querySelectorAll(selector).length,
+        height: document.body.scrollHeight,
+        end: !!end
+    };
+}
+"""
+
+SCROLL_JS = """
+() => {
+    window.scrollTo(0, document.body.scrollHeight);
+    // Nudge up and back so intersection observers near the bottom fire again
+    window.scrollBy(0, -100);
+    window.scrollBy(0, 200);
+}
+"""
+
+GROWTH_JS = """
+([selector, markers, before]) => {
+    if (document.querySelectorAll(selector).length > before.count) return 'nodes';
+    if (document.body.scrollHeight > before.height) return 'height';
+    if (markers.length) {
+        const xpath = markers.map(m => `//*[not(self::script)][text()[contains(., ${JSON.stringify(m)})]]`).join(' | ');
+        if (document.evaluate(xpath, document.body, null, XPathResult.ANY_UNORDERED_NODE_TYPE, null).singleNodeValue) return 'end_of_feed';
+    }
+    return false;
+}
+"""
+
+
+class ScrollResult:
+    """Outcome of one scroll step"""
+
+    def __init__(self, reason: str, grew: bool, waited: float, count: int = 0, height: int = 0):
+        self.reason = reason      # nodes / height / graphql / end_of_feed / timeout / error
+        self.grew = grew
+        self.waited = waited
+        self.count = count
+        self.height = height
+
+    @property
+    def end_of_feed(self) -> bool:
+        return self.reason == "end_of_feed"
+
+    def __repr__(self) -> str:
+        return f"ScrollResult(reason={self.reason!r}, grew={self.grew}, waited={self.waited:.2f}s)"
+
+
+class ScrollDriver:
+    """
+    Scroll a live page and wait only as long as the next batch takes to arrive.
+
+    Args:
+        page: Playwright page
+        item_selector: CSS selector whose match count grows as items load
+        min_delay/max_delay: randomized human floor paid on every scroll
+        timeout: give up waiting for growth after this many seconds
+        graphql_url: URL fragment of the pagination endpoint ("" disables it)
+        settle_timeout: after the GraphQL request finishes, how long to wait for it to render
+    """
+
+    def __init__(self, page, item_selector: str = FEED_ITEM_SELECTOR,
+                 min_delay: float = 0.4, max_delay: float = 0.9, timeout: float = 8.0,
+                 graphql_url: str = "/api/graphql", settle_timeout: float = 1.5,
+                 end_markers: Optional[List[str]] = None, poll_interval: int = 150):
+        self.page = page
+        self.item_selector = item_selector
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.graphql_url = graphql_url
+        self.settle_timeout = settle_timeout
+        self.end_markers = END_OF_FEED_MARKERS if end_markers is None else end_markers
+        self.poll_interval = poll_interval
+
+        self._graphql_finished = asyncio.Event()
+        self._listening = False
+
+        # Metrics
+        self.rounds = 0
+        self.total_wait = 0.0
+        self.reasons = Counter()
+
+    def _on_request_finished(self, request) -> None:
+        if self.graphql_url in request.url:
+            self._graphql_finished.set()
+
+    def _listen(self) -> None:
+        if self._listening or not self.graphql_url:
+            return
+        try:
+            self.page.on("requestfinished", self._on_request_finished)
+            self._listening = True
+        except Exception as e:
+            logger.debug(f"Could not listen for GraphQL requests: {e}")
+
+    def close(self) -> None:
+        """Detach the request listener"""
+        if self._listening:
+            try:
+                self.page.remove_listener("requestfinished", self._on_request_finished)
+            except Exception:
+                pass
+            self._listening = False
+
+    def rebind(self, page) -> None:
+        """Drive another page (one swapped in after a crash), keeping the metrics"""
+        self.close()
+        self.page = page
+
+    async def metrics(self) -> Dict[str, Any]:
+        """Current item count, document height and end-of-feed flag in one round trip"""
+        return await self.page.evaluate(METRICS_JS, [self.item_selector, self.end_markers])
+
+    async def scroll(self) -> ScrollResult:
+        """Scroll to the bottom and wait for the next batch (or the end of the feed)"""
+        self._listen()
+        start = time.time()
+        self.rounds += 1
+
+        try:
+            before = await self.metrics()
+            if before["end"]:
+                return self._finish(ScrollResult("end_of_feed", False, 0.0, before["count"], before["height"]))
+
+            self._graphql_finished.clear()
+            await self.page.evaluate(SCROLL_JS)
+            await asyncio.sleep(random.uniform(self.min_delay, self.max_delay))
+
+            reason = await self._wait_for_growth(before, start)
+            after = await self.metrics()
+            grew = after["count"] > before["count"] or after["height"] > before["height"]
+            if after["end"] and not grew:
+                reason = "end_of_feed"
+            return self._finish(ScrollResult(reason, grew, time.time() - start, after["count"], after["height"]))
+
+        except Exception as e:
+            logger.warning(f"⚠️ Error during event-driven scroll: {e}")
+            return self._finish(ScrollResult("error", False, time.time() - start))
+
+    async def _wait_for_growth(self, before: Dict[str, Any], start: float) -> str:
+        # Playwright treats timeout=0 as "wait forever", so keep a small positive budget
+        remaining = max(0.1, self.timeout - (time.time() - start))
+        growth = asyncio.ensure_future(self.page.wait_for_function(
+            GROWTH_JS, arg=[self.item_selector, self.end_markers, before],
+            polling=self.poll_interval, timeout=remaining * 1000
+        ))
+        graphql = asyncio.ensure_future(self._graphql_finished.wait())
+
+        try:
+            done, _ = await asyncio.wait({growth, graphql}, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+
+            if growth in done:
+                if growth.exception() is not None:
+                    return "timeout"
+                return await growth.result().json_value()
+
+            if graphql in done:
+                # The page has the data; give it a moment to render before extracting
+                try:
+                    await asyncio.wait_for(asyncio.shield(growth), timeout=self.settle_timeout)
+                except (asyncio.TimeoutError, Exception):
+                    pass
+                return "graphql"
+
+            return "timeout"
+        finally:
+            for task in (growth, graphql):
+                if not task.done():
+                    task.cancel()
+            # Retrieve exceptions so cancelled/timed-out waits are not reported as unhandled
+            await asyncio.gather(growth, graphql, return_exceptions=True)
+
+    def _finish(self, result: ScrollResult) -> ScrollResult:
+        self.total_wait += result.waited
+        self.reasons[result.reason] += 1
+        logger.debug(f"Scroll {self.rounds}: {result}")
+        return result
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "rounds": self.rounds,
+            "total_wait_seconds": round(self.total_wait, 2),
+            "avg_wait_seconds": round(self.total_wait / self.rounds, 2) if self.rounds else 0.0,
+            "reasons": dict(self.reasons)
+        }
+
+    def log_stats(self) -> None:
+        if self.rounds:
+            stats = self.report()
+            logger.info(f"📜 Scrolls: {stats['rounds']} rounds, avg wait {stats['avg_wait_seconds']}s, {stats['reasons']}")
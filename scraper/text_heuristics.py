@@ -0,0 +1,269 @@
+"""
+Compiled text heuristics for post-content filtering
+
+Fast, batch-friendly versions of the PostsScraperImproved text checks
+(_is_actual_post_content, _is_ui_text, _is_content_line, _score_content_quality,
+_clean_facebook_content, _final_content_cleanup, _clean_repetitive_text).
+
+Keyword lists are compiled once into trie-shaped regexes, so each check is a
+single C-level scan instead of one substring search per keyword. The cleanup
+regex sets are pre-screened with one combined pattern: text that matches none
+of them skips the sequential substitutions entirely. Results are identical to
+the scraper methods, which stay in place as the readable reference.
+"""
+import re
+from typing import Iterable, List, Tuple
+
+
+def compile_keywords(keywords: Iterable[str], flags: int = 0) -> "re.Pattern":
+    """Compile a keyword list into one trie-shaped alternation (matches any keyword as a substring)"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        optional = "" in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")" + ("?" if optional else "")
+
+    return re.compile(build(trie), flags)
+
+
+# _is_actual_post_content
+UI_NOISE_RE = compile_keywords([
+    'like', 'comment', 'share', 'reply', 'follow', 'message',
+    'see more', 'see less', 'show more', 'show less',
+    'ago', 'hours', 'minutes', 'yesterday', 'just now',
+    'mobile uploads', 'shared with', 'tagged', 'photo',
+    'add friend', 'send message', 'view profile',
+    'home', 'watch', 'marketplace', 'groups', 'gaming',
+    'what\'s on your mind', 'write a comment', 'add a comment'
+])
+CONTENT_INDICATORS_RE = compile_keywords([
+    'happy', 'birthday', 'love', 'great', 'awesome',
+    'thanks', 'congratulations', 'beautiful', 'amazing'
+])
+SENTENCE_CHARS_RE = re.compile(r'[.!?,:]')
+
+# _score_content_quality
+SCORE_BONUS_RE = compile_keywords(['happy', 'birthday', 'love', 'great', 'awesome', 'thanks'])
+SCORE_PENALTY_RE = compile_keywords(['like', 'comment', 'share', 'see more', 'mobile uploads'])
+SCORE_PUNCTUATION_RE = re.compile(r'[.!?]')
+
+# _is_ui_text
+UI_INDICATORS_RE = compile_keywords([
+    'like', 'comment', 'share', 'reply', 'follow', 'message',
+    'see more', 'show more', 'mobile uploads', 'shared with',
+    'minutes ago', 'hours ago', 'days ago'
+])
+
+# _is_content_line
+UI_ELEMENTS_EXACT = frozenset(ui.lower() for ui in [
+    'Like', 'Comment', 'Share', 'Reply', 'Follow', 'Message',
+    'ago', 'just now', 'yesterday', 'See more', 'Show more',
+    'Home', 'Watch', 'Marketplace', 'Groups', 'Gaming',
+    'What\'s on your mind?', 'Write a comment...',
+    'Add a comment...', 'Sponsored', 'Suggested for you'
+])
+UI_PARTIALS_RE = compile_keywords(['hours ago', 'minutes ago', 'days ago', 'weeks ago', 'months ago', 'years ago'])
+
+# _clean_facebook_content (applied in order)
+CLEAN_PATTERNS = [
+    (re.compile(r'Facebook\s*Facebook\s*Facebook', re.IGNORECASE), 'Facebook'),
+    (re.compile(r'(Facebook\s*){2,}', re.IGNORECASE), 'Facebook '),
+] + [(re.compile(pattern, re.IGNORECASE), '') for pattern in [
+    r'\b(Like|Comment|Share|Reply)\b',
+    r'\b\d+\s+(minutes?|hours?|days?|weeks?|months?|years?)\s+ago\b',
+    r'\bSee more\b|\bSee less\b',
+    r'\bFollow\b|\bFollowing\b',
+    r'\bAdd friend\b|\bMessage\b',
+    r'\bHome\b|\bWatch\b|\bMarketplace\b|\bGroups\b|\bGaming\b',
+    r'\bShared with.*?friends\b',
+    r'\bmobile uploads\b',
+    r'\b[A-Za-z0-9]{20,}\b',
+    r'\b\w+\.\w+\.com\b'
+]]
+KEEP_SHORT_WORDS = frozenset(['I', 'a', 'is', 'to'])
+
+# _final_content_cleanup (applied in order)
+FINAL_PATTERNS = [
+    (re.compile(r'\bFacebook(?:\s*Facebook\b)+', re.IGNORECASE), 'Facebook'),
+    (re.compile(r'(\bFacebook\b\s*){3,}', re.IGNORECASE), ''),
+] + [(re.compile(pattern, re.IGNORECASE), '') for pattern in [
+    r'\bLike\b|\bComment\b|\bShare\b',
+    r'\b\d+\s*likes?\b',
+    r'\b\d+\s*comments?\b',
+    r'\b\d+\s*shares?\b',
+    r'\bmobile uploads\b',
+    r'\bsee more\b|\bsee less\b',
+    r'\bhours ago\b|\bminutes ago\b|\bdays ago\b'
+]]
+KEEP_SHORT_WORDS_LOWER = frozenset(['i', 'a', 'is', 'to', 'in', 'on', 'at'])
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _prescreen(patterns) -> "re.Pattern":
+    """One pattern that matches wherever any pattern of an ordered substitution set would"""
+    return re.compile("|".join(f"(?:{p.pattern})" for p, _ in patterns), re.IGNORECASE)
+
+
+CLEAN_PRESCREEN_RE = _prescreen(CLEAN_PATTERNS)
+FINAL_PRESCREEN_RE = _prescreen(FINAL_PATTERNS)
+
+
+def _apply_patterns(text: str, patterns, prescreen) -> str:
+    # If nothing matches up front, every substitution in the chain is a no-op
+    if prescreen.search(text) is None:
+        return text
+    for pattern, replacement in patterns:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def is_actual_post_content(text: str) -> bool:
+    """Equivalent of PostsScraperImproved._is_actual_post_content"""
+    if not text or len(text.strip()) < 10:
+        return False
+
+    text_lower = text.lower()
+    if len(text) < 50 and UI_NOISE_RE.search(text_lower):
+        return False
+    if len(text) <= 15:
+        return False
+
+    return bool(SENTENCE_CHARS_RE.search(text) or '#' in text or CONTENT_INDICATORS_RE.search(text_lower))
+
+
+def score_content_quality(text: str) -> float:
+    """Equivalent of PostsScraperImproved._score_content_quality"""
+    if not text or len(text) < 10:
+        return 0.0
+
+    length = len(text)
+    text_lower = text.lower()
+    score = 0.0
+
+    if 20 <= length <= 200:
+        score += 0.3
+    elif length > 200:
+        score += 0.1
+
+    if SCORE_PUNCTUATION_RE.search(text):
+        score += 0.3
+    if '#' in text:
+        score += 0.2
+    if SCORE_BONUS_RE.search(text_lower):
+        score += 0.2
+
+    if text_lower.count('facebook') > 3:
+        score -= 0.8
+    if SCORE_PENALTY_RE.search(text_lower):
+        score -= 0.3
+    if len(text.split()) < 3:
+        score -= 0.2
+    if length > 10 and text.isupper():
+        score -= 0.4
+    if sum(map(str.isdigit, text)) > length * 0.3:
+        score -= 0.3
+
+    return max(0.0, score)
+
+
+def is_ui_text(text: str) -> bool:
+    """Equivalent of PostsScraperImproved._is_ui_text"""
+    return UI_INDICATORS_RE.search(text.lower()) is not None
+
+
+def is_content_line(text: str) -> bool:
+    """Equivalent of PostsScraperImproved._is_content_line"""
+    if not text or len(text) < 8:
+        return False
+
+    text_lower = text.lower().strip()
+    if text_lower in UI_ELEMENTS_EXACT or UI_PARTIALS_RE.search(text_lower):
+        return False
+    if len(text) < 15:
+        return False
+    return not (text.isupper() and len(text) > 5)
+
+
+def clean_facebook_content(text: str) -> str:
+    """Equivalent of PostsScraperImproved._clean_facebook_content"""
+    if not text:
+        return ""
+
+    text = _apply_patterns(text, CLEAN_PATTERNS, CLEAN_PRESCREEN_RE)
+    text = WHITESPACE_RE.sub(' ', text)
+    return ' '.join(word for word in text.split() if len(word) > 2 or word in KEEP_SHORT_WORDS).strip()
+
+
+def final_content_cleanup(text: str) -> str:
+    """Equivalent of PostsScraperImproved._final_content_cleanup"""
+    if not text:
+        return ""
+
+    text = _apply_patterns(text, FINAL_PATTERNS, FINAL_PRESCREEN_RE)
+    text = WHITESPACE_RE.sub(' ', text).strip()
+    result = ' '.join(
+        word for word in text.split() if len(word) > 2 or word.lower() in KEEP_SHORT_WORDS_LOWER
+    ).strip()
+    return result if len(result) > 10 else ""
+
+
+def clean_repetitive_text(text: str) -> str:
+    """Equivalent of PostsScraperImproved._clean_repetitive_text"""
+    if not text:
+        return ""
+
+    words = text.split()
+    if len(words) < 10 or words.count("Facebook") <= 10:
+        return text
+
+    cleaned_words = []
+    facebook_count = 0
+    for word in words:
+        if word == "Facebook":
+            facebook_count += 1
+            if facebook_count > 3:
+                continue
+        cleaned_words.append(word)
+    return ' '.join(cleaned_words)
+
+
+def score_candidates(texts: Iterable[str], min_length: int) -> List[Tuple[str, float]]:
+    """
+    Batched candidate filter for Strategies A and B of _extract_enhanced_post_content:
+    strip, clean, keep text longer than ``min_length`` that looks like post content,
+    and score it. Returns (cleaned_text, score) pairs in input order.
+    """
+    candidates = []
+    for text in texts:
+        if not text:
+            continue
+        text = text.strip()
+        if len(text) <= min_length:
+            continue
+        cleaned = clean_facebook_content(text)
+        if len(cleaned) > min_length and is_actual_post_content(cleaned):
+            candidates.append((cleaned, score_content_quality(cleaned)))
+    return candidates
+
+
+def score_lines(full_text: str) -> List[Tuple[str, float]]:
+    """Batched line filter for Strategy C: analyse each line of an element's full text"""
+    candidates = []
+    for line in full_text.split('\n'):
+        line = line.strip()
+        if len(line) > 25 and is_actual_post_content(line) and not is_ui_text(line):
+            cleaned = clean_facebook_content(line)
+            if len(cleaned) > 20:
+                candidates.append((cleaned, score_content_quality(cleaned)))
+    return candidates
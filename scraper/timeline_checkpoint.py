@@ -0,0 +1,163 @@
+"""
+Resumable timeline checkpoints
+
+Journals a timeline run to an append-only JSONL file per profile: every
+accepted DOM post and captured GraphQL record, a progress record per round
+(feed height reached, GraphQL cursor, posts written so far) and, whenever it
+changes, the request shape needed to continue paginating. A restarted run loads
+the journal, restores its posts and seen IDs, and continues from where the
+previous one stopped. Checkpoints older than the TTL are discarded.
+
+File format (one JSON object per line):
+    {"type": "meta", "profile": ..., "created_at": ...}
+    {"type": "post", "time": ..., "post": {...}}
+    {"type": "record", "time": ..., "key": ..., "record": {...}}
+    {"type": "request", "time": ..., "request": {...}}
+    {"type": "progress", "time": ..., "scroll_height": ..., "cursor": ..., "posts": ...}
+    {"type": "complete", "time": ...}
+"""
+import os
+import json
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_TTL = 6 * 3600  # seconds
+
+
+class TimelineCheckpoint:
+    """Append-only journal for one profile's timeline run"""
+
+    def __init__(self, path: str, profile: str = "", ttl: float = DEFAULT_CHECKPOINT_TTL):
+        self.path = path
+        self.profile = profile
+        self.ttl = ttl
+        self._file = None
+        self.posts_written = 0
+        # Last pagination request journaled (headers and tokens are written once, not per round)
+        self._request: Optional[Dict[str, Any]] = None
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Read an unfinished, fresh checkpoint.
+
+        Returns {"posts", "seen_post_ids", "records", "scroll_height", "cursor", "request", "age"} or
+        None when there is nothing to resume (missing, complete, stale or unreadable).
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        posts: List[Dict[str, Any]] = []
+        seen = set()
+        records: Dict[str, Dict[str, Any]] = {}
+        progress: Dict[str, Any] = {}
+        request: Optional[Dict[str, Any]] = None
+        last_time = 0.0
+        complete = False
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line_number, line in enumerate(f, 1):
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A crash can leave a torn last line; everything before it is valid
+                        logger.warning(f"⚠️ Skipping unreadable checkpoint line {line_number} in {self.path}")
+                        continue
+                    last_time = max(last_time, record.get("time", record.get("created_at", 0)))
+                    kind = record.get("type")
+                    if kind == "post":
+                        post = record["post"]
+                        if post.get("id") and post["id"] not in seen:
+                            seen.add(post["id"])
+                            posts.append(post)
+                    elif kind == "record":
+                        records[record["key"]] = record["record"]
+                    elif kind == "request":
+                        request = record["request"]
+                    elif kind == "progress":
+                        progress = record
+                    elif kind == "complete":
+                        complete = True
+        except OSError as e:
+            logger.warning(f"⚠️ Could not read checkpoint {self.path}: {e}")
+            return None
+
+        age = time.time() - last_time
+        if complete:
+            return None
+        if age > self.ttl:
+            logger.info(f"🗑️ Discarding stale timeline checkpoint ({age / 3600:.1f}h old)")
+            self.discard()
+            return None
+
+        self._request = request
+        self.posts_written = len(posts)
+        logger.info(f"♻️ Resuming timeline checkpoint: {len(posts)} posts, {len(records)} GraphQL records, "
+                    f"{age / 60:.0f} min old")
+        return {
+            "posts": posts,
+            "seen_post_ids": seen,
+            "records": records,
+            "scroll_height": progress.get("scroll_height", 0),
+            "cursor": progress.get("cursor"),
+            "request": request,
+            "age": age
+        }
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            self._file = open(self.path, "a", encoding="utf-8")
+            if is_new:
+                self._file.write(json.dumps({"type": "meta", "profile": self.profile, "created_at": time.time()}) + "\n")
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record_round(self, new_posts: List[Dict[str, Any]], scroll_height: int = 0,
+                     cursor: Optional[str] = None, request: Optional[Dict[str, Any]] = None,
+                     new_records: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        """Journal one round: its newly accepted posts and records, then where the run is now"""
+        try:
+            now = time.time()
+            for post in new_posts:
+                self._append({"type": "post", "time": now, "post": post})
+            for key, record in (new_records or {}).items():
+                self._append({"type": "record", "time": now, "key": key, "record": record})
+            if request is not None and request != self._request:
+                self._append({"type": "request", "time": now, "request": request})
+                self._request = request
+            self.posts_written += len(new_posts)
+            self._append({"type": "progress", "time": now, "scroll_height": scroll_height, "cursor": cursor,
+                          "posts": self.posts_written})
+            self._sync()
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Could not write timeline checkpoint: {e}")
+
+    def complete(self) -> None:
+        """Mark the run finished; the next run starts from scratch"""
+        try:
+            self._append({"type": "complete", "time": time.time()})
+            self._sync()
+        except OSError as e:
+            logger.warning(f"⚠️ Could not complete timeline checkpoint: {e}")
+        self.close()
+        self.discard()
+
+    def discard(self) -> None:
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -20,6 +20,208 @@ logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('facebook_utils')
 
+# Button labels per expansion kind (matched against the trimmed button text or aria-label)
+EXPANSION_PATTERNS = {
+    "see_more": r"^(see more|show more)$",
+    "comments": r"^(view|see) (\d+ )?(more|previous) (comments?|repl(y|ies))$|^view all \d+ repl(y|ies)$|^\d+ repl(y|ies)$",
+    "load_more": r"^(load more|show more|see more)$",
+}
+
+# Controls that go away once clicked. "View more comments" and "Load more" stay in
+# place and load another page on every click, so they are never marked as done.
+ONE_SHOT_EXPANSIONS = ("see_more",)
+
+# Trigger every matching control at once, then wait for the DOM to go quiet
+EXPAND_JS = """
+([patterns, oneShot, maxExpansions, rootSelector, viewportOnly, settleMs, firstMutationMs, timeoutMs]) => new Promise(resolve => {
+    const started = performance.now();
+    const regexes = Object.entries(patterns).map(([kind, source]) => [kind, new RegExp(source, 'i')]);
+    const inViewport = el => {
+        const r = el.getBoundingClientRect();
+        return r.bottom > 0 && r.top < window.innerHeight && r.width > 0 && r.height > 0;
+    };
+    let roots = rootSelector ? Array.from(document.querySelectorAll(rootSelector)) : [document.body];
+    if (viewportOnly) roots = roots.filter(inViewport);
+
+    const byKind = {};
+    const targets = [];
+    const seen = new Set();
+    for (const root of roots) {
+        for (const el of root.querySelectorAll('[role="button"], button')) {
+            if (targets.length >= maxExpansions) break;
+            if (seen.has(el) || el.hasAttribute('data-fbs-expanded')) continue;
+            seen.add(el);
+            const label = (el.getAttribute('aria-label') || el.textContent || '').trim();
+            if (!label || label.length > 60) continue;
+            const match = regexes.find(([, re]) => re.test(label));
+            if (!match || (viewportOnly && !inViewport(el))) continue;
+            targets.push([el, match[0]]);
+            byKind[match[0]] = (byKind[match[0]] || 0) + 1;
+        }
+    }
+    if (!targets.length) return resolve({clicked: 0, by_kind: {}, mutations: 0, waited_ms: 0});
+
+    let mutations = 0;
+    let timer = null;
+    const finish = () => {
+        observer.disconnect();
+        clearTimeout(timer);
+        clearTimeout(cap);
+        resolve({clicked: targets.length, by_kind: byKind, mutations, waited_ms: Math.round(performance.now() - started)});
+    };
+    const observer = new MutationObserver(records => {
+        mutations += records.length;
+        clearTimeout(timer);
+        timer = setTimeout(finish, settleMs);
+    });
+    observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+    const cap = setTimeout(finish, timeoutMs);
+
+    for (const [el, kind] of targets) {
+        if (oneShot.includes(kind)) el.setAttribute('data-fbs-expanded', '1');
+        el.click();
+    }
+    // Comment threads load over the network, so allow longer for the first mutation
+    timer = setTimeout(finish, firstMutationMs);
+})
+"""
+
+# Page-state rules in order of precedence; text indicators are lowercase
+PAGE_STATE_RULES = [
+    {
+        "state": "checkpoint",
+        "url": ["/checkpoint"],
+        "selectors": ["[data-testid='security_checkpoint']", "div[aria-label='Checkpoint']",
+                      "[role='dialog'][aria-label*='Security']", "[role='dialog'][aria-label*='Verify']",
+                      "form[action*='checkpoint']", "div[id*='checkpoint']", "img[alt*='captcha']",
+                      "img[src*='captcha']", "input[name='captcha_response']",
+                      "button[value='This Was Me']"],
+        "text": ["security checkpoint", "security check", "confirm it's you", "verify it's you",
+                 "verify your identity", "confirm your identity", "verify your account",
+                 "prove you're a person", "unusual activity", "suspicious activity",
+                 "login from a new location", "verify this login", "approve this login",
+                 "location verification",
+                 # Arabic/French variations (for Moroccan accounts)
+                 "نقطة أمان", "تأكيد الهوية", "نشاط مشبوه",
+                 "point de sécurité", "vérifier votre identité", "activité suspecte"],
+    },
+    {
+        "state": "login",
+        "url": ["/login"],
+        "selectors": ["form[data-testid='royal_login_form']", "button[name='login']"],
+        "text": [],
+        # Logged-in chrome present: the login widgets are some embedded prompt
+        "unless": "[aria-label='Your profile']",
+    },
+    {
+        "state": "rate_limited",
+        "url": [],
+        "selectors": [],
+        "text": ["you're temporarily blocked", "you’re temporarily blocked", "you can't use this feature right now",
+                 "you’re going too fast", "you're going too fast", "it looks like you were misusing this feature"],
+    },
+    {
+        "state": "not_found",
+        "url": [],
+        "selectors": [],
+        "text": ["this page isn't available", "this page isn’t available", "the link you followed may be broken",
+                 "page not found"],
+    },
+    {
+        "state": "private",
+        "url": [],
+        "selectors": [],
+        "text": ["this content isn't available", "this content isn’t available", "content not available",
+                 "friends list is private", "no friends to show", "only you can see"],
+    },
+    {
+        "state": "error",
+        "url": ["/error", "error="],
+        "selectors": [],
+        "text": ["sorry, something went wrong"],
+    },
+]
+
+PAGE_STATES = [rule["state"] for rule in PAGE_STATE_RULES] + ["profile"]
+
+# One round trip: first rule with any evidence wins, else the page is content.
+# Text rules only read visible text outside posts and feeds: a post saying
+# "page not found" does not make its profile an error page.
+CLASSIFY_PAGE_JS = """
+(rules) => {
+    const url = location.href;
+    const lowerUrl = url.toLowerCase();
+    const title = document.title;
+    const visible = el => el.getClientRects().length > 0;
+    const skip = '[role="article"], [role="feed"], script, style, noscript, template';
+    const parts = [];
+    if (document.body) {
+        const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT, {
+            acceptNode: node => node.nodeType === Node.TEXT_NODE ? NodeFilter.FILTER_ACCEPT
+                : node.matches(skip) ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_SKIP
+        });
+        for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+            if (node.data.trim() && visible(node.parentElement)) parts.push(node.data);
+        }
+    }
+    const text = parts.join(' ').replace(/\\s+/g, ' ').toLowerCase();
+    for (const rule of rules) {
+        const evidence = [];
+        for (const part of rule.url) if (lowerUrl.includes(part)) evidence.push(`url:${part}`);
+        for (const selector of rule.selectors) {
+            const el = document.querySelector(selector);
+            if (el && visible(el)) evidence.push(`selector:${selector}`);
+        }
+        const phrases = rule.text.filter(phrase => text.includes(phrase));
+        for (const phrase of phrases) evidence.push(`text:${phrase}`);
+        if (phrases.length) {
+            // Where the phrase sits: a dialog, or an error page without any profile chrome
+            for (const dialog of document.querySelectorAll('[role="dialog"], [role="alertdialog"]')) {
+                if (!visible(dialog)) continue;
+                const dialogText = (dialog.innerText || '').toLowerCase();
+                for (const phrase of phrases) if (dialogText.includes(phrase)) evidence.push(`dialog:${phrase}`);
+            }
+            if (!document.querySelector('div[role="main"] h1, [role="tablist"], [role="feed"], [role="article"]')) {
+                evidence.push('layout:no_profile_header');
+            }
+        }
+        if (evidence.length && !(rule.unless && document.querySelector(rule.unless))) {
+            return {state: rule.state, evidence, url, title};
+        }
+    }
+    if (!text.trim() && !document.querySelector('[role="article"], [role="feed"]')) {
+        return {state: 'error', evidence: ['empty_page'], url, title};
+    }
+    return {state: 'profile', evidence: document.querySelector('div[role="main"]') ? ['selector:div[role="main"]'] : [],
+            url, title};
+}
+"""
+
+# A locked or private profile says so in its header (next to the name), not just anywhere on the page
+PROFILE_LOCK_PHRASES = ["locked their profile", "locked his profile", "locked her profile", "locked profile",
+                        "this account is private", "this profile is private", "profile is locked",
+                        "only their friends can see what they share"]
+
+# Evidence from the profile header only: the block around the profile name (main h1) up to the tab bar
+PROFILE_HEADER_LOCK_JS = """
+(phrases) => {
+    const main = document.querySelector('div[role="main"]');
+    const name = main && main.querySelector('h1');
+    if (!name) return [];
+    let header = name;
+    for (let i = 0; i < 8 && header.parentElement && header.parentElement !== main; i++) {
+        header = header.parentElement;
+        if (header.querySelector('[role="tablist"]')) break;
+    }
+    const evidence = [];
+    const text = (header.innerText || '').toLowerCase();
+    for (const phrase of phrases) if (text.includes(phrase)) evidence.push(`header_text:${phrase}`);
+    const lock = header.querySelector('[aria-label*="locked" i], [aria-label*="lock icon" i]');
+    if (lock && evidence.length) evidence.push(`header_selector:${lock.getAttribute('aria-label')}`);
+    return evidence;
+}
+"""
+
 class ScraperUtils:
     """Utilities for the scraper"""
     
@@ -30,18 +232,27 @@ class ScraperUtils:
         if self.screenshot_dir:
             os.makedirs(self.screenshot_dir, exist_ok=True)
 
-    async def take_screenshot(self, name: str, selector: Optional[str] = None):
-        """Take a screenshot of the page or a specific element"""
-        path = os.path.join(self.screenshot_dir, f"{name}.png")
+    async def take_screenshot(self, name: str, selector: Optional[str] = None, full_page: bool = False,
+                              image_type: str = "jpeg", quality: Optional[int] = 70):
+        """
+        Take a screenshot of the page or a specific element
+        
+        Captures the viewport unless full_page is set (a full long timeline costs
+        seconds to encode); image_type is "jpeg" or "png" (quality applies to JPEG).
+        """
+        path = os.path.join(self.screenshot_dir, f"{name}.{'jpg' if image_type == 'jpeg' else image_type}")
+        options = {"path": path, "type": image_type}
+        if image_type == "jpeg" and quality is not None:
+            options["quality"] = quality
         try:
             if selector:
                 element = await self.page.query_selector(selector)
                 if element:
-                    await element.screenshot(path=path)
+                    await element.screenshot(**options)
                 else:
-                    await self.page.screenshot(path=path, full_page=True)
+                    await self.page.screenshot(full_page=full_page, **options)
             else:
-                await self.page.screenshot(path=path, full_page=True)
+                await self.page.screenshot(full_page=full_page, **options)
             return path
         except Exception as e:
             logger.warning(f"Failed to take screenshot {name}: {e}")
@@ -61,17 +272,38 @@ class ScraperUtils:
                 break
             prev_height = new_height
 
+    async def bulk_expand(self, kinds: Tuple[str, ...] = ("see_more", "comments"), max_expansions: int = 25,
+                          root_selector: Optional[str] = None, viewport_only: bool = True,
+                          settle_ms: int = 400, first_mutation_ms: int = 1500,
+                          timeout_ms: int = 4000) -> Dict[str, Any]:
+        """
+        Expand truncated text and comment threads in one page call.
+        
+        Finds every control of the requested kinds (see EXPANSION_PATTERNS) inside
+        root_selector elements (the whole page if None) that are in the viewport,
+        clicks up to max_expansions of them at once, then waits until no DOM
+        mutation has happened for settle_ms (first_mutation_ms before the first
+        one, timeout_ms overall). One-shot controls (ONE_SHOT_EXPANSIONS) are
+        marked so later rounds never click them twice; comment and "load more"
+        controls can be clicked again on every pass.
+        
+        Returns {"clicked", "by_kind", "mutations", "waited_ms"}.
+        """
+        patterns = {kind: EXPANSION_PATTERNS[kind] for kind in kinds}
+        try:
+            result = await self.page.evaluate(EXPAND_JS, [patterns, list(ONE_SHOT_EXPANSIONS), max_expansions,
+                                                          root_selector, viewport_only, settle_ms,
+                                                          first_mutation_ms, timeout_ms])
+        except Exception as e:
+            logger.warning(f"Bulk expansion failed: {e}")
+            return {"clicked": 0, "by_kind": {}, "mutations": 0, "waited_ms": 0}
+        if result["clicked"]:
+            logger.info(f"Expanded {result['clicked']} controls {result['by_kind']} in {result['waited_ms']}ms")
+        return result
+
     async def click_see_more_buttons(self):
         """Click on 'See more' buttons to expand content"""
-        see_more_buttons = await self.page.query_selector_all('div[role="button"]:text("See more")')
-        
-        # Click each button with error handling
-        for button in see_more_buttons:
-            try:
-                await button.click()
-                await asyncio.sleep(0.5)  # Give time for content to expand
-            except Exception as e:
-                logger.warning(f"Failed to click 'See more' button: {str(e)}")
+        return await self.bulk_expand(kinds=("see_more",), viewport_only=False)
                 
     async def check_for_login_status(self) -> bool:
         """Check if the user is currently logged in to Facebook"""
@@ -85,65 +317,43 @@ class ScraperUtils:
         
         return (user_icon is not None or home_icon is not None) and (login_form is None and login_button is None)
         
+    async def classify_page_state(self) -> Dict[str, Any]:
+        """
+        Classify the current page in one page call.
+        
+        Returns {"state", "evidence", "url", "title"}, where state is one of
+        PAGE_STATES (profile, login, checkpoint, private, not_found, rate_limited,
+        error) and evidence lists the URL parts, visible selectors and phrases that
+        decided it. A page that cannot be read at all is an "error".
+        """
+        try:
+            verdict = await self.page.evaluate(CLASSIFY_PAGE_JS, PAGE_STATE_RULES)
+        except Exception as e:
+            return {"state": "error", "evidence": [f"exception:{e}"], "url": getattr(self.page, "url", ""), "title": ""}
+        if verdict["state"] != "profile":
+            logger.info(f"Page state: {verdict['state']} ({', '.join(verdict['evidence'][:3])})")
+        return verdict
+        
+    async def profile_lock_evidence(self) -> List[str]:
+        """
+        Evidence that the profile itself is locked or private, read from its header.
+        
+        classify_page_state calls a page "private" on phrases anywhere in it (a
+        post or a hidden list can say "only you can see"); this looks only at the
+        block around the profile name. Empty if the header says nothing.
+        """
+        try:
+            return await self.page.evaluate(PROFILE_HEADER_LOCK_JS, PROFILE_LOCK_PHRASES)
+        except Exception as e:
+            logger.debug(f"Could not read the profile header: {e}")
+            return []
+        
     async def check_for_security_checkpoint(self) -> bool:
         """
         Detect if Facebook is showing a security checkpoint or CAPTCHA
         Returns True if security checkpoint detected, False otherwise
         """
-        # Look for common security checkpoint indicators
-        checkpoint_indicators = [
-            'a text containing "Confirm it\'s you"',
-            'a text containing "Security check"', 
-            'a text containing "prove you\'re a person"',
-            'a text containing "confirm your identity"',
-            'a text containing "verify your account"',
-            'a text containing "challenge"',
-            'a text containing "puzzle"',
-            'div[aria-label="Checkpoint"]',
-            'form[action*="checkpoint"]',
-            'img[alt*="captcha"]',
-            'img[src*="captcha"]',
-            'input[name="captcha_response"]',
-            'a[href*="checkpoint"]'
-        ]
-        
-        for indicator in checkpoint_indicators:
-            try:
-                element = None
-                if indicator.startswith('a text'):
-                    # Extract the text to search for
-                    text_to_find = indicator.split('"')[1]
-                    # Use evaluate to find text on the page
-                    has_text = await self.page.evaluate(f'''
-                        () => {{
-                            return document.body.innerText.includes("{text_to_find}")
-                        }}
-                    ''')
-                    if has_text:
-                        logger.info(f"Security checkpoint detected: Page contains text '{text_to_find}'")
-                        return True
-                else:
-                    # Use regular selector
-                    element = await self.page.query_selector(indicator)
-                    if element:
-                        logger.info(f"Security checkpoint detected: Found element matching {indicator}")
-                        return True
-            except Exception as e:
-                logger.debug(f"Error checking for security indicator {indicator}: {str(e)}")
-                
-        # Check for generic indicators like unusual activity messages
-        page_text = await self.page.evaluate('() => document.body.innerText')
-        security_phrases = [
-            "unusual activity", "security check", "captcha", "robot", 
-            "human", "verify", "puzzle", "checkpoint"
-        ]
-        
-        for phrase in security_phrases:
-            if phrase.lower() in page_text.lower():
-                logger.info(f"Security checkpoint detected: Page contains phrase '{phrase}'")
-                return True
-                
-        return False
+        return (await self.classify_page_state())["state"] == "checkpoint"
     
     async def handle_dialogs(self):
         """Set up handlers for unexpected dialogs"""
@@ -193,29 +403,11 @@ class ScraperUtils:
             return False
 
     async def expand_comments(self, max_expansion: int = 3):
-        """Expand comments on posts"""
+        """Expand comments on posts (each pass can reveal further "View more" controls)"""
         for _ in range(max_expansion):
-            # Click "View more comments" buttons
-            more_comments_buttons = await self.page.query_selector_all('div[role="button"]:text-matches("View (more |\\d+ more |)comments")')
-            
-            if not more_comments_buttons:
+            result = await self.bulk_expand(kinds=("comments",), viewport_only=False)
+            if not result["clicked"]:
                 break
-                
-            for button in more_comments_buttons:
-                try:
-                    await button.click()
-                    await asyncio.sleep(1)
-                except:
-                    pass
-                    
-            # Click "Reply" buttons to expand nested comments
-            reply_buttons = await self.page.query_selector_all('div[role="button"]:text("Reply")')
-            for button in reply_buttons:
-                try:
-                    await button.click()
-                    await asyncio.sleep(0.5)
-                except:
-                    pass
 
     def clean_text(self, text: str) -> str:
         """Clean up text content with better Unicode support"""
@@ -362,56 +554,8 @@ class ScraperUtils:
             await self.human_like_delay(1, 3)
     
     async def facebook_security_check(self):
-        """Enhanced security checkpoint detection for international accounts"""
-        security_indicators = [
-            # Standard checkpoints
-            "security checkpoint", "verify your identity", "confirm your identity",
-            "unusual activity", "suspicious activity", "verify it's you",
-            
-            # International login specific
-            "login from a new location", "new device", "different country",
-            "verify this login", "was this you", "approve this login",
-            "location verification", "account security", "protect your account",
-            
-            # Arabic/French variations (for Moroccan accounts)
-            "نقطة أمان", "تأكيد الهوية", "نشاط مشبوه",
-            "point de sécurité", "vérifier votre identité", "activité suspecte"
-        ]
-        
-        try:
-            page_content = await self.page.content()
-            page_text = page_content.lower();
-            
-            # Check for security checkpoint indicators
-            for indicator in security_indicators:
-                if indicator.lower() in page_text:
-                    # Remove verbose checkpoint prints
-                    # print(f"🔒 Security checkpoint detected: {indicator}")
-                    return True
-            
-            # Check for specific security-related selectors
-            security_selectors = [
-                "[data-testid='security_checkpoint']",
-                "[role='dialog'][aria-label*='Security']",
-                "[role='dialog'][aria-label*='Verify']", 
-                "form[action*='checkpoint']",
-                "div[id*='checkpoint']",
-                "button[value='Continue']",
-                "button[value='This Was Me']"
-            ]
-            
-            for selector in security_selectors:
-                if await self.page.is_visible(selector):
-                    # Remove verbose checkpoint prints
-                    # print(f"🔒 Security checkpoint element found: {selector}")
-                    return True
-                    
-            return False
-            
-        except Exception as e:
-            # Remove verbose checkpoint prints
-            # print(f"Error checking for security checkpoint: {e}")
-            return False
+        """Enhanced security checkpoint detection for international accounts (see classify_page_state)"""
+        return await self.check_for_security_checkpoint()
     
     async def handle_security_checkpoint(self, wait_time=300):
         """Enhanced security checkpoint handler for international accounts"""
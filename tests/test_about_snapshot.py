@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for one-pass About extraction
+Parses About snapshots offline with the profile field parsers (text patterns,
+fragment fallbacks, mailto/tel links) and picks the sub-tabs for missing
+fields, then (with Chromium) serves slow About sub-tabs from a local aiohttp
+server and snapshots them side by side in background tabs.
+"""
+import time
+import asyncio
+
+import pytest
+from aiohttp import web
+from playwright.async_api import async_playwright
+
+from scraper.about_snapshot import ABOUT_SETTLE_SECONDS, empty_snapshot, load_about_subtabs, missing_fields, subtabs_for
+from scraper.profile import ProfileScraper
+from scraper.utils import ScraperUtils
+
+TAB_DELAY = 1.0
+
+SUBTAB_HTML = {
+    "about_work_and_education": '<div>Works at Acme Corp</div><div>Studied at Example University</div>',
+    "about_places": '<div>Lives in Casablanca, Morocco</div>',
+    "about_contact_and_basic_info": '<a href="mailto:jane@example.com">jane@example.com</a>'
+                                    '<a href="tel:+212600000000">+212 600 000000</a><div>Birthday: March 3, 1990</div>',
+}
+
+
+def _parse(snapshot):
+    scraper = ProfileScraper(None, ScraperUtils(None))
+    return asyncio.run(scraper._parse_about_snapshot(snapshot))
+
+
+def test_parse_overview_snapshot():
+    snapshot = empty_snapshot("https://www.facebook.com/jane/about")
+    snapshot["text"] = "Jane Doe\nWorks at Acme Corp\nStudied at Example University (2010)\nLives in Casablanca\n" \
+                       "Birthday: March 3, 1990"
+    about = _parse(snapshot)
+    assert about["work"] == "Works at Acme Corp"
+    assert about["education"] == "Example University"
+    assert about["location"] == "Casablanca"
+    assert about["birthday"] == "March 3, 1990"
+    assert missing_fields(about) == ["email", "phone"]
+    assert subtabs_for(missing_fields(about)) == ["about_contact_and_basic_info"]
+
+
+def test_links_and_fragments_fill_gaps():
+    snapshot = empty_snapshot()
+    snapshot["emails"] = ["jane@example.com"]
+    snapshot["phones"] = ["+212600000000"]
+    snapshot["fragments"]["work"] = ["Acme Corp", "Globex"]
+    about = _parse(snapshot)
+    assert about["work"] == "Acme Corp • Globex"
+    assert about["email"] == "jane@example.com" and about["phone"] == "+212600000000"
+    assert subtabs_for(missing_fields(about)) == ["about_work_and_education", "about_places",
+                                                  "about_contact_and_basic_info"]
+
+
+async def _start_server():
+    async def subtab(request):
+        await asyncio.sleep(TAB_DELAY)
+        body = SUBTAB_HTML[request.match_info["section"]]
+        return web.Response(text=f'<html><body><div role="main">{body}</div></body></html>', content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/jane/{section}", subtab)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def _load_subtabs():
+    runner, base_url = await _start_server()
+    try:
+        async with async_playwright() as p:
+            try:
+                browser = await p.chromium.launch(headless=True)
+            except Exception as e:
+                pytest.skip(f"Chromium not available: {e}")
+            context = await browser.new_context()
+            urls = {section: f"{base_url}/jane/{section}" for section in SUBTAB_HTML}
+            start = time.time()
+            snapshots = await load_about_subtabs(context, urls)
+            elapsed = time.time() - start
+            tabs_left = len(context.pages)
+            await browser.close()
+            return snapshots, elapsed, tabs_left
+    finally:
+        await runner.cleanup()
+
+
+def test_subtabs_load_in_parallel():
+    snapshots, elapsed, tabs_left = asyncio.run(_load_subtabs())
+    assert set(snapshots) == set(SUBTAB_HTML)
+    # One tab per section at once: about one delay, not three
+    assert elapsed < 2 * (TAB_DELAY + ABOUT_SETTLE_SECONDS)
+    assert tabs_left == 0
+    contact = _parse(snapshots["about_contact_and_basic_info"])
+    assert contact["email"] == "jane@example.com" and contact["phone"] == "+212600000000"
+    assert contact["birthday"] == "March 3, 1990"
+    assert _parse(snapshots["about_places"])["location"] == "Casablanca, Morocco"
+
+
+if __name__ == "__main__":
+    test_parse_overview_snapshot()
+    test_links_and_fragments_fill_gaps()
+    test_subtabs_load_in_parallel()
+    print("✅ About snapshot tests passed")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk in-page expansion
+Checks the button label patterns offline, then (with Chromium) that one
+bulk_expand call expands every visible post's "See more" and comment thread,
+respects the per-round cap and the viewport, waits for the late comment
+mutations, and clicks a reused "View more comments" control on every pass. The browser part is skipped without Chromium.
+"""
+import re
+import asyncio
+
+import pytest
+from playwright.async_api import async_playwright
+
+from scraper.utils import ScraperUtils, EXPANSION_PATTERNS
+
+FEED_HTML = """
+<html><body style="margin:0">
+<script>
+  function post(n) {
+    return `<div role="article" style="height:150px">
+      <span class="text">Post ${n} starts here…</span>
+      <div role="button" onclick="this.previousElementSibling.textContent = 'Post ${n} full text'">See more</div>
+      <div class="comments"></div>
+      <div role="button" onclick="setTimeout(() => {
+        this.previousElementSibling.insertAdjacentHTML('beforeend', '<div>comment a</div><div>comment b</div>');
+      }, 300)">View more comments</div>
+      <div role="button">Reply</div>
+    </div>`;
+  }
+  document.write(Array.from({length: 4}, (_, n) => post(n)).join(''));
+  document.write('<div style="height:3000px"></div>' + post(99));
+</script>
+</body></html>
+"""
+
+
+def test_label_patterns():
+    def kind(label):
+        return [k for k, p in EXPANSION_PATTERNS.items() if re.search(p, label, re.I)]
+    assert kind("See more") == ["see_more", "load_more"]
+    assert kind("View 12 more comments") == ["comments"]
+    assert kind("View previous comments") == ["comments"]
+    assert kind("View all 3 replies") == ["comments"]
+    assert kind("Reply") == []
+    assert kind("See more of John on Facebook") == []
+
+
+async def _expand(**kwargs):
+    async with async_playwright() as p:
+        try:
+            browser = await p.chromium.launch(headless=True)
+        except Exception as e:
+            pytest.skip(f"Chromium not available: {e}")
+        page = await browser.new_page(viewport={"width": 800, "height": 800})
+        await page.set_content(FEED_HTML)
+        utils = ScraperUtils(page)
+        result = await utils.bulk_expand(root_selector='div[role="article"]', **kwargs)
+        texts = await page.eval_on_selector_all(".text", "els => els.map(e => e.textContent)")
+        comments = await page.eval_on_selector_all(".comments", "els => els.map(e => e.children.length)")
+        again = await utils.bulk_expand(root_selector='div[role="article"]', **kwargs)
+        await browser.close()
+        return result, texts, comments, again
+
+
+async def _expand_comments(max_expansion):
+    async with async_playwright() as p:
+        try:
+            browser = await p.chromium.launch(headless=True)
+        except Exception as e:
+            pytest.skip(f"Chromium not available: {e}")
+        page = await browser.new_page(viewport={"width": 800, "height": 800})
+        await page.set_content(FEED_HTML)
+        await ScraperUtils(page).expand_comments(max_expansion=max_expansion)
+        comments = await page.eval_on_selector_all(".comments", "els => els.map(e => e.children.length)")
+        await browser.close()
+        return comments
+
+
+def test_expands_visible_posts_in_one_call():
+    result, texts, comments, again = asyncio.run(_expand())
+    assert result["clicked"] == 8
+    assert result["by_kind"] == {"see_more": 4, "comments": 4}
+    assert texts[:4] == [f"Post {n} full text" for n in range(4)]
+    assert comments[:4] == [2, 2, 2, 2]
+    # Off-screen post untouched; "See more" is never clicked twice, "View more comments" is
+    assert texts[4] == "Post 99 starts here…" and comments[4] == 0
+    assert again["by_kind"] == {"comments": 4}
+
+
+def test_expand_comments_clicks_the_same_control_each_pass():
+    # Facebook keeps the "View more comments" control in place and loads another page per click
+    assert asyncio.run(_expand_comments(3)) == [6] * 5
+
+
+def test_cap_per_round():
+    result, texts, _, again = asyncio.run(_expand(kinds=("see_more",), max_expansions=2))
+    assert result["clicked"] == 2
+    assert sum(t.endswith("full text") for t in texts) == 2
+    assert again["clicked"] == 2
+
+
+if __name__ == "__main__":
+    test_label_patterns()
+    test_expands_visible_posts_in_one_call()
+    test_cap_per_round()
+    test_expand_comments_clicks_the_same_control_each_pass()
+    print("✅ Bulk expansion tests passed")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for the confidence-based extraction cascade
+Covers early exit and stats, and checks the timestamp cascade picks the same
+value as running every strategy. Runs on HTML snapshots, no browser required.
+"""
+import os
+import asyncio
+
+from scraper.cascade import ExtractionCascade
+from scraper.html_backend import SnapshotPage, _find_post_elements
+from scraper.posts_improved import PostsScraperImproved
+from scraper.utils import ScraperUtils
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+POST_HTML = """
+<html><body>
+  <div role="article">
+    <div dir="auto" style="text-align:start">Happy birthday to my best friend, have a great day! #bday</div>
+    <span>Like</span><span>Comment</span>
+    <a role="link" tabindex="0" href="/posts/1" title="Monday, March 4, 2024 at 10:15 AM">3h</a>
+    <a href="/demo/posts/pfbid0abc" aria-label="3 hours ago">3h</a>
+    <time datetime="2024-03-04T10:15:00">March 4</time>
+  </div>
+</body></html>
+"""
+
+
+def _scraper(threshold=0.8):
+    return PostsScraperImproved(SnapshotPage(""), ScraperUtils(None), content_confidence_threshold=threshold)
+
+
+def test_cascade_early_exit_and_stats():
+    calls = []
+
+    def strategy(name, candidates):
+        async def run(element):
+            calls.append(name)
+            return candidates
+        return run
+
+    cascade = ExtractionCascade("demo", threshold=0.9)
+    cascade.add("weak", strategy("weak", [("a", 0.2)]))
+    cascade.add("strong", strategy("strong", [("b", 0.95), ("c", 0.95)]))
+    cascade.add("never", strategy("never", [("d", 1.0)]))
+
+    assert asyncio.run(cascade.run(None)) == ("b", 0.95)
+    assert calls == ["weak", "strong"]
+
+    report = cascade.report()
+    assert report["early_exits"] == 1
+    assert report["strategies"]["strong"]["wins"] == 1
+    assert report["strategies"]["weak"]["hits"] == 1
+    assert report["strategies"]["never"]["skipped"] == 1
+    assert report["strategies"]["never"]["runs"] == 0
+
+
+def test_content_cascade_skips_after_confident_candidate():
+    scraper = _scraper()
+    page = SnapshotPage(POST_HTML)
+
+    async def run():
+        element = await page.query_selector('div[role="article"]')
+        return await scraper._extract_enhanced_post_content(element)
+
+    content = asyncio.run(run())
+    assert content == "Happy birthday to best friend, have a great day! #bday"
+    report = scraper.content_cascade.report()
+    assert report["early_exits"] == 1
+    assert report["strategies"]["C full text lines"]["skipped"] == 1
+
+
+def test_timestamp_cascade_matches_exhaustive_run():
+    """Early exit on the timestamp cascade never changes the pick"""
+    pages = [SnapshotPage(POST_HTML)]
+    for name in ("fb_profile_sample.html", "debug_facebook_page.html"):
+        with open(os.path.join(ROOT_DIR, name), "r", encoding="utf-8") as f:
+            pages.append(SnapshotPage(f.read()))
+
+    cascading = _scraper(threshold=float("inf"))
+    exhaustive = _scraper(threshold=float("inf"))
+    exhaustive.timestamp_cascade.threshold = float("inf")
+
+    async def run():
+        for page in pages:
+            elements = _find_post_elements(page) + await page.query_selector_all('div[role="article"]')
+            for element in elements:
+                assert await cascading._extract_enhanced_timestamp(element) == \
+                    await exhaustive._extract_enhanced_timestamp(element)
+
+    asyncio.run(run())
+    assert exhaustive.timestamp_cascade.early_exits == 0
+    assert cascading.timestamp_cascade.early_exits >= 1
+
+
+if __name__ == "__main__":
+    test_cascade_early_exit_and_stats()
+    test_content_cascade_skips_after_confident_candidate()
+    test_timestamp_cascade_matches_exhaustive_run()
+    print("✅ Extraction cascade tests passed")
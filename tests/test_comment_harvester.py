@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for permalink comment harvesting
+Normalizes raw in-page comments offline, then (with Chromium) serves post
+permalink pages from a local aiohttp server whose threads load more comments
+on click, and harvests several posts through a two-tab pool: full threads,
+the per-post limit, the tab cap, and streaming into the post records.
+"""
+import asyncio
+
+import pytest
+from aiohttp import web
+from playwright.async_api import async_playwright
+
+from scraper.comment_harvester import CommentHarvester, normalize_comment
+
+POSTS = 5
+COMMENTS_PER_POST = 12
+
+
+def _permalink_html(post, total=COMMENTS_PER_POST, shown=2):
+    comments = "".join(
+        f'<div role="article" aria-label="Comment by User {n}">'
+        f'<a href="/user{n}?__cft__[0]=AZX&amp;__tn__=R">User {n}</a>'
+        f'<div dir="auto">Comment {n} on post {post}</div>'
+        f'<a href="/demo/posts/{post}?comment_id={post}00{n}">{n}h</a></div>'
+        for n in range(total)
+    )
+    return f"""
+    <html><body>
+      <div id="thread">{comments}</div>
+      <div role="button" id="more">View more comments</div>
+      <script>
+        const all = Array.from(document.querySelectorAll('#thread > div'));
+        all.slice({shown}).forEach(c => c.remove());
+        let shown = {shown};
+        document.getElementById('more').onclick = () => setTimeout(() => {{
+          all.slice(shown, shown + 4).forEach(c => document.getElementById('thread').appendChild(c));
+          shown += 4;
+          if (shown >= all.length) document.getElementById('more').remove();
+        }}, 100);
+      </script>
+    </body></html>
+    """
+
+
+async def _start_server():
+    async def post(request):
+        await asyncio.sleep(0.2)
+        return web.Response(text=_permalink_html(request.match_info["post_id"]), content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/demo/posts/{post_id}", post)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_normalize_comment():
+    comment = normalize_comment({
+        "author": "Jane Doe", "profile_url": "/jane.doe?__cft__[0]=AZX&__tn__=R",
+        "text": "Great  photo!", "timestamp": "2h",
+        "permalink": "/demo/posts/1234567890123456?comment_id=998877", "is_reply": False,
+    })
+    assert comment == {
+        "id": "998877",
+        "commenter": {"name": "Jane Doe", "profile_url": "https://www.facebook.com/jane.doe"},
+        "comment_text": "Great photo!", "timestamp": "2h", "is_reply": False,
+    }
+    assert normalize_comment({"profile_url": "/profile.php?id=100004567890123&__tn__=R",
+                              "text": "hi"})["commenter"]["profile_url"] == \
+        "https://www.facebook.com/profile.php?id=100004567890123"
+    assert normalize_comment({"author": "Jane", "text": "  "}) is None
+
+
+async def _harvest(max_comments_per_post):
+    runner, base_url = await _start_server()
+    try:
+        async with async_playwright() as p:
+            try:
+                browser = await p.chromium.launch(headless=True)
+            except Exception as e:
+                pytest.skip(f"Chromium not available: {e}")
+            context = await browser.new_context()
+            harvester = CommentHarvester(context, concurrency=2, max_comments_per_post=max_comments_per_post)
+            posts = [{"id": str(n), "original_url": f"{base_url}/demo/posts/{n}", "comments": []}
+                     for n in range(POSTS)]
+            for post in posts:
+                assert harvester.submit(post)
+            assert not harvester.submit(posts[0])
+            await harvester.drain(timeout=60)
+            tabs_used = len(context.pages)
+            await browser.close()
+            return posts, harvester, tabs_used
+    finally:
+        await runner.cleanup()
+
+
+def test_full_threads_stream_into_posts():
+    posts, harvester, _ = asyncio.run(_harvest(max_comments_per_post=50))
+    for post in posts:
+        assert [c["comment_text"] for c in post["comments"]] == \
+            [f"Comment {n} on post {post['id']}" for n in range(COMMENTS_PER_POST)]
+        assert post["comments_count"] == COMMENTS_PER_POST
+        assert post["comments"][0]["commenter"]["profile_url"].endswith("/user0")
+    report = harvester.report()
+    assert report["posts_with_comments"] == POSTS and report["failed"] == 0
+    # Copied records (e.g. after GraphQL merging) pick the threads up by ID
+    copies = [{"id": post["id"]} for post in posts]
+    assert harvester.apply(copies) == POSTS and copies[0]["comments"] == posts[0]["comments"]
+
+
+def test_per_post_limit():
+    posts, _, tabs_used = asyncio.run(_harvest(max_comments_per_post=6))
+    assert all(len(post["comments"]) == 6 for post in posts)
+    # Tabs are closed once the harvest is drained
+    assert tabs_used == 0
+
+
+if __name__ == "__main__":
+    test_normalize_comment()
+    test_full_threads_stream_into_posts()
+    test_per_post_limit()
+    print("✅ Comment harvester tests passed")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script for DOM pruning of extracted posts
+Checks pruned posts keep their height, lose their subtree and drop out of
+the extraction selectors, along with anything nested inside them. The browser part is skipped without Chromium.
+"""
+import asyncio
+
+import pytest
+from playwright.async_api import async_playwright
+
+from scraper.dom_pruning import DomPruner, unpruned, PRUNED_ATTR
+
+FEED_HTML = """
+<html><body>
+  <div role="article" style="height:300px"><span>First post</span><img src="data:image/gif;base64,R0lGODlhAQABAAAAACw=">
+    <div role="article"><span>A comment on the first post</span></div></div>
+  <div role="article" style="height:250px"><span>Second post</span></div>
+  <div role="article"><span>Third post, not extracted yet</span></div>
+</body></html>
+"""
+
+
+def test_selector_and_mode_validation():
+    assert unpruned('div[role="article"]') == f'div[role="article"]:not([{PRUNED_ATTR}]):not([{PRUNED_ATTR}] *)'
+    with pytest.raises(ValueError):
+        DomPruner(page=None, mode="detach")
+
+
+async def _prune(mode):
+    async with async_playwright() as p:
+        try:
+            browser = await p.chromium.launch(headless=True)
+        except Exception as e:
+            pytest.skip(f"Chromium not available: {e}")
+        page = await browser.new_page()
+        await page.set_content(FEED_HTML)
+
+        before_height = await page.evaluate("document.body.scrollHeight")
+        articles = await page.query_selector_all('body > div[role="article"]')
+        pruner = DomPruner(page, mode)
+        assert await pruner.prune(articles[:2]) == 2
+        # Pruning twice is a no-op
+        assert await pruner.prune(articles[:2]) == 0
+
+        after_height = await page.evaluate("document.body.scrollHeight")
+        remaining = await page.query_selector_all(unpruned('div[role="article"]'))
+        first_children = await articles[0].evaluate("el => el.children.length")
+        img_src = await page.evaluate("document.querySelector('img') && document.querySelector('img').getAttribute('src')")
+        await browser.close()
+        return before_height, after_height, len(remaining), first_children, img_src, pruner.report()
+
+
+def test_prune_keeps_height_and_skips_pruned_posts():
+    for mode in ("empty", "hide"):
+        before, after, remaining, children, img_src, report = asyncio.run(_prune(mode))
+        assert after == before
+        assert remaining == 1
+        assert report["posts_pruned"] == 2
+        if mode == "empty":
+            assert children == 0
+        else:
+            # Hidden posts keep their nodes, but nothing inside them matches any more
+            assert children == 3 and img_src is None
+
+
+if __name__ == "__main__":
+    test_selector_and_mode_validation()
+    test_prune_keeps_height_and_skips_pruned_posts()
+    print("✅ DOM pruning tests passed")
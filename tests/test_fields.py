@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for field projection
+Checks fields spec parsing, that unrequested post extractors and profile
+sections never run (offline, on the bundled HTML sample), and the per-field
+cost report.
+"""
+import os
+import asyncio
+
+import pytest
+
+from scraper.fields import FieldCostTracker, parse_fields, POST_FIELDS, PROFILE_SECTIONS
+from scraper.html_backend import SnapshotPage
+from scraper.posts_improved import PostsScraperImproved, POST_CONTAINER_SELECTORS
+from scraper.profile import ProfileScraper
+from scraper.utils import ScraperUtils
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_parse_fields():
+    assert parse_fields(None) == (frozenset(POST_FIELDS), frozenset(PROFILE_SECTIONS))
+    assert parse_fields("content,timestamp") == (frozenset({"timestamp"}), frozenset(PROFILE_SECTIONS))
+    assert parse_fields("friends") == (frozenset(POST_FIELDS), frozenset({"friends"}))
+    assert parse_fields(["content", "groups"]) == (frozenset(), frozenset({"groups"}))
+    with pytest.raises(ValueError):
+        parse_fields("content,likes")
+
+
+def _extract_sample_posts(fields):
+    async def run():
+        with open(os.path.join(ROOT_DIR, "fb_profile_sample.html"), "r", encoding="utf-8") as f:
+            page = SnapshotPage(f.read())
+        tracker = FieldCostTracker(baseline_path=None)
+        scraper = PostsScraperImproved(page, ScraperUtils(None), fields=fields, cost_tracker=tracker)
+        elements = []
+        for selector in POST_CONTAINER_SELECTORS:
+            matches = await page.query_selector_all(selector)
+            if len(matches) > len(elements):
+                elements = matches
+        posts = [await scraper._extract_comprehensive_post_data(el) for el in elements[:10]]
+        return posts, tracker
+    return asyncio.run(run())
+
+
+def test_unrequested_post_fields_are_not_extracted():
+    posts, tracker = _extract_sample_posts("content,timestamp")
+    assert posts
+    assert set(tracker.calls) == {"id", "content", "original_url", "timestamp"}
+    assert all(p["reactions"] == {} and p["media"] == [] and p["comments"] == [] for p in posts)
+
+    full_posts, full_tracker = _extract_sample_posts(None)
+    assert set(full_tracker.calls) == {"id", "content", "original_url", *POST_FIELDS}
+    assert [p["id"] for p in posts] == [p["id"] for p in full_posts]
+
+
+def test_unrequested_profile_sections_are_skipped():
+    async def run():
+        tracker = FieldCostTracker(baseline_path=None)
+        scraper = ProfileScraper(SnapshotPage("<html></html>"), ScraperUtils(None), fields="friends", cost_tracker=tracker)
+        ran = []
+
+        async def extractor():
+            ran.append(True)
+            return [{"name": "Friend"}]
+
+        friends = await scraper._extract_section("friends", extractor, [])
+        groups = await scraper._extract_section("groups", extractor, [])
+        return friends, groups, ran, tracker
+    friends, groups, ran, tracker = asyncio.run(run())
+    assert friends == [{"name": "Friend"}] and groups == [] and len(ran) == 1
+    assert set(tracker.calls) == {"friends"}
+
+
+def test_cost_report_and_baseline(tmp_path):
+    baseline = str(tmp_path / "field_costs.json")
+    tracker = FieldCostTracker(baseline_path=baseline)
+    tracker.seconds.update({"reactions": 2.0, "friends": 12.0})
+    tracker.calls.update({"reactions": 40, "friends": 1})
+    tracker.save_baseline()
+
+    report = FieldCostTracker(baseline_path=baseline).report({"reactions": 20, "friends": 1, "media": 20})
+    assert report["estimated_seconds_saved"] == {"reactions": 1.0, "friends": 12.0, "media": None}
+    assert report["total_estimated_seconds_saved"] == 13.0
+    assert report["skipped"] == ["friends", "media", "reactions"]
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    test_parse_fields()
+    test_unrequested_post_fields_are_not_extracted()
+    test_unrequested_profile_sections_are_skipped()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_cost_report_and_baseline(Path(tmp))
+    print("✅ Field projection tests passed")
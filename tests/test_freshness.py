@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script for section-level freshness
+Splits a scrape into sections, stores them with their scrape time, finds
+the stale ones from the per-section TTLs, merges a partial refresh over the
+stored rest, and reports each section's age. Sections whose extraction
+failed are reported by the profile scraper so they are never stored as
+fresh.
+"""
+import os
+import asyncio
+import tempfile
+
+from scraper.freshness import SECTION_TTLS, SectionStore, join_sections, split_sections
+from scraper.profile import ProfileScraper
+
+SCRAPE = {
+    "profile": {
+        "name": "Jane Doe", "bio": "Hi",
+        "about": {"work": "ACME", "education": "", "location": "Rabat", "birthday": "",
+                  "contact": {"email": "", "phone": ""}},
+        "friends": [{"name": "Bob", "profile_url": "https://www.facebook.com/bob", "bio": ""}],
+        "pages_followed": [], "following": [], "groups": [],
+    },
+    "posts": {"own_posts": [{"id": "1", "content": "first"}]},
+}
+
+
+def test_split_and_join():
+    sections = split_sections(SCRAPE)
+    assert sections["basics"] == {"name": "Jane Doe", "bio": "Hi"}
+    assert sections["about"]["location"] == "Rabat" and sections["posts"] == SCRAPE["posts"]
+    assert join_sections(sections) == SCRAPE
+    # A failed scrape stores nothing
+    assert split_sections({"profile": {}, "posts": {}}) == {}
+
+
+def test_stale_sections_and_partial_refresh():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SectionStore(tmp)
+        assert store.stale_sections("jane.doe") == list(SECTION_TTLS)
+
+        store.update("jane.doe", split_sections(SCRAPE), now=1000)
+        hour, day = 3600, 24 * 3600
+        assert store.stale_sections("jane.doe", now=1000 + hour) == ["posts"]
+        assert store.stale_sections(["100004567890123", "jane.doe"], now=1000 + day) == \
+            ["basics", "friends", "posts"]
+        assert store.stale_sections("jane.doe", ["about", "groups"], now=1000 + day) == []
+
+        # Refresh posts only: the rest keeps its data and its age
+        fresh_posts = {"own_posts": [{"id": "2", "content": "second"}]}
+        stored = store.update("jane.doe", {"posts": fresh_posts}, now=1000 + hour)
+        merged = join_sections(SectionStore.data(stored))
+        assert merged["posts"] == fresh_posts and merged["profile"]["friends"] == SCRAPE["profile"]["friends"]
+        ages = SectionStore.ages(stored, now=1000 + hour + 60)
+        assert ages["posts"] == 60 and ages["about"] == hour + 60
+        assert not [name for name in os.listdir(tmp) if name.endswith(".tmp")]
+
+
+def test_stored_under_alias():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SectionStore(tmp, ttls={"posts": 60})
+        store.update("100004567890123", {"posts": {}}, now=1000)
+        # The profile's vanity name was learned since: the new key carries the old sections
+        stored = store.update("jane.doe", {"basics": {"name": "Jane"}}, now=1030,
+                              aliases=["jane.doe", "100004567890123"])
+        assert sorted(stored) == ["basics", "posts"]
+        assert store.stale_sections("jane.doe", ["basics", "posts"], now=1070) == ["posts"]
+
+
+class ScriptedUtils:
+    """Stands in for ScraperUtils"""
+
+    def clean_text(self, text):
+        return text
+
+
+def _scraper(**extractors):
+    scraper = ProfileScraper(None, ScriptedUtils())
+
+    async def returns(value):
+        return value
+
+    scraper._extract_profile_name = lambda: returns("Jane Doe")
+    scraper._extract_profile_bio = lambda: returns("Hi")
+    scraper._extract_about_info_enhanced = lambda: returns({})
+    for name in ("friends_summary", "pages_followed", "following_list", "groups_list"):
+        setattr(scraper, f"_extract_{name}", lambda: returns([]))
+    for name, extractor in extractors.items():
+        setattr(scraper, f"_extract_{name}", extractor)
+    return scraper
+
+
+def test_failed_sections_are_reported():
+    async def broken():
+        raise RuntimeError("groups page did not load")
+
+    scraper = _scraper(groups_list=broken)
+    profile = asyncio.run(scraper.get_basic_info())
+    assert profile["name"] == "Jane Doe" and profile["groups"] == []
+    assert scraper.section_errors == {"groups": "groups page did not load"}
+
+    # The placeholder profile of a failed get_basic_info is not data of any section
+    scraper = _scraper(profile_bio=broken)
+    profile = asyncio.run(scraper.get_basic_info())
+    assert profile["name"] == "Unknown"
+    assert set(scraper.section_errors) == {"basics", "about", "friends", "pages_followed", "following", "groups"}
+
+    # Success clears the errors of the last run
+    scraper._extract_profile_bio = _scraper()._extract_profile_bio
+    asyncio.run(scraper.get_basic_info())
+    assert scraper.section_errors == {}
+
+
+if __name__ == "__main__":
+    test_split_and_join()
+    test_stale_sections_and_partial_refresh()
+    test_stored_under_alias()
+    test_failed_sections_are_reported()
+    print("✅ Freshness tests passed")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for the friend-graph crawler
+Crawls a scripted friend graph with two accounts (no browser): depth limits,
+deduplication across accounts, the on-disk frontier and edge files, the total
+budget, resuming an interrupted crawl, retries, the per-account rate limit
+and the time budget, and private friends lists.
+"""
+import os
+import json
+import asyncio
+import tempfile
+
+from scraper.graph_crawler import AccountLimiter, CrawlFrontier, GraphCrawler
+
+# seed -> friends -> friends of friends
+GRAPH = {
+    "alice": ["bob", "carol", "dave"],
+    "bob": ["alice", "carol", "erin"],
+    "carol": ["alice", "bob", "frank"],
+    "dave": ["alice", "grace"],
+    "erin": ["bob", "heidi"],
+}
+
+
+class ScriptedScraper:
+    """Stands in for ProfileScraper: friends lists come from GRAPH"""
+
+    def __init__(self, fail_once=(), private=()):
+        self.expanded = []
+        self.fail_once = set(fail_once)
+        self.private = set(private)
+        self.list_metrics = {}
+        self.current = None
+
+    def use_profile(self, username):
+        self.current = username.rstrip("/").rsplit("/", 1)[-1]
+
+    async def get_friends_list(self, max_friends=None):
+        await asyncio.sleep(0.01)
+        if self.current in self.fail_once:
+            self.fail_once.discard(self.current)
+            return []
+        self.expanded.append(self.current)
+        if self.current in self.private:
+            self.list_metrics["friends"] = {"items": 0, "private": True}
+            return []
+        self.list_metrics["friends"] = {"items": len(GRAPH.get(self.current, []))}
+        return [{"name": name.title(), "profile_url": f"https://www.facebook.com/{name}", "bio": ""}
+                for name in GRAPH.get(self.current, [])][:max_friends]
+
+
+def _crawl(crawl_dir, scrapers, seeds=("alice",), **kwargs):
+    crawler = GraphCrawler(scrapers, crawl_dir, min_interval=0, **kwargs)
+    crawler.seed(seeds)
+    return crawler, asyncio.run(crawler.run())
+
+
+def _edges(crawl_dir):
+    with open(os.path.join(crawl_dir, "edges.jsonl"), encoding="utf-8") as f:
+        return {(e["source"], e["target"]) for e in map(json.loads, f)}
+
+
+def test_depth_two_with_two_accounts():
+    with tempfile.TemporaryDirectory() as tmp:
+        scrapers = {"one": ScriptedScraper(), "two": ScriptedScraper()}
+        crawler, report = _crawl(tmp, scrapers)
+        expanded = scrapers["one"].expanded + scrapers["two"].expanded
+        # The seed and its friends are expanded exactly once each
+        assert sorted(expanded) == ["alice", "bob", "carol", "dave"]
+        assert all(scrapers[account].expanded for account in scrapers)
+        assert report["stop_reason"] == "exhausted"
+        assert report["frontier"] == {"pending": 0, "in_progress": 0, "done": 4, "failed": 0}
+        # Friends of friends appear as edges only
+        assert ("bob", "erin") in _edges(tmp) and ("dave", "grace") in _edges(tmp)
+        assert "erin" not in crawler.frontier.nodes
+
+
+def test_budget_and_resume():
+    with tempfile.TemporaryDirectory() as tmp:
+        first = {"one": ScriptedScraper()}
+        _, report = _crawl(tmp, first, max_profiles=2)
+        assert report["stop_reason"] == "max_profiles" and len(first["one"].expanded) == 2
+
+        # A new run with the same directory picks up the saved frontier
+        second = {"one": ScriptedScraper()}
+        _, report = _crawl(tmp, second, seeds=(), max_profiles=10)
+        assert sorted(first["one"].expanded + second["one"].expanded) == ["alice", "bob", "carol", "dave"]
+        assert report["frontier"]["done"] == 4
+
+
+def test_interrupted_profiles_are_retaken():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "frontier.jsonl")
+        frontier = CrawlFrontier(path)
+        frontier.add("alice", "https://www.facebook.com/alice", 0)
+        frontier.add("bob", "https://www.facebook.com/bob", 1, parent="alice")
+        assert frontier.next()["key"] == "alice"
+        frontier.close()
+        resumed = CrawlFrontier(path)
+        assert resumed.stats() == {"pending": 2, "in_progress": 0, "done": 0, "failed": 0}
+        assert not resumed.add("bob", "https://www.facebook.com/bob", 1)
+
+
+def test_failed_expansion_is_retried():
+    with tempfile.TemporaryDirectory() as tmp:
+        scrapers = {"one": ScriptedScraper(fail_once={"bob"})}
+        _, report = _crawl(tmp, scrapers)
+        assert scrapers["one"].expanded.count("bob") == 1
+        assert report["frontier"]["done"] == 4 and report["frontier"]["failed"] == 0
+
+
+def test_account_limiter():
+    limiter = AccountLimiter(min_interval=30, max_per_hour=2)
+    assert limiter.delay(now=1000) == 0
+    limiter._starts.extend([1000, 1040])
+    assert limiter.delay(now=1050) == 3550
+    assert limiter.delay(now=4601) == 0
+    limiter = AccountLimiter(min_interval=30)
+    limiter._starts.append(1000)
+    assert limiter.delay(now=1010) == 20
+
+
+def test_rate_limit_past_time_budget_returns_profile():
+    with tempfile.TemporaryDirectory() as tmp:
+        scrapers = {"one": ScriptedScraper()}
+        crawler = GraphCrawler(scrapers, tmp, min_interval=3600, max_seconds=60)
+        crawler.seed(["alice", "bob"])
+        report = asyncio.run(asyncio.wait_for(crawler.run(), timeout=5))
+        # alice is expanded; bob would wait an hour, so it goes back to the frontier unattempted
+        assert scrapers["one"].expanded == ["alice"]
+        assert report["stop_reason"] == "time_budget"
+        assert crawler.frontier.nodes["bob"]["status"] == "pending" and crawler.frontier.nodes["bob"]["attempts"] == 0
+        assert CrawlFrontier(crawler.frontier.path).nodes["bob"]["status"] == "pending"
+
+
+def test_private_friends_list_is_done():
+    with tempfile.TemporaryDirectory() as tmp:
+        scrapers = {"one": ScriptedScraper(private={"alice"})}
+        _, report = _crawl(tmp, scrapers)
+        assert report["frontier"] == {"pending": 0, "in_progress": 0, "done": 1, "failed": 0}
+
+
+if __name__ == "__main__":
+    test_depth_two_with_two_accounts()
+    test_budget_and_resume()
+    test_interrupted_profiles_are_retaken()
+    test_failed_expansion_is_retried()
+    test_account_limiter()
+    test_rate_limit_past_time_budget_returns_profile()
+    test_private_friends_list_is_done()
+    print("✅ Graph crawler tests passed")
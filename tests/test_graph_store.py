@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test script for the compact friend-graph store
+Merges friendships in several batches (duplicates, both directions,
+self-loops, new profiles), checks neighbor, degree and mutual-friend
+queries, and reopens the memory-mapped arrays from disk. Also merges a
+crawler edges file and a scraped friends list, and merges the nodes of a
+profile first seen by its numeric ID and later by its vanity name. Two
+store instances on one directory (the API server and a crawl) keep each
+other's merges.
+"""
+import os
+import json
+import tempfile
+
+import numpy as np
+
+from scraper.graph_store import GraphStore
+from scraper.identity import IdentityResolver
+
+
+def test_merge_and_queries():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = GraphStore(tmp)
+        assert store.stats()["profiles"] == 0 and store.neighbors("alice") == []
+
+        added = store.merge([("alice", "bob"), ("alice", "carol"), ("bob", "alice"), ("bob", "carol"),
+                             ("alice", "alice")])
+        assert added == 3 and store.node_count == 3
+        assert store.neighbors("alice") == ["bob", "carol"]
+        assert store.degree("carol") == 2
+
+        # A later batch interns new profiles and skips known friendships
+        assert store.merge([("carol", "dave"), ("alice", "dave"), ("carol", "alice")]) == 2
+        assert store.neighbors("dave") == ["alice", "carol"]
+        assert store.mutual_friends("bob", "dave") == ["alice", "carol"]
+        assert store.mutual_friends("alice", "nobody") == []
+        assert store.neighbors("alice", limit=2) == ["bob", "carol"]
+
+        # Rows stay sorted so intersections can assume unique sorted input
+        for i in range(store.node_count):
+            row = store.indices[store.indptr[i]:store.indptr[i + 1]]
+            assert np.all(np.diff(row) > 0)
+
+        stats = store.stats()
+        assert stats["profiles"] == 4 and stats["friendships"] == 5 and stats["max_degree"] == 3
+
+
+def test_reopen_from_disk():
+    with tempfile.TemporaryDirectory() as tmp:
+        GraphStore(tmp).merge([("alice", "bob"), ("bob", "carol")])
+        reopened = GraphStore(tmp)
+        assert isinstance(reopened.indices, np.memmap)
+        assert reopened.neighbors("bob") == ["alice", "carol"]
+        assert reopened.merge([("carol", "erin")]) == 1
+        assert GraphStore(tmp).degree("carol") == 2
+        assert not [name for name in os.listdir(tmp) if name.endswith(".tmp")]
+
+
+def test_merge_crawl_edges_and_friends_list():
+    with tempfile.TemporaryDirectory() as tmp:
+        edges_path = os.path.join(tmp, "edges.jsonl")
+        with open(edges_path, "w", encoding="utf-8") as f:
+            for source, target in [("alice", "bob"), ("alice", "carol"), ("alice", "bob")]:
+                f.write(json.dumps({"source": source, "target": target, "depth": 0}) + "\n")
+        store = GraphStore(os.path.join(tmp, "graph"))
+        assert store.merge_jsonl(edges_path) == 2
+
+        resolver = IdentityResolver()
+        resolver.learn("dave", "100004567890123")
+        friends = [{"name": "Bob", "profile_url": "https://www.facebook.com/bob"},
+                   {"name": "Dave", "profile_url": "https://www.facebook.com/profile.php?id=100004567890123"},
+                   {"name": "Group", "profile_url": "https://www.facebook.com/groups/123"}]
+        assert store.merge_friends("carol", friends, resolver) == 2
+        assert store.neighbors("carol") == ["alice", "bob", "dave"]
+        assert store.mutual_friends("alice", "bob") == ["carol"]
+
+
+def test_profile_keeps_one_node_across_key_change():
+    with tempfile.TemporaryDirectory() as tmp:
+        numeric_id = "100004567890123"
+        resolver = IdentityResolver()
+        store = GraphStore(tmp)
+        # Crawled before the vanity name was known: the key is the numeric ID
+        store.merge_friends(resolver.resolve(numeric_id).aliases,
+                            [{"profile_url": "https://www.facebook.com/alice"}], resolver)
+        resolver.learn("dave", numeric_id)
+        # Scraped again under the vanity name
+        store.merge_friends(resolver.resolve("dave").aliases,
+                            [{"profile_url": "https://www.facebook.com/bob"}], resolver)
+        store.merge([("alice", "bob")])
+        assert store.node_count == 3
+        assert store.neighbors("dave") == store.neighbors(numeric_id) == ["alice", "bob"]
+        assert store.key(numeric_id) == "dave"
+        assert store.mutual_friends("alice", "bob") == ["dave"]
+
+        # Two nodes stored under each alias before the pair was learned are merged into one
+        store.merge([("100000000000001", "carol"), ("erin", "frank")])
+        resolver.learn("erin", "100000000000001")
+        store.merge([(resolver.resolve("erin").aliases, "bob")])
+        reopened = GraphStore(tmp)
+        assert reopened.node_count == 6
+        assert reopened.neighbors("100000000000001") == ["bob", "carol", "frank"]
+        assert reopened.key("100000000000001") == "erin"
+        for i in range(reopened.node_count):
+            row = reopened.indices[reopened.indptr[i]:reopened.indptr[i + 1]]
+            assert np.all(np.diff(row) > 0)
+
+
+def test_concurrent_writers_keep_each_others_edges():
+    with tempfile.TemporaryDirectory() as tmp:
+        server = GraphStore(tmp)
+        server.merge([("alice", "bob")])
+        crawl = GraphStore(tmp)
+        crawl.merge([("carol", "dave")])
+        # The server's copy is stale: it reloads before merging instead of overwriting the crawl's edges
+        assert server.merge([("alice", "erin")]) == 1
+        reopened = GraphStore(tmp)
+        assert reopened.edge_count == 3 and reopened.neighbors("carol") == ["dave"]
+        assert crawl.refresh() and crawl.neighbors("alice") == ["bob", "erin"]
+        assert not crawl.refresh()
+        # Only the current version and the one before it are kept
+        assert len([name for name in os.listdir(tmp) if name.startswith("v")]) == 2
+
+
+if __name__ == "__main__":
+    test_merge_and_queries()
+    test_reopen_from_disk()
+    test_merge_crawl_edges_and_friends_list()
+    test_profile_keeps_one_node_across_key_change()
+    test_concurrent_writers_keep_each_others_edges()
+    print("✅ Graph store tests passed")
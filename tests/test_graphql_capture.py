@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test script for GraphQL response capture
+Parses recorded timeline payloads from tests/fixtures, merges them with DOM
+results, and (when Chromium is available) serves the fixtures through
+route.fulfill to a local stand-in page to exercise the live listener.
+"""
+import os
+import json
+import asyncio
+from urllib.parse import parse_qs
+
+import pytest
+from playwright.async_api import async_playwright
+
+from scraper.graphql_capture import GraphQLCapture, parse_graphql_payload, find_page_info
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_parse_streamed_payload():
+    posts = parse_graphql_payload(_fixture("graphql_timeline_page1.txt"))
+    assert [p["post_id"] for p in posts] == ["101000222333444", "102000222333444"]
+
+    first = posts[0]
+    assert first["content"] == "Happy birthday to my best friend, have a great day! #bday"
+    assert first["timestamp"] == "2024-03-04 10:15:00"
+    assert first["original_url"].endswith("/posts/pfbid0AbCdEf123456789xyz")
+    assert first["actors"][0]["name"] == "Srikanth Chellaboina"
+    assert first["reactions"] == {"total": 42}
+    assert first["comments_count"] == 7 and first["shares_count"] == 1
+    assert first["media"][0]["type"] == "image" and first["media"][0]["description"].startswith("May be")
+
+    assert [m["type"] for m in posts[1]["media"]] == ["image", "video"]
+    assert find_page_info(_fixture("graphql_timeline_page1.txt")) == {"end_cursor": "CURSOR_PAGE_2", "has_next_page": True}
+
+
+def test_shared_story_is_not_a_separate_post():
+    posts = parse_graphql_payload(_fixture("graphql_timeline_page2.txt"))
+    assert len(posts) == 1
+    assert posts[0]["shared"] is True
+    assert posts[0]["shared_content"] == "Original post being shared"
+    assert posts[0]["original_poster"] == "Tech News Daily"
+
+
+def test_merge_with_dom():
+    capture = GraphQLCapture(page=None)
+    capture.ingest(_fixture("graphql_timeline_page1.txt"))
+    capture.ingest(_fixture("graphql_timeline_page2.txt"))
+
+    dom_posts = [
+        {"id": "a1b2c3d4e5f6", "timestamp": "3h", "content": "Happy birthday to best friend, have a great day! #bday",
+         "original_url": "https://www.facebook.com/srikanth767/posts/pfbid0AbCdEf123456789xyz?__cft__=x",
+         "media": [], "reactions": {"total": 40}, "comments_count": 0, "shares_count": 0},
+        {"id": "ffffffffffff", "timestamp": "", "content": "A post GraphQL never returned, with some text.",
+         "original_url": "", "media": [], "reactions": {"total": 0}, "comments_count": 0, "shares_count": 0},
+    ]
+    merged = capture.merge_with_dom(dom_posts)
+
+    assert len(merged) == 4
+    assert merged[0]["id"] == "a1b2c3d4e5f6"
+    assert merged[0]["timestamp"] == "2024-03-04 10:15:00"
+    assert merged[0]["reactions"]["total"] == 42 and merged[0]["comments_count"] == 7
+    assert len(merged[0]["media"]) == 1
+    assert merged[1]["content"] == "A post GraphQL never returned, with some text."
+    assert {p["post_id"] for p in merged[2:]} == {"102000222333444", "103000222333444"}
+    # The DOM input is not modified
+    assert dom_posts[0]["timestamp"] == "3h"
+
+
+def test_merge_is_newest_first():
+    capture = GraphQLCapture(page=None)
+    capture.ingest(_fixture("graphql_timeline_page1.txt"))
+    newest = dict(next(iter(capture.records.values())), id="900", post_id="900", story_id="",
+                  original_url="", content="Posted after the DOM was read, only seen in GraphQL.",
+                  creation_time=4102444800)
+    capture.records["900"] = newest
+    dom_posts = [
+        {"id": "a1b2c3d4e5f6", "timestamp": "3h", "content": "Happy birthday to best friend, have a great day! #bday",
+         "original_url": "https://www.facebook.com/srikanth767/posts/pfbid0AbCdEf123456789xyz"},
+        {"id": "ffffffffffff", "timestamp": "", "content": "A post GraphQL never returned, with some text.",
+         "original_url": ""},
+    ]
+    merged = capture.merge_with_dom(dom_posts)
+    # The newer GraphQL-only post leads, so truncating keeps it
+    assert merged[0]["post_id"] == "900"
+    assert [p["id"] for p in merged[1:3]] == ["a1b2c3d4e5f6", "ffffffffffff"]
+    times = [p.get("creation_time", 0) for p in merged if p.get("creation_time")]
+    assert times == sorted(times, reverse=True)
+
+
+STAND_IN_HTML = """
+<html><body><div id="feed"></div>
+<script>
+  async function loadPage(cursor) {
+    const body = new URLSearchParams({
+      doc_id: '1234567890',
+      fb_api_req_friendly_name: 'ProfileCometTimelineFeedRefetchQuery',
+      variables: JSON.stringify({cursor: cursor, count: 3, id: '100004567890123'})
+    });
+    await fetch('/api/graphql/', {method: 'POST', body: body});
+  }
+  window.loadTwoPages = async () => { await loadPage(null); await loadPage('CURSOR_PAGE_2'); };
+</script>
+</body></html>
+"""
+
+
+async def _capture_through_route():
+    async with async_playwright() as p:
+        try:
+            browser = await p.chromium.launch(headless=True)
+        except Exception as e:
+            pytest.skip(f"Chromium not available: {e}")
+        page = await browser.new_page()
+
+        async def handle(route):
+            request = route.request
+            if "/api/graphql" in request.url:
+                form = parse_qs(request.post_data or "")
+                variables = json.loads(form.get("variables", ["{}"])[0])
+                name = "graphql_timeline_page2.txt" if variables.get("cursor") else "graphql_timeline_page1.txt"
+                await route.fulfill(status=200, content_type="text/html", body=_fixture(name))
+            else:
+                await route.fulfill(status=200, content_type="text/html", body=STAND_IN_HTML)
+
+        await page.route("https://www.facebook.com/**", handle)
+        capture = GraphQLCapture(page)
+        capture.start()
+        await page.goto("https://www.facebook.com/srikanth767")
+        await page.evaluate("window.loadTwoPages()")
+        await capture.flush()
+        capture.stop()
+        await browser.close()
+        return capture
+
+
+def test_capture_from_live_responses():
+    capture = asyncio.run(_capture_through_route())
+    assert len(capture.posts) == 3
+    assert capture.cursor == "CURSOR_PAGE_3" and not capture.has_next_page
+    assert capture.last_request["doc_id"] == "1234567890"
+    assert capture.last_request["variables"]["cursor"] == "CURSOR_PAGE_2"
+
+
+if __name__ == "__main__":
+    test_parse_streamed_payload()
+    test_shared_story_is_not_a_separate_post()
+    test_merge_with_dom()
+    test_merge_is_newest_first()
+    test_capture_from_live_responses()
+    print("✅ GraphQL capture tests passed")
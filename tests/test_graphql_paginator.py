@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Test script for cursor-based GraphQL pagination
+Runs a local aiohttp stand-in for /api/graphql that serves canned timeline
+pages keyed by cursor, then pages through 200 posts without scrolling.
+The in-page fetch path is exercised with Chromium when available; otherwise
+the paginator is driven through a plain HTTP page adapter.
+"""
+import json
+import time
+import asyncio
+from types import SimpleNamespace
+from urllib.parse import urlencode
+
+import aiohttp
+import pytest
+from aiohttp import web
+from playwright.async_api import async_playwright
+
+from scraper.graphql_capture import GraphQLCapture
+from scraper.graphql_paginator import GraphQLPaginator, FetchLimiter, FETCH_JS
+
+PAGE_SIZE = 20
+TOTAL_PAGES = 10
+
+STAND_IN_HTML = """
+<html><body><script>
+  window.firstPage = () => fetch('/api/graphql/', {method: 'POST', body: new URLSearchParams({
+    doc_id: '9876543210', fb_dtsg: 'token', fb_api_req_friendly_name: 'ProfileCometTimelineFeedRefetchQuery',
+    variables: JSON.stringify({cursor: null, count: 20, id: '100004567890123'})
+  })}).then(r => r.text());
+</script></body></html>
+"""
+
+
+def _timeline_page(index):
+    edges = []
+    for i in range(PAGE_SIZE):
+        n = index * PAGE_SIZE + i
+        edges.append({"node": {
+            "__typename": "Story", "id": f"story{n}", "post_id": str(100000000000 + n),
+            "url": f"https://www.facebook.com/demo/posts/{100000000000 + n}",
+            "message": {"text": f"Post number {n}, loaded by cursor."},
+            "creation_time": 1700000000 - n * 3600,
+        }})
+    has_next = index + 1 < TOTAL_PAGES
+    page_info = {"end_cursor": f"CURSOR_{index + 1}" if has_next else None, "has_next_page": has_next}
+    return json.dumps({"data": {"node": {"timeline_list_feed_units": {"edges": edges, "page_info": page_info}}}})
+
+
+async def _start_server():
+    requests = []
+
+    async def graphql(request):
+        form = await request.post()
+        variables = json.loads(form["variables"])
+        requests.append({"time": time.monotonic(), "cursor": variables.get("cursor"), "doc_id": form.get("doc_id")})
+        cursor = variables.get("cursor")
+        index = int(cursor.split("_")[1]) if cursor else 0
+        await asyncio.sleep(0.02)
+        return web.Response(text=_timeline_page(index), content_type="text/html")
+
+    async def home(request):
+        return web.Response(text=STAND_IN_HTML, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_post("/api/graphql/", graphql)
+    app.router.add_get("/", home)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", requests
+
+
+class HTTPPage:
+    """Page adapter that runs the paginator's fetch over plain HTTP"""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def evaluate(self, expression, arg=None):
+        assert expression == FETCH_JS
+        async with self.session.post(arg["url"], data=arg["form"], headers=arg["headers"]) as response:
+            return {"status": response.status, "text": await response.text()}
+
+
+def _seed_capture(capture, base_url):
+    """Record the first page exactly as the response listener would"""
+    form = {"doc_id": "9876543210", "fb_dtsg": "token",
+            "fb_api_req_friendly_name": "ProfileCometTimelineFeedRefetchQuery",
+            "variables": json.dumps({"cursor": None, "count": 20, "id": "100004567890123"})}
+    body = _timeline_page(0)
+    capture.ingest(body)
+    capture.page_info = {"end_cursor": "CURSOR_1", "has_next_page": True}
+    capture._remember_request(SimpleNamespace(
+        url=f"{base_url}/api/graphql/", method="POST",
+        headers={"x-fb-friendly-name": "ProfileCometTimelineFeedRefetchQuery", "user-agent": "test"},
+        post_data=urlencode(form)
+    ))
+
+
+def test_paginates_200_posts_by_cursor():
+    async def run():
+        runner, base_url, requests = await _start_server()
+        try:
+            async with aiohttp.ClientSession() as session:
+                capture = GraphQLCapture(page=None)
+                _seed_capture(capture, base_url)
+                paginator = GraphQLPaginator(HTTPPage(session), capture,
+                                             limiter=FetchLimiter(max_concurrency=2, requests_per_second=50))
+                start = time.time()
+                posts = await paginator.paginate(max_posts=200)
+                return posts, time.time() - start, requests, paginator.report()
+        finally:
+            await runner.cleanup()
+
+    posts, elapsed, requests, report = asyncio.run(run())
+    assert len(posts) == 200
+    assert len({p["post_id"] for p in posts}) == 200
+    assert [r["cursor"] for r in requests] == [f"CURSOR_{i}" for i in range(1, TOTAL_PAGES)]
+    assert all(r["doc_id"] == "9876543210" for r in requests)
+    assert report["pages_fetched"] == TOTAL_PAGES - 1
+    assert elapsed < 5
+
+
+def test_limiter_spaces_requests_across_paginators():
+    async def run():
+        runner, base_url, requests = await _start_server()
+        try:
+            async with aiohttp.ClientSession() as session:
+                limiter = FetchLimiter(max_concurrency=2, requests_per_second=20)
+                paginators = []
+                for _ in range(2):
+                    capture = GraphQLCapture(page=None)
+                    _seed_capture(capture, base_url)
+                    paginators.append(GraphQLPaginator(HTTPPage(session), capture, limiter=limiter))
+                await asyncio.gather(*(p.paginate(max_posts=100) for p in paginators))
+                return requests
+        finally:
+            await runner.cleanup()
+
+    requests = asyncio.run(run())
+    assert len(requests) == 8  # 4 more pages each
+    starts = sorted(r["time"] for r in requests)
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert min(gaps) >= 0.04  # 20 req/s -> 50ms spacing, with scheduling slack
+
+
+def test_limiter_slot_survives_cancelled_wait():
+    async def run():
+        limiter = FetchLimiter(max_concurrency=1, requests_per_second=0.5)
+        async with limiter:
+            pass
+        # The next start is 2s away: cancel while waiting for it
+        waiting = asyncio.ensure_future(limiter.__aenter__())
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert not limiter.semaphore.locked()
+
+    asyncio.run(run())
+
+
+def test_in_page_fetch_with_browser():
+    async def run():
+        runner, base_url, requests = await _start_server()
+        try:
+            async with async_playwright() as p:
+                try:
+                    browser = await p.chromium.launch(headless=True)
+                except Exception as e:
+                    pytest.skip(f"Chromium not available: {e}")
+                page = await browser.new_page()
+                capture = GraphQLCapture(page)
+                capture.start()
+                await page.goto(base_url + "/")
+                await page.evaluate("window.firstPage()")
+                await capture.flush()
+                paginator = GraphQLPaginator(page, capture, limiter=FetchLimiter(requests_per_second=50))
+                posts = await paginator.paginate(max_posts=200)
+                capture.stop()
+                await browser.close()
+                return posts
+        finally:
+            await runner.cleanup()
+
+    posts = asyncio.run(run())
+    assert len(posts) == 200
+
+
+if __name__ == "__main__":
+    test_paginates_200_posts_by_cursor()
+    test_limiter_spaces_requests_across_paginators()
+    test_limiter_slot_survives_cancelled_wait()
+    test_in_page_fetch_with_browser()
+    print("✅ GraphQL paginator tests passed")
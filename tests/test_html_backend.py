@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline HTML extraction backend
+Runs the post and profile extractors against the bundled HTML samples,
+no browser required.
+"""
+import os
+import asyncio
+import logging
+
+import pytest
+
+from scraper.html_backend import HTMLSnapshotBackend, SnapshotPage, UnsupportedOnSnapshot
+
+logging.basicConfig(level=logging.WARNING)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES = ["fb_profile_sample.html", "debug_facebook_page.html"]
+
+
+def _read_sample(name):
+    with open(os.path.join(ROOT_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_samples_extract_without_browser():
+    backend = HTMLSnapshotBackend(max_workers=2, chunk_size=1)
+    try:
+        for name in SAMPLES:
+            result = backend.extract_file(os.path.join(ROOT_DIR, name))
+            assert result["profile"]["name"] == "Srikanth Chellaboina"
+            assert set(result["profile"]["about"]) == {"work", "education", "location", "birthday", "contact"}
+            assert isinstance(result["posts"], list)
+    finally:
+        backend.close()
+
+
+def test_pool_matches_inline_extraction():
+    with open(os.path.join(ROOT_DIR, "tests", "fixtures", "timeline_posts.html"), "r", encoding="utf-8") as f:
+        html = f.read()
+    pooled = HTMLSnapshotBackend(max_workers=2, chunk_size=1)
+    inline = HTMLSnapshotBackend(max_workers=0)
+    try:
+        posts = inline.extract_posts(html)
+        assert [post["id"] for post in posts] == [f"pfbid0post{i}" for i in range(1, 5)]
+        assert posts[0]["content"].startswith("Spent the weekend hiking")
+        assert pooled.extract_posts(html) == posts
+    finally:
+        pooled.close()
+
+
+def test_snapshot_page_api():
+    html = """
+    <html><head><title>Demo</title></head><body>
+      <div role="article" id="story_1234567890">
+        <span dir="auto">Happy birthday to my best friend, have a great day!</span>
+        <a href="https://www.facebook.com/demo/posts/pfbid0abc" aria-label="2 hours ago">2h</a>
+      </div>
+      <script>var ignored = "script text";</script>
+    </body></html>
+    """
+    page = SnapshotPage(html)
+
+    async def run():
+        assert await page.title() == "Demo"
+        body_text = await page.evaluate("() => document.body.innerText")
+        assert "Happy birthday" in body_text and "script text" not in body_text
+        article = await page.query_selector('div[role="article"]')
+        assert await article.get_attribute("id") == "story_1234567890"
+        links = await article.query_selector_all('a[href*="/posts/"]')
+        assert len(links) == 1
+        # Playwright-only selector syntax is treated as "no match" offline
+        assert await page.query_selector_all('div:has-text("Birthday")') == []
+        # Scrolling is a no-op; other scripts need a live page
+        assert await page.evaluate("window.scrollTo(0, document.body.scrollHeight);") is None
+        with pytest.raises(UnsupportedOnSnapshot):
+            await page.evaluate("() => document.querySelectorAll('a').length")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_samples_extract_without_browser()
+    test_pool_matches_inline_extraction()
+    test_snapshot_page_api()
+    print("✅ Offline HTML backend tests passed")
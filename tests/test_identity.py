@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for profile identity resolution
+Resolves every input form of a profile, learns vanity name / numeric ID
+pairs from (scripted) profile pages, and checks that the learned map is
+persisted so both forms share one key across runs.
+"""
+import os
+import json
+import asyncio
+import tempfile
+
+import pytest
+
+from scraper.identity import IdentityResolver, parse_profile_input
+
+
+class ScriptedPage:
+    """Stands in for a profile page: its final URL and app-link meta IDs"""
+
+    def __init__(self, url, ids):
+        self.result = {"url": url, "ids": ids}
+
+    async def evaluate(self, script, *args):
+        return self.result
+
+
+def test_parse_input_forms():
+    assert parse_profile_input("Jane.Doe") == ("username", "jane.doe")
+    assert parse_profile_input("@jane.doe/") == ("username", "jane.doe")
+    assert parse_profile_input("https://www.facebook.com/Jane.Doe/about?ref=x") == ("username", "jane.doe")
+    assert parse_profile_input("m.facebook.com/jane.doe") == ("username", "jane.doe")
+    assert parse_profile_input("100004567890123") == ("id", "100004567890123")
+    assert parse_profile_input("profile.php?id=100004567890123") == ("id", "100004567890123")
+    assert parse_profile_input("https://www.facebook.com/profile.php?id=100004567890123&sk=about") == \
+        ("id", "100004567890123")
+    assert parse_profile_input("https://www.facebook.com/people/Jane-Doe/100004567890123/") == \
+        ("id", "100004567890123")
+    with pytest.raises(ValueError):
+        parse_profile_input("  ")
+    with pytest.raises(ValueError):
+        parse_profile_input("https://www.facebook.com/groups/12345")
+
+
+def test_urls_and_memo():
+    resolver = IdentityResolver()
+    identity = resolver.resolve("jane.doe")
+    assert identity.url() == "https://www.facebook.com/jane.doe"
+    assert identity.url("friends") == "https://www.facebook.com/jane.doe/friends"
+    assert resolver.profile_url("100004567890123", "about") == \
+        "https://www.facebook.com/profile.php?id=100004567890123&sk=about"
+    assert resolver.resolve("jane.doe") is identity
+
+
+def test_learn_from_pages_and_persist():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data", "identity_map.json")
+        resolver = IdentityResolver(path)
+        assert resolver.resolve("100004567890123").key == "100004567890123"
+
+        # The ID link redirected to the vanity URL and the page confirms the ID
+        page = ScriptedPage("https://www.facebook.com/jane.doe", ["100004567890123"])
+        identity = asyncio.run(resolver.learn_from_page(page, "100004567890123"))
+        assert identity.key == "jane.doe"
+        assert identity.aliases == ["jane.doe", "100004567890123"]
+        # A redirect elsewhere (e.g. the feed) teaches nothing
+        stray = ScriptedPage("https://www.facebook.com/someone.else", ["999999999999"])
+        assert asyncio.run(resolver.learn_from_page(stray, "100004567890123")).key == "jane.doe"
+
+        with open(path, encoding="utf-8") as f:
+            assert json.load(f) == {"vanity_to_id": {"jane.doe": "100004567890123"}}
+
+        # A new run resolves every form of the person to the same key
+        later = IdentityResolver(path)
+        keys = {later.resolve(raw).key for raw in ("jane.doe", "100004567890123",
+                                                   "https://www.facebook.com/profile.php?id=100004567890123")}
+        assert keys == {"jane.doe"}
+        assert later.resolve("Jane.Doe").numeric_id == "100004567890123"
+
+
+def test_vanity_change():
+    resolver = IdentityResolver()
+    resolver.learn("jane.doe", "100004567890123")
+    assert resolver.learn("jane.smith", "100004567890123")
+    assert resolver.resolve("100004567890123").key == "jane.smith"
+    assert resolver.resolve("jane.doe").numeric_id is None
+
+
+if __name__ == "__main__":
+    test_parse_input_forms()
+    test_urls_and_memo()
+    test_learn_from_pages_and_persist()
+    test_vanity_change()
+    print("✅ Identity tests passed")
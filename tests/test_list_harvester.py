@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test script for the infinite-list harvester
+Checks canonical profile/group keys and the stop rules (end of list, stall
+after a "See more" attempt, budgets) offline with a scripted extractor, then
+(with Chromium) scrolls a local 5,000-friend infinite list that repeats tiles
+across batches and reuses common names: every distinct profile is kept once,
+each round reads only new tiles, read tiles are emptied, and friends are
+streamed to JSONL as they arrive. The browser part is skipped without Chromium.
+"""
+import os
+import json
+import time
+import asyncio
+import tempfile
+
+import pytest
+from playwright.async_api import async_playwright
+
+from scraper.list_harvester import LinkListExtractor, ListHarvester, group_key, profile_key
+from scraper.scroll_driver import ScrollDriver, ScrollResult
+
+TOTAL_FRIENDS = 5000
+BATCH = 250
+
+LIST_HTML = """
+<html><body style="margin:0">
+<div id="list"></div>
+<script>
+  const total = %d, batch = %d;
+  let rendered = 0;
+  function tile(n) {
+    // Every tenth friend is a "John Smith"; odd friends have numeric-ID profiles
+    const name = n %% 10 === 0 ? 'John Smith' : `Friend ${n}`;
+    const href = n %% 2 ? `https://www.facebook.com/profile.php?id=${100000000000 + n}&__tn__=%%2CdlC`
+                        : `https://www.facebook.com/friend.${n}?__cft__[0]=AZX`;
+    return `<div role="listitem" style="height:60px">
+      <a href="${href}"><img alt=""></a>
+      <a href="${href}"><span dir="auto">${name}</span></a>
+      <span dir="auto">Lives in City ${n}</span></div>`;
+  }
+  function loadMore() {
+    if (rendered >= total) return;
+    // Facebook re-renders the last few tiles of the previous batch
+    const start = Math.max(0, rendered - 5);
+    const end = Math.min(total, rendered + batch);
+    let html = '';
+    for (let n = start; n < end; n++) html += tile(n);
+    document.getElementById('list').insertAdjacentHTML('beforeend', html);
+    rendered = end;
+    if (rendered >= total) document.body.insertAdjacentHTML('beforeend', '<div>End of results</div>');
+  }
+  loadMore();
+  window.addEventListener('scroll', () => {
+    if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 200) setTimeout(loadMore, 50);
+  });
+</script>
+</body></html>
+""" % (TOTAL_FRIENDS, BATCH)
+
+LINK_SELECTOR = 'a[href*="facebook.com/"]'
+
+
+def test_profile_key():
+    assert profile_key("https://www.facebook.com/profile.php?id=100004567890123&__tn__=R") == "100004567890123"
+    assert profile_key("https://www.facebook.com/Jane.Doe?__cft__[0]=AZX") == "jane.doe"
+    assert profile_key("https://m.facebook.com/jane.doe/") == "jane.doe"
+    assert profile_key("https://www.facebook.com/people/Jane-Doe/100004567890123/") == "100004567890123"
+    assert profile_key("https://www.facebook.com/groups/123456789/") is None
+    assert profile_key("https://example.com/jane.doe") is None
+    assert group_key("https://www.facebook.com/groups/MoroccoDevs/?ref=share") == "group:moroccodevs"
+    assert group_key("https://www.facebook.com/groups/feed/") is None
+
+
+class ScriptedExtractor(LinkListExtractor):
+    """Returns one scripted batch of raw items per round"""
+
+    def __init__(self, batches):
+        super().__init__("a", "group_name", "group_url", key=group_key)
+        self.batches = list(batches)
+
+    async def new_items(self, page, prune):
+        return self.batches.pop(0) if self.batches else []
+
+
+class ScriptedScroll:
+    def __init__(self, reasons):
+        self.reasons = list(reasons)
+
+    async def scroll(self):
+        reason = self.reasons.pop(0) if self.reasons else "timeout"
+        return ScrollResult(reason, reason in ("nodes", "height"), 0.0)
+
+
+def _group(n, name=None):
+    return {"name": name or f"Group {n}", "url": f"https://www.facebook.com/groups/{1000 + n}/", "bio": ""}
+
+
+def _run(harvester):
+    return asyncio.run(harvester.harvest())
+
+
+def test_stop_rules():
+    # End-of-list marker: the tiles rendered with it are still collected
+    harvester = ListHarvester(None, ScriptedExtractor([[_group(1), _group(2)], [_group(2), _group(3)]]),
+                              ScriptedScroll(["end_of_feed"]), name="groups")
+    assert [g["group_name"] for g in _run(harvester)] == ["Group 1", "Group 2", "Group 3"]
+    assert harvester.report()["stop_reason"] == "end_of_list" and harvester.duplicates == 1
+
+    # A stalled round tries "See more" first; stalls only count once that reveals nothing
+    clicks = iter([1, 0, 0])
+
+    async def expand():
+        return next(clicks)
+
+    harvester = ListHarvester(None, ScriptedExtractor([[_group(1)], [], [_group(2)]]),
+                              ScriptedScroll(["timeout"] * 10), name="groups", stable_rounds=2, expand=expand)
+    assert len(_run(harvester)) == 2
+    assert harvester.stop_reason == "stalled" and harvester.expansions == 1
+
+    # Budgets
+    batches = [[_group(n) for n in range(r * 10, r * 10 + 10)] for r in range(10)]
+    harvester = ListHarvester(None, ScriptedExtractor(batches), ScriptedScroll(["nodes"] * 10), max_items=25)
+    assert len(_run(harvester)) == 25 and harvester.stop_reason == "max_items"
+    harvester = ListHarvester(None, ScriptedExtractor(batches), ScriptedScroll(["nodes"] * 10), max_rounds=3)
+    assert len(_run(harvester)) == 30 and harvester.stop_reason == "max_rounds"
+    harvester = ListHarvester(None, ScriptedExtractor(batches), ScriptedScroll(["nodes"] * 10), max_seconds=0)
+    assert harvester.rounds == 0 and _run(harvester) and harvester.stop_reason == "time_budget"
+
+
+async def _harvest(output_path):
+    async with async_playwright() as p:
+        try:
+            browser = await p.chromium.launch(headless=True)
+        except Exception as e:
+            pytest.skip(f"Chromium not available: {e}")
+        page = await browser.new_page(viewport={"width": 800, "height": 800})
+        await page.set_content(LIST_HTML)
+        driver = ScrollDriver(page, item_selector=LINK_SELECTOR, min_delay=0, max_delay=0, timeout=3)
+        harvester = ListHarvester(page, LinkListExtractor(LINK_SELECTOR), driver, name="friends",
+                                  output_path=output_path)
+        start = time.perf_counter()
+        friends = await harvester.harvest()
+        elapsed = time.perf_counter() - start
+        remaining_links = await page.eval_on_selector_all(LINK_SELECTOR, "els => els.length")
+        await browser.close()
+        return friends, harvester, elapsed, remaining_links
+
+
+def test_harvests_five_thousand_friends():
+    with tempfile.TemporaryDirectory() as out:
+        output_path = os.path.join(out, "friends.jsonl")
+        friends, harvester, elapsed, remaining_links = asyncio.run(_harvest(output_path))
+
+        assert len(friends) == TOTAL_FRIENDS
+        assert sum(f["name"] == "John Smith" for f in friends) == TOTAL_FRIENDS // 10
+        assert friends[1]["bio"] == "Lives in City 1"
+        # Re-rendered tiles were recognized by profile ID
+        assert harvester.duplicates > 0
+        # Read tiles are emptied, so the page holds no friend links any more
+        assert remaining_links == 0
+        assert elapsed < 60
+
+        with open(output_path, encoding="utf-8") as f:
+            streamed = [json.loads(line) for line in f]
+        assert streamed == friends
+
+
+if __name__ == "__main__":
+    test_profile_key()
+    test_stop_rules()
+    test_harvests_five_thousand_friends()
+    print("✅ List harvester tests passed")
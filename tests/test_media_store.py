@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test script for the content-addressed media store
+Serves images from a local aiohttp stand-in for the CDN and downloads the
+media of several posts: identical content under different URLs is stored
+once, signed URLs past their oe= expiry are never requested, transient 503s
+are retried, session cookies reach the CDN host, and a second run reuses
+the index without downloading anything. Oversized files and malformed URLs
+get their own download status. In-memory content (post screenshots) put
+into the store is deduplicated the same way.
+"""
+import os
+import time
+import asyncio
+import tempfile
+
+from aiohttp import web
+
+from scraper.media_store import MediaFetcher, MediaStore, is_expired, url_expiry
+
+PHOTO = b"\xff\xd8\xff\xe0" + b"photo-bytes" * 500
+OTHER = b"\xff\xd8\xff\xe0" + b"other-bytes" * 500
+
+
+async def _start_server():
+    hits = []
+    failures = {"/flaky.jpg": 2}
+
+    async def media(request):
+        hits.append((request.path, request.headers.get("Cookie", "")))
+        if failures.get(request.path):
+            failures[request.path] -= 1
+            return web.Response(status=503)
+        if request.path == "/missing.jpg":
+            return web.Response(status=404)
+        body = OTHER if request.path == "/other.jpg" else PHOTO
+        return web.Response(body=body, content_type="image/jpeg")
+
+    app = web.Application()
+    app.router.add_get("/{name}", media)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", hits
+
+
+def test_url_expiry():
+    expiry = int(time.time()) + 3600
+    url = f"https://scontent.xx.fbcdn.net/v/t39.30808-6/123_n.jpg?_nc_ht=x&oh=00_abc&oe={expiry:X}"
+    assert url_expiry(url) == expiry
+    assert not is_expired(url)
+    assert is_expired(url, now=expiry + 1)
+    assert url_expiry("https://example.com/a.jpg") is None
+
+
+async def _run(root):
+    runner, base_url, hits = await _start_server()
+    valid = f"oe={int(time.time()) + 3600:X}"
+    posts = [
+        {"id": "1", "media": [{"type": "image", "url": f"{base_url}/photo.jpg?{valid}", "description": ""},
+                              {"type": "image", "url": f"{base_url}/other.jpg", "description": ""}]},
+        # The same photo reposted under another path, and the first one re-signed
+        {"id": "2", "media": [{"type": "image", "url": f"{base_url}/repost.jpg", "description": ""},
+                              {"type": "image", "url": f"{base_url}/photo.jpg?oe=5F5E1000", "description": ""}]},
+        {"id": "3", "media": [{"type": "image", "url": f"{base_url}/expired.jpg?oe=5F5E1000", "description": ""},
+                              {"type": "image", "url": f"{base_url}/flaky.jpg", "description": ""},
+                              {"type": "image", "url": f"{base_url}/missing.jpg", "description": ""},
+                              {"type": "video", "url": "blob:https://www.facebook.com/abc", "description": ""}]},
+    ]
+    cookies = [{"name": "c_user", "value": "100004567890123", "domain": "127.0.0.1"},
+               {"name": "xs", "value": "secret", "domain": ".facebook.com"}]
+    try:
+        fetcher = MediaFetcher(MediaStore(root), cookies=cookies, max_connections=2)
+        stats = await fetcher.fetch_posts(posts)
+        first_hits = list(hits)
+        rerun = [{"id": "1", "media": [{"type": "image", "url": f"{base_url}/photo.jpg?oe=FFFFFFFF"}]}]
+        rerun_stats = await MediaFetcher(MediaStore(root)).fetch_posts(rerun)
+        return posts, stats, first_hits, rerun, rerun_stats, len(hits) - len(first_hits)
+    finally:
+        await runner.cleanup()
+
+
+def test_fetch_dedup_retry_and_expiry():
+    with tempfile.TemporaryDirectory() as root:
+        posts, stats, hits, rerun, rerun_stats, rerun_hits = asyncio.run(_run(root))
+        photo, other = posts[0]["media"]
+        repost, resigned = posts[1]["media"]
+        expired, flaky, missing, blob = posts[2]["media"]
+
+        assert photo["stored"]["sha256"] == repost["stored"]["sha256"] == resigned["stored"]["sha256"]
+        assert photo["stored"]["sha256"] != other["stored"]["sha256"]
+        assert photo["stored"]["url"].endswith(".jpg") and os.path.exists(photo["stored"]["path"])
+        assert stats["downloaded"] == 2 and stats["deduplicated"] == 2
+        assert expired["download_status"] == "expired" and "stored" not in expired
+        assert flaky["stored"]["sha256"] == photo["stored"]["sha256"]
+        assert missing["download_status"] == "http_404"
+        assert blob["download_status"] == "unsupported"
+
+        paths = [path for path, _ in hits]
+        assert "/expired.jpg" not in paths
+        assert paths.count("/photo.jpg") == 1 and paths.count("/flaky.jpg") == 3
+        assert all(cookie == "c_user=100004567890123" for _, cookie in hits)
+
+        objects = [f for _, _, files in os.walk(os.path.join(root, "objects")) for f in files]
+        assert len(objects) == 2
+
+        assert rerun[0]["media"][0]["stored"]["sha256"] == photo["stored"]["sha256"]
+        assert rerun_stats["cached"] == 1 and rerun_hits == 0
+
+
+def test_put_bytes_dedup():
+    with tempfile.TemporaryDirectory() as root:
+        store = MediaStore(root, url_prefix="/static/media")
+        first = store.put_bytes(b"RIFF-webp-capture", "image/webp", key="screenshot:p1")
+        second = store.put_bytes(b"RIFF-webp-capture", "image/webp", key="screenshot:p2")
+        assert first == second and first["url"].startswith("/static/media/objects/")
+        assert first["url"].endswith(".webp") and os.path.exists(first["path"])
+        assert store.lookup("screenshot:p2")["sha256"] == first["sha256"]
+        objects = [f for _, _, files in os.walk(os.path.join(root, "objects")) for f in files]
+        assert len(objects) == 1
+        assert not [name for name in os.listdir(root) if name.endswith(".tmp")]
+
+
+async def _run_limits(root):
+    runner, base_url, hits = await _start_server()
+    posts = [{"id": "1", "media": [{"type": "image", "url": f"{base_url}/photo.jpg"},
+                                   {"type": "image", "url": "http:///no-host.jpg"}]}]
+    try:
+        stats = await MediaFetcher(MediaStore(root), max_bytes=1024).fetch_posts(posts)
+        return posts, stats, hits
+    finally:
+        await runner.cleanup()
+
+
+def test_too_large_and_invalid_url():
+    with tempfile.TemporaryDirectory() as root:
+        posts, stats, hits = asyncio.run(_run_limits(root))
+        large, invalid = posts[0]["media"]
+        assert large["download_status"] == "too_large"
+        # aiohttp.InvalidURL is also a ValueError; it must not be reported as too large
+        assert invalid["download_status"] == "invalid_url"
+        assert stats["failed"] == 2 and len(hits) == 1
+        assert not [name for name in os.listdir(root) if name.endswith(".tmp")]
+
+
+if __name__ == "__main__":
+    test_url_expiry()
+    test_fetch_dedup_retry_and_expiry()
+    test_put_bytes_dedup()
+    test_too_large_and_invalid_url()
+    print("✅ Media store tests passed")
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Test script for navigation deduplication
+Normalizes profile URLs, skips gotos to the URL the (scripted) page already
+shows, including after a redirect, loads again after an unusable page state
+or a forced navigation, and counts the navigations avoided when the profile
+and posts scrapers share one manager. A page replaced after a crash is the
+page of both scrapers and of the posts scraper's helpers (the timeline
+still scrolls after a recovery), and a list page emptied by its harvest is loaded
+again.
+"""
+import asyncio
+
+import scraper.profile
+from scraper.navigation import NavigationManager, canonical_url
+from scraper.profile import ProfileScraper
+from scraper.posts_improved import PostsScraperImproved
+from scraper.scroll_driver import METRICS_JS, SCROLL_JS
+
+
+class ScriptedPage:
+    """Stands in for a Playwright page: records gotos, follows scripted redirects"""
+
+    def __init__(self, redirects=None):
+        self.url = "about:blank"
+        self.gotos = []
+        self.scripts = []
+        self.redirects = redirects or {}
+        self.listeners = []
+        self.closed = False
+        self.items = 5
+
+    async def goto(self, url, **kwargs):
+        self.gotos.append(url)
+        self.url = self.redirects.get(url, url)
+
+    async def evaluate(self, script, *args):
+        if self.closed:
+            raise RuntimeError("Target closed")
+        if script == METRICS_JS:
+            return {"count": self.items, "height": self.items * 100, "end": False}
+        if script == SCROLL_JS:
+            self.items += 5
+            return None
+        self.scripts.append(script)
+
+    async def wait_for_function(self, script, **kwargs):
+        return ScriptedHandle("nodes")
+
+    def on(self, event, handler):
+        self.listeners.append((event, handler))
+
+    def remove_listener(self, event, handler):
+        self.listeners.remove((event, handler))
+
+    async def wait_for_selector(self, selector, **kwargs):
+        return None
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class ScriptedHandle:
+    def __init__(self, value):
+        self.value = value
+
+    async def json_value(self):
+        return self.value
+
+
+class ScriptedContext:
+    """Stands in for a browser context: hands out new scripted pages"""
+
+    async def new_page(self):
+        page = ScriptedPage()
+        page.context = self
+        return page
+
+    async def cookies(self):
+        return []
+
+
+def test_canonical_url():
+    assert canonical_url("https://m.facebook.com/Jane.Doe/?ref=bookmarks#x") == "https://www.facebook.com/jane.doe"
+    assert canonical_url("https://www.facebook.com/profile.php?sk=about&id=1000&__tn__=R") == \
+        "https://www.facebook.com/profile.php?id=1000&sk=about"
+    assert canonical_url("https://www.facebook.com/jane.doe/friends/") != canonical_url("https://www.facebook.com/jane.doe")
+
+
+def test_skips_current_url_and_redirect_target():
+    id_url = "https://www.facebook.com/profile.php?id=1000"
+    page = ScriptedPage(redirects={id_url: "https://www.facebook.com/jane.doe"})
+    navigation = NavigationManager(page)
+
+    async def run():
+        assert await navigation.goto(id_url) is True
+        # The ID link redirected to the vanity URL: both now count as shown
+        assert await navigation.goto(id_url) is False
+        assert await navigation.goto("https://www.facebook.com/jane.doe/") is False
+        assert await navigation.goto("https://www.facebook.com/jane.doe/friends") is True
+        assert await navigation.goto("https://www.facebook.com/jane.doe/friends", force=True) is True
+        # A login wall or error page is never reused
+        navigation.note_state("login")
+        assert await navigation.goto("https://www.facebook.com/jane.doe/friends") is True
+
+    asyncio.run(run())
+    assert len(page.gotos) == 4
+    assert navigation.report() == {"navigations": 4, "avoided": 2,
+                                   "avoided_urls": {"https://www.facebook.com/profile.php?id=1000": 1,
+                                                    "https://www.facebook.com/jane.doe": 1}}
+    # A skipped navigation still starts from the top of the page
+    assert page.scripts == ["window.scrollTo(0, 0)"] * 2
+
+
+def test_scrapers_share_one_manager():
+    page = ScriptedPage()
+    navigation = NavigationManager(page)
+    profile_scraper = ProfileScraper(page, None, navigation=navigation)
+    posts_scraper = PostsScraperImproved(page, None, navigation=navigation)
+    profile_url = "https://www.facebook.com/jane.doe"
+
+    async def run():
+        # Profile stage opens the page; the posts stage finds it already shown
+        assert await profile_scraper._navigate_with_retries(profile_url, ready_selector="div[role='main']")
+        navigation.note_state("profile")
+        posts_scraper._check_page_health = _healthy
+        assert await posts_scraper._navigate_with_retries(profile_url)
+
+    asyncio.run(run())
+    assert page.gotos == [profile_url]
+    assert navigation.avoided == 1
+
+    # With GraphQL capture on, the posts stage reloads the page so the capture sees its responses
+    asyncio.run(posts_scraper._navigate_with_retries(profile_url, force=True))
+    assert page.gotos == [profile_url, profile_url]
+
+
+async def _healthy():
+    return True
+
+
+class ScriptedUtils:
+    page = None
+
+    async def classify_page_state(self):
+        return {"state": "profile", "evidence": [], "url": "", "title": ""}
+
+    def clean_text(self, text):
+        return text
+
+
+class ScriptedHarvester:
+    """Stands in for ListHarvester (which marks and empties the tiles it reads)"""
+
+    def __init__(self, page, *args, **kwargs):
+        self.items = [{"name": "Bob", "profile_url": "https://www.facebook.com/bob"}]
+
+    async def harvest(self):
+        return self.items
+
+    def report(self):
+        return {"items": len(self.items)}
+
+
+def test_harvested_list_is_loaded_again(monkeypatch):
+    monkeypatch.setattr(scraper.profile, "ListHarvester", ScriptedHarvester)
+    page = ScriptedPage()
+    profile_scraper = ProfileScraper(page, ScriptedUtils())
+    profile_scraper.use_profile("jane.doe")
+
+    async def run():
+        await profile_scraper.get_friends_list()
+        await profile_scraper.get_friends_list()
+
+    asyncio.run(run())
+    # The tiles of the first harvest are gone from the DOM: the second harvest reloads the list
+    assert page.gotos == ["https://www.facebook.com/jane.doe/friends"] * 2
+
+
+def test_crash_recovery_swaps_page_for_both_scrapers():
+    page = ScriptedPage()
+    page.context = ScriptedContext()
+    navigation = NavigationManager(page)
+    utils = ScriptedUtils()
+    profile_scraper = ProfileScraper(page, utils, navigation=navigation)
+    posts_scraper = PostsScraperImproved(page, utils, navigation=navigation, paginate_graphql=True,
+                                         prune_extracted_posts=True)
+    posts_scraper.graphql_capture.start()
+    posts_scraper.scroll_driver.min_delay = posts_scraper.scroll_driver.max_delay = 0
+
+    async def run():
+        assert (await posts_scraper.scroll_driver.scroll()).reason == "nodes"
+        assert await posts_scraper._recover_from_crash()
+        return await posts_scraper.scroll_driver.scroll()
+
+    after_recovery = asyncio.run(run())
+    new_page = posts_scraper.page
+    assert new_page is not page and page.closed
+    assert profile_scraper.page is new_page and utils.page is new_page and navigation.page is new_page
+    # The timeline driver scrolls the new page, and no longer listens on the old one
+    assert after_recovery.reason == "nodes" and after_recovery.grew
+    assert page.listeners == []
+    assert sorted(event for event, _ in new_page.listeners) == ["requestfinished", "response"]
+    assert posts_scraper.graphql_paginator.page is new_page and posts_scraper.dom_pruner.page is new_page
+
+
+if __name__ == "__main__":
+    test_canonical_url()
+    test_skips_current_url_and_redirect_target()
+    test_scrapers_share_one_manager()
+    test_crash_recovery_swaps_page_for_both_scrapers()
+    print("✅ Navigation tests passed")
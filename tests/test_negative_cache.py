@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Test script for the negative-result cache
+Records missing, restricted and private results with their TTLs, looks them
+up through any alias of the profile, persists them, and checks that the
+profile scraper skips cached sections without navigating and records new
+ones from the page state (scripted page, no browser). A profile is recorded
+as restricted only when its header says it is locked, and nothing is
+recorded on page-wide text alone.
+"""
+import os
+import asyncio
+import tempfile
+
+import pytest
+
+from scraper.negative_cache import NEGATIVE_TTLS, NegativeCache
+from scraper.identity import IdentityResolver
+from scraper.profile import ProfileScraper
+
+
+class ScriptedPage:
+    """Stands in for a Playwright page: counts navigations"""
+
+    def __init__(self):
+        self.url = "about:blank"
+        self.visited = []
+
+    async def goto(self, url, **kwargs):
+        self.visited.append(url)
+        self.url = url
+
+    async def wait_for_selector(self, selector, **kwargs):
+        return None
+
+    async def query_selector(self, selector):
+        return None
+
+    def is_closed(self):
+        return False
+
+
+class ScriptedUtils:
+    """Stands in for ScraperUtils: every page has the same state"""
+
+    def __init__(self, state):
+        self.state = state
+
+    async def classify_page_state(self):
+        return {"state": self.state, "evidence": [f"text:{self.state}"], "url": "", "title": ""}
+
+    def clean_text(self, text):
+        return text
+
+
+class ScriptedProfileUtils(ScriptedUtils):
+    """Classifies the page it is on; the profile header may say the profile is locked"""
+
+    def __init__(self, page, state, header_evidence=(), evidence=None):
+        super().__init__(state)
+        self.page = page
+        self.header_evidence = list(header_evidence)
+        self.evidence = evidence or [f"text:{state}"]
+
+    async def classify_page_state(self):
+        return {"state": self.state, "evidence": list(self.evidence), "url": self.page.url, "title": ""}
+
+    async def profile_lock_evidence(self):
+        return self.header_evidence
+
+
+async def _settled():
+    return None
+
+
+def _navigate(page, utils, cache, username="https://www.facebook.com/jane.doe", retries=None):
+    scraper = ProfileScraper(page, utils, identity_resolver=IdentityResolver(), negative_cache=cache)
+    scraper._wait_for_page_load = _settled
+    if retries:
+        scraper.max_retries = retries
+    return scraper, asyncio.run(scraper.navigate_to_profile(username))
+
+
+def test_ttls_aliases_and_persistence():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data", "negative_cache.json")
+        cache = NegativeCache(path)
+        cache.record("jane.doe", "profile", "not_found", ["text:page not found"], now=1000)
+        cache.record("jane.doe", "friends", "private", now=1000)
+        with pytest.raises(ValueError):
+            cache.record("jane.doe", "profile", "rate_limited")
+
+        # Found through any alias, with its age, until the reason's TTL runs out
+        entry = cache.lookup(["100004567890123", "jane.doe"], now=1060)
+        assert entry["reason"] == "not_found" and entry["age_seconds"] == 60 and entry["key"] == "jane.doe"
+        assert cache.lookup("jane.doe", "friends", now=1000 + NEGATIVE_TTLS["private"]) is None
+        assert cache.lookup("jane.doe", "groups", now=1060) is None
+
+        reloaded = NegativeCache(path)
+        assert reloaded.lookup("jane.doe", "friends", now=1060)["reason"] == "private"
+        assert reloaded.prune(now=1000 + NEGATIVE_TTLS["private"]) == 1
+        assert reloaded.clear(["jane.doe"]) == 1
+        assert NegativeCache(path).entries == {}
+
+
+def test_scraper_skips_cached_profile_and_records_private_list():
+    cache = NegativeCache()
+    resolver = IdentityResolver()
+    page = ScriptedPage()
+    scraper = ProfileScraper(page, ScriptedUtils("private"), identity_resolver=resolver, negative_cache=cache)
+
+    # A profile cached as missing is answered without a navigation
+    cache.record("jane.doe", "profile", "not_found")
+    assert asyncio.run(scraper.navigate_to_profile("https://www.facebook.com/Jane.Doe")) is False
+    assert scraper.negative_result["reason"] == "not_found" and page.visited == []
+
+    # A private friends list is recorded, then skipped and reported as harvested
+    scraper.use_profile("john.roe")
+    assert asyncio.run(scraper.get_friends_list()) == []
+    assert page.visited == ["https://www.facebook.com/john.roe/friends"]
+    assert cache.lookup("john.roe", "friends")["reason"] == "private"
+    scraper.list_metrics.clear()
+    assert asyncio.run(scraper.get_friends_list()) == []
+    assert len(page.visited) == 1
+    assert scraper.list_metrics["friends"] == {"items": 0, "negative": "private"}
+
+
+def test_locked_profile_header_is_restricted():
+    cache = NegativeCache()
+    page = ScriptedPage()
+    evidence = ["header_text:locked their profile"]
+    scraper, found = _navigate(page, ScriptedProfileUtils(page, "private", evidence), cache)
+    # One navigation, no retries, and the verdict is remembered as restricted
+    assert found is False and scraper.profile_locked
+    assert page.visited == ["https://www.facebook.com/jane.doe"]
+    entry = cache.lookup("jane.doe")
+    assert entry["reason"] == "restricted" and entry["evidence"] == evidence
+
+    # "Private" text elsewhere on a profile (a post, a hidden list) is not a locked profile
+    cache = NegativeCache()
+    scraper, found = _navigate(page, ScriptedProfileUtils(page, "private"), cache)
+    assert found is True and not scraper.profile_locked and cache.lookup("jane.doe") is None
+
+
+def test_not_found_needs_page_level_evidence():
+    page = ScriptedPage()
+    # "Page not found" somewhere in the page text of a profile is retried but never cached
+    cache = NegativeCache()
+    scraper, found = _navigate(page, ScriptedProfileUtils(page, "not_found"), cache, retries=1)
+    assert found is False and cache.lookup("jane.doe") is None
+
+    # The error page layout (no profile header at all) is
+    cache = NegativeCache()
+    evidence = ["text:page not found", "layout:no_profile_header"]
+    scraper, found = _navigate(page, ScriptedProfileUtils(page, "not_found", evidence=evidence), cache, retries=1)
+    assert found is False and cache.lookup("jane.doe")["evidence"] == evidence
+
+
+def test_private_text_with_list_items_is_not_a_private_list():
+    class ListPage(ScriptedPage):
+        async def query_selector(self, selector):
+            return object()
+
+    cache = NegativeCache()
+    page = ListPage()
+    scraper = ProfileScraper(page, ScriptedUtils("private"), identity_resolver=IdentityResolver(),
+                             negative_cache=cache)
+    scraper.use_profile("john.roe")
+    assert not asyncio.run(scraper._check_privacy_restrictions("a[href]"))
+    assert scraper.page_state["state"] == "profile" and cache.lookup("john.roe", "friends") is None
+
+    # With no items the same text describes the list
+    scraper.page = ScriptedPage()
+    assert asyncio.run(scraper._check_privacy_restrictions("a[href]"))
+    assert "empty_list:a[href]" in scraper.page_state["evidence"]
+
+
+if __name__ == "__main__":
+    test_ttls_aliases_and_persistence()
+    test_scraper_skips_cached_profile_and_records_private_list()
+    test_locked_profile_header_is_restricted()
+    test_not_found_needs_page_level_evidence()
+    test_private_text_with_list_items_is_not_a_private_list()
+    print("✅ Negative cache tests passed")
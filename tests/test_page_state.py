@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for the page-state classifier
+Checks the rule table offline, then (with Chromium) classifies one sample
+page per state and checks the verdict and its evidence come back from a
+single page call.
+"""
+import os
+import asyncio
+
+import pytest
+from playwright.async_api import async_playwright
+
+from scraper.utils import PAGE_STATE_RULES, PAGE_STATES, ScraperUtils
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+PAGES = {
+    "profile": '<div role="main"><h1>Jane Doe</h1><div>Lives in Casablanca</div></div>',
+    "login": '<form data-testid="royal_login_form"><input name="email"><button name="login">Log in</button></form>',
+    "checkpoint": '<div role="main"><h2>Confirm it\'s you</h2><form action="/checkpoint/?next">…</form></div>',
+    "private": '<div role="main"><span>This content isn\'t available right now</span></div>',
+    "not_found": '<div role="main"><span>This page isn\'t available</span>'
+                 '<span>The link you followed may be broken</span></div>',
+    "rate_limited": '<div role="dialog"><span>You\'re Temporarily Blocked</span></div>',
+    "error": '',
+}
+
+
+def test_rules_table():
+    assert PAGE_STATES == ["checkpoint", "login", "rate_limited", "not_found", "private", "error", "profile"]
+    for rule in PAGE_STATE_RULES:
+        # The page text is lowercased before matching
+        assert all(phrase == phrase.lower() for phrase in rule["text"])
+
+
+async def _classify_all():
+    async with async_playwright() as p:
+        try:
+            browser = await p.chromium.launch(headless=True)
+        except Exception as e:
+            pytest.skip(f"Chromium not available: {e}")
+        page = await browser.new_page()
+        utils = ScraperUtils(page)
+        calls = []
+        original_evaluate = page.evaluate
+
+        async def counting_evaluate(*args, **kwargs):
+            calls.append(args[0])
+            return await original_evaluate(*args, **kwargs)
+
+        page.evaluate = counting_evaluate
+        verdicts = {}
+        for expected, body in PAGES.items():
+            await page.set_content(f"<html><head><title>{expected}</title></head><body>{body}</body></html>")
+            verdicts[expected] = await utils.classify_page_state()
+        # A login widget on a logged-in page is not a login wall
+        await page.set_content(PAGES["login"] + '<div aria-label="Your profile"></div><div role="main">Feed</div>')
+        embedded_login = await utils.classify_page_state()
+        checkpoint = await utils.check_for_security_checkpoint()
+        # Error and block phrases inside posts are content, not page state
+        with open(os.path.join(FIXTURES_DIR, "profile_post_phrases.html"), "r", encoding="utf-8") as f:
+            await page.set_content(f.read())
+        post_phrases = await utils.classify_page_state()
+        await browser.close()
+        return verdicts, embedded_login, checkpoint, post_phrases, len(calls)
+
+
+def test_classify_pages():
+    verdicts, embedded_login, checkpoint, post_phrases, calls = asyncio.run(_classify_all())
+    for expected, verdict in verdicts.items():
+        assert verdict["state"] == expected, (expected, verdict)
+    assert "text:confirm it's you" in verdicts["checkpoint"]["evidence"]
+    assert "selector:form[data-testid='royal_login_form']" in verdicts["login"]["evidence"]
+    assert verdicts["error"]["evidence"] == ["empty_page"]
+    assert verdicts["profile"]["title"] == "profile"
+    assert embedded_login["state"] == "profile"
+    assert checkpoint is False
+    assert post_phrases["state"] == "profile", post_phrases
+    # One page call per verdict
+    assert calls == len(PAGES) + 3
+
+
+if __name__ == "__main__":
+    test_rules_table()
+    test_classify_pages()
+    print("✅ Page state tests passed")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for post history and delta refreshes
+Checks history merge/save/load, and that a delta run over a simulated feed
+stops after a run of known posts while returning the same timeline a full
+run would.
+"""
+import json
+import asyncio
+
+import pytest
+
+from scraper.post_history import PostHistory
+from scraper.posts_improved import PostsScraperImproved
+from scraper.scroll_driver import ScrollResult
+
+FEED_SIZE = 100
+PER_ROUND = 5
+
+
+def _post(n, reactions=0):
+    return {"id": f"post_{n}", "content": f"Post number {n}", "reactions": {"total": reactions},
+            "original_url": f"https://www.facebook.com/demo/posts/{100000000000 + n}?__cft__=x"}
+
+
+def test_merge_save_and_load(tmp_path):
+    path = str(tmp_path / "demo_posts.json")
+    history = PostHistory(path, "demo")
+    history.merge([_post(2), _post(1)])
+    history.save()
+
+    history = PostHistory(path, "demo")
+    assert len(history) == 2
+    # Same permalink with a different tracking query is the same post
+    assert history.is_known({"id": "other", "original_url": "https://www.facebook.com/demo/posts/100000000001"})
+
+    merged = history.merge([_post(4), _post(3), _post(2, reactions=7)])
+    assert [p["id"] for p in merged] == ["post_4", "post_3", "post_2", "post_1"]
+    assert merged[2]["reactions"] == {"total": 7}
+
+
+def test_merge_run_reaching_past_history(tmp_path):
+    history = PostHistory(str(tmp_path / "demo_posts.json"), "demo")
+    history.merge([_post(5), _post(4)])
+    # A fresh run with a newer post that also reaches further back than the stored history
+    merged = history.merge([_post(6), _post(5), _post(4), _post(3), _post(2)])
+    assert [p["id"] for p in merged] == ["post_6", "post_5", "post_4", "post_3", "post_2"]
+
+    # Unknown posts between known ones stay between them
+    merged = history.merge([_post(7), _post(6), _post(5, reactions=1), {"id": "post_4b"}, _post(4)])
+    assert [p["id"] for p in merged] == ["post_7", "post_6", "post_5", "post_4b", "post_4", "post_3", "post_2"]
+
+
+def test_index_aliases_last_seen_and_v1_migration(tmp_path):
+    path = tmp_path / "demo_posts.json"
+    path.write_text(json.dumps({"profile": "demo", "updated_at": 1700000000, "posts": [_post(2), _post(1)]}))
+    history = PostHistory(str(path), "demo")
+    assert [p["id"] for p in history.posts] == ["post_2", "post_1"]
+    assert history.last_seen(_post(1)) == 1700000000
+
+    # A later run sees post 1 under its numeric ID only: same entry, refreshed last-seen time
+    history.merge([{"id": "100000000001", "reactions": {"total": 3}}], seen_at=1700086400)
+    assert len(history) == 2
+    assert history.find({"id": "100000000001"})["id"] == "post_1"
+    assert history.last_seen(_post(1)) == 1700086400
+    history.save()
+    assert json.loads(path.read_text())["version"] == 2
+    assert PostHistory(str(path), "demo").last_seen({"id": "100000000001"}) == 1700086400
+
+
+class SimulatedFeed:
+    """Timeline where each scroll reveals PER_ROUND more posts, newest first"""
+
+    def __init__(self):
+        self.visible = PER_ROUND
+        self.rounds = 0
+
+    async def extract(self):
+        self.rounds += 1
+        return [_post(n) for n in range(self.visible)]
+
+    async def scroll(self):
+        grew = self.visible < FEED_SIZE
+        self.visible = min(FEED_SIZE, self.visible + PER_ROUND)
+        return ScrollResult("nodes" if grew else "end_of_feed", grew, 0.0, self.visible, self.visible * 500)
+
+
+def _run(scraper, feed, max_posts):
+    scraper._extract_current_posts_with_enhanced_content = feed.extract
+    scraper._smart_scroll_for_more_posts = feed.scroll
+    return asyncio.run(scraper._extract_all_posts_chronologically(max_posts))
+
+
+def test_delta_run_stops_at_known_posts(tmp_path):
+    # Yesterday's run stored everything from post 7 down
+    history = PostHistory(str(tmp_path / "demo_posts.json"), "demo")
+    history.merge([_post(n) for n in range(7, FEED_SIZE)])
+
+    scraper = PostsScraperImproved(page=None, utils=None, history_dir=str(tmp_path), delta=True)
+    scraper.post_history = history
+    feed = SimulatedFeed()
+    fresh = _run(scraper, feed, max_posts=FEED_SIZE)
+
+    assert feed.rounds == 2  # posts 0-9: seven new, then three known in a row
+    assert [p["id"] for p in fresh] == [f"post_{n}" for n in range(10)]
+    merged = history.merge(fresh)
+    assert [p["id"] for p in merged] == [f"post_{n}" for n in range(FEED_SIZE)]
+
+    full_feed = SimulatedFeed()
+    full = _run(PostsScraperImproved(page=None, utils=None), full_feed, max_posts=FEED_SIZE)
+    assert [p["id"] for p in full] == [p["id"] for p in merged]
+    assert full_feed.rounds == FEED_SIZE // PER_ROUND
+
+
+def test_delta_requires_history():
+    with pytest.raises(ValueError):
+        PostsScraperImproved(page=None, utils=None, delta=True)
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    for test in (test_merge_save_and_load, test_merge_run_reaching_past_history,
+                 test_index_aliases_last_seen_and_v1_migration,
+                 test_delta_run_stops_at_known_posts):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    test_delta_requires_history()
+    print("✅ Post history tests passed")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test script for canonical post identity
+Checks permalink and story-ID parsing, that the DOM extractor and the GraphQL
+parser agree on a post's ID, and that the ID survives changes to the rendered
+text such as reaction counts.
+"""
+import asyncio
+
+from scraper.post_identity import canonical_post_id, decode_story_id, ids_from_url, post_aliases
+from scraper.graphql_capture import parse_story
+from scraper.html_backend import SnapshotPage
+from scraper.posts_improved import PostsScraperImproved
+
+POST_ID = "1234567890123456"
+STORY_ID = "UzpfSTEwMDAwNDU2Nzg5MDEyMzoxMjM0NTY3ODkwMTIzNDU2"  # S:_I100004567890123:1234567890123456
+PFBID = "pfbid0abcDEF123xyz"
+
+
+def test_permalink_forms():
+    assert ids_from_url(f"https://www.facebook.com/demo/posts/{POST_ID}?__cft__[0]=x") == [POST_ID]
+    assert ids_from_url(f"/permalink.php?story_fbid={POST_ID}&id=100004567890123") == [POST_ID]
+    assert ids_from_url(f"https://www.facebook.com/story.php?story_fbid={PFBID}&id=1000045") == [PFBID]
+    assert ids_from_url(f"https://www.facebook.com/groups/123456789/permalink/{POST_ID}/") == [POST_ID]
+    assert ids_from_url(f"https://www.facebook.com/photo/?fbid={POST_ID}&set=a.987654321") == [POST_ID]
+    assert ids_from_url("https://www.facebook.com/demo/photos/a.98765432/1122334455/") == ["1122334455"]
+    # The owner's profile ID is never taken for the post
+    assert ids_from_url("https://www.facebook.com/profile.php?id=100004567890123") == []
+
+
+def test_canonical_preference():
+    assert decode_story_id(STORY_ID) == POST_ID
+    assert canonical_post_id(story_id=STORY_ID) == POST_ID
+    assert canonical_post_id(url=f"https://www.facebook.com/demo/posts/{PFBID}", post_id=POST_ID) == POST_ID
+    assert canonical_post_id(url=f"https://www.facebook.com/demo/posts/{PFBID}") == PFBID
+    assert set(post_aliases({"id": POST_ID, "story_id": STORY_ID,
+                             "original_url": f"https://www.facebook.com/demo/posts/{PFBID}"})) == {POST_ID, STORY_ID, PFBID}
+
+
+def _post_html(reactions):
+    return f"""
+    <html><body><div role="article">
+      <a href="/demo/posts/{POST_ID}?__cft__[0]=AZX">3h</a>
+      <div data-ad-preview="message">Weekend hike up the mountain with the whole family</div>
+      <span>{reactions} reactions</span>
+    </div></body></html>
+    """
+
+
+def _dom_id(html):
+    async def run():
+        page = SnapshotPage(html)
+        element = (await page.query_selector_all('div[role="article"]'))[0]
+        scraper = PostsScraperImproved(page, None)
+        url = await scraper._extract_enhanced_post_url(element)
+        return await scraper._generate_enhanced_post_id(element, url, "")
+    return asyncio.run(run())
+
+
+def test_dom_id_is_stable_and_matches_graphql():
+    assert _dom_id(_post_html(12)) == _dom_id(_post_html(57)) == POST_ID
+    record = parse_story({"__typename": "Story", "id": STORY_ID,
+                          "url": f"https://www.facebook.com/demo/posts/{POST_ID}",
+                          "message": {"text": "Weekend hike up the mountain with the whole family"}})
+    assert record["id"] == POST_ID
+
+
+if __name__ == "__main__":
+    test_permalink_forms()
+    test_canonical_preference()
+    test_dom_id_is_stable_and_matches_graphql()
+    print("✅ Post identity tests passed")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for clipped background post screenshots
+Captures three posts of a local page as clipped WebP and JPEG images through
+the background queue, then changes one post and checks that only that post
+is captured again. Images go into a MediaStore, where identical captures are
+stored once. The browser part is skipped without Chromium.
+"""
+import os
+import json
+import asyncio
+import tempfile
+
+import pytest
+from playwright.async_api import async_playwright
+
+from scraper.media_store import MediaStore
+from scraper.screenshot_service import ScreenshotService
+
+FEED_HTML = """
+<html><body style="margin:0">
+  <div role="article" id="p1" style="height:300px;width:500px;background:#fee">First post</div>
+  <div role="article" id="p2" style="height:300px;width:500px;background:#efe">Second post</div>
+  <div style="height:2000px"></div>
+  <div role="article" id="p3" style="height:300px;width:500px;background:#eef">Third post, far below</div>
+  <div role="article" id="p4" style="height:300px;width:500px;background:#eef">Third post, far below</div>
+</body></html>
+"""
+
+
+def test_rejects_unknown_format():
+    with tempfile.TemporaryDirectory() as out:
+        with pytest.raises(ValueError):
+            ScreenshotService(None, MediaStore(os.path.join(out, "media")), out, image_format="bmp")
+
+
+async def _capture(out, image_format):
+    async with async_playwright() as p:
+        try:
+            browser = await p.chromium.launch(headless=True)
+        except Exception as e:
+            pytest.skip(f"Chromium not available: {e}")
+        page = await browser.new_page(viewport={"width": 800, "height": 600})
+        await page.set_content(FEED_HTML)
+        store = MediaStore(os.path.join(out, "media"), url_prefix="/static/media")
+        service = ScreenshotService(page, store, out, image_format=image_format)
+        posts = [{"id": f"p{n}", "media_screenshot_url": ""} for n in (1, 2, 3, 4)]
+        for post in posts:
+            service.submit(post, await page.query_selector(f"#{post['id']}"))
+        await service.close()
+        first = dict(service.stats)
+
+        # Second run: one post changed since
+        await page.evaluate("document.querySelector('#p2').textContent = 'Second post, edited'")
+        service = ScreenshotService(page, MediaStore(store.root, url_prefix="/static/media"), out,
+                                    image_format=image_format)
+        for post in posts:
+            service.submit(post, await page.query_selector(f"#{post['id']}"))
+        await service.close()
+        await browser.close()
+        return posts, first, dict(service.stats), service.store
+
+
+@pytest.mark.parametrize("image_format,ext,magic", [("webp", "webp", b"RIFF"), ("jpeg", "jpg", b"\xff\xd8")])
+def test_clipped_capture_and_hash_skip(image_format, ext, magic):
+    with tempfile.TemporaryDirectory() as out:
+        posts, first, second, store = asyncio.run(_capture(out, image_format))
+        assert first == {"captured": 4, "unchanged": 0, "failed": 0}
+        assert second == {"captured": 1, "unchanged": 3, "failed": 0}
+        # p3 and p4 look identical: one stored image serves both
+        assert posts[2]["media_screenshot_url"] == posts[3]["media_screenshot_url"]
+        assert len({post["media_screenshot_url"] for post in posts}) == 3
+        for post in posts:
+            assert post["media_screenshot_url"].startswith("/static/media/objects/")
+            assert post["media_screenshot_url"].endswith(f".{ext}")
+            path = os.path.join(store.root, post["media_screenshot_url"][len("/static/media/"):])
+            with open(path, "rb") as f:
+                assert f.read(4) == magic
+        with open(os.path.join(out, "screenshots_index.json"), encoding="utf-8") as f:
+            assert set(json.load(f)["p1"]) == {"hash", "sha256"}
+
+
+if __name__ == "__main__":
+    test_rejects_unknown_format()
+    test_clipped_capture_and_hash_skip("webp", "webp", b"RIFF")
+    test_clipped_capture_and_hash_skip("jpeg", "jpg", b"\xff\xd8")
+    print("✅ Screenshot service tests passed")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the event-driven scroll driver
+Serves a local infinite-scroll page (items appended after a delay on scroll,
+then an end-of-feed marker) and checks the driver returns on growth instead
+of a fixed sleep. Skipped when Chromium cannot be launched.
+"""
+import time
+import asyncio
+
+import pytest
+from playwright.async_api import async_playwright
+
+from scraper.scroll_driver import ScrollDriver
+
+FEED_HTML = """
+<html><body>
+<div id="feed"></div>
+<script>
+  let pages = 0;
+  const feed = document.getElementById('feed');
+  function addPage() {
+    for (let i = 0; i < 5; i++) {
+      const item = document.createElement('div');
+      item.setAttribute('role', 'article');
+      item.style.height = '400px';
+      item.textContent = 'Post ' + (pages * 5 + i);
+      feed.appendChild(item);
+    }
+    pages++;
+  }
+  addPage();
+  let loading = false;
+  window.addEventListener('scroll', () => {
+    if (loading || window.innerHeight + window.scrollY < document.body.scrollHeight - 50) return;
+    loading = true;
+    setTimeout(() => {
+      if (pages < 3) { addPage(); }
+      else if (!document.getElementById('end')) {
+        const end = document.createElement('div');
+        end.id = 'end';
+        end.textContent = 'No more posts to show';
+        document.body.appendChild(end);
+      }
+      loading = false;
+    }, 300);
+  });
+</script>
+</body></html>
+"""
+
+
+async def _run_feed():
+    async with async_playwright() as p:
+        try:
+            browser = await p.chromium.launch(headless=True)
+        except Exception as e:
+            pytest.skip(f"Chromium not available: {e}")
+        page = await browser.new_page(viewport={"width": 800, "height": 600})
+        await page.set_content(FEED_HTML)
+
+        driver = ScrollDriver(page, item_selector='div[role="article"]',
+                              min_delay=0.05, max_delay=0.1, timeout=5.0)
+        results = []
+        start = time.time()
+        for _ in range(6):
+            result = await driver.scroll()
+            results.append(result)
+            if result.end_of_feed:
+                break
+        elapsed = time.time() - start
+        driver.close()
+        await browser.close()
+        return results, elapsed, driver.report()
+
+
+def test_scroll_waits_on_growth_and_stops_at_end_marker():
+    results, elapsed, report = asyncio.run(_run_feed())
+
+    assert [r.grew for r in results[:2]] == [True, True]
+    assert results[0].reason in ("nodes", "height")
+    assert results[-1].end_of_feed
+    # Two pages at ~300ms plus the end marker: well under the old fixed sleeps
+    assert elapsed < 4.0
+    assert report["reasons"].get("end_of_feed") == 1
+
+
+if __name__ == "__main__":
+    test_scroll_waits_on_growth_and_stops_at_end_marker()
+    print("✅ Scroll driver tests passed")
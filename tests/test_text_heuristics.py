@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for the compiled text heuristics
+Checks that every function in scraper.text_heuristics returns exactly what the
+PostsScraperImproved reference methods return, on a corpus pulled from the
+bundled HTML samples plus hand-written edge cases.
+"""
+import os
+import asyncio
+
+from scraper import text_heuristics
+from scraper.html_backend import SnapshotPage
+from scraper.posts_improved import PostsScraperImproved
+from scraper.utils import ScraperUtils
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES = ["fb_profile_sample.html", "debug_facebook_page.html"]
+
+EDGE_CASES = [
+    "", "   ", "Like", "Like Comment Share", "See more", "What's on your mind?",
+    "Happy birthday to my best friend, have a great day!",
+    "Facebook Facebook Facebook Facebook Facebook is everywhere today.",
+    "FacebookFacebook we love it so much, thanks everyone",
+    "5 minutes ago Like  Comment Share  mobile uploads",
+    "5 Like minutes ago but still a sentence here.",
+    "THIS IS ALL CAPS TEXT WITHOUT PUNCTUATION",
+    "123456789 987654321 12345 call now!!",
+    "Visit abc.defghijklmnopqrstuvwxyz.com for more info, friends.",
+    "Shared with Public and 23 friends. Beautiful sunset tonight #sunset",
+    "Following Home Watch Marketplace Groups Gaming",
+    "We had an amazing time at the beach. 🌊 #summer #fun",
+    "Congratulations on the new job, so proud of you!",
+    "I am at the park in the sun with a dog and it is good to be here.",
+    " ".join(["Facebook"] * 12 + ["posted", "a", "new", "photo", "today", "with", "friends"]),
+]
+
+
+def _build_corpus():
+    async def collect(html):
+        page = SnapshotPage(html)
+        texts = []
+        for selector in ("span", "div[dir='auto']", "a", "h1, h2, h3"):
+            for element in await page.query_selector_all(selector):
+                texts.append(await element.text_content())
+        body = await page.evaluate("() => document.body.innerText")
+        texts.extend(body.split("\n"))
+        return texts
+
+    corpus = list(EDGE_CASES)
+    for name in SAMPLES:
+        with open(os.path.join(ROOT_DIR, name), "r", encoding="utf-8") as f:
+            corpus.extend(asyncio.run(collect(f.read())))
+    return corpus
+
+
+def test_matches_reference_methods():
+    scraper = PostsScraperImproved(SnapshotPage(""), ScraperUtils(None))
+    pairs = [
+        (text_heuristics.is_actual_post_content, scraper._is_actual_post_content),
+        (text_heuristics.score_content_quality, scraper._score_content_quality),
+        (text_heuristics.is_ui_text, scraper._is_ui_text),
+        (text_heuristics.is_content_line, scraper._is_content_line),
+        (text_heuristics.clean_facebook_content, scraper._clean_facebook_content),
+        (text_heuristics.final_content_cleanup, scraper._final_content_cleanup),
+        (text_heuristics.clean_repetitive_text, scraper._clean_repetitive_text),
+    ]
+
+    corpus = _build_corpus()
+    assert len(corpus) > 200
+    for text in corpus:
+        for fast, reference in pairs:
+            assert fast(text) == reference(text), (reference.__name__, text[:80])
+
+
+def test_batched_candidates_match_reference():
+    scraper = PostsScraperImproved(SnapshotPage(""), ScraperUtils(None))
+    corpus = _build_corpus()
+
+    expected = []
+    for text in corpus:
+        if text and len(text.strip()) > 20:
+            cleaned = scraper._clean_facebook_content(text.strip())
+            if len(cleaned) > 20 and scraper._is_actual_post_content(cleaned):
+                expected.append((cleaned, scraper._score_content_quality(cleaned)))
+    assert text_heuristics.score_candidates(corpus, 20) == expected
+
+    full_text = "\n".join(corpus)
+    expected_lines = []
+    for line in [line.strip() for line in full_text.split('\n') if line.strip()]:
+        if len(line) > 25 and scraper._is_actual_post_content(line) and not scraper._is_ui_text(line):
+            cleaned = scraper._clean_facebook_content(line)
+            if len(cleaned) > 20:
+                expected_lines.append((cleaned, scraper._score_content_quality(cleaned)))
+    assert text_heuristics.score_lines(full_text) == expected_lines
+
+
+def test_final_cleanup_collapses_repeated_facebook():
+    assert text_heuristics.final_content_cleanup("Facebook Facebook Facebook rocks the world today") == \
+        "Facebook rocks the world today"
+
+
+if __name__ == "__main__":
+    test_matches_reference_methods()
+    test_batched_candidates_match_reference()
+    test_final_cleanup_collapses_repeated_facebook()
+    print("✅ Text heuristics tests passed")
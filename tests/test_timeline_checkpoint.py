@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for resumable timeline checkpoints
+Checks the append-only journal round-trips posts, records and the cursor,
+writes the pagination request only when it changes, tolerates a torn last line, drops stale or finished checkpoints, and that an
+interrupted cursor-paginated run resumes at the journaled cursor against the
+local GraphQL stand-in server.
+"""
+import os
+import json
+import time
+import asyncio
+
+import aiohttp
+
+from scraper.timeline_checkpoint import TimelineCheckpoint
+from scraper.posts_improved import PostsScraperImproved
+from scraper.graphql_paginator import FetchLimiter
+from test_graphql_paginator import HTTPPage, _seed_capture, _start_server, TOTAL_PAGES
+
+
+def _post(n):
+    return {"id": f"post_{n}", "content": f"Post number {n}", "timestamp": "2h"}
+
+
+def test_journal_round_trip(tmp_path):
+    path = str(tmp_path / "demo_timeline.jsonl")
+    checkpoint = TimelineCheckpoint(path, "demo")
+    checkpoint.record_round([_post(1), _post(2)], scroll_height=3000)
+    checkpoint.record_round([_post(3)], scroll_height=5200, cursor="CURSOR_2",
+                            request={"url": "/api/graphql/"}, new_records={"story3": {"post_id": "3"}})
+    checkpoint.close()
+
+    state = TimelineCheckpoint(path, "demo").load()
+    assert [p["id"] for p in state["posts"]] == ["post_1", "post_2", "post_3"]
+    assert state["seen_post_ids"] == {"post_1", "post_2", "post_3"}
+    assert state["records"] == {"story3": {"post_id": "3"}}
+    assert state["scroll_height"] == 5200
+    assert state["cursor"] == "CURSOR_2"
+    assert state["request"] == {"url": "/api/graphql/"}
+
+
+def test_request_is_journaled_once(tmp_path):
+    path = str(tmp_path / "demo_timeline.jsonl")
+    request = {"url": "/api/graphql/", "headers": {"x-fb-lsd": "token"}, "variables": {"id": "1"}}
+    checkpoint = TimelineCheckpoint(path, "demo")
+    for n in range(5):
+        checkpoint.record_round([_post(n)], scroll_height=1000 * n, cursor=f"CURSOR_{n}", request=dict(request))
+    changed = dict(request, headers={"x-fb-lsd": "refreshed"})
+    checkpoint.record_round([_post(5)], scroll_height=6000, cursor="CURSOR_5", request=changed)
+    checkpoint.close()
+
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    # Progress lines carry only the cursor, counts and height; the request is written when it changes
+    assert [line["request"] for line in lines if line["type"] == "request"] == [request, changed]
+    progress = [line for line in lines if line["type"] == "progress"]
+    assert all("request" not in line for line in progress)
+    assert [line["posts"] for line in progress] == [1, 2, 3, 4, 5, 6]
+
+    resumed = TimelineCheckpoint(path, "demo")
+    state = resumed.load()
+    assert state["request"] == changed and state["cursor"] == "CURSOR_5"
+    # A resumed run does not journal the same request again
+    resumed.record_round([_post(6)], scroll_height=7000, cursor="CURSOR_6", request=dict(changed))
+    resumed.close()
+    with open(path, "r", encoding="utf-8") as f:
+        assert sum(json.loads(line)["type"] == "request" for line in f) == 2
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    path = str(tmp_path / "demo_timeline.jsonl")
+    checkpoint = TimelineCheckpoint(path, "demo")
+    checkpoint.record_round([_post(1)], scroll_height=1000)
+    checkpoint.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type": "post", "time": 1, "post": {"id": "po')  # process died mid-write
+
+    state = TimelineCheckpoint(path, "demo").load()
+    assert [p["id"] for p in state["posts"]] == ["post_1"]
+    assert state["scroll_height"] == 1000
+
+
+def test_stale_and_finished_checkpoints_are_ignored(tmp_path):
+    path = str(tmp_path / "demo_timeline.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        old = time.time() - 7200
+        f.write(json.dumps({"type": "meta", "profile": "demo", "created_at": old}) + "\n")
+        f.write(json.dumps({"type": "post", "time": old, "post": _post(1)}) + "\n")
+    assert TimelineCheckpoint(path, "demo", ttl=3600).load() is None
+    assert not os.path.exists(path)
+
+    checkpoint = TimelineCheckpoint(path, "demo")
+    checkpoint.record_round([_post(1)])
+    checkpoint.complete()
+    assert not os.path.exists(path)
+    assert TimelineCheckpoint(path, "demo").load() is None
+
+
+def test_interrupted_pagination_resumes_at_cursor(tmp_path):
+    async def run():
+        runner, base_url, requests = await _start_server()
+        try:
+            async with aiohttp.ClientSession() as session:
+                page = HTTPPage(session)
+
+                # First run journals each page, then dies after 80 posts
+                first = PostsScraperImproved(page, None, paginate_graphql=True)
+                first.graphql_paginator.limiter = FetchLimiter(requests_per_second=50)
+                first.checkpoint = TimelineCheckpoint(str(tmp_path / "demo_timeline.jsonl"), "demo")
+                _seed_capture(first.graphql_capture, base_url)
+                await first.graphql_paginator.paginate(80, on_page=first._checkpoint_round)
+                first.checkpoint.close()
+                interrupted_at = len(requests)
+
+                # A fresh scraper picks up from the journal instead of starting over
+                second = PostsScraperImproved(page, None, paginate_graphql=True)
+                second.graphql_paginator.limiter = FetchLimiter(requests_per_second=50)
+                second.checkpoint = TimelineCheckpoint(str(tmp_path / "demo_timeline.jsonl"), "demo")
+                posts = await second._extract_all_posts_chronologically(200)
+                return posts, requests, interrupted_at
+        finally:
+            await runner.cleanup()
+
+    posts, requests, interrupted_at = asyncio.run(run())
+    assert interrupted_at == 3
+    assert [r["cursor"] for r in requests[interrupted_at:]] == [f"CURSOR_{i}" for i in range(4, TOTAL_PAGES)]
+    assert len(posts) == 200
+    assert len({p["post_id"] for p in posts}) == 200
+    assert not os.path.exists(tmp_path / "demo_timeline.jsonl")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    for test in (test_journal_round_trip, test_request_is_journaled_once,
+                 test_torn_last_line_is_skipped,
+                 test_stale_and_finished_checkpoints_are_ignored, test_interrupted_pagination_resumes_at_cursor):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("✅ Timeline checkpoint tests passed")